@@ -1,15 +1,20 @@
 # app/api/routers/ai_router.py
 from xml.etree.ElementTree import tostring
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 import asyncio
 from app.core.ai_manager import ai_manager
-from exchanges.binance import FuturesSymbol, BinanceFuturesClient
+from exchanges.binance import AsyncBinanceFuturesClient
+from exchanges.binance.ratelimit import Priority, request_priority
+from app.core.dependencies import ValidSymbol, get_binance_client
 
 router = APIRouter(prefix="/api/ai", tags=["ai"])
 
+# 交易分析发送给模型的K线数量上限
+TRADER_KLINES_WINDOW = 120
+
 
 class ChatMessage(BaseModel):
     role: str
@@ -36,7 +41,7 @@ class ChatTraderRequest(BaseModel):
     klines_count: Optional[int] = 100
     session_id: Optional[str] = None
     is_Trader: Optional[bool] = False
-    symbol: FuturesSymbol = Query(..., description="交易对", example="BTCUSDT")
+    symbol: ValidSymbol = Query(..., description="交易对", example="BTCUSDT")
     interval: str = Query(
         "1h",
         description="K线间隔",
@@ -120,7 +125,8 @@ async def chat_completion(request: ChatRequest):
 
 
 @router.post("/chat/trader")
-async def chat_completion(request: ChatTraderRequest):
+async def chat_completion(request: ChatTraderRequest,
+                          client: AsyncBinanceFuturesClient = Depends(get_binance_client)):
     """AI聊天接口"""
     try:
         # 获取服务实例
@@ -147,17 +153,19 @@ async def chat_completion(request: ChatTraderRequest):
 
         # 判断是否新增交易k线数据
         if request.is_Trader is True:
-            # 使用同步客户端获取带技术指标的K线数据
-            client = BinanceFuturesClient()
-            klines = client.get_klines_with_indicators(
-                symbol=request.symbol,
-                interval=request.interval,
-                limit=request.klines_count,
-                start_time=None,
-                end_time=None
-            )
-            # 将k线数据的后100根作为系统消息添加到消息列表开头
-            messages = [{"role": "system", "content": str(klines[-120:])}]
+            # 使用共享连接池的异步客户端获取带技术指标的K线数据，
+            # 按指标预热期多取历史K线，返回的窗口中每一行指标都有值；
+            # 交易请求以最高优先级排队，权重不足时先于页面查询和历史回补获得权重
+            with request_priority(Priority.LIVE):
+                klines = await client.get_klines_with_indicators(
+                    symbol=request.symbol,
+                    interval=request.interval,
+                    limit=min(request.klines_count or TRADER_KLINES_WINDOW, TRADER_KLINES_WINDOW),
+                    start_time=None,
+                    end_time=None
+                )
+            # 将k线数据作为系统消息添加到消息列表开头
+            messages = [{"role": "system", "content": str(klines)}]
             # system_message = {"role": "system", "content": str(klines)}
             # messages = [system_message]
         else:
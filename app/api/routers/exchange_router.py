@@ -1,23 +1,37 @@
 # app/api/routers/exchange_router.py
-from fastapi import APIRouter, HTTPException, Query
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, WebSocket, WebSocketDisconnect
+from pydantic import BaseModel, ConfigDict
 from typing import List, Optional
 from datetime import datetime
 import asyncio
+import json
+import logging
 import sys
 import os
 
 # 添加exchanges模块到路径
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
-from exchanges.binance.futures import BinanceFuturesClient, FuturesSymbol
+from exchanges.binance.futures import BinanceFuturesClient
+from exchanges.binance.symbols import Symbol, symbol_registry
+from exchanges.binance.async_futures import AsyncBinanceFuturesClient
+from exchanges.binance.executor import IndicatorQueueFull, IndicatorTimeout
 from exchanges.binance.indicators import TechnicalIndicators
+from exchanges.binance.push import KlinePushHub
+from app.core.dependencies import get_binance_client, get_kline_hub, get_symbol
+from app.core.caching import conditional, kline_validator
+from app.core.formats import COLUMN_MEDIA_TYPES, MEDIA_TYPES, FastJSONResponse, column_response, dumps, negotiate_format
+from app.core.streaming import stream_rows
 router = APIRouter(prefix="/api/exchange", tags=["exchange"])
+logger = logging.getLogger(__name__)
 
 # 更新 app/api/routers/exchange_router.py 中的 KlineResponse 模型
 # 在 app/api/routers/exchange_router.py 中修改 KlineResponse 模型
 
 class KlineResponse(BaseModel):
+    # 允许按请求参数生成的指标字段（如 rsi_9、ema_50）
+    model_config = ConfigDict(extra="allow")
+
     symbol: str # 交易对
     interval: str # 周期
     open_time: str # 开盘时间:
@@ -87,19 +101,27 @@ class KlineResponse(BaseModel):
     volatility_20: Optional[float] = None  # 20周期波动率
 
 
+# 接口文档按以下模型生成；K线和指标接口返回 FastJSONResponse 直接编码引擎输出，不再逐行校验
 class KlinesResponse(BaseModel):
     symbol: str
     interval: str
     klines: List[KlineResponse]
 
 
+class BatchKlinesResponse(BaseModel):
+    interval: str
+    results: List[KlinesResponse]
+
+
+# 其他响应格式在接口文档中的说明：ndjson/sse 每行/每个事件为一个 KlineResponse 对象，
+# columns/msgpack/arrow 为按列编码的K线和指标
+FORMAT_RESPONSES = {200: {"content": {media_type: {} for format, media_type in MEDIA_TYPES.items() if format != "json"}}}
 
-# 定义可用的交易对列表
-AVAILABLE_SYMBOLS = [symbol.value for symbol in FuturesSymbol]
 
-@router.get("/binance/futures/klines", response_model=KlinesResponse)
+
+@router.get("/binance/futures/klines", response_model=KlinesResponse, responses=FORMAT_RESPONSES)
 async def get_binance_futures_klines(
-    symbol: FuturesSymbol = Query(..., description="交易对", example="BTCUSDT"),
+    symbol: Symbol = Depends(get_symbol),
     interval: str = Query(
         "1h",
         description="K线间隔",
@@ -107,22 +129,30 @@ async def get_binance_futures_klines(
     ),
     limit: int = Query(500, ge=1, le=1500, description="返回的K线数量"),
     start_time: Optional[int] = Query(None, description="开始时间戳(毫秒)"),
-    end_time: Optional[int] = Query(None, description="结束时间戳(毫秒)")
+    end_time: Optional[int] = Query(None, description="结束时间戳(毫秒)"),
+    format: Optional[str] = Query(
+        None,
+        description="响应格式: json（默认） | ndjson（每行一根K线） | sse（每个事件一根K线） | "
+                    "columns（按列的 JSON） | msgpack | arrow（Arrow IPC 流），为空时按 Accept 头协商"
+    ),
+    accept: Optional[str] = Header(None, description="format 为空时按媒体类型协商响应格式"),
+    if_none_match: Optional[str] = Header(None, description="上次响应的 ETag，K线窗口未变化时返回 304"),
+    client: AsyncBinanceFuturesClient = Depends(get_binance_client)
 ):
     """
-    获取币安合约K线数据
+    获取币安合约K线数据（format=ndjson/sse 时逐行流式返回，columns/msgpack/arrow 时按列编码）
+
+    响应带 ETag / Last-Modified，Cache-Control 的 max-age 对齐到最后一根K线收盘；
+    If-None-Match 与当前K线窗口的 ETag 相同时直接返回 304，不再序列化。
     """
     try:
-        # 验证symbol是否支持
-        if symbol.value not in AVAILABLE_SYMBOLS:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Unsupported symbol: {symbol.value}. Available symbols: {AVAILABLE_SYMBOLS}"
-            )
+        format = negotiate_format(format, accept)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        # 使用同步客户端（直接HTTP请求）
-        client = BinanceFuturesClient()
-        klines = client.get_klines(
+    try:
+        # 使用共享连接池的异步客户端取列式K线，只有逐行输出的格式才转换为旧格式
+        klines = await client.get_kline_columns(
             symbol=symbol,
             interval=interval,
             limit=limit,
@@ -130,24 +160,39 @@ async def get_binance_futures_klines(
             end_time=end_time
         )
 
-        return KlinesResponse(
-            symbol=symbol.value,
-            interval=interval,
-            klines=klines
-        )
+        validator = kline_validator(("klines", symbol.value, interval, limit, start_time, end_time, format), klines,
+                                    format)
+        if validator is not None and validator.matches(if_none_match):
+            return validator.not_modified()
+
+        if format in COLUMN_MEDIA_TYPES:
+            return conditional(validator, column_response(klines, format))
+        if format != "json":
+            return conditional(validator, stream_rows(klines.to_klines(), format))
+
+        # 跳过 KlinesResponse 对每一行的校验，直接编码
+        return conditional(validator, FastJSONResponse(
+            {"symbol": symbol.value, "interval": interval, "klines": klines.to_klines()}))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/binance/futures/symbols")
-async def get_available_symbols():
+async def get_available_symbols(
+    details: bool = Query(False, description="是否返回每个交易对的元数据（价格/数量精度、最小变动单位等）")
+):
     """
-    获取支持的交易对列表
+    获取支持的交易对列表（来自交易所 exchangeInfo，后台定期刷新）
     """
-    return {
-        "symbols": AVAILABLE_SYMBOLS,
-        "count": len(AVAILABLE_SYMBOLS)
+    symbols = symbol_registry.symbols()
+    result = {
+        "symbols": symbols,
+        "count": len(symbols),
+        "registry": symbol_registry.stats()
     }
+    if details:
+        result["details"] = {symbol: symbol_registry.get(symbol).to_dict() for symbol in symbols}
+    return result
 
 @router.get("/binance/futures/indicators")
 async def get_supported_indicators():
@@ -158,16 +203,214 @@ async def get_supported_indicators():
         indicators = TechnicalIndicators.get_supported_indicators()
         return {
             "indicators": indicators,
-            "count": len(indicators)
+            "count": len(indicators),
+            "backend": TechnicalIndicators.engine_class.BACKEND
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/binance/futures/indicators/cache")
+async def get_indicator_cache_stats():
+    """
+    获取技术指标缓存的命中统计
+    """
+    try:
+        return {
+            "frames": BinanceFuturesClient.frame_cache.stats(),
+            "indicators": TechnicalIndicators.memo.stats()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/binance/futures/stream")
+async def get_kline_stream_stats(client: AsyncBinanceFuturesClient = Depends(get_binance_client)):
+    """
+    获取K线推送服务的连接状态、订阅列表和内存K线命中统计
+    """
+    try:
+        if client.kline_stream is None:
+            return {"enabled": False}
+        return {"enabled": True, **client.kline_stream.stats()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/binance/futures/push")
+async def get_kline_push_stats(hub: KlinePushHub = Depends(get_kline_hub)):
+    """
+    获取K线实时推送的订阅、计算次数和推送次数统计
+    """
+    try:
+        return hub.stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.websocket("/binance/futures/ws")
+async def kline_push_websocket(websocket: WebSocket, hub: KlinePushHub = Depends(get_kline_hub)):
+    """
+    K线和技术指标实时推送
+
+    客户端发送 {"action": "subscribe" | "unsubscribe", "symbol": "BTCUSDT", "interval": "1h",
+    "indicators": "rsi:9,ema:20"}（indicators 为空时计算全部默认指标）；
+    服务端推送 {"type": "klines", "symbol", "interval", "indicators", "klines": [...]}（indicators 为规范化的
+    指标字符串，如 "ema:20,rsi:9"，与订阅确认消息中的一致），只含最后一根K线
+    （开始新K线时连同刚收盘的一根），同一订阅的所有连接共用一次计算。
+    """
+    await websocket.accept()
+    queue = hub.queue()
+
+    async def send_messages():
+        while True:
+            message = await queue.get()
+            await websocket.send_text(dumps(message).decode())
+
+    async def receive_messages():
+        while True:
+            message = await websocket.receive_text()
+            try:
+                _handle_push_message(hub, queue, json.loads(message))
+            except (ValueError, TypeError, AttributeError) as e:
+                hub.put(queue, {"type": "error", "detail": str(e)})
+
+    sender = asyncio.ensure_future(send_messages())
+    receiver = asyncio.ensure_future(receive_messages())
+    try:
+        done, _ = await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+        if sender in done:
+            # 发送失败时关闭连接，不再接收订阅（连接可能已断开，关闭失败可忽略）
+            logger.warning(f"Kline push send failed: {sender.exception()!r}")
+            try:
+                await websocket.close(code=1011)
+            except Exception:
+                pass
+        else:
+            receiver.result()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        hub.unsubscribe_all(queue)
+        # 已结束任务的异常已在上面取出，其余任务取消即可
+        sender.cancel()
+        receiver.cancel()
+
+
+def _handle_push_message(hub: KlinePushHub, queue: asyncio.Queue, message: dict) -> None:
+    """处理推送连接的订阅消息：先回复确认，订阅已有结果时随后收到最新快照"""
+    action = message.get("action")
+    if action not in ("subscribe", "unsubscribe"):
+        raise ValueError(f"Unsupported action: {action}")
+    symbol = symbol_registry.validate(message.get("symbol", ""))
+    interval = message.get("interval", "1h")
+    if interval not in hub.client.INTERVAL_MS:
+        raise ValueError(f"Unsupported interval: {interval}")
+    selection = TechnicalIndicators.planner.parse(message.get("indicators") or None)
+    if selection is not None:
+        TechnicalIndicators.planner.plan(selection)
+
+    # 确认消息返回规范化的指标字符串，与推送消息中的 indicators 一致
+    key = hub.topic_key(symbol, interval, selection)
+    hub.put(queue, {"type": f"{action}d", "symbol": symbol.value, "interval": interval, "indicators": key[2]})
+    if action == "subscribe":
+        hub.subscribe(queue, symbol, interval, selection)
+    else:
+        hub.unsubscribe(queue, key)
+
+
+@router.get("/binance/futures/ratelimit")
+async def get_rate_limit_stats(client: AsyncBinanceFuturesClient = Depends(get_binance_client)):
+    """
+    获取请求权重预算的使用情况（可用权重、排队数、交易所报告的已用权重和限流次数）
+    """
+    try:
+        return client.weight_budget.stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/binance/futures/executor")
+async def get_executor_stats(client: AsyncBinanceFuturesClient = Depends(get_binance_client)):
+    """
+    获取指标计算执行器的统计（排队和执行中的任务数、拒绝和超时次数，排队等待时间与计算时间）
+    """
+    try:
+        return client.executor.stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/binance/futures/coalescing")
+async def get_coalescing_stats(client: AsyncBinanceFuturesClient = Depends(get_binance_client)):
+    """
+    获取相同K线请求的合并统计（调用方总数、实际上游请求数、共享次数和单个请求的最大调用方数）
+    """
+    try:
+        return client.single_flight.stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/binance/futures/windows")
+async def get_window_cache_stats(client: AsyncBinanceFuturesClient = Depends(get_binance_client)):
+    """
+    获取最近K线窗口缓存的统计（完整获取与增量获取次数、检测到的缺失、实际取回与返回的K线根数）
+    """
+    try:
+        if client.window_cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **client.window_cache.stats()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/binance/futures/store")
+async def get_kline_store_stats(client: AsyncBinanceFuturesClient = Depends(get_binance_client)):
+    """
+    获取本地K线存储中每个交易对/周期的行数和时间范围
+    """
+    try:
+        if client.kline_store is None:
+            return {"enabled": False}
+        return {"enabled": True, "root": client.kline_store.root, "klines": client.kline_store.stats()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/binance/futures/store/sync")
+async def sync_kline_store(
+    symbol: Symbol = Depends(get_symbol),
+    interval: str = Query("1h", description="K线间隔（不支持月线）"),
+    start_time: Optional[int] = Query(None, description="首次同步的开始时间戳(毫秒)"),
+    client: AsyncBinanceFuturesClient = Depends(get_binance_client)
+):
+    """
+    增量同步本地K线存储：只获取已存储的最后一根K线之后的K线
+    """
+    if client.kline_store is None:
+        raise HTTPException(status_code=400, detail="Kline store is not configured")
+    if interval not in client.INTERVAL_MS:
+        raise HTTPException(status_code=400, detail=f"Unsupported interval for kline store: {interval}")
+    if client.kline_store.last_open_time(symbol.value, interval) is None and start_time is None:
+        raise HTTPException(status_code=400, detail="start_time is required for the first sync")
+
+    try:
+        added = await client.sync_klines(symbol, interval, start_time)
+        return {
+            "symbol": symbol.value,
+            "interval": interval,
+            "added": added,
+            "gaps": client.kline_store.gaps(symbol.value, interval)
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 # 在 app/api/routers/exchange_router.py 文件中添加新的API端点
-@router.get("/binance/futures/indicators/all", response_model=KlinesResponse)
+@router.get("/binance/futures/indicators/all", response_model=KlinesResponse, responses=FORMAT_RESPONSES)
 async def get_binance_futures_indicators(
-    symbol: FuturesSymbol = Query(..., description="交易对", example="BTCUSDT"),
+    symbol: Symbol = Depends(get_symbol),
     interval: str = Query(
         "1h",
         description="K线间隔",
@@ -175,33 +418,131 @@ async def get_binance_futures_indicators(
     ),
     limit: int = Query(500, ge=1, le=1500, description="返回的K线数量"),
     start_time: Optional[int] = Query(None, description="开始时间戳(毫秒)"),
-    end_time: Optional[int] = Query(None, description="结束时间戳(毫秒)")
+    end_time: Optional[int] = Query(None, description="结束时间戳(毫秒)"),
+    indicators: Optional[str] = Query(
+        None,
+        description="需要计算的指标，逗号分隔，可用冒号按顺序指定参数，为空时计算全部",
+        example="rsi:9,ema:20,ema:50,bollinger_bands:20:2"
+    ),
+    warmup: bool = Query(True, description="是否多取预热K线，使返回的每一行指标都有值"),
+    format: Optional[str] = Query(
+        None,
+        description="响应格式: json（默认） | ndjson（每行一根K线） | sse（每个事件一根K线） | "
+                    "columns（按列的 JSON） | msgpack | arrow（Arrow IPC 流），为空时按 Accept 头协商"
+    ),
+    accept: Optional[str] = Header(None, description="format 为空时按媒体类型协商响应格式"),
+    if_none_match: Optional[str] = Header(None, description="上次响应的 ETag，K线窗口未变化时返回 304"),
+    client: AsyncBinanceFuturesClient = Depends(get_binance_client)
 ):
     """
-    获取币安合约K线数据及所有技术指标
+    获取币安合约K线数据及所有技术指标（可通过 indicators 只计算部分指标）
+
+    format=ndjson/sse 时结果行由列式引擎按块生成并逐行写出，不经过响应模型校验；
+    columns/msgpack/arrow 时直接按列编码引擎的结果列，不生成结果行。
+    响应带 ETag / Last-Modified 和对齐到K线收盘的 Cache-Control；取回K线后先比较 If-None-Match，
+    窗口未变化时直接返回 304，不计算指标。
     """
+    # 协商响应格式，校验指标列表，只计算请求的指标
     try:
-        # 验证symbol是否支持
-        if symbol.value not in AVAILABLE_SYMBOLS:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Unsupported symbol: {symbol.value}. Available symbols: {AVAILABLE_SYMBOLS}"
-            )
+        format = negotiate_format(format, accept)
+        selection = TechnicalIndicators.planner.parse(indicators)
+        if selection is not None:
+            TechnicalIndicators.planner.plan(selection)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        # 使用同步客户端获取带技术指标的K线数据
-        client = BinanceFuturesClient()
-        klines = client.get_klines_with_indicators(
+    try:
+        # 使用共享连接池的异步客户端获取计算指标所需的K线（含预热K线）
+        klines, warmup_count = await client.get_indicator_window(
             symbol=symbol,
             interval=interval,
             limit=limit,
             start_time=start_time,
-            end_time=end_time
+            end_time=end_time,
+            indicators=selection,
+            warmup=warmup
         )
 
-        return KlinesResponse(
-            symbol=symbol.value,
+        key = ("indicators", TechnicalIndicators.engine_class.BACKEND, symbol.value, interval, limit, start_time,
+               end_time, indicators, warmup, format)
+        validator = kline_validator(key, klines.slice(warmup_count), format)
+        if validator is not None and validator.matches(if_none_match):
+            return validator.not_modified()
+
+        if format in COLUMN_MEDIA_TYPES:
+            columns = await client.run_indicator_columns(klines, selection, warmup_count)
+            return conditional(validator, column_response(columns, format))
+        if format != "json":
+            rows = await client.run_iter_indicator_rows(klines, selection, warmup_count)
+            return conditional(validator, stream_rows(rows, format))
+
+        # 跳过 KlinesResponse 对每一行的校验，直接编码
+        rows = await client.run_indicator_rows(klines, selection, warmup_count)
+        return conditional(validator,
+                           FastJSONResponse({"symbol": symbol.value, "interval": interval, "klines": rows}))
+    except IndicatorQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except IndicatorTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/binance/futures/indicators/batch", response_model=BatchKlinesResponse)
+async def get_binance_futures_indicators_batch(
+    symbols: List[str] = Query(..., description="交易对列表", example=["BTCUSDT", "ETHUSDT"]),
+    interval: str = Query(
+        "1h",
+        description="K线间隔",
+        example="1m, 3m, 5m, 15m, 30m, 1h, 2h, 4h, 6h, 8h, 12h, 1d, 3d, 1w, 1M"
+    ),
+    limit: int = Query(500, ge=1, le=1500, description="每个交易对返回的K线数量"),
+    start_time: Optional[int] = Query(None, description="开始时间戳(毫秒)"),
+    end_time: Optional[int] = Query(None, description="结束时间戳(毫秒)"),
+    indicators: Optional[str] = Query(
+        None,
+        description="需要计算的指标，逗号分隔，可用冒号按顺序指定参数，为空时计算全部",
+        example="rsi:9,ema:20,ema:50,bollinger_bands:20:2"
+    ),
+    warmup: bool = Query(True, description="是否多取预热K线，使返回的每一行指标都有值"),
+    client: AsyncBinanceFuturesClient = Depends(get_binance_client)
+):
+    """
+    批量获取多个交易对的K线数据及技术指标（所有交易对在一次向量化计算中完成）
+    """
+    try:
+        symbols = [symbol_registry.validate(symbol) for symbol in symbols]
+        selection = TechnicalIndicators.planner.parse(indicators)
+        if selection is not None:
+            TechnicalIndicators.planner.plan(selection)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        # 去重并保持请求顺序
+        symbols = list(dict.fromkeys(symbols))
+
+        # 各交易对的K线并发获取
+        results = await client.get_klines_with_indicators_batch(
+            symbols=symbols,
             interval=interval,
-            klines=klines
+            limit=limit,
+            start_time=start_time,
+            end_time=end_time,
+            indicators=selection,
+            warmup=warmup
         )
+
+        return FastJSONResponse({
+            "interval": interval,
+            "results": [
+                {"symbol": symbol, "interval": interval, "klines": klines}
+                for symbol, klines in results.items()
+            ]
+        })
+    except IndicatorQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except IndicatorTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -8,7 +8,7 @@ import logging
 
 from app.api.routers.ai_router import ChatTraderRequest
 from app.scheduler.trading_scheduler import trading_scheduler
-from exchanges.binance.futures import FuturesSymbol
+from app.core.dependencies import ValidSymbol
 
 router = APIRouter(prefix="/api/scheduler", tags=["scheduler"])
 logger = logging.getLogger(__name__)
@@ -16,7 +16,7 @@ logger = logging.getLogger(__name__)
 class ScheduleJobRequest(BaseModel):
     job_id: str
     chatTraderRequest: ChatTraderRequest
-    symbol: str
+    symbol: ValidSymbol
     interval: int = 20 # 间隔次数
     type: str = Query(
         "m", # 分钟 小时
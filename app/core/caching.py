@@ -0,0 +1,102 @@
+# core/caching.py
+import hashlib
+import math
+import os
+import time
+from email.utils import formatdate
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from fastapi import Response
+
+from exchanges.binance.klines import KlineColumns
+
+# 已全部收盘的K线窗口（不会再变化）的缓存时间(秒)，也是未收盘窗口缓存时间的上限
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", "86400"))
+
+# 决定窗口版本的最后一根K线字段（正在形成的K线这些值会变化）
+VERSION_FIELDS = ("open_time", "close_time", "open", "high", "low", "close", "volume", "number_of_trades")
+
+
+class KlineValidator:
+    """
+    K线接口响应的 HTTP 缓存校验信息
+
+    ETag 由请求参数（交易对、周期、数量、时间范围、指标、响应格式等）和K线窗口的版本
+    （首根 open_time、根数、最后一根K线的时间和价格成交量）确定：正在形成的K线更新后 ETag 随之变化。
+    Cache-Control 的 max-age 对齐到最后一根K线收盘的时间；窗口已全部收盘时数据不会再变化，
+    使用 HTTP_CACHE_MAX_AGE。
+    """
+
+    def __init__(self,
+                 key: Tuple,
+                 klines: Union[List[Dict[str, Any]], KlineColumns],
+                 clock=time.time,
+                 max_age: int = HTTP_CACHE_MAX_AGE):
+        """
+        Args:
+            key: 请求参数
+            klines: 响应对应的K线窗口（不能为空）
+            clock: 返回当前时间(秒)的函数
+            max_age: 缓存时间上限(秒)
+        """
+        if isinstance(klines, KlineColumns):
+            first_open_time = int(klines["open_time"][0])
+            last = tuple(float(klines[name][-1]) for name in VERSION_FIELDS)
+        else:
+            first_open_time = int(klines[0]["open_time"])
+            last = tuple(float(klines[-1][name]) for name in VERSION_FIELDS)
+        version = (key, first_open_time, len(klines), last)
+        self.etag = f'"{hashlib.blake2b(repr(version).encode(), digest_size=12).hexdigest()}"'
+
+        now_ms = int(clock() * 1000)
+        close_time = int(last[1])
+        # 未收盘的K线以本次取数时间为最后修改时间
+        self.last_modified = min(close_time, now_ms) / 1000
+        if close_time < now_ms:
+            self.max_age = max_age
+        else:
+            self.max_age = min(math.ceil((close_time + 1 - now_ms) / 1000), max_age)
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """If-None-Match 是否与当前 ETag 匹配（弱比较）"""
+        if not if_none_match:
+            return False
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or any(tag.removeprefix("W/") == self.etag for tag in tags)
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {
+            "ETag": self.etag,
+            "Last-Modified": formatdate(self.last_modified, usegmt=True),
+            "Cache-Control": f"public, max-age={self.max_age}",
+            "Vary": "Accept"
+        }
+
+    def not_modified(self) -> Response:
+        """304 响应"""
+        return Response(status_code=304, headers=self.headers)
+
+    def apply(self, response: Response) -> Response:
+        """在响应上设置缓存头"""
+        response.headers.update(self.headers)
+        return response
+
+
+def kline_validator(key: Tuple,
+                    klines: Union[List[Dict[str, Any]], KlineColumns],
+                    format: str) -> Optional[KlineValidator]:
+    """
+    生成K线接口响应的缓存校验信息
+
+    Returns:
+        校验信息，窗口为空或为 SSE 事件流（不应被缓存）时返回 None
+    """
+    if format == "sse" or len(klines) == 0:
+        return None
+    return KlineValidator(key, klines)
+
+
+def conditional(validator: Optional[KlineValidator], response: Response) -> Response:
+    """有校验信息时在响应上设置缓存头"""
+    return validator.apply(response) if validator is not None else response
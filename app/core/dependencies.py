@@ -1,10 +1,19 @@
 # core/dependencies.py
-from fastapi import Depends, Request
-from typing import Optional
+from fastapi import Depends, HTTPException, Query, Request
+from pydantic import AfterValidator
+from starlette.requests import HTTPConnection
+from typing import Annotated, Optional
 
+from exchanges.binance.async_futures import AsyncBinanceFuturesClient
+from exchanges.binance.push import KlinePushHub
+from exchanges.binance.symbols import Symbol, symbol_registry
 from .logging import trace_id_var, logger
 
 
+# 请求体中的交易对字段：按交易所当前可交易的交易对校验，不支持时返回422
+ValidSymbol = Annotated[Symbol, AfterValidator(symbol_registry.validate)]
+
+
 def get_trace_id(request: Request) -> str:
     """获取当前请求的TraceID"""
     return trace_id_var.get()
@@ -15,6 +24,33 @@ def get_logger():
     return logger
 
 
+def get_binance_client(request: HTTPConnection) -> AsyncBinanceFuturesClient:
+    """获取应用生命周期内共享的币安合约异步客户端（未经 lifespan 启动时按需创建）"""
+    client = getattr(request.app.state, "binance_client", None)
+    if client is None:
+        client = AsyncBinanceFuturesClient()
+        request.app.state.binance_client = client
+    return client
+
+
+def get_kline_hub(connection: HTTPConnection) -> KlinePushHub:
+    """获取应用生命周期内共享的K线推送中心（HTTP 和 WebSocket 接口共用，未经 lifespan 启动时按需创建）"""
+    hub = getattr(connection.app.state, "kline_hub", None)
+    if hub is None:
+        client = get_binance_client(connection)
+        hub = KlinePushHub(client, client.kline_stream)
+        connection.app.state.kline_hub = hub
+    return hub
+
+
+def get_symbol(symbol: str = Query(..., description="交易对", example="BTCUSDT")) -> Symbol:
+    """校验交易对（按交易所当前可交易的交易对），不支持时返回400"""
+    try:
+        return symbol_registry.validate(symbol)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 async def log_service_call(service_name: str, operation: str, parameters: dict = None, trace_id: str = None):
     """记录服务调用日志"""
     logger.info(
@@ -0,0 +1,171 @@
+# core/formats.py
+import json
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from fastapi import Response
+
+from exchanges.binance.klines import KlineColumns
+
+try:
+    import orjson
+except ImportError:  # 未安装时使用标准库 json
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # MessagePack 是可选依赖
+    msgpack = None
+
+try:
+    import pyarrow as pa
+except ImportError:  # Arrow 是可选依赖
+    pa = None
+
+# 流式响应格式 -> 媒体类型（逐行输出）
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+# 按列编码的响应格式 -> 媒体类型（每个字段一个数组，数值保持为数字）
+COLUMN_MEDIA_TYPES = {
+    "columns": "application/vnd.kline.columns+json",
+    "msgpack": "application/msgpack",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+# 响应格式 -> 媒体类型（json 为默认的逐行 JSON 响应）
+MEDIA_TYPES = {"json": "application/json", **STREAM_MEDIA_TYPES, **COLUMN_MEDIA_TYPES}
+# Accept 头中的媒体类型 -> 响应格式
+MEDIA_FORMATS = {
+    **{media_type: format for format, media_type in MEDIA_TYPES.items()},
+    "application/x-msgpack": "msgpack",
+    "application/vnd.msgpack": "msgpack",
+    "*/*": "json",
+    "application/*": "json",
+}
+# 需要可选依赖的格式 -> 依赖包名
+DEPENDENCIES = {"msgpack": "msgpack", "arrow": "pyarrow"}
+
+
+def dumps(value: Any) -> bytes:
+    """
+    编码 JSON（优先使用 orjson：直接编码 NumPy 数组，NaN 编码为 null）
+
+    标准库 json 不支持 NumPy 数组，且会把 NaN 编码为非法的 NaN，只用于已转换为 Python 对象的数据。
+    """
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(Response):
+    """
+    直接编码的 JSON 响应
+
+    接口返回的数据由本服务的指标引擎生成，字段和类型已确定，返回该响应可跳过 response_model
+    对每一行的校验和重新序列化（接口文档仍按 response_model 生成）。
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def format_available(format: str) -> bool:
+    """格式所需的可选依赖是否已安装"""
+    return not (format == "msgpack" and msgpack is None or format == "arrow" and pa is None)
+
+
+def negotiate_format(format: Optional[str], accept: Optional[str]) -> str:
+    """
+    确定响应格式：优先使用 format 参数，否则按 Accept 头（q 值从高到低）选择第一个支持的格式，都没有时为 json
+
+    Args:
+        format: format 查询参数
+        accept: Accept 请求头
+
+    Returns:
+        响应格式
+
+    Raises:
+        ValueError: format 参数不支持或所需的依赖未安装
+    """
+    if format is not None:
+        if format not in MEDIA_TYPES:
+            raise ValueError(f"Unsupported format: {format}, expected one of {', '.join(MEDIA_TYPES)}")
+        if not format_available(format):
+            raise ValueError(f"Format {format} requires {DEPENDENCIES[format]}, which is not installed")
+        return format
+
+    ranges = []
+    for index, part in enumerate((accept or "").split(",")):
+        media_type, *params = [item.strip() for item in part.split(";")]
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            ranges.append((-quality, index, media_type.lower()))
+
+    for _, _, media_type in sorted(ranges):
+        candidate = MEDIA_FORMATS.get(media_type)
+        if candidate is not None and format_available(candidate):
+            return candidate
+    return "json"
+
+
+def _column_lists(columns: KlineColumns) -> Dict[str, List]:
+    """各列转换为 Python 列表（NaN 转为 None）"""
+    values = {}
+    for name, column in columns.columns.items():
+        items = column.tolist()
+        if column.dtype.kind == "f":
+            for i in np.flatnonzero(np.isnan(column)).tolist():
+                items[i] = None
+        values[name] = items
+    return values
+
+
+def encode_columns(columns: KlineColumns, format: str) -> bytes:
+    """
+    按列编码K线和指标
+
+    columns / msgpack 为 {"symbol", "interval", "count", "columns": {字段: 数组}}，NaN 编码为 null；
+    arrow 为 Arrow IPC 流格式的一张表，NaN 编码为空值，交易对和周期写在 schema 元数据中。
+
+    Args:
+        columns: 列式K线（可包含指标列）
+        format: columns、msgpack 或 arrow
+
+    Returns:
+        响应内容
+    """
+    if format == "arrow":
+        table = pa.table({name: pa.array(column, from_pandas=True) for name, column in columns.columns.items()},
+                         metadata={"symbol": str(columns.symbol), "interval": str(columns.interval)})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    payload = {
+        "symbol": str(columns.symbol),
+        "interval": str(columns.interval),
+        "count": len(columns)
+    }
+    if format == "msgpack":
+        return msgpack.packb({**payload, "columns": _column_lists(columns)})
+    if orjson is not None:
+        # orjson 直接编码连续的数值数组，NaN 编码为 null
+        return dumps({**payload, "columns": {name: np.ascontiguousarray(column)
+                                             for name, column in columns.columns.items()}})
+    return dumps({**payload, "columns": _column_lists(columns)})
+
+
+def column_response(columns: KlineColumns, format: str) -> Response:
+    """按列编码的响应"""
+    return Response(encode_columns(columns, format), media_type=COLUMN_MEDIA_TYPES[format])
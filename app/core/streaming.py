@@ -0,0 +1,42 @@
+# core/streaming.py
+from typing import Any, Dict, Iterable, Iterator
+
+from fastapi.responses import StreamingResponse
+
+from .formats import STREAM_MEDIA_TYPES, dumps
+
+# 每次写出的行数（减少逐行发送的开销）
+ROWS_PER_CHUNK = 64
+
+
+def _encode_rows(rows: Iterable[Dict[str, Any]], format: str) -> Iterator[bytes]:
+    """把结果行逐行编码为 NDJSON 行或 SSE 事件，每 ROWS_PER_CHUNK 行写出一次"""
+    prefix, suffix = (b"data: ", b"\n\n") if format == "sse" else (b"", b"\n")
+    chunk = []
+    count = 0
+    for row in rows:
+        chunk.append(prefix + dumps(row) + suffix)
+        count += 1
+        if len(chunk) >= ROWS_PER_CHUNK:
+            yield b"".join(chunk)
+            chunk = []
+    if format == "sse":
+        # 结束事件，便于客户端区分正常结束与断线
+        chunk.append(b"event: end\ndata: " + dumps({"count": count}) + b"\n\n")
+    if chunk:
+        yield b"".join(chunk)
+
+
+def stream_rows(rows: Iterable[Dict[str, Any]], format: str) -> StreamingResponse:
+    """
+    以 NDJSON 或 SSE 流式返回结果行（不经过 pydantic 响应模型，不在内存中拼接完整响应）
+
+    Args:
+        rows: 结果行（可以是按需生成的迭代器）
+        format: ndjson 或 sse
+
+    Returns:
+        流式响应
+    """
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"} if format == "sse" else None
+    return StreamingResponse(_encode_rows(rows, format), media_type=STREAM_MEDIA_TYPES[format], headers=headers)
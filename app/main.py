@@ -1,4 +1,6 @@
 # app/main.py
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.routers import ai_router, health, exchange_router, scheduler_router
@@ -7,6 +9,11 @@ import logging.config
 
 from app.core.config import setup_logging
 from app.core.interceptors import RequestResponseLoggerMiddleware, ResponseBodyCaptureMiddleware
+from exchanges.binance.async_futures import AsyncBinanceFuturesClient
+from exchanges.binance.stream import KlineStreamService, STREAM_ENABLED, subscriptions_from_env
+from exchanges.binance.kline_store import KlineStore, STORE_DIR
+from exchanges.binance.push import KlinePushHub
+from exchanges.binance.symbols import symbol_registry, SYMBOLS_FIXTURE
 
 # 初始化日志配置
 
@@ -17,11 +24,44 @@ logging.getLogger("app").setLevel(logging.INFO)
 logging.getLogger("ai_integration").setLevel(logging.INFO)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    应用生命周期：启动K线推送服务和打开本地K线存储（均需通过环境变量启用），创建共享的币安合约异步客户端（连接池），
+    加载交易对注册表（指定离线文件时从文件加载，否则在后台定期从交易所刷新），
+    创建K线和指标的实时推送中心，退出时关闭
+    """
+    kline_stream = None
+    if STREAM_ENABLED:
+        kline_stream = KlineStreamService()
+        for symbol, interval in subscriptions_from_env():
+            kline_stream.subscribe(symbol, interval)
+        kline_stream.start()
+
+    kline_store = KlineStore(STORE_DIR) if STORE_DIR else None
+
+    app.state.binance_client = AsyncBinanceFuturesClient(kline_stream=kline_stream, kline_store=kline_store)
+    await app.state.binance_client.start()
+    app.state.kline_hub = KlinePushHub(app.state.binance_client, kline_stream)
+    if SYMBOLS_FIXTURE:
+        symbol_registry.load_file(SYMBOLS_FIXTURE)
+    else:
+        symbol_registry.start(app.state.binance_client)
+    try:
+        yield
+    finally:
+        await symbol_registry.stop()
+        await app.state.kline_hub.close()
+        await app.state.binance_client.close()
+        if kline_stream is not None:
+            kline_stream.stop()
+
 
 app = FastAPI(
     title="AI Integration API",
     description="统一AI服务平台接口",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # 添加CORS中间件
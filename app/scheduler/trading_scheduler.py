@@ -10,7 +10,6 @@ from apscheduler.triggers.cron import CronTrigger
 from apscheduler.job import Job
 
 from app.api.routers.ai_router import ChatTraderRequest
-from exchanges.binance.futures import FuturesSymbol
 
 logger = logging.getLogger(__name__)
 
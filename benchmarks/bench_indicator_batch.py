@@ -0,0 +1,40 @@
+# benchmarks/bench_indicator_batch.py
+"""
+对比逐个交易对计算与 (时间, 品种) 二维数组批量计算全部默认指标的耗时
+
+运行方式: python -m benchmarks.bench_indicator_batch
+"""
+import numpy as np
+
+from exchanges.binance.engine import IndicatorEngine
+from exchanges.binance.indicators import TechnicalIndicators
+from reference.klines import make_klines
+
+from .common import measure, report
+
+
+def main():
+    for symbols in (10, 50):
+        klines_by_symbol = {f"S{i}": make_klines(1500, seed=i, symbol=f"S{i}") for i in range(symbols)}
+        engines = [IndicatorEngine(klines) for klines in klines_by_symbol.values()]
+        symbol_arrays = [[getattr(engine, field) for field in IndicatorEngine.PRICE_FIELDS] for engine in engines]
+        arrays = [np.column_stack(columns) for columns in zip(*symbol_arrays)]
+
+        def per_symbol():
+            # 每次重新创建引擎，不复用上一次的指标列和中间量
+            for columns in symbol_arrays:
+                IndicatorEngine.from_arrays(*columns).compute_all()
+
+        report(f"compute only ({symbols} symbols x 1500 candles)", [
+            ("per symbol", measure(per_symbol, 3)),
+            ("2-D block", measure(lambda: TechnicalIndicators.calculate_block(*arrays), 3)),
+        ])
+        report(f"with records ({symbols} symbols x 1500 candles)", [
+            ("calculate_all per symbol", measure(
+                lambda: [TechnicalIndicators.calculate_all(k) for k in klines_by_symbol.values()], 3)),
+            ("calculate_batch", measure(lambda: TechnicalIndicators.calculate_batch(klines_by_symbol), 3)),
+        ])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+# benchmarks/bench_indicator_cache.py
+"""
+对比指标结果帧缓存未命中(冷)与命中(热，只重算未收盘K线)时的耗时
+
+运行方式: python -m benchmarks.bench_indicator_cache
+"""
+from exchanges.binance.frame_cache import IndicatorFrameCache
+from exchanges.binance.indicators import TechnicalIndicators
+from exchanges.binance.klines import KlineColumns
+from reference.klines import make_klines
+
+from .common import measure, report
+
+
+def main():
+    for size in (500, 1500):
+        klines = make_klines(size)
+        columns = KlineColumns.from_klines(klines, "BTCUSDT", "1h")
+        # 最后一根K线处于未收盘状态
+        cache = IndicatorFrameCache(clock=lambda: int(klines[-1]["open_time"]) + 1)
+
+        def cold():
+            cache.clear()
+            cache.calculate(columns)
+
+        full = measure(lambda: TechnicalIndicators.calculate_all(klines), 10)
+        miss = measure(cold, 10)
+        cache.calculate(columns)
+        hit = measure(lambda: cache.calculate(columns), 50)
+        report(f"get_klines_with_indicators compute ({size} candles)",
+               [("calculate_all", full), ("cold cache (miss)", miss), ("hot cache (hit)", hit)])
+
+
+if __name__ == "__main__":
+    main()
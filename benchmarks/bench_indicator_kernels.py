@@ -0,0 +1,46 @@
+# benchmarks/bench_indicator_kernels.py
+"""
+对比原 DataFrame 逐行循环实现与向量化内核(SAR / MFI / OBV / ADX / CCI)的耗时
+
+运行方式: python -m benchmarks.bench_indicator_kernels
+"""
+import numpy as np
+import pandas as pd
+
+from exchanges.binance import kernels
+from exchanges.binance.engine import IndicatorEngine
+from reference.klines import make_klines
+from reference.legacy_indicators import TechnicalIndicators as LegacyIndicators
+
+from .common import measure, report
+
+CASES = [
+    ("parabolic_sar", "calculate_parabolic_sar", ()),
+    ("mfi", "calculate_mfi", (14,)),
+    ("obv", "calculate_obv", ()),
+    ("adx", "calculate_adx", (14,)),
+    ("cci", "calculate_cci", (20,)),
+]
+
+
+def main():
+    for size, repeat in ((1500, 5), (100_000, 1)):
+        klines = make_klines(size)
+        engine = IndicatorEngine(klines)
+        arrays = [getattr(engine, field) for field in IndicatorEngine.PRICE_FIELDS]
+        for method, legacy_name, args in CASES:
+            legacy = measure(lambda: getattr(LegacyIndicators, legacy_name)(klines, *args), repeat)
+            # 每次重新创建引擎，避免复用上一次缓存的中间量（真实波幅、典型价格等）
+            vectorized = measure(lambda: getattr(IndicatorEngine.from_arrays(*arrays), method)(*args), repeat)
+            report(f"{method} ({size} candles)", [("legacy loop", legacy), ("vectorized kernel", vectorized)])
+
+        # 单独对比 CCI 中的平均绝对偏差
+        tp = (engine.high + engine.low + engine.close) / 3
+        apply = measure(lambda: pd.Series(tp).rolling(window=20).apply(
+            lambda x: np.mean(np.abs(x - np.mean(x))), raw=True), repeat)
+        strided = measure(lambda: kernels.rolling_mad(tp, 20), repeat)
+        report(f"mad window=20 ({size} candles)", [("rolling.apply", apply), ("sliding window view", strided)])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# benchmarks/bench_kline_parse.py
+"""
+对比K线响应解析为字符串字典（_format_klines + 指标引擎再解析价格列）与直接解析为列式数值数组的耗时和内存
+
+运行方式: python -m benchmarks.bench_kline_parse
+"""
+import json
+import tracemalloc
+
+import numpy as np
+
+from exchanges.binance.engine import IndicatorEngine
+from exchanges.binance.futures import BinanceFuturesClient, FuturesSymbol
+from exchanges.binance.klines import parse_klines
+
+from .common import measure, report
+
+START = 1_700_000_000_000
+STEP = 60_000
+
+
+def make_body(count: int) -> bytes:
+    """生成与币安接口格式相同的K线响应内容"""
+    rng = np.random.default_rng(7)
+    close = 30000 + np.cumsum(rng.normal(0, 60, count))
+    rows = [[START + i * STEP, f"{close[i] - 5:.2f}", f"{close[i] + 20:.2f}", f"{close[i] - 20:.2f}",
+             f"{close[i]:.2f}", f"{100 + i % 400:.3f}", START + (i + 1) * STEP - 1, f"{close[i] * 150:.4f}",
+             300 + i % 50, f"{50 + i % 200:.3f}", f"{close[i] * 75:.4f}", "0"] for i in range(count)]
+    return json.dumps(rows, separators=(",", ":")).encode()
+
+
+def legacy(body: bytes):
+    """旧路径：JSON -> 字符串字典 -> 指标引擎解析价格列"""
+    klines = BinanceFuturesClient()._format_klines(json.loads(body), FuturesSymbol.BTCUSDT, "1m")
+    return klines, IndicatorEngine(klines)
+
+
+def typed(body: bytes):
+    """新路径：响应字节直接解析为数值列，引擎直接使用价格列"""
+    columns = parse_klines(body, "BTCUSDT", "1m")
+    return columns, columns.engine(IndicatorEngine)
+
+
+def retained(func, body: bytes) -> int:
+    """解析结果常驻内存的字节数"""
+    tracemalloc.start()
+    result = func(body)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main():
+    for count in (1500, 100_000):
+        body = make_body(count)
+        repeat = 20 if count <= 1500 else 3
+        report(f"parse {count} klines ({len(body) / 1024:.0f} KiB response)", [
+            ("str dicts + engine parse", measure(lambda: legacy(body), repeat)),
+            ("typed columns", measure(lambda: typed(body), repeat)),
+        ])
+        print(f"  {'memory str dicts':<28} {retained(legacy, body) / 1024:>12.1f} KiB")
+        print(f"  {'memory typed columns':<28} {retained(typed, body) / 1024:>12.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
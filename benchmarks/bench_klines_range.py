@@ -0,0 +1,66 @@
+# benchmarks/bench_klines_range.py
+"""
+对比顺序翻页与分页并发获取长时间范围K线的耗时（本地模拟接口，每个请求固定延迟）
+
+运行方式: python -m benchmarks.bench_klines_range
+"""
+import asyncio
+import time
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from exchanges.binance.async_futures import AsyncBinanceFuturesClient
+from exchanges.binance.futures import FuturesSymbol
+
+from .common import report
+
+START = 1_700_000_000_000
+STEP = 60_000
+COUNT = 90 * 24 * 60  # 90天的1分钟K线
+LATENCY = 0.05
+
+
+async def klines(request):
+    """按 startTime / endTime / limit 生成原始K线，模拟网络往返延迟"""
+    start_time = int(request.query["startTime"])
+    end_time = int(request.query["endTime"])
+    limit = int(request.query["limit"])
+    first = max(0, -(-(start_time - START) // STEP))
+    last = min(COUNT - 1, (end_time - START) // STEP, first + limit - 1)
+    await asyncio.sleep(LATENCY)
+    return web.json_response([[START + i * STEP, "1", "2", "0.5", "1.5", "10", START + (i + 1) * STEP - 1,
+                               "15", 3, "5", "7.5", "0"] for i in range(first, last + 1)])
+
+
+async def fetch(base_url: str, concurrency: int) -> float:
+    async with AsyncBinanceFuturesClient() as client:
+        client.BASE_URL = base_url
+        started = time.perf_counter()
+        rows = await client.get_klines_range(FuturesSymbol.BTCUSDT, "1m", START, START + (COUNT - 1) * STEP,
+                                             concurrency=concurrency)
+        elapsed = time.perf_counter() - started
+    assert len(rows) == COUNT
+    return elapsed
+
+
+async def run():
+    app = web.Application()
+    app.router.add_get("/fapi/v1/klines", klines)
+    server = TestServer(app)
+    await server.start_server()
+    base_url = str(server.make_url("")).rstrip("/")
+    try:
+        report(f"get_klines_range ({COUNT} x 1m candles, {LATENCY * 1000:.0f} ms per request)", [
+            (f"concurrency={concurrency}", await fetch(base_url, concurrency)) for concurrency in (1, 4, 8, 16)
+        ])
+    finally:
+        await server.close()
+
+
+def main():
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
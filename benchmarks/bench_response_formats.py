@@ -0,0 +1,43 @@
+# benchmarks/bench_response_formats.py
+"""
+对比 1500 根K线 + 全部默认指标在各响应格式下的编码耗时和响应大小
+
+逐行 JSON 为现有默认格式（不含响应模型校验）；MessagePack、Arrow 需要安装可选依赖，未安装时跳过。
+
+运行方式: python -m benchmarks.bench_response_formats
+"""
+import json
+
+from app.core.formats import encode_columns, format_available
+from exchanges.binance.futures import _FuturesClientBase
+from exchanges.binance.indicators import TechnicalIndicators
+from exchanges.binance.klines import KlineColumns
+from reference.klines import make_klines
+
+from .common import measure, report
+
+
+def main():
+    klines = make_klines(1500)
+    rows = TechnicalIndicators.calculate(klines)
+    columns = _FuturesClientBase.indicator_columns(KlineColumns.from_klines(klines, "BTCUSDT", "1h"), None, 0)
+
+    encoders = [("rows json (default)",
+                 lambda: json.dumps({"symbol": "BTCUSDT", "interval": "1h", "klines": rows}).encode())]
+    for format in ("columns", "msgpack", "arrow"):
+        if format_available(format):
+            encoders.append((format, lambda format=format: encode_columns(columns, format)))
+        else:
+            print(f"skip {format}: optional dependency not installed")
+
+    report(f"encode {len(rows)} klines x {len(rows[0])} fields", [
+        (name, measure(encode, 20)) for name, encode in encoders
+    ])
+    baseline = len(encoders[0][1]())
+    for name, encode in encoders:
+        size = len(encode())
+        print(f"  {'size ' + name:<28} {size / 1024:>12.1f} KiB   x{baseline / size:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# benchmarks/bench_response_serialization.py
+"""
+对比指标接口经 response_model=KlinesResponse 校验序列化与直接编码（FastJSONResponse）的端到端请求耗时
+
+两个路由返回同一份 1500 根K线 + 全部默认指标的结果，请求经完整的 FastAPI/Starlette 处理流程。
+
+运行方式: python -m benchmarks.bench_response_serialization
+"""
+import importlib.util
+import os
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.formats import FastJSONResponse
+from exchanges.binance.indicators import TechnicalIndicators
+from reference.klines import make_klines
+
+from .common import measure, report
+
+
+def load_models():
+    """按文件加载接口模型（app.api.routers 包会导入 AI 模块，这里只需要 exchange_router）"""
+    path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "app", "api", "routers", "exchange_router.py")
+    spec = importlib.util.spec_from_file_location("bench_exchange_router", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.KlinesResponse
+
+
+def main():
+    KlinesResponse = load_models()
+    rows = TechnicalIndicators.calculate(make_klines(1500))
+    app = FastAPI()
+
+    @app.get("/validated", response_model=KlinesResponse)
+    async def validated():
+        return KlinesResponse(symbol="BTCUSDT", interval="1h", klines=rows)
+
+    @app.get("/fast", response_model=KlinesResponse)
+    async def fast():
+        return FastJSONResponse({"symbol": "BTCUSDT", "interval": "1h", "klines": rows})
+
+    with TestClient(app) as client:
+        report(f"GET indicators ({len(rows)} klines x {len(rows[0])} fields)", [
+            ("response_model validation", measure(lambda: client.get("/validated"), 10)),
+            ("FastJSONResponse", measure(lambda: client.get("/fast"), 10)),
+        ])
+        validated_body, fast_body = client.get("/validated").json(), client.get("/fast").json()
+        print(f"  {'same payload':<28} {validated_body == fast_body}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+# benchmarks/common.py
+import time
+from typing import Callable
+
+
+def measure(func: Callable, repeat: int = 5) -> float:
+    """多次执行取最短耗时(秒)"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(title: str, rows) -> None:
+    """打印对比结果: rows 为 (名称, 耗时秒) 列表，以第一行为基准计算加速比"""
+    print(f"\n== {title} ==")
+    baseline = rows[0][1]
+    for name, seconds in rows:
+        print(f"  {name:<28} {seconds * 1000:>12.3f} ms   x{baseline / seconds:>8.1f}")
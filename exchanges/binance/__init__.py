@@ -1,5 +1,9 @@
 # exchanges/binance/__init__.py
 from .futures import BinanceFuturesClient, FuturesSymbol
+from .async_futures import AsyncBinanceFuturesClient
 from .indicators import TechnicalIndicators
+from .engine import IndicatorEngine
+from .incremental import IncrementalIndicators
 
-__all__ = ['BinanceFuturesClient', 'FuturesSymbol', 'TechnicalIndicators']
+__all__ = ['BinanceFuturesClient', 'AsyncBinanceFuturesClient', 'FuturesSymbol', 'TechnicalIndicators', 'IndicatorEngine',
+           'IncrementalIndicators']
@@ -0,0 +1,672 @@
+# exchanges/binance/async_futures.py
+import asyncio
+import json
+import logging
+import time
+from typing import List, Dict, Any, AsyncIterator, Iterator, Optional, Set, Tuple, Union
+
+import aiohttp
+import numpy as np
+
+from .futures import FuturesSymbol, _FuturesClientBase
+from .candle_store import KlineWindowCache
+from .executor import IndicatorExecutor
+from .kline_store import KlineStore
+from .klines import KlineColumns
+from .ratelimit import Priority, WeightBudget, current_priority, request_priority, request_weight
+from .singleflight import SingleFlight
+from .stream import KlineStreamService
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncBinanceFuturesClient(_FuturesClientBase):
+    """
+    币安合约交易客户端（asyncio，基于长期复用的 aiohttp 会话）
+
+    所有请求共用一个 ClientSession：连接保持 keep-alive 复用，DNS 解析结果缓存，
+    并限制到同一主机的并发连接数。指标计算在执行器（线程池/进程池）中进行，不阻塞事件循环。
+    应在应用生命周期内创建一次，退出时调用 close()。
+    """
+
+    def __init__(self,
+                 api_key: Optional[str] = None,
+                 api_secret: Optional[str] = None,
+                 limit: int = 100,
+                 limit_per_host: int = 20,
+                 dns_cache_ttl: int = 300,
+                 keepalive_timeout: float = 30,
+                 timeout: float = 30,
+                 weight_budget: Optional[WeightBudget] = None,
+                 kline_stream: Optional[KlineStreamService] = None,
+                 kline_store: Optional[KlineStore] = None,
+                 delta_fetch: bool = True,
+                 executor: Optional[IndicatorExecutor] = None):
+        """
+        Args:
+            api_key: API Key
+            api_secret: API Secret
+            limit: 连接池的最大连接数
+            limit_per_host: 到同一主机的最大连接数
+            dns_cache_ttl: DNS 解析结果的缓存时间(秒)
+            keepalive_timeout: 空闲连接的保持时间(秒)
+            timeout: 单次请求的总超时时间(秒)
+            weight_budget: 请求权重预算，为 None 时使用进程内共享的预算
+            kline_stream: K线推送服务，最近K线优先从其内存存储读取，REST 只补缺
+            kline_store: 本地持久化K线存储，指定时间范围的请求优先从中读取
+            delta_fetch: 是否缓存最近K线窗口，之后的请求只增量获取窗口最后一根之后的K线
+            executor: 指标计算执行器，为 None 时按环境变量配置创建
+        """
+        self.api_key = ""
+        self.api_secret = ""
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        if weight_budget is not None:
+            self.weight_budget = weight_budget
+        self.kline_stream = kline_stream
+        self.kline_store = kline_store
+        # 相同参数的并发 REST 请求只发一次
+        self.single_flight = SingleFlight()
+        self.window_cache = KlineWindowCache(self.INTERVAL_MS, maxlen=self.MAX_LIMIT) if delta_fetch else None
+        self.executor = executor or IndicatorExecutor()
+        # 正在后台线程中写入本地存储的任务（写入包含刷盘，不在事件循环中执行）
+        self._store_writes: Set[asyncio.Future] = set()
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """共享的 aiohttp 会话，首次使用时创建"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.dns_cache_ttl,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={"X-MBX-APIKEY": self.api_key}
+            )
+        return self._session
+
+    async def start(self) -> None:
+        """创建共享会话（须在事件循环中调用）"""
+        _ = self.session
+
+    async def close(self) -> None:
+        """等待后台的本地存储写入完成，关闭共享会话及其连接池，以及指标计算执行器"""
+        await self.flush_store()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self.executor.close()
+
+    async def get_klines(
+            self,
+            symbol: FuturesSymbol,
+            interval: str = "1h",
+            limit: int = 500,
+            start_time: Optional[int] = None,
+            end_time: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        获取合约K线数据
+
+        Args:
+            symbol: 交易对枚举值
+            interval: K线间隔 (1m, 3m, 5m, 15m, 30m, 1h, 2h, 4h, 6h, 8h, 12h, 1d, 3d, 1w, 1M)
+            limit: 返回的K线数量，最大1500，默认500
+            start_time: 开始时间戳 (毫秒)
+            end_time: 结束时间戳 (毫秒)
+
+        Returns:
+            K线数据列表
+        """
+        params = self._kline_params(symbol, interval, limit, start_time, end_time)
+
+        # 取最近K线时优先读推送维护的内存K线（本身就是旧格式），未命中再取列式K线并转换
+        if self.kline_stream is not None and start_time is None and end_time is None:
+            klines = self.kline_stream.read(symbol.value, interval, limit)
+            if klines is not None:
+                return klines
+        columns = await self._fetch_kline_columns(symbol, interval, limit, start_time, end_time, params)
+        return columns.to_klines()
+
+    async def get_kline_columns(
+            self,
+            symbol: FuturesSymbol,
+            interval: str = "1h",
+            limit: int = 500,
+            start_time: Optional[int] = None,
+            end_time: Optional[int] = None
+    ) -> KlineColumns:
+        """
+        获取列式K线（参数与 get_klines 相同）
+
+        REST 响应直接解析为数值列，本地存储命中时直接返回存储的列，都不经过字符串字典；
+        原始K线随列保留，只有接口需要旧格式时才调用 to_klines 转换。指标计算也直接使用这些列。
+
+        Returns:
+            列式K线
+        """
+        params = self._kline_params(symbol, interval, limit, start_time, end_time)
+
+        if self.kline_stream is not None and start_time is None and end_time is None:
+            klines = self.kline_stream.read(symbol.value, interval, limit)
+            if klines is not None:
+                return KlineColumns.from_klines(klines, symbol.value, interval)
+        return await self._fetch_kline_columns(symbol, interval, limit, start_time, end_time, params)
+
+    async def _fetch_kline_columns(
+            self,
+            symbol: FuturesSymbol,
+            interval: str,
+            limit: int,
+            start_time: Optional[int],
+            end_time: Optional[int],
+            params: Dict[str, Any]
+    ) -> KlineColumns:
+        """
+        不经过推送的内存K线获取列式K线：指定时间范围时先读本地存储，最近K线走增量窗口，其余直接请求 REST；
+        REST 结果顺带补齐推送缓冲区的历史和本地存储
+        """
+        # 指定时间范围时优先读本地存储中完整覆盖该范围的K线
+        if self.kline_store is not None and (start_time is not None or end_time is not None):
+            columns = self._read_store(symbol, interval, limit, start_time, end_time)
+            if columns is not None:
+                return columns
+
+        latest = start_time is None and end_time is None
+        if self.window_cache is not None and latest:
+            columns = await self._fetch_window(symbol, interval, limit, params)
+        else:
+            columns = self._parse_klines(await self._fetch_klines(params), symbol, interval)
+        if self.kline_stream is not None and latest:
+            self.kline_stream.fill(symbol.value, interval, columns)
+        if self.kline_store is not None:
+            self._extend_store(symbol, interval, columns)
+        return columns
+
+    async def _fetch_window(
+            self,
+            symbol: FuturesSymbol,
+            interval: str,
+            limit: int,
+            params: Dict[str, Any]
+    ) -> KlineColumns:
+        """
+        获取最近 limit 根K线：缓存的窗口足够时只从窗口最后一根K线开始增量获取并拼接，
+        缓存不足、距上次获取超过单次上限或检测到缺失K线时完整获取并重建窗口
+        """
+        since = self.window_cache.since(symbol.value, interval, limit)
+        step = self.INTERVAL_MS.get(interval)
+        if since is not None and step is not None:
+            # 从 since 到当前正在形成的K线共 count 根，多请求一根用于判断是否已取全
+            count = (int(time.time() * 1000) - since) // step + 1
+            if count < self.MAX_LIMIT:
+                delta_params = self._kline_params(symbol, interval, count + 1, since, None)
+                delta = self._parse_klines(await self._fetch_klines(delta_params), symbol, interval)
+                if len(delta) <= count:
+                    klines = self.window_cache.splice(symbol.value, interval, delta, limit)
+                    if klines is not None:
+                        return klines
+
+        klines = self._parse_klines(await self._fetch_klines(params), symbol, interval)
+        self.window_cache.replace(symbol.value, interval, klines)
+        return klines
+
+    def _read_store(
+            self,
+            symbol: FuturesSymbol,
+            interval: str,
+            limit: int,
+            start_time: Optional[int],
+            end_time: Optional[int]
+    ) -> Optional[KlineColumns]:
+        """
+        从本地存储读取K线，只有确定与 REST 返回相同的K线时才使用
+
+        Returns:
+            列式K线，存储中缺少其中任意一根，或只有数值列（无法还原旧格式）时返回 None
+        """
+        step = self.INTERVAL_MS.get(interval)
+        if step is None:
+            return None
+        columns = self.kline_store.read(symbol.value, interval, start_time, end_time, limit)
+        if len(columns) == 0 or columns.rows is None or not columns.is_contiguous(step):
+            return None
+
+        open_time = columns["open_time"]
+        # 开头缺少K线
+        if start_time is not None and open_time[0] >= start_time + step:
+            return None
+        # 不足 limit 根时，只有起止时间都指定且存储已覆盖到结束时间才算完整
+        if len(columns) < limit and (start_time is None or end_time is None or open_time[-1] + step <= end_time):
+            return None
+        return columns
+
+    def _extend_store(self, symbol: FuturesSymbol, interval: str, klines: KlineColumns) -> None:
+        """REST 取回的已收盘K线与存储末尾连续时顺带写入（新的交易对由 sync_klines 建立）"""
+        last = self.kline_store.last_open_time(symbol.value, interval) if interval in self.INTERVAL_MS else None
+        if last is None or len(klines) == 0:
+            return
+        open_time = klines["open_time"]
+        closed = (open_time > last) & (klines["close_time"] < int(time.time() * 1000))
+        if closed.any() and open_time[closed][0] == last + self.INTERVAL_MS[interval]:
+            # 升序K线中比存储更新且已收盘的是连续的一段，按行切片保留原始K线
+            index = np.flatnonzero(closed)
+            self._write_store(symbol.value, interval, klines.slice(index[0], index[-1] + 1))
+
+    def _write_store(self,
+                     symbol: str,
+                     interval: str,
+                     klines: Union[List[Dict[str, Any]], KlineColumns]) -> asyncio.Future:
+        """在默认线程池中向本地存储追加K线（转换和刷盘都不阻塞事件循环），返回追加行数的 Future"""
+        future = asyncio.get_running_loop().run_in_executor(None, self.kline_store.append, symbol, interval, klines)
+        self._store_writes.add(future)
+        future.add_done_callback(self._store_write_done)
+        return future
+
+    def _store_write_done(self, future: asyncio.Future) -> None:
+        self._store_writes.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            logger.warning(f"Failed to write klines to the local store: {str(future.exception())}")
+
+    async def flush_store(self) -> None:
+        """等待已提交的本地存储写入完成"""
+        while self._store_writes:
+            await asyncio.gather(*self._store_writes, return_exceptions=True)
+
+    async def _fetch_klines(self, params: Dict[str, Any]) -> bytes:
+        """
+        通过 REST 接口获取K线的原始响应内容
+
+        同一秒内多个调用方（页面、定时任务、AI 交易员）请求相同的K线时共享同一个上游请求，
+        各调用方再分别解析为需要的格式。
+        """
+        key = tuple(sorted(params.items()))
+        return await self.single_flight.do(key, lambda: self._request_klines(params))
+
+    async def _request_klines(self, params: Dict[str, Any]) -> bytes:
+        """发送K线请求"""
+        return await self._request("/fapi/v1/klines", params, "fetching klines")
+
+    async def _request(self, path: str, params: Dict[str, Any], action: str) -> bytes:
+        """
+        发送 REST 请求（按当前上下文的优先级排队等待权重，被限流时等到 Retry-After 之后重试）
+
+        Args:
+            path: 接口路径
+            params: 请求参数
+            action: 出错时异常信息中的操作描述
+
+        Returns:
+            响应内容
+        """
+        weight = request_weight(path, params)
+
+        for attempt in range(self.MAX_RETRIES + 1):
+            await self.weight_budget.acquire(weight)
+            try:
+                url = f"{self.BASE_URL}{path}"
+                async with self.session.get(url, params=params) as response:
+                    retry_after = self.weight_budget.update_from_headers(response.status, response.headers)
+                    if response.status == 200:
+                        return await response.read()
+                    if not self._should_retry(retry_after, attempt):
+                        raise Exception(f"Binance API Error: {response.status} - {await response.text()}")
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                raise Exception(f"Network Error: {str(e) or type(e).__name__}")
+            except Exception as e:
+                raise Exception(f"Error {action}: {str(e)}")
+
+    async def get_exchange_info(self) -> Dict[str, Any]:
+        """
+        获取合约交易规则和交易对信息（/fapi/v1/exchangeInfo）
+
+        Returns:
+            交易所信息，symbols 中包含每个交易对的状态和价格/数量过滤器
+        """
+        return json.loads(await self._request("/fapi/v1/exchangeInfo", {}, "fetching exchange info"))
+
+    async def iter_klines_range(
+            self,
+            symbol: FuturesSymbol,
+            interval: str,
+            start_time: int,
+            end_time: Optional[int] = None,
+            concurrency: int = 8
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        按 MAX_LIMIT 根一页拆分时间范围并发获取，每取回一页就产出一页
+
+        页按到达顺序产出（页之间不保证时间顺序，页内升序），已产出过的 open_time 不会重复产出。
+        请求同时受 concurrency 和客户端的权重预算限制，并以回补优先级排在实时请求之后。
+
+        Args:
+            symbol: 交易对枚举值
+            interval: K线间隔
+            start_time: 开始时间戳 (毫秒)
+            end_time: 结束时间戳 (毫秒)，为 None 时到当前时间
+            concurrency: 同时进行的请求数上限
+
+        Yields:
+            一页K线数据
+        """
+        if interval not in self.INTERVAL_MAP:
+            raise ValueError(f"Unsupported interval: {interval}")
+        if end_time is None:
+            end_time = int(time.time() * 1000)
+        if start_time > end_time:
+            raise ValueError(f"start_time {start_time} is after end_time {end_time}")
+
+        seen = set()
+
+        def fresh(page: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            rows = [kline for kline in page if kline["open_time"] not in seen]
+            seen.update(kline["open_time"] for kline in rows)
+            return rows
+
+        step = self.INTERVAL_MS.get(interval)
+        if step is None:
+            # 月线长度不固定，无法预先拆页，按上一页最后一根K线顺序翻页
+            cursor = start_time
+            while cursor <= end_time:
+                with request_priority(Priority.BACKFILL):
+                    page = await self.get_klines(symbol, interval, self.MAX_LIMIT, cursor, end_time)
+                rows = fresh(page)
+                if rows:
+                    yield rows
+                if len(page) < self.MAX_LIMIT:
+                    return
+                cursor = int(page[-1]["open_time"]) + 1
+            return
+
+        span = step * self.MAX_LIMIT
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(page_start: int) -> List[Dict[str, Any]]:
+            page_end = min(page_start + span - 1, end_time)
+            # 最后一页按实际K线数请求，降低权重
+            limit = min(self.MAX_LIMIT, (page_end - page_start) // step + 1)
+            # 每页是独立的任务，在任务自己的上下文中设置优先级
+            current_priority.set(Priority.BACKFILL)
+            async with semaphore:
+                return await self.get_klines(symbol, interval, limit, page_start, page_end)
+
+        tasks = [asyncio.ensure_future(fetch(page_start)) for page_start in range(start_time, end_time + 1, span)]
+        try:
+            for future in asyncio.as_completed(tasks):
+                rows = fresh(await future)
+                if rows:
+                    yield rows
+        finally:
+            # 提前结束或出错时取消未完成的页
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def get_klines_range(
+            self,
+            symbol: FuturesSymbol,
+            interval: str,
+            start_time: int,
+            end_time: Optional[int] = None,
+            concurrency: int = 8
+    ) -> List[Dict[str, Any]]:
+        """
+        获取任意长度时间范围内的K线（超过单次上限时分页并发获取，按 open_time 拼接去重）
+
+        Args:
+            symbol: 交易对枚举值
+            interval: K线间隔
+            start_time: 开始时间戳 (毫秒)
+            end_time: 结束时间戳 (毫秒)，为 None 时到当前时间
+            concurrency: 同时进行的请求数上限
+
+        Returns:
+            按时间升序的K线数据列表
+        """
+        klines = []
+        async for page in self.iter_klines_range(symbol, interval, start_time, end_time, concurrency):
+            klines.extend(page)
+        klines.sort(key=lambda kline: int(kline["open_time"]))
+        return klines
+
+    async def sync_klines(
+            self,
+            symbol: FuturesSymbol,
+            interval: str,
+            start_time: Optional[int] = None,
+            end_time: Optional[int] = None,
+            concurrency: int = 8
+    ) -> int:
+        """
+        增量同步本地K线存储：只获取已存储的最后一根K线收盘之后的K线
+
+        Args:
+            symbol: 交易对枚举值
+            interval: K线间隔（月线不支持）
+            start_time: 存储中还没有该交易对时的起始时间戳 (毫秒)
+            end_time: 同步到该时间戳 (毫秒)，为 None 时到当前时间
+            concurrency: 同时进行的请求数上限
+
+        Returns:
+            新写入的K线根数
+        """
+        if self.kline_store is None:
+            raise ValueError("Kline store is not configured")
+
+        last_close_time = self.kline_store.last_close_time(symbol.value, interval)
+        if last_close_time is None:
+            if start_time is None:
+                raise ValueError(f"start_time is required for the first sync of {symbol.value}@{interval}")
+            since = start_time
+        else:
+            since = last_close_time + 1
+
+        now = int(time.time() * 1000)
+        end_time = now if end_time is None else min(end_time, now)
+        if since > end_time:
+            return 0
+        count = self.kline_store.count(symbol.value, interval)
+        klines = await self.get_klines_range(symbol, interval, since, end_time, concurrency)
+        # 只保存已收盘的K线（分页取回时已顺带写入的部分会被跳过）
+        closed = [kline for kline in klines if int(kline["close_time"]) < now]
+        await self._write_store(symbol.value, interval, closed)
+        return self.kline_store.count(symbol.value, interval) - count
+
+    async def get_klines_with_indicators(
+            self,
+            symbol: FuturesSymbol,
+            interval: str = "1h",
+            limit: int = 500,
+            start_time: Optional[int] = None,
+            end_time: Optional[int] = None,
+            indicators: Optional[List[Any]] = None,
+            warmup: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        获取合约K线数据并计算所有技术指标（参数与 BinanceFuturesClient.get_klines_with_indicators 相同）
+
+        Returns:
+            包含所有技术指标的K线数据列表
+        """
+        klines, warmup_count = await self.get_indicator_window(
+            symbol, interval, limit, start_time, end_time, indicators, warmup)
+        return await self.run_indicator_rows(klines, indicators, warmup_count)
+
+    async def iter_klines_with_indicators(
+            self,
+            symbol: FuturesSymbol,
+            interval: str = "1h",
+            limit: int = 500,
+            start_time: Optional[int] = None,
+            end_time: Optional[int] = None,
+            indicators: Optional[List[Any]] = None,
+            warmup: bool = True
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        获取合约K线数据并计算技术指标，返回逐行生成结果的迭代器（流式响应使用）
+
+        参数与 get_klines_with_indicators 相同，指标列一次性计算，结果行在迭代时才按块生成。
+
+        Returns:
+            包含技术指标的K线数据行迭代器
+        """
+        klines, warmup_count = await self.get_indicator_window(
+            symbol, interval, limit, start_time, end_time, indicators, warmup)
+        return await self.run_iter_indicator_rows(klines, indicators, warmup_count)
+
+    async def get_indicator_columns(
+            self,
+            symbol: FuturesSymbol,
+            interval: str = "1h",
+            limit: int = 500,
+            start_time: Optional[int] = None,
+            end_time: Optional[int] = None,
+            indicators: Optional[List[Any]] = None,
+            warmup: bool = True
+    ) -> KlineColumns:
+        """
+        获取合约K线数据并计算技术指标，返回列式结果（参数与 get_klines_with_indicators 相同）
+
+        供列式 JSON、MessagePack、Arrow 等按列编码的响应格式使用，数值保持为数字，不生成结果行。
+
+        Returns:
+            K线数值列与指标列
+        """
+        klines, warmup_count = await self.get_indicator_window(
+            symbol, interval, limit, start_time, end_time, indicators, warmup)
+        return await self.run_indicator_columns(klines, indicators, warmup_count)
+
+    async def get_indicator_window(
+            self,
+            symbol: FuturesSymbol,
+            interval: str = "1h",
+            limit: int = 500,
+            start_time: Optional[int] = None,
+            end_time: Optional[int] = None,
+            indicators: Optional[List[Any]] = None,
+            warmup: bool = True
+    ) -> Tuple[KlineColumns, int]:
+        """
+        获取计算指标所需的列式K线（参数与 get_klines_with_indicators 相同），不计算指标
+
+        调用方可以先根据K线决定是否需要计算（如 HTTP 条件请求），再用 run_indicator_rows、
+        run_iter_indicator_rows 或 run_indicator_columns 计算。
+
+        Returns:
+            (预热K线 + 窗口K线, 预热K线数量)
+        """
+        lookback = self._indicator_lookback(indicators, warmup)
+        return await self._get_klines_with_history(symbol, interval, limit, start_time, end_time, lookback)
+
+    async def _get_klines_with_history(
+            self,
+            symbol: FuturesSymbol,
+            interval: str,
+            limit: int,
+            start_time: Optional[int],
+            end_time: Optional[int],
+            lookback: int
+    ) -> Tuple[KlineColumns, int]:
+        """
+        获取K线窗口及其之前的 lookback 根历史K线（列式）
+
+        Returns:
+            (历史K线 + 窗口K线, 历史K线数量)
+        """
+        if lookback <= 0:
+            return await self.get_kline_columns(symbol, interval, limit, start_time, end_time), 0
+
+        # 不指定开始时间且总数不超过单次上限时一次取回
+        if start_time is None and limit + lookback <= self.MAX_LIMIT:
+            klines = await self.get_kline_columns(symbol, interval, limit + lookback, None, end_time)
+            return klines, max(len(klines) - limit, 0)
+
+        window = await self.get_kline_columns(symbol, interval, limit, start_time, end_time)
+        if len(window) == 0:
+            return window, 0
+        history = await self.get_kline_columns(symbol, interval, min(lookback, self.MAX_LIMIT), None,
+                                               int(window["open_time"][0]) - 1)
+        return KlineColumns.concat([history, window]), len(history)
+
+    async def get_klines_with_indicators_batch(
+            self,
+            symbols: List[FuturesSymbol],
+            interval: str = "1h",
+            limit: int = 500,
+            start_time: Optional[int] = None,
+            end_time: Optional[int] = None,
+            indicators: Optional[List[Any]] = None,
+            warmup: bool = True
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        并发获取多个交易对的K线数据，并在一次向量化计算中得到所有交易对的技术指标
+
+        Returns:
+            交易对 -> 包含技术指标的K线数据列表
+        """
+        lookback = self._indicator_lookback(indicators, warmup)
+
+        fetched = await asyncio.gather(*(
+            self._get_klines_with_history(symbol, interval, limit, start_time, end_time, lookback)
+            for symbol in symbols))
+
+        klines_by_symbol = {}
+        warmup_counts = {}
+        for symbol, (klines, warmup_count) in zip(symbols, fetched):
+            klines_by_symbol[symbol.value], warmup_counts[symbol.value] = klines, warmup_count
+
+        rows = sum(len(klines) for klines in klines_by_symbol.values())
+        return await self.executor.run(self._calculate_batch, klines_by_symbol, warmup_counts, indicators,
+                                       process=self.executor.use_process(rows))
+
+    async def run_indicator_rows(self,
+                                 klines: KlineColumns,
+                                 indicators: Optional[List[Any]],
+                                 start: int = 0) -> List[Dict[str, Any]]:
+        """
+        在执行器中计算技术指标结果行（同 indicator_rows，不阻塞事件循环）
+
+        全部默认指标走进程内的结果帧缓存，始终在线程池中计算；指定指标且窗口较大时可在进程池中计算。
+
+        Raises:
+            IndicatorQueueFull: 计算任务排队已满
+            IndicatorTimeout: 计算超时
+        """
+        if indicators is not None and self.executor.use_process(len(klines)):
+            return await self.executor.run(self._uncached_indicator_rows, klines, indicators, start, process=True)
+        return await self.executor.run(self.indicator_rows, klines, indicators, start)
+
+    async def run_iter_indicator_rows(self,
+                                      klines: KlineColumns,
+                                      indicators: Optional[List[Any]],
+                                      start: int = 0) -> Iterator[Dict[str, Any]]:
+        """
+        在线程池中计算指标列，返回逐行生成结果的迭代器（同 iter_indicator_rows）
+
+        结果行在迭代时才按块生成（流式响应在线程池中迭代），迭代器不能跨进程传递，因此不使用进程池。
+        """
+        return await self.executor.run(self.iter_indicator_rows, klines, indicators, start)
+
+    async def run_indicator_columns(self,
+                                    klines: KlineColumns,
+                                    indicators: Optional[List[Any]],
+                                    start: int = 0) -> KlineColumns:
+        """在执行器中计算技术指标的列式结果（同 indicator_columns，窗口较大时可在进程池中计算）"""
+        return await self.executor.run(self.indicator_columns, klines, indicators, start,
+                                       process=self.executor.use_process(len(klines)))
@@ -0,0 +1,200 @@
+# exchanges/binance/backends.py
+import logging
+import os
+from typing import Dict, Type
+
+import numpy as np
+
+from .engine import IndicatorEngine
+
+try:
+    import talib
+    from talib import abstract
+except ImportError:  # TA-Lib 是可选依赖
+    talib = None
+
+logger = logging.getLogger(__name__)
+
+# 启动时通过环境变量选择指标计算后端
+DEFAULT_BACKEND = os.getenv("INDICATOR_BACKEND", "pandas")
+
+# TA-Lib 与 pandas 实现定义不同的指标（由 tests/test_exchanges/test_backend_parity.py 校验）
+DEFINITION_DIFFERENCES = {
+    "rsi": "TA-Lib 使用 Wilder 平滑（首值为前 period 个涨跌幅的均值，之后按 1/period 递推），pandas 实现使用简单移动平均",
+    "atr": "TA-Lib 使用 Wilder 平滑且首根K线不计入真实波幅，pandas 实现对真实波幅取简单移动平均",
+    "adx": "TA-Lib 的 +DI/-DI 和 ADX 均使用 Wilder 平滑，pandas 实现使用简单移动平均",
+    "bollinger_bands": "TA-Lib 使用总体标准差(ddof=0)，pandas 实现使用样本标准差(ddof=1)，中轨相同",
+    "standard_deviation": "TA-Lib 使用总体标准差(ddof=0)，pandas 实现使用样本标准差(ddof=1)",
+    "obv": "TA-Lib 以首根K线的成交量为初值，pandas 实现以0为初值，两者相差一个常数",
+    "parabolic_sar": "TA-Lib 按首两根K线的方向运动确定初始趋势，并将反转当根的 SAR 限制在前两根K线的价格范围内，"
+                     "首根为 NaN，少数反转点的取值不同",
+    "macd": "TA-Lib 的 EMA 以前 period 个值的简单平均为初值，pandas 实现以首个值为初值，预热期之后一致",
+    "ema": "TA-Lib 的 EMA 以前 period 个值的简单平均为初值，pandas 实现以首个值为初值，预热期之后一致",
+    "stochastic": "TA-Lib 的 %K 与 %D 同时从 k_period + d_period - 2 开始有值，pandas 实现的 %K 提前 d_period - 1 根有值",
+}
+
+
+def _talib(func, *arrays, **kwargs):
+    """
+    调用 TA-Lib 函数，(时间, 品种) 的二维输入逐列计算
+
+    Returns:
+        与 TA-Lib 函数相同的单个数组或数组元组
+    """
+    if arrays[0].ndim == 1:
+        return func(*(np.ascontiguousarray(array) for array in arrays), **kwargs)
+
+    results = [func(*(np.ascontiguousarray(array[:, j]) for array in arrays), **kwargs)
+               for j in range(arrays[0].shape[1])]
+    if isinstance(results[0], tuple):
+        return tuple(np.column_stack(outputs) for outputs in zip(*results))
+    return np.column_stack(results)
+
+
+class TalibIndicatorEngine(IndicatorEngine):
+    """
+    TA-Lib 后端的列式指标计算引擎
+
+    TA-Lib 提供的指标使用其 C 实现计算，VWAP、一目均衡表、CMF、波动率等
+    TA-Lib 没有的指标沿用 pandas 实现。输出字段与 pandas 后端相同，
+    定义不同之处见 DEFINITION_DIFFERENCES。
+    """
+
+    BACKEND = "talib"
+
+    # 指标 -> [(TA-Lib 函数名, {TA-Lib 参数名: 指标参数名})]，用于查询 TA-Lib 的预热K线数
+    TALIB_FUNCTIONS = {
+        "macd": [("MACD", {"fastperiod": "fast_period", "slowperiod": "slow_period", "signalperiod": "signal_period"})],
+        "rsi": [("RSI", {"timeperiod": "period"})],
+        "bollinger_bands": [("BBANDS", {"timeperiod": "period"})],
+        "ma": [("SMA", {"timeperiod": "period"})],
+        "ema": [("EMA", {"timeperiod": "period"})],
+        "stochastic": [("STOCHF", {"fastk_period": "k_period", "fastd_period": "d_period"})],
+        "atr": [("ATR", {"timeperiod": "period"})],
+        "cci": [("CCI", {"timeperiod": "period"})],
+        "williams_r": [("WILLR", {"timeperiod": "period"})],
+        "momentum": [("MOM", {"timeperiod": "period"})],
+        "parabolic_sar": [("SAR", {})],
+        "mfi": [("MFI", {"timeperiod": "period"})],
+        "obv": [("OBV", {})],
+        "adl": [("AD", {})],
+        "standard_deviation": [("STDDEV", {"timeperiod": "period"})],
+        "adx": [("ADX", {"timeperiod": "period"}), ("PLUS_DI", {"timeperiod": "period"}),
+                ("MINUS_DI", {"timeperiod": "period"})],
+    }
+
+    @classmethod
+    def indicator_lookback(cls, request) -> int:
+        """TA-Lib 计算的指标使用 TA-Lib 报告的预热K线数，其余沿用 pandas 实现"""
+        functions = cls.TALIB_FUNCTIONS.get(request.name)
+        if functions is None:
+            return super().indicator_lookback(request)
+
+        params = request.kwargs
+        lookbacks = []
+        for name, mapping in functions:
+            function = abstract.Function(name)
+            function.set_parameters({key: params[param] for key, param in mapping.items()})
+            lookbacks.append(function.lookback)
+        return max(lookbacks)
+
+    def macd(self, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9) -> "IndicatorEngine":
+        macd_line, signal_line, histogram = _talib(talib.MACD, self.close, fastperiod=fast_period,
+                                                   slowperiod=slow_period, signalperiod=signal_period)
+        self._set("macd", macd_line)
+        self._set("macd_signal", signal_line)
+        self._set("macd_histogram", histogram)
+        return self
+
+    def rsi(self, period: int = 14) -> "IndicatorEngine":
+        self._set(f"rsi_{period}", _talib(talib.RSI, self.close, timeperiod=period))
+        return self
+
+    def bollinger_bands(self, period: int = 20, num_std: int = 2) -> "IndicatorEngine":
+        upper, middle, lower = _talib(talib.BBANDS, self.close, timeperiod=period,
+                                      nbdevup=num_std, nbdevdn=num_std, matype=0)
+        self._set("bb_upper", upper)
+        self._set("bb_middle", middle)
+        self._set("bb_lower", lower)
+        return self
+
+    def ma(self, period: int = 30) -> "IndicatorEngine":
+        self._set(f"ma_{period}", _talib(talib.SMA, self.close, timeperiod=period))
+        return self
+
+    def ema(self, period: int = 12) -> "IndicatorEngine":
+        self._set(f"ema_{period}", _talib(talib.EMA, self.close, timeperiod=period))
+        return self
+
+    def stochastic(self, k_period: int = 14, d_period: int = 3) -> "IndicatorEngine":
+        percent_k, percent_d = _talib(talib.STOCHF, self.high, self.low, self.close,
+                                      fastk_period=k_period, fastd_period=d_period, fastd_matype=0)
+        self._set("stoch_k", percent_k)
+        self._set("stoch_d", percent_d)
+        return self
+
+    def atr(self, period: int = 14) -> "IndicatorEngine":
+        self._set(f"atr_{period}", _talib(talib.ATR, self.high, self.low, self.close, timeperiod=period))
+        return self
+
+    def cci(self, period: int = 20) -> "IndicatorEngine":
+        self._set(f"cci_{period}", _talib(talib.CCI, self.high, self.low, self.close, timeperiod=period))
+        return self
+
+    def williams_r(self, period: int = 14) -> "IndicatorEngine":
+        self._set(f"williams_r_{period}", _talib(talib.WILLR, self.high, self.low, self.close, timeperiod=period))
+        return self
+
+    def momentum(self, period: int = 10) -> "IndicatorEngine":
+        self._set(f"momentum_{period}", _talib(talib.MOM, self.close, timeperiod=period))
+        return self
+
+    def parabolic_sar(self, acceleration: float = 0.02, maximum: float = 0.2) -> "IndicatorEngine":
+        self._set("sar", _talib(talib.SAR, self.high, self.low, acceleration=acceleration, maximum=maximum))
+        return self
+
+    def mfi(self, period: int = 14) -> "IndicatorEngine":
+        self._set(f"mfi_{period}", _talib(talib.MFI, self.high, self.low, self.close, self.volume, timeperiod=period))
+        return self
+
+    def obv(self) -> "IndicatorEngine":
+        self._set("obv", _talib(talib.OBV, self.close, self.volume))
+        return self
+
+    def adl(self) -> "IndicatorEngine":
+        self._set("adl", _talib(talib.AD, self.high, self.low, self.close, self.volume))
+        return self
+
+    def standard_deviation(self, period: int = 20) -> "IndicatorEngine":
+        self._set(f"std_{period}", _talib(talib.STDDEV, self.close, timeperiod=period, nbdev=1))
+        return self
+
+    def adx(self, period: int = 14) -> "IndicatorEngine":
+        self._set("di_plus", _talib(talib.PLUS_DI, self.high, self.low, self.close, timeperiod=period))
+        self._set("di_minus", _talib(talib.MINUS_DI, self.high, self.low, self.close, timeperiod=period))
+        self._set(f"adx_{period}", _talib(talib.ADX, self.high, self.low, self.close, timeperiod=period))
+        return self
+
+
+# 可用的后端: 名称 -> 引擎类
+BACKENDS: Dict[str, Type[IndicatorEngine]] = {"pandas": IndicatorEngine}
+if talib is not None:
+    BACKENDS["talib"] = TalibIndicatorEngine
+
+
+def get_backend(name: str) -> Type[IndicatorEngine]:
+    """
+    获取指标计算后端
+
+    Args:
+        name: 后端名称 pandas / talib，talib 不可用时回退到 pandas
+
+    Returns:
+        引擎类
+    """
+    if name == "talib" and talib is None:
+        logger.warning("TA-Lib is not installed, falling back to pandas indicator backend")
+        return IndicatorEngine
+    if name not in BACKENDS:
+        raise ValueError(f"Unsupported indicator backend: {name}. Available backends: {list(BACKENDS)}")
+    return BACKENDS[name]
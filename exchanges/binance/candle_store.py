@@ -0,0 +1,278 @@
+# exchanges/binance/candle_store.py
+import os
+import threading
+import time
+from collections import deque
+from typing import List, Dict, Any, Callable, Optional, Tuple
+
+import numpy as np
+
+from .cache import LRUCache
+from .klines import KlineColumns
+
+# 最近K线窗口缓存最多保存的 (交易对, 周期) 窗口数，超出时淘汰最久未使用的窗口
+WINDOW_CACHE_MAX_WINDOWS = int(os.getenv("KLINE_WINDOW_CACHE_MAX_WINDOWS", "200"))
+# 窗口超过该秒数没有被请求（重建或拼接）时过期
+WINDOW_CACHE_IDLE_TIMEOUT = float(os.getenv("KLINE_WINDOW_CACHE_IDLE_TIMEOUT", "3600"))
+
+
+class CandleBuffer:
+    """
+    单个 (交易对, 周期) 的K线环形缓冲区
+
+    只保存按时间连续的K线（相邻K线相差一个周期），超出容量时丢弃最旧的K线。
+    推送的K线与缓冲区末尾不连续时（断线期间漏掉了K线）清空重来，缺失的历史由 REST 补齐。
+    """
+
+    def __init__(self, interval_ms: int, maxlen: int):
+        """
+        Args:
+            interval_ms: K线周期(毫秒)
+            maxlen: 最多保存的K线根数
+        """
+        self.interval_ms = interval_ms
+        self.maxlen = maxlen
+        self.candles: deque = deque(maxlen=maxlen)
+        self.live = False
+        self.updated_at = 0.0
+
+    def update(self, kline: Dict[str, Any]) -> None:
+        """写入推送的K线：同一根K线覆盖，下一根追加，不连续时清空后重新开始"""
+        open_time = int(kline["open_time"])
+        if self.candles:
+            last = int(self.candles[-1]["open_time"])
+            if open_time == last:
+                self.candles[-1] = kline
+                return
+            if open_time < last:
+                # 迟到的旧K线：只覆盖缓冲区内已有的同一根
+                index = len(self.candles) - 1 - (last - open_time) // self.interval_ms
+                if index >= 0 and int(self.candles[index]["open_time"]) == open_time:
+                    self.candles[index] = kline
+                return
+            if open_time != last + self.interval_ms:
+                self.candles.clear()
+        self.candles.append(kline)
+
+    def fill(self, klines: KlineColumns) -> None:
+        """
+        用 REST 取回的K线（升序、连续）补齐缓冲区开头缺失的历史，重叠部分以推送的数据为准
+
+        只有实际补入缓冲区的K线才转换为旧格式。
+        """
+        if len(klines) == 0:
+            return
+        if not self.candles:
+            self.candles.extend(klines.slice(-self.maxlen).to_klines())
+            return
+
+        first = int(self.candles[0]["open_time"])
+        open_time = klines["open_time"]
+        older = int(np.searchsorted(open_time, first))
+        if older == 0 or int(open_time[older - 1]) != first - self.interval_ms:
+            return
+        count = min(older, self.maxlen - len(self.candles))
+        if count > 0:
+            self.candles.extendleft(reversed(klines.slice(older - count, older).to_klines()))
+
+    def latest(self, limit: int) -> Optional[List[Dict[str, Any]]]:
+        """最近 limit 根K线，不足时返回 None"""
+        if len(self.candles) < limit:
+            return None
+        return list(self.candles)[len(self.candles) - limit:]
+
+
+class CandleStore:
+    """
+    内存K线存储：每个 (交易对, 周期) 一个有界环形缓冲区
+
+    由 WebSocket 推送线程写入、事件循环读取，所有操作加锁。
+    只有推送连接正常且最近 max_age 秒内收到过更新的缓冲区才会被读取。
+    """
+
+    def __init__(self,
+                 interval_ms: Dict[str, int],
+                 maxlen: int = 1500,
+                 max_age: float = 10.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            interval_ms: K线周期 -> 毫秒数，只支持其中的周期
+            maxlen: 每个缓冲区最多保存的K线根数
+            max_age: 缓冲区超过该秒数没有收到推送即视为过期
+            clock: 返回单调时间(秒)的函数
+        """
+        self.interval_ms = interval_ms
+        self.maxlen = maxlen
+        self.max_age = max_age
+        self.clock = clock
+        self.buffers: Dict[Tuple[str, str], CandleBuffer] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _buffer(self, symbol: str, interval: str) -> CandleBuffer:
+        key = (symbol, interval)
+        buffer = self.buffers.get(key)
+        if buffer is None:
+            buffer = self.buffers[key] = CandleBuffer(self.interval_ms[interval], self.maxlen)
+        return buffer
+
+    def update(self, kline: Dict[str, Any]) -> None:
+        """写入一根推送的K线"""
+        with self._lock:
+            buffer = self._buffer(kline["symbol"], kline["interval"])
+            buffer.update(kline)
+            buffer.live = True
+            buffer.updated_at = self.clock()
+
+    def fill(self, symbol: str, interval: str, klines: KlineColumns) -> None:
+        """用 REST 数据补齐已有缓冲区的历史（没有推送的交易对不缓存）"""
+        with self._lock:
+            buffer = self.buffers.get((symbol, interval))
+            if buffer is not None:
+                buffer.fill(klines)
+
+    def remove(self, symbol: str, interval: str) -> None:
+        """释放 (交易对, 周期) 的缓冲区（取消订阅后不再有推送）"""
+        with self._lock:
+            self.buffers.pop((symbol, interval), None)
+
+    def set_live(self, live: bool) -> None:
+        """推送连接断开时把所有缓冲区标记为不可读，重连后收到推送再恢复"""
+        with self._lock:
+            for buffer in self.buffers.values():
+                buffer.live = live
+
+    def read(self, symbol: str, interval: str, limit: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        读取最近 limit 根K线
+
+        Returns:
+            K线数据列表，缓冲区不存在、已过期或根数不足时返回 None
+        """
+        with self._lock:
+            buffer = self.buffers.get((symbol, interval))
+            klines = None
+            if buffer is not None and buffer.live and self.clock() - buffer.updated_at <= self.max_age:
+                klines = buffer.latest(limit)
+            if klines is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return klines
+
+    def stats(self) -> Dict[str, Any]:
+        """获取存储统计信息"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "buffers": {f"{symbol}@{interval}": {"size": len(buffer.candles), "live": buffer.live}
+                            for (symbol, interval), buffer in self.buffers.items()},
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0
+            }
+
+
+class KlineWindowCache:
+    """
+    最近K线窗口缓存（增量获取）
+
+    记住每个 (交易对, 周期) 最近一次取回的列式K线窗口。之后的请求只从窗口最后一根K线的 open_time 开始获取，
+    把返回的K线拼接到窗口末尾：同一根覆盖（正在形成的K线会变化），新的追加。
+    返回的第一根不是窗口的最后一根时说明中间缺了K线，由调用方重新完整获取。
+    窗口数量有上限，超出时淘汰最久未使用的窗口，长时间没有请求的窗口过期。
+    """
+
+    def __init__(self,
+                 interval_ms: Dict[str, int],
+                 maxlen: int = 1500,
+                 max_windows: int = WINDOW_CACHE_MAX_WINDOWS,
+                 idle_timeout: Optional[float] = WINDOW_CACHE_IDLE_TIMEOUT):
+        """
+        Args:
+            interval_ms: K线周期 -> 毫秒数，只缓存其中的周期
+            maxlen: 每个窗口最多保存的K线根数
+            max_windows: 最多保存的窗口数
+            idle_timeout: 窗口未被请求的最长时间(秒)，为 None 时只按数量淘汰
+        """
+        self.interval_ms = interval_ms
+        self.maxlen = maxlen
+        # (交易对, 周期) -> 列式K线窗口
+        self.windows = LRUCache(maxsize=max_windows, ttl=idle_timeout)
+        self._lock = threading.Lock()
+        self.full = 0
+        self.delta = 0
+        self.gaps = 0
+        self.rows_fetched = 0
+        self.rows_served = 0
+
+    def since(self, symbol: str, interval: str, limit: int) -> Optional[int]:
+        """
+        增量获取的起始 open_time
+
+        Returns:
+            窗口最后一根K线的 open_time，窗口不存在或不足 limit 根时返回 None
+        """
+        with self._lock:
+            window = self.windows.get((symbol, interval))
+            if window is None or len(window) < limit:
+                return None
+            return int(window["open_time"][-1])
+
+    def splice(self,
+               symbol: str,
+               interval: str,
+               klines: KlineColumns,
+               limit: int) -> Optional[KlineColumns]:
+        """
+        把从窗口最后一根开始增量取回的K线拼接到窗口末尾
+
+        Returns:
+            拼接后最近 limit 根K线，与窗口末尾不连续时返回 None
+        """
+        key = (symbol, interval)
+        with self._lock:
+            window = self.windows.get(key)
+            if window is None or len(window) == 0 or len(klines) == 0 \
+                    or int(klines["open_time"][0]) != int(window["open_time"][-1]):
+                self.gaps += 1
+                return None
+            self.rows_fetched += len(klines)
+            if not klines.is_contiguous(self.interval_ms[interval]):
+                # 增量K线之间不连续，丢弃窗口，由调用方重新完整获取
+                self.windows.delete(key)
+                self.gaps += 1
+                return None
+            window = KlineColumns.concat([window.slice(0, -1), klines])
+            window = window.slice(max(len(window) - self.maxlen, 0))
+            self.windows.set(key, window)
+            self.delta += 1
+            self.rows_served += limit
+            return window.slice(len(window) - limit)
+
+    def replace(self, symbol: str, interval: str, klines: KlineColumns) -> None:
+        """完整获取后重建窗口"""
+        if interval not in self.interval_ms:
+            return
+        with self._lock:
+            self.windows.set((symbol, interval), klines.slice(max(len(klines) - self.maxlen, 0)))
+            self.full += 1
+            self.rows_fetched += len(klines)
+            self.rows_served += len(klines)
+
+    def stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息（rows_fetched / rows_served 为实际取回与返回给调用方的K线根数）"""
+        with self._lock:
+            return {
+                "windows": len(self.windows),
+                "max_windows": self.windows.maxsize,
+                "idle_timeout": self.windows.ttl,
+                "evictions": self.windows.evictions,
+                "full": self.full,
+                "delta": self.delta,
+                "gaps": self.gaps,
+                "rows_fetched": self.rows_fetched,
+                "rows_served": self.rows_served
+            }
@@ -0,0 +1,493 @@
+# exchanges/binance/engine.py
+import pandas as pd
+import numpy as np
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+from . import kernels
+
+
+def _divide(numerator, denominator) -> np.ndarray:
+    """逐元素除法，除零得到 inf/NaN 而不告警（与 pandas 行为一致）"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.divide(numerator, denominator)
+
+
+def _shift(values: np.ndarray, periods: int) -> np.ndarray:
+    """沿时间轴平移，空出的位置填 NaN（等价于 Series.shift）"""
+    result = np.full(values.shape, np.nan)
+    if periods >= 0:
+        if periods < len(values):
+            result[periods:] = values[:len(values) - periods]
+    elif -periods < len(values):
+        result[:periods] = values[-periods:]
+    return result
+
+
+def _shift_diff(values: np.ndarray) -> np.ndarray:
+    """一阶差分，首个位置为 NaN（等价于 Series.diff）"""
+    return values - _shift(values, 1)
+
+
+def _ewm(values: np.ndarray, span: int) -> np.ndarray:
+    """指数移动平均 ewm(span, adjust=False)"""
+    frame = pd.Series(values, copy=False) if values.ndim == 1 else pd.DataFrame(values, copy=False)
+    return frame.ewm(span=span, adjust=False).mean().to_numpy()
+
+
+class IndicatorEngine:
+    """
+    列式技术指标计算引擎
+
+    K线只在构造时解析一次为 float64 列，所有指标共享这些列进行计算，
+    计算结果以列的形式保存在 columns 中，最后统一生成结果行。
+    """
+
+    # 后端名称（见 backends.py）
+    BACKEND = "pandas"
+
+    # 需要解析为浮点列的价格字段
+    PRICE_FIELDS = ("high", "low", "close", "volume")
+
+    # 各指标的预热K线数：结果开头为 NaN（或首根没有前值）的K线数，参数为补齐默认值后的参数字典。
+    # 一目均衡表的滞后跨度引用未来价格，最后 kijun_sen_period 根总是为空，不计入预热期
+    LOOKBACKS = {
+        "macd": lambda p: 0,
+        "rsi": lambda p: p["period"],
+        "bollinger_bands": lambda p: p["period"] - 1,
+        "ma": lambda p: p["period"] - 1,
+        "ema": lambda p: 0,
+        "stochastic": lambda p: p["k_period"] + p["d_period"] - 2,
+        "atr": lambda p: p["period"] - 1,
+        "cci": lambda p: p["period"] - 1,
+        "williams_r": lambda p: p["period"] - 1,
+        "momentum": lambda p: p["period"],
+        "ichimoku": lambda p: max(p["tenkan_sen_period"], p["kijun_sen_period"],
+                                  p["senkou_span_b_period"]) - 1 + p["kijun_sen_period"],
+        "parabolic_sar": lambda p: 1,
+        "vwap": lambda p: 0,
+        "mfi": lambda p: p["period"],
+        "obv": lambda p: 0,
+        "adl": lambda p: 0,
+        "cmf": lambda p: p["period"] - 1,
+        "standard_deviation": lambda p: p["period"] - 1,
+        "adx": lambda p: 2 * p["period"] - 2,
+        "volatility": lambda p: p["period"],
+    }
+
+    def __init__(self, klines: List[Dict[str, Any]]):
+        self.klines = klines
+        self.size = len(klines)
+
+        # 只解析一次价格列
+        self.high = self._parse_column(klines, "high")
+        self.low = self._parse_column(klines, "low")
+        self.close = self._parse_column(klines, "close")
+        self.volume = self._parse_column(klines, "volume")
+
+        # 指标结果列（按计算顺序保存）
+        self.columns: Dict[str, np.ndarray] = {}
+        # 共享中间量缓存: (名称, 参数...) -> 结果
+        self.intermediates: Dict[Tuple, Any] = {}
+        # 由列式K线构造时的窗口标识（见 window_key）
+        self.window: Optional[Tuple] = None
+
+    @classmethod
+    def from_arrays(cls,
+                    high: np.ndarray,
+                    low: np.ndarray,
+                    close: np.ndarray,
+                    volume: np.ndarray,
+                    klines: Optional[List[Dict[str, Any]]] = None,
+                    window: Optional[Tuple] = None) -> "IndicatorEngine":
+        """
+        直接使用已解析的价格数组构造引擎
+
+        数组可以是一维序列，也可以是 (时间, 品种) 的二维数组，
+        二维时所有指标沿时间轴对每个品种同时计算。
+
+        Args:
+            high: 最高价
+            low: 最低价
+            close: 收盘价
+            volume: 成交量
+            klines: 对应的原始K线（一维时用于生成结果行，可选）
+            window: K线窗口标识（见 KlineColumns.window_key），指定时指标结果缓存不需要原始K线
+
+        Returns:
+            引擎实例
+        """
+        engine = cls.__new__(cls)
+        engine.klines = klines or []
+        engine.high = np.asarray(high, dtype=np.float64)
+        engine.low = np.asarray(low, dtype=np.float64)
+        engine.close = np.asarray(close, dtype=np.float64)
+        engine.volume = np.asarray(volume, dtype=np.float64)
+        engine.size = len(engine.close)
+        engine.columns = {}
+        engine.intermediates = {}
+        engine.window = window
+        return engine
+
+    def select(self, index: int, klines: List[Dict[str, Any]]) -> "IndicatorEngine":
+        """
+        取出二维批量计算结果中第 index 个品种的一维视图（不复制数据）
+
+        Args:
+            index: 品种所在的列
+            klines: 该品种的原始K线
+
+        Returns:
+            只包含该品种价格列和指标列的引擎
+        """
+        engine = type(self).from_arrays(*(getattr(self, field)[:, index] for field in self.PRICE_FIELDS),
+                                             klines=klines)
+        engine.columns = {name: column[:, index] for name, column in self.columns.items()}
+        return engine
+
+    @staticmethod
+    def _parse_column(klines: List[Dict[str, Any]], field: str) -> np.ndarray:
+        """将K线中的某个字段解析为 float64 数组"""
+        return np.array([kline[field] for kline in klines], dtype=np.float64)
+
+    def _set(self, name: str, values: np.ndarray) -> None:
+        """保存指标列"""
+        self.columns[name] = values
+
+    def intermediate(self, name: str, *args) -> Any:
+        """
+        获取共享中间量（每组参数只计算一次）
+
+        Args:
+            name: 中间量名称，见 planner.INTERMEDIATES
+            args: 中间量参数，例如窗口长度
+
+        Returns:
+            中间量结果
+        """
+        key = (name,) + args
+        if key not in self.intermediates:
+            self.intermediates[key] = getattr(self, f"_{name}")(*args)
+        return self.intermediates[key]
+
+    def window_key(self) -> Tuple:
+        """
+        K线窗口标识，用于指标结果缓存
+
+        已收盘的K线不会再变化，窗口由交易对、周期、首根开盘时间、根数和末根收盘时间确定；
+        末根K线可能尚未收盘，因此同时带上它当前的价格和成交量。不同后端的结果不共用。
+
+        Returns:
+            可哈希的窗口标识
+        """
+        if self.window is not None:
+            return (self.BACKEND,) + self.window
+        if not self.klines:
+            return ()
+        first, last = self.klines[0], self.klines[-1]
+        return (self.BACKEND, first.get("symbol"), first.get("interval"), first.get("open_time"), self.size,
+                last.get("close_time"), last["high"], last["low"], last["close"], last["volume"])
+
+    def run(self, request) -> Dict[str, np.ndarray]:
+        """
+        计算单个指标请求，返回它产生的指标列（不写入 columns）
+
+        Args:
+            request: IndicatorRequest
+
+        Returns:
+            指标列名 -> 结果
+        """
+        columns, self.columns = self.columns, {}
+        try:
+            getattr(self, request.name)(**request.kwargs)
+            return self.columns
+        finally:
+            self.columns = columns
+
+    # ---------- 共享中间量 ----------
+
+    def _typical_price(self) -> np.ndarray:
+        return (self.high + self.low + self.close) / 3
+
+    def _true_range(self) -> np.ndarray:
+        return kernels.true_range(self.high, self.low, self.close)
+
+    def _directional_movement(self) -> Tuple[np.ndarray, np.ndarray]:
+        return kernels.directional_movement(self.high, self.low)
+
+    def _money_flow(self) -> Tuple[np.ndarray, np.ndarray]:
+        return kernels.money_flow(self.intermediate("typical_price"), self.volume)
+
+    def _money_flow_volume(self) -> np.ndarray:
+        """资金流量 = CLV * 成交量，high == low 时 CLV 取 0"""
+        clv = _divide((self.close - self.low) - (self.high - self.close), self.high - self.low)
+        clv = np.where(np.isnan(clv), 0.0, clv)
+        return clv * self.volume
+
+    def _rolling_high(self, window: int) -> np.ndarray:
+        return kernels.rolling_window("max", self.high, window)
+
+    def _rolling_low(self, window: int) -> np.ndarray:
+        return kernels.rolling_window("min", self.low, window)
+
+    # ---------- 技术指标 ----------
+
+    def macd(self, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9) -> "IndicatorEngine":
+        """计算MACD指标"""
+        macd_line = _ewm(self.close, fast_period) - _ewm(self.close, slow_period)
+        signal_line = _ewm(macd_line, signal_period)
+
+        self._set("macd", macd_line)
+        self._set("macd_signal", signal_line)
+        self._set("macd_histogram", macd_line - signal_line)
+        return self
+
+    def rsi(self, period: int = 14) -> "IndicatorEngine":
+        """计算RSI指标"""
+        delta = _shift_diff(self.close)
+
+        gain = kernels.rolling_window("mean", np.where(delta > 0, delta, 0.0), period)
+        loss = kernels.rolling_window("mean", -np.where(delta < 0, delta, 0.0), period)
+        rs = _divide(gain, loss)
+
+        self._set(f"rsi_{period}", 100 - _divide(100, 1 + rs))
+        return self
+
+    def bollinger_bands(self, period: int = 20, num_std: int = 2) -> "IndicatorEngine":
+        """计算布林带指标"""
+        middle_band = kernels.rolling_window("mean", self.close, period)
+        std_dev = kernels.rolling_window("std", self.close, period)
+
+        self._set("bb_upper", middle_band + (std_dev * num_std))
+        self._set("bb_middle", middle_band)
+        self._set("bb_lower", middle_band - (std_dev * num_std))
+        return self
+
+    def ma(self, period: int = 30) -> "IndicatorEngine":
+        """计算简单移动平均线"""
+        self._set(f"ma_{period}", kernels.rolling_window("mean", self.close, period))
+        return self
+
+    def ema(self, period: int = 12) -> "IndicatorEngine":
+        """计算指数移动平均线"""
+        self._set(f"ema_{period}", _ewm(self.close, period))
+        return self
+
+    def stochastic(self, k_period: int = 14, d_period: int = 3) -> "IndicatorEngine":
+        """计算随机指标(KDJ)"""
+        low_min = self.intermediate("rolling_low", k_period)
+        high_max = self.intermediate("rolling_high", k_period)
+        percent_k = 100 * _divide(self.close - low_min, high_max - low_min)
+
+        self._set("stoch_k", percent_k)
+        self._set("stoch_d", kernels.rolling_window("mean", percent_k, d_period))
+        return self
+
+    def atr(self, period: int = 14) -> "IndicatorEngine":
+        """计算平均真实范围(ATR)"""
+        self._set(f"atr_{period}", kernels.rolling_window("mean", self.intermediate("true_range"), period))
+        return self
+
+    def cci(self, period: int = 20) -> "IndicatorEngine":
+        """计算商品通道指数(CCI)"""
+        tp = self.intermediate("typical_price")
+        sma_tp = kernels.rolling_window("mean", tp, period)
+        mad = kernels.rolling_window("mad", tp, period)
+
+        self._set(f"cci_{period}", _divide(tp - sma_tp, 0.015 * mad))
+        return self
+
+    def williams_r(self, period: int = 14) -> "IndicatorEngine":
+        """计算威廉姆斯%R指标"""
+        highest_high = self.intermediate("rolling_high", period)
+        lowest_low = self.intermediate("rolling_low", period)
+
+        self._set(f"williams_r_{period}", _divide(highest_high - self.close, highest_high - lowest_low) * -100)
+        return self
+
+    def momentum(self, period: int = 10) -> "IndicatorEngine":
+        """计算动量指标"""
+        self._set(f"momentum_{period}", self.close - _shift(self.close, period))
+        return self
+
+    def ichimoku(self,
+                 tenkan_sen_period: int = 9,
+                 kijun_sen_period: int = 26,
+                 senkou_span_b_period: int = 52) -> "IndicatorEngine":
+        """计算顺势指标(Ichimoku Cloud)"""
+        tenkan_sen = (self.intermediate("rolling_high", tenkan_sen_period)
+                      + self.intermediate("rolling_low", tenkan_sen_period)) / 2
+        kijun_sen = (self.intermediate("rolling_high", kijun_sen_period)
+                     + self.intermediate("rolling_low", kijun_sen_period)) / 2
+        span_b = (self.intermediate("rolling_high", senkou_span_b_period)
+                  + self.intermediate("rolling_low", senkou_span_b_period)) / 2
+
+        self._set("tenkan_sen", tenkan_sen)
+        self._set("kijun_sen", kijun_sen)
+        self._set("senkou_span_a", _shift((tenkan_sen + kijun_sen) / 2, kijun_sen_period))
+        self._set("senkou_span_b", _shift(span_b, kijun_sen_period))
+        self._set("chikou_span", _shift(self.close, -kijun_sen_period))
+        return self
+
+    def parabolic_sar(self, acceleration: float = 0.02, maximum: float = 0.2) -> "IndicatorEngine":
+        """计算抛物线转向指标(Parabolic SAR)"""
+        self._set("sar", kernels.parabolic_sar(self.high, self.low, self.close, acceleration, maximum))
+        return self
+
+    def vwap(self) -> "IndicatorEngine":
+        """计算成交量加权平均价(VWAP)"""
+        tp = self.intermediate("typical_price")
+        self._set("vwap", _divide(np.cumsum(tp * self.volume, axis=0), np.cumsum(self.volume, axis=0)))
+        return self
+
+    def mfi(self, period: int = 14) -> "IndicatorEngine":
+        """计算资金流量指数(MFI)"""
+        positive_flow, negative_flow = self.intermediate("money_flow")
+        money_ratio = _divide(kernels.rolling_window("sum", positive_flow, period),
+                              kernels.rolling_window("sum", negative_flow, period))
+
+        self._set(f"mfi_{period}", 100 - _divide(100, 1 + money_ratio))
+        return self
+
+    def obv(self) -> "IndicatorEngine":
+        """计算能量潮指标(OBV)，第一根为0"""
+        self._set("obv", kernels.obv(self.close, self.volume))
+        return self
+
+    def adl(self) -> "IndicatorEngine":
+        """计算累积/派发线(ADL)"""
+        self._set("adl", np.cumsum(self.intermediate("money_flow_volume"), axis=0))
+        return self
+
+    def cmf(self, period: int = 20) -> "IndicatorEngine":
+        """计算蔡金资金流量(CMF)"""
+        money_flow_volume_sum = kernels.rolling_window("sum", self.intermediate("money_flow_volume"), period)
+        volume_sum = kernels.rolling_window("sum", self.volume, period)
+
+        self._set(f"cmf_{period}", _divide(money_flow_volume_sum, volume_sum))
+        return self
+
+    def standard_deviation(self, period: int = 20) -> "IndicatorEngine":
+        """计算标准差"""
+        self._set(f"std_{period}", kernels.rolling_window("std", self.close, period))
+        return self
+
+    def adx(self, period: int = 14) -> "IndicatorEngine":
+        """计算平均方向指数(ADX)"""
+        plus_dm, minus_dm = self.intermediate("directional_movement")
+
+        atr_period = kernels.rolling_window("mean", self.intermediate("true_range"), period)
+        di_plus = _divide(kernels.rolling_window("mean", plus_dm, period), atr_period) * 100
+        di_minus = _divide(kernels.rolling_window("mean", minus_dm, period), atr_period) * 100
+        dx = _divide(np.abs(di_plus - di_minus), di_plus + di_minus) * 100
+
+        self._set("di_plus", di_plus)
+        self._set("di_minus", di_minus)
+        self._set(f"adx_{period}", kernels.rolling_window("mean", dx, period))
+        return self
+
+    def volatility(self, period: int = 20) -> "IndicatorEngine":
+        """计算波动率(收益率的标准差)"""
+        returns = _divide(self.close, _shift(self.close, 1)) - 1
+
+        self._set(f"volatility_{period}", kernels.rolling_window("std", returns, period))
+        return self
+
+    @classmethod
+    def indicator_lookback(cls, request) -> int:
+        """
+        单个指标需要的预热K线数
+
+        Args:
+            request: IndicatorRequest
+
+        Returns:
+            结果开头没有有效值的K线数
+        """
+        return cls.LOOKBACKS[request.name](request.kwargs)
+
+    @classmethod
+    def lookback(cls, indicators) -> int:
+        """
+        一组指标需要的最大预热K线数
+
+        多取这么多根K线计算后再去掉开头部分，返回的每一行指标都有值。
+
+        Args:
+            indicators: 指标列表，元素可以是名称、(名称, 参数字典) 或 IndicatorRequest
+
+        Returns:
+            最大预热K线数
+        """
+        from .indicators import TechnicalIndicators
+        requests = TechnicalIndicators.planner.plan(indicators).indicators
+        return max((cls.indicator_lookback(request) for request in requests), default=0)
+
+    def compute(self, indicators, memo=None) -> "IndicatorEngine":
+        """
+        按依赖计划计算指定的指标，共享的中间量只计算一次
+
+        Args:
+            indicators: 指标列表，元素可以是名称、(名称, 参数字典) 或 IndicatorRequest
+            memo: 可选的指标结果缓存，见 IndicatorPlan.execute
+
+        Returns:
+            引擎自身
+        """
+        from .indicators import TechnicalIndicators
+        return TechnicalIndicators.planner.plan(indicators).execute(self, memo)
+
+    def compute_all(self) -> "IndicatorEngine":
+        """按 calculate_all 的默认参数和顺序计算所有常用技术指标"""
+        from .indicators import TechnicalIndicators
+        return self.compute(TechnicalIndicators.DEFAULT_INDICATORS)
+
+    def iter_records(self, normalize: bool = False, start: int = 0,
+                     chunk_size: int = 256) -> Iterator[Dict[str, Any]]:
+        """
+        逐行生成结果行（按块把列转换为 Python 对象，内存占用只与块大小有关，用于流式响应）
+
+        Args:
+            normalize: 是否转换为接口格式：价格字段统一为字符串，NaN 转为 None
+            start: 起始行（跳过预热数据）
+            chunk_size: 每次转换的行数
+
+        Returns:
+            原始K线字段与指标字段合并后的数据行迭代器
+        """
+        names = list(self.columns)
+        if normalize:
+            names = list(self.PRICE_FIELDS) + names
+
+        for begin in range(max(start, 0), self.size, chunk_size):
+            end = min(begin + chunk_size, self.size)
+            values = []
+            for name in self.columns:
+                column = self.columns[name][begin:end]
+                items = column.tolist()
+                if normalize:
+                    for i in np.flatnonzero(np.isnan(column)).tolist():
+                        items[i] = None
+                values.append(items)
+
+            if normalize:
+                # 价格字段沿用原有 str(float) 的字符串格式
+                values = [[str(v) for v in getattr(self, field)[begin:end].tolist()]
+                          for field in self.PRICE_FIELDS] + values
+
+            for kline, row in zip(self.klines[begin:end], zip(*values)):
+                record = dict(kline)
+                record.update(zip(names, row))
+                yield record
+
+    def to_records(self, normalize: bool = False) -> List[Dict[str, Any]]:
+        """
+        生成结果行（只在最后执行一次）
+
+        Args:
+            normalize: 是否转换为接口格式：价格字段统一为字符串，NaN 转为 None
+
+        Returns:
+            原始K线字段与指标字段合并后的数据列表
+        """
+        return list(self.iter_records(normalize, chunk_size=max(self.size, 1)))
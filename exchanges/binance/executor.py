@@ -0,0 +1,225 @@
+# exchanges/binance/executor.py
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+# 指标计算执行器: thread（线程池） | process（超过 INDICATOR_PROCESS_MIN_ROWS 根K线的窗口在进程池中计算） |
+# inline（直接在事件循环中计算，仅用于调试）
+INDICATOR_EXECUTOR = os.getenv("INDICATOR_EXECUTOR", "thread")
+# 计算线程（及进程）数
+INDICATOR_WORKERS = int(os.getenv("INDICATOR_WORKERS", "4"))
+# 最多同时排队和执行的计算任务数，超出时直接拒绝
+INDICATOR_MAX_PENDING = int(os.getenv("INDICATOR_MAX_PENDING", "32"))
+# 单次计算从提交到完成的超时时间(秒)
+INDICATOR_TIMEOUT = float(os.getenv("INDICATOR_TIMEOUT", "30"))
+# process 模式下使用进程池的最少K线根数（较小的窗口传输数据的开销大于计算本身，仍在线程池中计算）
+INDICATOR_PROCESS_MIN_ROWS = int(os.getenv("INDICATOR_PROCESS_MIN_ROWS", "1000"))
+
+EXECUTOR_KINDS = ("thread", "process", "inline")
+
+
+class IndicatorQueueFull(Exception):
+    """排队和执行中的计算任务已达上限"""
+
+
+class IndicatorTimeout(Exception):
+    """计算任务未在超时时间内完成"""
+
+
+def _timed(func: Callable, *args) -> Tuple[Any, float, float]:
+    """在工作线程/进程中执行计算，并记录开始和结束时间"""
+    started = time.time()
+    result = func(*args)
+    return result, started, time.time()
+
+
+class Timings:
+    """最近若干次耗时的统计"""
+
+    def __init__(self, maxlen: int = 1000):
+        self.samples: Deque[float] = deque(maxlen=maxlen)
+        self.total = 0.0
+        self.count = 0
+
+    def add(self, seconds: float) -> None:
+        seconds = max(seconds, 0.0)
+        self.samples.append(seconds)
+        self.total += seconds
+        self.count += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """平均值（全部）、最近样本的 p50/p95 和最大值，单位毫秒"""
+        recent = sorted(self.samples)
+        if not recent:
+            return {"count": 0, "avg_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count * 1000, 3),
+            "p50_ms": round(recent[len(recent) // 2] * 1000, 3),
+            "p95_ms": round(recent[min(int(len(recent) * 0.95), len(recent) - 1)] * 1000, 3),
+            "max_ms": round(recent[-1] * 1000, 3)
+        }
+
+
+class IndicatorExecutor:
+    """
+    技术指标计算执行器
+
+    指标计算是 CPU 密集的 pandas/NumPy 运算，在事件循环中直接执行会阻塞其他所有请求（包括健康检查）。
+    计算任务提交到线程池（process 模式下较大的窗口提交到进程池）执行，事件循环只等待结果：
+    排队和执行中的任务数有上限，超出时立即拒绝；超时或调用方被取消时，尚未开始的任务从队列中撤销，
+    已开始的任务无法中断，结果被丢弃，但在完成前仍计入上限。分别统计排队等待时间和计算时间。
+    """
+
+    def __init__(self,
+                 kind: str = INDICATOR_EXECUTOR,
+                 workers: int = INDICATOR_WORKERS,
+                 max_pending: int = INDICATOR_MAX_PENDING,
+                 timeout: Optional[float] = INDICATOR_TIMEOUT,
+                 process_min_rows: int = INDICATOR_PROCESS_MIN_ROWS):
+        """
+        Args:
+            kind: thread / process / inline
+            workers: 计算线程（及进程）数
+            max_pending: 最多同时排队和执行的任务数
+            timeout: 单次计算的超时时间(秒)，为 None 时不限
+            process_min_rows: process 模式下使用进程池的最少K线根数
+
+        Raises:
+            ValueError: kind 不支持
+        """
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Unsupported indicator executor: {kind}, expected one of {', '.join(EXECUTOR_KINDS)}")
+        self.kind = kind
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.process_min_rows = process_min_rows
+        self.pending = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.cancelled = 0
+        self.failed = 0
+        self.queue_wait = Timings()
+        self.compute_time = Timings()
+        self._lock = threading.Lock()
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._processes: Optional[ProcessPoolExecutor] = None
+
+    def use_process(self, rows: int) -> bool:
+        """该K线根数的窗口是否在进程池中计算"""
+        return self.kind == "process" and rows >= self.process_min_rows
+
+    def _pool(self, process: bool) -> Executor:
+        # 首次使用时创建（close 之后再次使用时重新创建）
+        if process:
+            if self._processes is None:
+                # 不 fork 带有事件循环和推送线程的进程
+                self._processes = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._processes
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(self.workers, thread_name_prefix="indicators")
+        return self._threads
+
+    def _release(self, future: Future) -> None:
+        # 在工作线程中调用：任务完成（或被撤销）后才释放名额
+        with self._lock:
+            self.pending -= 1
+
+    async def run(self, func: Callable, *args, process: bool = False) -> Any:
+        """
+        执行计算并等待结果
+
+        Args:
+            func: 计算函数；process=True 时必须可被 pickle（模块级函数或静态方法），参数和结果同样
+            *args: 计算函数的参数
+            process: 是否在进程池中执行（仅 process 模式有效）
+
+        Returns:
+            计算结果
+
+        Raises:
+            IndicatorQueueFull: 排队和执行中的任务已达上限
+            IndicatorTimeout: 未在超时时间内完成
+        """
+        if self.kind == "inline":
+            self.submitted += 1
+            result, started, finished = _timed(func, *args)
+            self.queue_wait.add(0.0)
+            self.compute_time.add(finished - started)
+            self.completed += 1
+            return result
+
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise IndicatorQueueFull(f"Too many pending indicator computations ({self.max_pending})")
+            self.pending += 1
+        self.submitted += 1
+
+        process = process and self.kind == "process"
+        submitted = time.time()
+        try:
+            future = self._pool(process).submit(_timed, func, *args)
+        except BaseException:
+            with self._lock:
+                self.pending -= 1
+            raise
+        future.add_done_callback(self._release)
+
+        try:
+            # 等待被超时或取消打断时 wrap_future 同时撤销尚未开始的任务
+            result, started, finished = await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise IndicatorTimeout(f"Indicator computation timed out after {self.timeout}s")
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        except BrokenProcessPool:
+            # 工作进程异常退出，下次使用时重新创建进程池
+            self.failed += 1
+            self._processes = None
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+
+        self.queue_wait.add(started - submitted)
+        self.compute_time.add(finished - started)
+        self.completed += 1
+        return result
+
+    def close(self) -> None:
+        """关闭线程池和进程池，撤销尚未开始的任务（不等待执行中的任务）"""
+        for pool in (self._threads, self._processes):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        self._threads = None
+        self._processes = None
+
+    def stats(self) -> Dict[str, Any]:
+        """获取执行器统计信息（排队等待时间与计算时间分开统计）"""
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "timeout": self.timeout,
+            "pending": self.pending,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "cancelled": self.cancelled,
+            "failed": self.failed,
+            "queue_wait": self.queue_wait.stats(),
+            "compute": self.compute_time.stats()
+        }
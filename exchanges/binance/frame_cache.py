@@ -0,0 +1,111 @@
+# exchanges/binance/frame_cache.py
+import time
+from typing import List, Dict, Any, Callable, Optional, Tuple
+
+from .cache import LRUCache
+from .engine import IndicatorEngine
+from .incremental import PANDAS_EXACT, IncrementalIndicators
+from .klines import KlineColumns
+from .indicators import TechnicalIndicators
+
+
+class IndicatorFrameCache:
+    """
+    技术指标结果帧缓存（全部默认指标）
+
+    已收盘的K线不会再变化，因此以 (交易对, 周期, 已收盘K线根数, 最后一根已收盘K线的 close_time)
+    为键，缓存已收盘部分的指标结果行和增量计算器状态。
+    命中时只用增量计算器重算正在形成的最后一根K线，不再对整个窗口重新计算。
+    增量计算器按 pandas 后端的指标定义实现，其他后端（以及不在 SUPPORTED_PANDAS 范围内的 pandas 版本）
+    只缓存全部已收盘的窗口。
+    """
+
+    # 滞后跨度的位移：默认指标中 ichimoku 的 kijun_sen_period（与 IncrementalIndicators 取法相同）
+    CHIKOU_SHIFT = IncrementalIndicators.PARAMS["ichimoku"][0]["kijun_sen_period"]
+
+    def __init__(self,
+                 maxsize: int = 64,
+                 ttl: Optional[float] = None,
+                 clock: Optional[Callable[[], int]] = None):
+        """
+        Args:
+            maxsize: 最多缓存的结果帧数量
+            ttl: 过期时间(秒)，为 None 时只按容量淘汰
+            clock: 返回当前毫秒时间戳的函数，用于判断K线是否已收盘
+        """
+        self.frames = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.clock = clock or (lambda: int(time.time() * 1000))
+
+    def closed_count(self, klines: KlineColumns) -> int:
+        """已收盘的K线根数（只有最后一根可能尚未收盘）"""
+        close_time = klines["close_time"]
+        if len(close_time) and int(close_time[-1]) >= self.clock():
+            return len(close_time) - 1
+        return len(close_time)
+
+    def calculate(self, klines: KlineColumns) -> List[Dict[str, Any]]:
+        """
+        计算所有默认技术指标（结果与 TechnicalIndicators.calculate_all 格式一致）
+
+        返回的已收盘K线行与缓存共享，调用方不应修改。命中时只把正在形成的最后一根K线转换为旧格式。
+
+        Args:
+            klines: 列式K线（按时间升序）
+
+        Returns:
+            包含所有技术指标的K线数据
+        """
+        engine_class = TechnicalIndicators.engine_class
+        closed = self.closed_count(klines)
+        # 增量计算器只在 pandas 后端且 pandas 版本受支持时与全量计算逐位一致
+        incremental = engine_class.BACKEND == IndicatorEngine.BACKEND and PANDAS_EXACT
+        if closed == 0 or (closed < len(klines) and not incremental):
+            return klines.engine(engine_class, klines.to_klines()).compute_all().to_records(normalize=True)
+
+        key = (engine_class.BACKEND, klines.symbol, klines.interval, closed, int(klines["close_time"][closed - 1]))
+        frame = self.frames.get(key)
+        if frame is None:
+            records, frame = self._build(klines.engine(engine_class, klines.to_klines()).compute_all(), closed,
+                                         incremental)
+            self.frames.set(key, frame)
+            return records
+
+        records, state = frame
+        if closed == len(klines):
+            return list(records)
+        return self._with_forming(records, state, klines.slice(-1).to_klines()[0])
+
+    @staticmethod
+    def _build(engine: IndicatorEngine, closed: int, incremental: bool) -> Tuple[List[Dict[str, Any]], Tuple]:
+        """未命中时对整个窗口计算一次，并拆出已收盘部分作为缓存帧"""
+        records = engine.to_records(normalize=True)
+        state = IncrementalIndicators.from_engine(engine, closed) if incremental else None
+        if closed == engine.size:
+            return list(records), (records, state)
+
+        closed_records = records[:closed]
+        # 滞后跨度引用 CHIKOU_SHIFT 根之后的收盘价，这一行在缓存中不能保留正在形成的K线的价格
+        index = closed - IndicatorFrameCache.CHIKOU_SHIFT
+        if index >= 0:
+            closed_records[index] = dict(closed_records[index], chikou_span=None)
+        return records, (closed_records, state)
+
+    @staticmethod
+    def _with_forming(records: List[Dict[str, Any]],
+                      state: IncrementalIndicators,
+                      forming: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """在缓存的已收盘结果后追加正在形成的K线"""
+        result = list(records)
+        index = len(records) - IndicatorFrameCache.CHIKOU_SHIFT
+        if index >= 0:
+            result[index] = dict(result[index], chikou_span=float(forming["close"]))
+        result.append(state.copy().update(forming))
+        return result
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self.frames.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        return self.frames.stats()
@@ -1,12 +1,20 @@
 # exchanges/binance/futures.py
+import itertools
+import logging
 import requests
 import time
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from enum import Enum
 import pandas as pd
 import numpy as np
 from urllib.parse import urlencode
 
+from .frame_cache import IndicatorFrameCache
+from .klines import KlineColumns, format_rows, parse_klines
+from .ratelimit import Priority, WeightBudget, current_priority, kline_weight, request_weight
+
+logger = logging.getLogger(__name__)
+
 
 class FuturesSymbol(Enum):
     """合约交易对枚举"""
@@ -23,11 +31,24 @@ class FuturesSymbol(Enum):
     # 可根据需要添加更多交易对
 
 
-class BinanceFuturesClient:
-    """币安合约交易客户端（直接HTTP请求）"""
+class _FuturesClientBase:
+    """币安合约客户端的公共部分（请求参数、K线格式化、指标计算），不涉及网络I/O"""
 
     BASE_URL = "https://fapi.binance.com"
 
+    # 单次K线请求的最大数量
+    MAX_LIMIT = 1500
+
+    # 全部默认指标的结果帧缓存（进程内共享）
+    frame_cache = IndicatorFrameCache(maxsize=64)
+
+    # 请求权重预算（进程内所有客户端共享，同一 IP 的限流按分钟权重计算）
+    weight_budget = WeightBudget(capacity=2400)
+
+    # 被限流(429/418)后的最大重试次数，以及愿意等待的最长 Retry-After(秒)，超过则直接报错
+    MAX_RETRIES = 3
+    MAX_RETRY_WAIT = 60
+
     # K线间隔映射
     INTERVAL_MAP = {
         "1m": "1m",
@@ -47,6 +68,175 @@ class BinanceFuturesClient:
         "1M": "1M"
     }
 
+    # 固定长度K线间隔的毫秒数（月线长度不固定，不在其中）
+    INTERVAL_MS = {
+        "1m": 60_000,
+        "3m": 180_000,
+        "5m": 300_000,
+        "15m": 900_000,
+        "30m": 1_800_000,
+        "1h": 3_600_000,
+        "2h": 7_200_000,
+        "4h": 14_400_000,
+        "6h": 21_600_000,
+        "8h": 28_800_000,
+        "12h": 43_200_000,
+        "1d": 86_400_000,
+        "3d": 259_200_000,
+        "1w": 604_800_000
+    }
+
+    @staticmethod
+    def kline_weight(limit: int) -> int:
+        """/fapi/v1/klines 单次请求的权重（按 limit 分档）"""
+        return kline_weight(limit)
+
+    def _kline_params(
+            self,
+            symbol: FuturesSymbol,
+            interval: str,
+            limit: int,
+            start_time: Optional[int],
+            end_time: Optional[int]
+    ) -> Dict[str, Any]:
+        """
+        构建K线请求参数
+
+        Returns:
+            /fapi/v1/klines 的查询参数
+        """
+        # 验证interval参数
+        if interval not in self.INTERVAL_MAP:
+            raise ValueError(f"Unsupported interval: {interval}")
+
+        # 构建请求参数
+        params = {
+            "symbol": symbol.value,
+            "interval": self.INTERVAL_MAP[interval],
+            "limit": limit
+        }
+
+        if start_time:
+            params["startTime"] = start_time
+        if end_time:
+            params["endTime"] = end_time
+        return params
+
+    def _format_klines(self, klines_data: List[List], symbol: FuturesSymbol, interval: str) -> List[Dict[str, Any]]:
+        """
+        格式化K线数据
+
+        Args:
+            klines_data: 原始K线数据
+
+        Returns:
+            格式化后的K线数据
+        """
+        return format_rows(klines_data, symbol.value, interval)
+
+    @staticmethod
+    def _parse_klines(body: bytes, symbol: FuturesSymbol, interval: str) -> KlineColumns:
+        """把K线接口的响应内容直接解析为列式K线"""
+        return parse_klines(body, symbol.value, interval)
+
+    def _should_retry(self, retry_after: Optional[float], attempt: int) -> bool:
+        """
+        被限流的请求是否排队重试
+
+        重试次数用完时不再重试；Retry-After 超过 MAX_RETRY_WAIT 时只有 LIVE 请求直接失败，
+        其他优先级的请求在共享预算中排队等到封禁结束。
+        """
+        if retry_after is None or attempt >= self.MAX_RETRIES:
+            return False
+        if retry_after > self.MAX_RETRY_WAIT and current_priority.get() == Priority.LIVE:
+            return False
+        logger.warning(f"Binance rate limit hit, retrying in {retry_after:.0f}s (attempt {attempt + 1})")
+        return True
+
+    @staticmethod
+    def _indicator_lookback(indicators: Optional[List[Any]], warmup: bool) -> int:
+        """需要多取的预热K线数，不预热时为0"""
+        if not warmup:
+            return 0
+        from .indicators import TechnicalIndicators
+
+        selection = TechnicalIndicators.DEFAULT_INDICATORS if indicators is None else indicators
+        return TechnicalIndicators.engine_class.lookback(selection)
+
+    @staticmethod
+    def _engine(klines: KlineColumns):
+        """在价格列上构造当前后端的指标引擎，生成结果行所需的旧格式K线只在这里转换"""
+        from .indicators import TechnicalIndicators
+
+        return klines.engine(TechnicalIndicators.engine_class, klines.to_klines())
+
+    def _calculate_indicators(self, klines: KlineColumns, indicators: Optional[List[Any]]) -> List[Dict[str, Any]]:
+        """计算技术指标：全部默认指标走结果帧缓存，只重算未收盘的K线；指定指标时按指标缓存结果"""
+        from .indicators import TechnicalIndicators
+
+        if indicators is None:
+            return self.frame_cache.calculate(klines)
+        return self._engine(klines).compute(indicators, TechnicalIndicators.memo).to_records(normalize=True)
+
+    def indicator_rows(self,
+                       klines: KlineColumns,
+                       indicators: Optional[List[Any]],
+                       start: int = 0) -> List[Dict[str, Any]]:
+        """计算技术指标并返回结果行（去掉前 start 根预热K线）"""
+        return self._calculate_indicators(klines, indicators)[start:]
+
+    def iter_indicator_rows(self,
+                            klines: KlineColumns,
+                            indicators: Optional[List[Any]],
+                            start: int = 0) -> Iterator[Dict[str, Any]]:
+        """
+        逐行生成技术指标结果（流式响应使用）：全部默认指标的结果行已由结果帧缓存持有，直接逐行返回；
+        指定指标时由列式引擎按块生成，不构造完整的结果列表
+        """
+        from .indicators import TechnicalIndicators
+
+        if indicators is None:
+            return itertools.islice(self.frame_cache.calculate(klines), start, None)
+        engine = self._engine(klines).compute(indicators, TechnicalIndicators.memo)
+        return engine.iter_records(normalize=True, start=start)
+
+    @staticmethod
+    def _uncached_indicator_rows(klines: KlineColumns,
+                                 indicators: Optional[List[Any]],
+                                 start: int = 0) -> List[Dict[str, Any]]:
+        """不经过进程内的结果缓存计算技术指标结果行（在进程池中执行时使用）"""
+        from .indicators import TechnicalIndicators
+
+        selection = TechnicalIndicators.DEFAULT_INDICATORS if indicators is None else indicators
+        return _FuturesClientBase._engine(klines).compute(selection).to_records(normalize=True)[start:]
+
+    @staticmethod
+    def indicator_columns(klines: KlineColumns,
+                          indicators: Optional[List[Any]],
+                          start: int = 0) -> KlineColumns:
+        """计算技术指标并返回列式结果（K线数值列 + 指标列，去掉预热部分），不生成结果行"""
+        from .indicators import TechnicalIndicators
+
+        selection = TechnicalIndicators.DEFAULT_INDICATORS if indicators is None else indicators
+        engine = klines.engine(TechnicalIndicators.engine_class).compute(selection, TechnicalIndicators.memo)
+        columns = {name: column[start:] for name, column in klines.columns.items()}
+        columns.update((name, column[start:]) for name, column in engine.columns.items())
+        return KlineColumns(klines.symbol, klines.interval, columns)
+
+    @staticmethod
+    def _calculate_batch(klines_by_symbol: Dict[str, KlineColumns],
+                         warmup_counts: Dict[str, int],
+                         indicators: Optional[List[Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """在一次向量化计算中得到所有交易对的技术指标，并去掉预热部分"""
+        from .indicators import TechnicalIndicators
+
+        results = TechnicalIndicators.calculate_batch(klines_by_symbol, indicators)
+        return {symbol: records[warmup_counts[symbol]:] for symbol, records in results.items()}
+
+
+class BinanceFuturesClient(_FuturesClientBase):
+    """币安合约交易客户端（直接HTTP请求，同步调用，供脚本使用）"""
+
     def __init__(self, api_key: Optional[str] = None, api_secret: Optional[str] = None):
         self.api_key = ""
         self.api_secret = ""
@@ -78,81 +268,57 @@ class BinanceFuturesClient:
         Returns:
             K线数据列表
         """
-        # 验证interval参数
-        if interval not in self.INTERVAL_MAP:
-            raise ValueError(f"Unsupported interval: {interval}")
+        return self.get_kline_columns(symbol, interval, limit, start_time, end_time).to_klines()
 
-        # 构建请求参数
-        params = {
-            "symbol": symbol.value,
-            "interval": self.INTERVAL_MAP[interval],
-            "limit": limit
-        }
+    def get_kline_columns(
+            self,
+            symbol: FuturesSymbol,
+            interval: str = "1h",
+            limit: int = 500,
+            start_time: Optional[int] = None,
+            end_time: Optional[int] = None
+    ) -> KlineColumns:
+        """
+        获取列式K线（参数与 get_klines 相同），响应内容直接解析为数值列并保留原始K线
 
-        if start_time:
-            params["startTime"] = start_time
-        if end_time:
-            params["endTime"] = end_time
+        Returns:
+            列式K线
+        """
+        params = self._kline_params(symbol, interval, limit, start_time, end_time)
+        weight = request_weight("/fapi/v1/klines", params)
 
-        try:
-            # 发送HTTP GET请求获取K线数据
-            url = f"{self.BASE_URL}/fapi/v1/klines"
-            headers = {
-                "X-MBX-APIKEY": self.api_key
-            }
+        for attempt in range(self.MAX_RETRIES + 1):
+            # 按权重预算等待，被限流时等到 Retry-After 之后重试
+            self.weight_budget.acquire_sync(weight)
+            try:
+                # 发送HTTP GET请求获取K线数据
+                url = f"{self.BASE_URL}/fapi/v1/klines"
+                headers = {
+                    "X-MBX-APIKEY": self.api_key
+                }
 
-            response = requests.get(url, params=params, headers=headers, timeout=30)
+                response = requests.get(url, params=params, headers=headers, timeout=30)
+                retry_after = self.weight_budget.update_from_headers(response.status_code, response.headers)
 
-            if response.status_code == 200:
-                return self._format_klines(response.json(), symbol, interval)
-            else:
-                raise Exception(f"Binance API Error: {response.status_code} - {response.text}")
+                if response.status_code == 200:
+                    return self._parse_klines(response.content, symbol, interval)
+                if not self._should_retry(retry_after, attempt):
+                    raise Exception(f"Binance API Error: {response.status_code} - {response.text}")
 
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"Network Error: {str(e)}")
-        except Exception as e:
-            raise Exception(f"Error fetching klines: {str(e)}")
+            except requests.exceptions.RequestException as e:
+                raise Exception(f"Network Error: {str(e)}")
+            except Exception as e:
+                raise Exception(f"Error fetching klines: {str(e)}")
 
-    def _format_klines(self, klines_data: List[List], symbol: FuturesSymbol, interval: str) -> List[Dict[str, Any]]:
-        """
-        格式化K线数据
-
-        Args:
-            klines_data: 原始K线数据
-
-        Returns:
-            格式化后的K线数据
-        """
-        formatted_klines = []
-        for kline in klines_data:
-            formatted_klines.append({
-                "symbol": symbol.value,
-                "interval": interval,
-                "open_time": str(kline[0]),
-                "open": str(kline[1]),
-                "high": str(kline[2]),
-                "low": str(kline[3]),
-                "close": str(kline[4]),
-                "volume": str(kline[5]),
-                "close_time": str(kline[6]),
-                "quote_asset_volume": str(kline[7]),
-                "number_of_trades": str(kline[8]),
-                "taker_buy_base_asset_volume": str(kline[9]),
-                "taker_buy_quote_asset_volume": str(kline[10]),
-                "ignore": kline[11]
-
-
-            })
-        return formatted_klines
-
-    # 在 exchanges/binance/futures.py 文件中的 BinanceFuturesClient 类中添加新方法
     def get_klines_with_indicators(
             self,
             symbol: FuturesSymbol,
             interval: str = "1h",
             limit: int = 500,
             start_time: Optional[int] = None,
-            end_time: Optional[int] = None
+            end_time: Optional[int] = None,
+            indicators: Optional[List[Any]] = None,
+            warmup: bool = True
     ) -> List[Dict[str, Any]]:
         """
         获取合约K线数据并计算所有技术指标
@@ -163,15 +329,79 @@ class BinanceFuturesClient:
             limit: 返回的K线数量，最大1500，默认500
             start_time: 开始时间戳 (毫秒)
             end_time: 结束时间戳 (毫秒)
+            indicators: 需要计算的指标列表（可带参数），为 None 时计算全部默认指标
+            warmup: 是否按指标的预热K线数多取历史K线，计算后去掉，使返回的每一行指标都有值
 
         Returns:
             包含所有技术指标的K线数据列表
         """
-        # 获取原始K线数据
-        klines = self.get_klines(symbol, interval, limit, start_time, end_time)
+        # 获取原始K线数据（包含预热部分）
+        lookback = self._indicator_lookback(indicators, warmup)
+        klines, warmup_count = self._get_klines_with_history(symbol, interval, limit, start_time, end_time, lookback)
 
-        # 计算所有技术指标
-        from .indicators import TechnicalIndicators
-        klines_with_indicators = TechnicalIndicators.calculate_all(klines)
+        return self._calculate_indicators(klines, indicators)[warmup_count:]
+
+    def _get_klines_with_history(
+            self,
+            symbol: FuturesSymbol,
+            interval: str,
+            limit: int,
+            start_time: Optional[int],
+            end_time: Optional[int],
+            lookback: int
+    ) -> Tuple[KlineColumns, int]:
+        """
+        获取K线窗口及其之前的 lookback 根历史K线（列式）
+
+        Returns:
+            (历史K线 + 窗口K线, 历史K线数量)
+        """
+        if lookback <= 0:
+            return self.get_kline_columns(symbol, interval, limit, start_time, end_time), 0
+
+        # 不指定开始时间且总数不超过单次上限时一次取回
+        if start_time is None and limit + lookback <= self.MAX_LIMIT:
+            klines = self.get_kline_columns(symbol, interval, limit + lookback, None, end_time)
+            return klines, max(len(klines) - limit, 0)
+
+        window = self.get_kline_columns(symbol, interval, limit, start_time, end_time)
+        if len(window) == 0:
+            return window, 0
+        history = self.get_kline_columns(symbol, interval, min(lookback, self.MAX_LIMIT), None,
+                                         int(window["open_time"][0]) - 1)
+        return KlineColumns.concat([history, window]), len(history)
+
+    def get_klines_with_indicators_batch(
+            self,
+            symbols: List[FuturesSymbol],
+            interval: str = "1h",
+            limit: int = 500,
+            start_time: Optional[int] = None,
+            end_time: Optional[int] = None,
+            indicators: Optional[List[Any]] = None,
+            warmup: bool = True
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        批量获取多个交易对的K线数据，并在一次向量化计算中得到所有交易对的技术指标
+
+        Args:
+            symbols: 交易对枚举值列表
+            interval: K线间隔
+            limit: 每个交易对返回的K线数量，最大1500，默认500
+            start_time: 开始时间戳 (毫秒)
+            end_time: 结束时间戳 (毫秒)
+            indicators: 需要计算的指标列表（可带参数），为 None 时计算全部默认指标
+            warmup: 是否按指标的预热K线数多取历史K线，计算后去掉
+
+        Returns:
+            交易对 -> 包含技术指标的K线数据列表
+        """
+        lookback = self._indicator_lookback(indicators, warmup)
+
+        klines_by_symbol = {}
+        warmup_counts = {}
+        for symbol in symbols:
+            klines_by_symbol[symbol.value], warmup_counts[symbol.value] = self._get_klines_with_history(
+                symbol, interval, limit, start_time, end_time, lookback)
 
-        return klines_with_indicators
+        return self._calculate_batch(klines_by_symbol, warmup_counts, indicators)
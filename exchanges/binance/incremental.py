@@ -0,0 +1,910 @@
+# exchanges/binance/incremental.py
+import math
+from collections import deque
+from itertools import islice
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from . import kernels
+from .engine import _divide as _divide_array, _ewm, _shift
+from .indicators import TechnicalIndicators
+
+NAN = float("nan")
+
+# RollingSum / RollingVariance 按 pandas rolling 的内部算法维护状态，只在测试过的版本范围内
+# （与 requirements.txt 一致）与 calculate_all 逐位相同；范围之外结果帧缓存不使用增量计算
+SUPPORTED_PANDAS = ((2, 2), (3, 1))
+PANDAS_VERSION = tuple(int(part) for part in pd.__version__.split(".")[:2])
+PANDAS_EXACT = SUPPORTED_PANDAS[0] <= PANDAS_VERSION < SUPPORTED_PANDAS[1]
+
+# pandas 3 的 rolling var 去掉了连续相同值计数，改为移出旧值后平方和相对原值小于该阈值时从头重算窗口
+PANDAS_VARIANCE_RESTART = PANDAS_VERSION >= (3, 0)
+VARIANCE_RESTART_RATIO = 1000 * np.finfo(np.float64).eps
+
+
+def _divide(a: float, b: float) -> float:
+    """按 IEEE 语义做除法（与 numpy/pandas 一致，除零不抛异常）"""
+    try:
+        return a / b
+    except ZeroDivisionError:
+        if a != a or a == 0:
+            return NAN
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+
+
+def _tail(values: deque, count: int) -> List[float]:
+    """deque 最后 count 个值（按原顺序），从右端读取，不遍历更早的历史"""
+    tail = list(islice(reversed(values), count))
+    tail.reverse()
+    return tail
+
+
+def _ewm_alpha(span: int) -> float:
+    """与 pandas ewm(span=...) 相同的 alpha 计算方式"""
+    com = (span - 1) / 2.0
+    return 1.0 / (1.0 + com)
+
+
+def _ewm_step(weighted: float, value: float, alpha: float) -> float:
+    """与 pandas ewm(adjust=False) 相同的单步递推"""
+    if weighted != weighted:
+        return value
+    if weighted != value:
+        old_wt = 1.0 - alpha
+        weighted = (old_wt * weighted + alpha * value) / (old_wt + alpha)
+    return weighted
+
+
+def _default_params() -> Dict[str, List[Dict[str, Any]]]:
+    """calculate_all 默认指标集合的完整参数（未指定的取 SUPPORTED_INDICATORS 中的默认值）"""
+    params: Dict[str, List[Dict[str, Any]]] = {}
+    for name, overrides in TechnicalIndicators.DEFAULT_INDICATORS:
+        params.setdefault(name, []).append(TechnicalIndicators.planner.resolve(name, overrides).kwargs)
+    return params
+
+
+class RollingSum:
+    """
+    滚动求和/均值的在线状态
+
+    pandas 的 rolling sum/mean 从序列开头起逐个加入新值、移出离开窗口的旧值，加入和移出分别做
+    Kahan 补偿求和，并用负数个数和末尾连续相同值的个数消除浮点残差，某个位置的结果取决于之前的
+    整段序列。这里按相同的顺序和公式维护同样的状态，结果与 kernels.rolling_window 逐位一致。
+    NaN 不计入窗口，有效值不足 window 个时结果为 NaN。
+    """
+
+    __slots__ = ("window", "nobs", "total", "add_compensation", "remove_compensation",
+                 "negative", "same", "previous")
+
+    def __init__(self, window: int):
+        self.window = window
+        self.restore((0, 0.0, 0.0, 0.0, 0, 0, NAN))
+
+    def save(self) -> Tuple:
+        return (self.nobs, self.total, self.add_compensation, self.remove_compensation,
+                self.negative, self.same, self.previous)
+
+    def restore(self, state: Tuple) -> None:
+        (self.nobs, self.total, self.add_compensation, self.remove_compensation,
+         self.negative, self.same, self.previous) = state
+
+    def push(self, values: deque, value: float) -> None:
+        """
+        窗口向后移动一根
+
+        Args:
+            values: 该序列之前的值（至少保留最后 window 个）
+            value: 新值
+        """
+        if len(values) >= self.window:
+            self._remove(values[-self.window])
+        self._add(value)
+
+    def extend(self, values: List[float]) -> None:
+        """从序列开头依次推入全部值（用于初始化，values 必须是完整序列；与逐个 push 等价，展开以减少调用开销）"""
+        window = self.window
+        nobs, total, add_compensation, remove_compensation, negative, same, previous = self.save()
+        copysign = math.copysign
+        for i, value in enumerate(values):
+            if i >= window:
+                leaving = values[i - window]
+                if leaving == leaving:
+                    nobs -= 1
+                    y = -leaving - remove_compensation
+                    t = total + y
+                    remove_compensation = t - total - y
+                    total = t
+                    if copysign(1.0, leaving) < 0:
+                        negative -= 1
+            if value == value:
+                nobs += 1
+                y = value - add_compensation
+                t = total + y
+                add_compensation = t - total - y
+                total = t
+                if copysign(1.0, value) < 0:
+                    negative += 1
+                same = same + 1 if value == previous else 1
+                previous = value
+        self.restore((nobs, total, add_compensation, remove_compensation, negative, same, previous))
+
+    def copy(self) -> "RollingSum":
+        clone = RollingSum.__new__(RollingSum)
+        clone.window = self.window
+        clone.restore(self.save())
+        return clone
+
+    def _add(self, value: float) -> None:
+        if value != value:
+            return
+        self.nobs += 1
+        y = value - self.add_compensation
+        t = self.total + y
+        self.add_compensation = t - self.total - y
+        self.total = t
+        if math.copysign(1.0, value) < 0:
+            self.negative += 1
+        self.same = self.same + 1 if value == self.previous else 1
+        self.previous = value
+
+    def _remove(self, value: float) -> None:
+        if value != value:
+            return
+        self.nobs -= 1
+        y = -value - self.remove_compensation
+        t = self.total + y
+        self.remove_compensation = t - self.total - y
+        self.total = t
+        if math.copysign(1.0, value) < 0:
+            self.negative -= 1
+
+    def sum(self) -> float:
+        """窗口内的和"""
+        if self.nobs < self.window:
+            return NAN
+        if self.same >= self.nobs:
+            return self.previous * self.nobs
+        return self.total
+
+    def mean(self) -> float:
+        """窗口内的均值"""
+        nobs = self.nobs
+        if nobs < self.window or nobs == 0:
+            return NAN
+        if self.same >= nobs:
+            return self.previous
+        result = self.total / nobs
+        if self.negative == 0 and result < 0:
+            return 0.0
+        if self.negative == nobs and result > 0:
+            return 0.0
+        return result
+
+
+class RollingVariance:
+    """
+    滚动样本标准差的在线状态
+
+    与 pandas rolling std 相同：Welford 算法逐个加入、移出，加入和移出分别做 Kahan 补偿；
+    pandas 3 在移出旧值后平方和骤降（相对原值小于 VARIANCE_RESTART_RATIO）时用窗口内剩余的值
+    从头重算，更早的版本则在窗口内全部为相同值时直接取 0。结果与 kernels.rolling_window 逐位一致。
+    """
+
+    __slots__ = ("window", "nobs", "mean", "ssqdm", "add_compensation", "remove_compensation",
+                 "same", "previous")
+
+    def __init__(self, window: int):
+        self.window = window
+        self.restore((0, 0.0, 0.0, 0.0, 0.0, 0, NAN))
+
+    def save(self) -> Tuple:
+        return (self.nobs, self.mean, self.ssqdm, self.add_compensation, self.remove_compensation,
+                self.same, self.previous)
+
+    def restore(self, state: Tuple) -> None:
+        (self.nobs, self.mean, self.ssqdm, self.add_compensation, self.remove_compensation,
+         self.same, self.previous) = state
+
+    def copy(self) -> "RollingVariance":
+        clone = RollingVariance.__new__(RollingVariance)
+        clone.window = self.window
+        clone.restore(self.save())
+        return clone
+
+    def push(self, values: deque, value: float) -> None:
+        """
+        窗口向后移动一根
+
+        Args:
+            values: 该序列之前的值（至少保留最后 window 个）
+            value: 新值
+        """
+        window = self.window
+        if len(values) >= window:
+            self._remove(values[-window], lambda: _tail(values, window - 1))
+        self._add(value)
+
+    def extend(self, values: List[float]) -> None:
+        """从序列开头依次推入全部值（用于初始化，values 必须是完整序列）"""
+        window = self.window
+        for i, value in enumerate(values):
+            if i >= window:
+                self._remove(values[i - window], lambda: values[i - window + 1:i])
+            self._add(value)
+
+    def _add(self, value: float) -> None:
+        if value != value:
+            return
+        self.nobs += 1
+        self.same = self.same + 1 if value == self.previous else 1
+        self.previous = value
+        previous_mean = self.mean - self.add_compensation
+        y = value - self.add_compensation
+        t = y - self.mean
+        self.add_compensation = t + self.mean - y
+        self.mean = self.mean + t / self.nobs
+        self.ssqdm = self.ssqdm + (value - previous_mean) * (value - self.mean)
+
+    def _remove(self, value: float, remaining) -> None:
+        if value != value:
+            return
+        ssqdm = self.ssqdm
+        self.nobs -= 1
+        if not self.nobs:
+            self.mean = 0.0
+            self.ssqdm = 0.0
+            return
+        previous_mean = self.mean - self.remove_compensation
+        y = value - self.remove_compensation
+        t = y - self.mean
+        self.remove_compensation = t + self.mean - y
+        self.mean = self.mean - t / self.nobs
+        self.ssqdm = self.ssqdm - (value - previous_mean) * (value - self.mean)
+        if PANDAS_VARIANCE_RESTART and self.ssqdm < ssqdm * VARIANCE_RESTART_RATIO:
+            # 相减抵消了几乎全部有效数字，用窗口内剩余的值从头计算
+            self.restore((0, 0.0, 0.0, 0.0, 0.0, 0, NAN))
+            for item in remaining():
+                self._add(item)
+
+    def std(self) -> float:
+        """窗口内的样本标准差"""
+        nobs = self.nobs
+        if nobs < self.window or nobs < 2:
+            return NAN
+        if not PANDAS_VARIANCE_RESTART and self.same >= nobs:
+            return 0.0
+        variance = self.ssqdm / (nobs - 1)
+        return math.sqrt(variance) if variance >= 0 else 0.0
+
+
+class RollingExtreme:
+    """
+    滚动最大值/最小值的在线状态（单调队列）
+
+    队列中只保留窗口内仍可能成为最值的 (位置, 值)：新值从队尾挤掉不会再成为最值的旧值，
+    离开窗口的值从队头移出，每根K线均摊 O(1)。与 pandas rolling max/min 相同，
+    窗口内有 NaN 或值不足 window 个时结果为 NaN。
+    """
+
+    __slots__ = ("window", "maximum", "count", "last_nan", "candidates", "_undo")
+
+    def __init__(self, window: int, maximum: bool):
+        self.window = window
+        self.maximum = maximum
+        self.count = 0
+        self.last_nan = -1
+        self.candidates: deque = deque()
+        # 撤销最后一次 push 所需的变化：(移出的队头, 从队尾挤掉的值, 是否加入了新值)
+        self._undo: Optional[Tuple] = None
+
+    def save(self) -> Tuple:
+        return self.count, self.last_nan
+
+    def restore(self, state: Tuple) -> None:
+        """恢复到 save 时的状态（队列只记录了最后一次 push 的变化，只能撤销这一次）"""
+        if state[0] != self.count:
+            front, evicted, appended = self._undo
+            if appended:
+                self.candidates.pop()
+            self.candidates.extend(reversed(evicted))
+            if front is not None:
+                self.candidates.appendleft(front)
+            self._undo = None
+        self.count, self.last_nan = state
+
+    def copy(self) -> "RollingExtreme":
+        clone = RollingExtreme.__new__(RollingExtreme)
+        clone.window = self.window
+        clone.maximum = self.maximum
+        clone.count = self.count
+        clone.last_nan = self.last_nan
+        clone.candidates = self.candidates.copy()
+        clone._undo = self._undo
+        return clone
+
+    def push(self, values: deque, value: float) -> None:
+        """
+        窗口向后移动一根
+
+        Args:
+            values: 该序列之前的值（不使用，与其他滚动状态的接口一致）
+            value: 新值
+        """
+        candidates = self.candidates
+        front = None
+        if candidates and candidates[0][0] <= self.count - self.window:
+            front = candidates.popleft()
+        evicted = []
+        appended = value == value
+        if appended:
+            if self.maximum:
+                while candidates and candidates[-1][1] <= value:
+                    evicted.append(candidates.pop())
+            else:
+                while candidates and candidates[-1][1] >= value:
+                    evicted.append(candidates.pop())
+            candidates.append((self.count, value))
+        else:
+            self.last_nan = self.count
+        self.count += 1
+        self._undo = (front, evicted, appended)
+
+    def extend(self, values: List[float]) -> None:
+        """从序列开头依次推入全部值（用于初始化）"""
+        for value in values:
+            self.push(None, value)
+        self._undo = None
+
+    def value(self) -> float:
+        """窗口内的最大值（或最小值）"""
+        if self.count < self.window or self.last_nan >= self.count - self.window:
+            return NAN
+        return self.candidates[0][1]
+
+
+class IncrementalIndicators:
+    """
+    增量技术指标计算器
+
+    使用历史K线初始化后，每根新K线只做 O(1) 的状态更新：
+    EMA/MACD、OBV、ADL、VWAP、SAR 等递推指标直接携带状态，
+    滚动均值、求和和标准差使用与 pandas 相同的在线算法（RollingSum / RollingVariance），
+    最大值、最小值使用单调队列（RollingExtreme）。平均绝对偏差依赖窗口均值，
+    没有精确的递推形式，只对缓冲区末尾的 CCI 窗口计算。
+    指标集合和参数与 TechnicalIndicators.calculate_all 的默认指标一致，
+    在 SUPPORTED_PANDAS 范围内结果逐位相同（见 PANDAS_EXACT）。
+    """
+
+    # 需要保留历史的序列
+    SERIES = ("high", "low", "close", "volume", "tp", "gain", "loss", "tr", "percent_k",
+              "plus_dm", "minus_dm", "dx", "returns", "money_flow_volume",
+              "positive_flow", "negative_flow", "cloud_a", "cloud_b")
+
+    # 默认指标的参数
+    PARAMS = _default_params()
+
+    def __init__(self):
+        params = self.PARAMS
+        self.macd_params = params["macd"][0]
+        self.rsi_period = params["rsi"][0]["period"]
+        self.bollinger_params = params["bollinger_bands"][0]
+        self.ma_periods = [item["period"] for item in params["ma"]]
+        self.ema_periods = [item["period"] for item in params["ema"]]
+        self.stochastic_params = params["stochastic"][0]
+        self.atr_period = params["atr"][0]["period"]
+        self.cci_period = params["cci"][0]["period"]
+        self.williams_period = params["williams_r"][0]["period"]
+        self.momentum_period = params["momentum"][0]["period"]
+        self.ichimoku_params = params["ichimoku"][0]
+        self.sar_params = params["parabolic_sar"][0]
+        self.mfi_period = params["mfi"][0]["period"]
+        self.cmf_period = params["cmf"][0]["period"]
+        self.std_period = params["standard_deviation"][0]["period"]
+        self.adx_period = params["adx"][0]["period"]
+        self.volatility_period = params["volatility"][0]["period"]
+
+        # 滚动累加状态，按 (序列, 窗口) 共享
+        self._sums: Dict[Tuple[str, int], RollingSum] = {}
+        self._variances: Dict[Tuple[str, int], RollingVariance] = {}
+        self._windows: Dict[str, List[Any]] = {name: [] for name in self.SERIES}
+        for name in ("gain", "loss"):
+            self._rolling_sum(name, self.rsi_period)
+        for period in [self.bollinger_params["period"]] + self.ma_periods:
+            self._rolling_sum("close", period)
+        self._rolling_sum("percent_k", self.stochastic_params["d_period"])
+        self._rolling_sum("tr", self.atr_period)
+        self._rolling_sum("tp", self.cci_period)
+        for name in ("positive_flow", "negative_flow"):
+            self._rolling_sum(name, self.mfi_period)
+        for name in ("money_flow_volume", "volume"):
+            self._rolling_sum(name, self.cmf_period)
+        for name in ("tr", "plus_dm", "minus_dm", "dx"):
+            self._rolling_sum(name, self.adx_period)
+        self._rolling_variance("close", self.bollinger_params["period"])
+        self._rolling_variance("close", self.std_period)
+        self._rolling_variance("returns", self.volatility_period)
+        # 滚动最值状态：最高价序列上的最大值、最低价序列上的最小值，按窗口共享
+        self._maxima: Dict[int, RollingExtreme] = {}
+        self._minima: Dict[int, RollingExtreme] = {}
+        for window in (self.stochastic_params["k_period"], self.williams_period,
+                       self.ichimoku_params["tenkan_sen_period"], self.ichimoku_params["kijun_sen_period"],
+                       self.ichimoku_params["senkou_span_b_period"]):
+            self._rolling_extreme(window)
+        self._accumulators = (list(self._sums.values()) + list(self._variances.values())
+                              + list(self._maxima.values()) + list(self._minima.values()))
+
+        # 保留的历史长度：覆盖 CCI 和滚动累加的窗口、先行跨度的位移和动量的回看（最值只保留在单调队列中）
+        windows = [self.cci_period]
+        windows += [accumulator.window for accumulator in list(self._sums.values()) + list(self._variances.values())]
+        self.history = max(windows + [self.ichimoku_params["kijun_sen_period"] + 1,
+                                      self.momentum_period + 1, 3])
+        self._series = {name: deque(maxlen=self.history) for name in self.SERIES}
+
+        # 递推指标状态
+        self.count = 0
+        self._alphas = {span: _ewm_alpha(span) for span in self._ema_spans()}
+        self._ema = {span: NAN for span in self._alphas}
+        self._signal_alpha = _ewm_alpha(self.macd_params["signal_period"])
+        self._macd_signal = NAN
+        self._obv = 0.0
+        self._adl = 0.0
+        self._cumulative_tp_volume = 0.0
+        self._cumulative_volume = 0.0
+        self._sar = NAN
+        self._sar_bull = True
+        self._sar_af = self.sar_params["acceleration"]
+        self._sar_ep = NAN
+
+        self._latest: Optional[Dict[str, Any]] = None
+        # 撤销最后一根K线所需的状态：递推状态、各序列被挤出的最早值、各滚动累加状态
+        self._undo: Optional[Tuple] = None
+
+    def _ema_spans(self) -> List[int]:
+        return [self.macd_params["fast_period"], self.macd_params["slow_period"]] + self.ema_periods
+
+    def _rolling_sum(self, name: str, window: int) -> RollingSum:
+        key = (name, window)
+        if key not in self._sums:
+            self._sums[key] = RollingSum(window)
+            self._windows[name].append(self._sums[key])
+        return self._sums[key]
+
+    def _rolling_variance(self, name: str, window: int) -> RollingVariance:
+        key = (name, window)
+        if key not in self._variances:
+            self._variances[key] = RollingVariance(window)
+            self._windows[name].append(self._variances[key])
+        return self._variances[key]
+
+    def _rolling_extreme(self, window: int) -> None:
+        if window not in self._maxima:
+            self._maxima[window] = RollingExtreme(window, maximum=True)
+            self._minima[window] = RollingExtreme(window, maximum=False)
+            self._windows["high"].append(self._maxima[window])
+            self._windows["low"].append(self._minima[window])
+
+    @classmethod
+    def from_klines(cls, klines: List[Dict[str, Any]]) -> "IncrementalIndicators":
+        """
+        使用历史K线初始化
+
+        Args:
+            klines: 历史K线数据列表（与 get_klines 格式一致）
+
+        Returns:
+            已初始化的增量计算器
+        """
+        indicators = cls()
+        for kline in klines:
+            indicators.update(kline)
+        return indicators
+
+    @classmethod
+    def from_engine(cls, engine, end: Optional[int] = None) -> "IncrementalIndicators":
+        """
+        使用 IndicatorEngine 的价格数组初始化，避免逐根回放全部历史
+
+        递推状态和各派生序列在引擎的数组上向量化计算（与引擎的指标定义相同），
+        滚动累加状态只需按顺序推入派生序列，之后回放最后一根K线，结果与 from_klines 相同。
+
+        Args:
+            engine: IndicatorEngine（一维）
+            end: 只使用前 end 根K线（默认全部）
+
+        Returns:
+            已初始化的增量计算器
+        """
+        end = engine.size if end is None else end
+        start = end - 1
+        indicators = cls()
+        if start < indicators.history:
+            return cls.from_klines(engine.klines[:end])
+
+        high, low, close, volume = (getattr(engine, name)[:start] for name in engine.PRICE_FIELDS)
+        series = indicators._derived_series(engine, start)
+
+        # 回放起点前一根K线的递推状态
+        last = start - 1
+        indicators.count = start
+        for span in indicators._ema:
+            indicators._ema[span] = float(_ewm(close, span)[last])
+        macd = indicators.macd_params
+        macd_line = _ewm(close, macd["fast_period"]) - _ewm(close, macd["slow_period"])
+        indicators._macd_signal = float(_ewm(macd_line, macd["signal_period"])[last])
+        indicators._obv = float(kernels.obv(close, volume)[last])
+        indicators._adl = float(np.cumsum(series["money_flow_volume"])[last])
+        indicators._cumulative_tp_volume = float(np.cumsum(series["tp"] * volume)[last])
+        indicators._cumulative_volume = float(np.cumsum(volume)[last])
+        _, state = kernels.parabolic_sar(high, low, close, indicators.sar_params["acceleration"],
+                                         indicators.sar_params["maximum"], return_state=True)
+        indicators._sar, indicators._sar_bull, indicators._sar_af, indicators._sar_ep = state
+
+        for name, values in series.items():
+            values = values.tolist()
+            for accumulator in indicators._windows[name]:
+                accumulator.extend(values)
+            indicators._series[name].extend(values[-indicators.history:])
+
+        for kline in engine.klines[start:end]:
+            indicators.update(kline)
+        return indicators
+
+    def _derived_series(self, engine, end: int) -> Dict[str, np.ndarray]:
+        """在引擎的数组上计算前 end 根K线的各派生序列（与 _apply 中的逐根定义逐位一致）"""
+        high, low, close, volume = (getattr(engine, name)[:end] for name in engine.PRICE_FIELDS)
+        tp = engine.intermediate("typical_price")[:end]
+        delta = close - _shift(close, 1)
+        plus_dm, minus_dm = (values[:end] for values in engine.intermediate("directional_movement"))
+        positive_flow, negative_flow = (values[:end] for values in engine.intermediate("money_flow"))
+        tr = engine.intermediate("true_range")[:end]
+
+        k_period = self.stochastic_params["k_period"]
+        low_min = engine.intermediate("rolling_low", k_period)[:end]
+        high_max = engine.intermediate("rolling_high", k_period)[:end]
+
+        atr = kernels.rolling_window("mean", tr, self.adx_period)
+        di_plus = _divide_array(kernels.rolling_window("mean", plus_dm, self.adx_period), atr) * 100
+        di_minus = _divide_array(kernels.rolling_window("mean", minus_dm, self.adx_period), atr) * 100
+
+        def midpoint(window: int) -> np.ndarray:
+            return (engine.intermediate("rolling_high", window)[:end]
+                    + engine.intermediate("rolling_low", window)[:end]) / 2
+
+        return {
+            "high": high,
+            "low": low,
+            "close": close,
+            "volume": volume,
+            "tp": tp,
+            "gain": np.where(delta > 0, delta, 0.0),
+            "loss": -np.where(delta < 0, delta, 0.0),
+            "tr": tr,
+            "percent_k": 100 * _divide_array(close - low_min, high_max - low_min),
+            "plus_dm": plus_dm,
+            "minus_dm": minus_dm,
+            "dx": _divide_array(np.abs(di_plus - di_minus), di_plus + di_minus) * 100,
+            "returns": _divide_array(close, _shift(close, 1)) - 1,
+            "money_flow_volume": engine.intermediate("money_flow_volume")[:end],
+            "positive_flow": positive_flow,
+            "negative_flow": negative_flow,
+            "cloud_a": (midpoint(self.ichimoku_params["tenkan_sen_period"])
+                        + midpoint(self.ichimoku_params["kijun_sen_period"])) / 2,
+            "cloud_b": midpoint(self.ichimoku_params["senkou_span_b_period"]),
+        }
+
+    def update(self, candle: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        追加一根新K线
+
+        Args:
+            candle: K线数据
+
+        Returns:
+            该K线及其技术指标（格式与 calculate_all 的单行一致）
+        """
+        self._undo = (
+            self._scalars(),
+            tuple(values[0] if len(values) == values.maxlen else None for values in self._series.values()),
+            tuple(accumulator.save() for accumulator in self._accumulators),
+            self._latest,
+        )
+        return self._apply(candle)
+
+    def replace_last(self, candle: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        替换最后一根K线（用于尚未收盘、持续变化的K线）
+
+        Args:
+            candle: 最新的K线数据
+
+        Returns:
+            该K线及其技术指标
+        """
+        if self._undo is not None:
+            self._rollback()
+        return self.update(candle)
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """获取最后一根K线及其技术指标"""
+        return self._latest
+
+    def copy(self) -> "IncrementalIndicators":
+        """复制当前状态（不影响原对象）"""
+        clone = IncrementalIndicators.__new__(IncrementalIndicators)
+        clone.__dict__.update(self.__dict__)
+        clone._series = {name: values.copy() for name, values in self._series.items()}
+        clone._ema = dict(self._ema)
+        clones = {id(accumulator): accumulator.copy() for accumulator in self._accumulators}
+        clone._sums = {key: clones[id(accumulator)] for key, accumulator in self._sums.items()}
+        clone._variances = {key: clones[id(accumulator)] for key, accumulator in self._variances.items()}
+        clone._maxima = {key: clones[id(accumulator)] for key, accumulator in self._maxima.items()}
+        clone._minima = {key: clones[id(accumulator)] for key, accumulator in self._minima.items()}
+        clone._windows = {name: [clones[id(accumulator)] for accumulator in accumulators]
+                          for name, accumulators in self._windows.items()}
+        clone._accumulators = list(clones.values())
+        return clone
+
+    def _scalars(self) -> Tuple:
+        return (self.count, dict(self._ema), self._macd_signal, self._obv, self._adl,
+                self._cumulative_tp_volume, self._cumulative_volume,
+                self._sar, self._sar_bull, self._sar_af, self._sar_ep)
+
+    def _rollback(self) -> None:
+        """撤销最后一次 update"""
+        scalars, evicted, accumulators, self._latest = self._undo
+        (self.count, ema, self._macd_signal, self._obv, self._adl,
+         self._cumulative_tp_volume, self._cumulative_volume,
+         self._sar, self._sar_bull, self._sar_af, self._sar_ep) = scalars
+        # 保存的状态可能被复制出的对象共用，不能原地修改
+        self._ema = dict(ema)
+        for values, value in zip(self._series.values(), evicted):
+            values.pop()
+            if value is not None:
+                values.appendleft(value)
+        for accumulator, state in zip(self._accumulators, accumulators):
+            accumulator.restore(state)
+        self._undo = None
+
+    def _push(self, name: str, value: float) -> None:
+        """向序列追加新值，并推进该序列上的滚动累加状态"""
+        values = self._series[name]
+        for accumulator in self._windows[name]:
+            accumulator.push(values, value)
+        values.append(value)
+
+    def _apply(self, candle: Dict[str, Any]) -> Dict[str, Any]:
+        series = self._series
+        sums = self._sums
+        high = float(candle["high"])
+        low = float(candle["low"])
+        close = float(candle["close"])
+        volume = float(candle["volume"])
+        tp = (high + low + close) / 3
+
+        has_previous = self.count > 0
+        prev_close = series["close"][-1] if has_previous else NAN
+        prev_high = series["high"][-1] if has_previous else NAN
+        prev_low = series["low"][-1] if has_previous else NAN
+        prev_tp = series["tp"][-1] if has_previous else NAN
+
+        self._push("high", high)
+        self._push("low", low)
+        self._push("close", close)
+        self._push("volume", volume)
+        self._push("tp", tp)
+        self.count += 1
+
+        row: Dict[str, Any] = {}
+
+        # MACD / EMA
+        for span, alpha in self._alphas.items():
+            self._ema[span] = _ewm_step(self._ema[span], close, alpha)
+        macd = self._ema[self.macd_params["fast_period"]] - self._ema[self.macd_params["slow_period"]]
+        self._macd_signal = _ewm_step(self._macd_signal, macd, self._signal_alpha)
+        row["macd"] = macd
+        row["macd_signal"] = self._macd_signal
+        row["macd_histogram"] = macd - self._macd_signal
+
+        # RSI，首根K线的涨跌记为0
+        delta = close - prev_close if has_previous else NAN
+        self._push("gain", delta if delta > 0 else 0.0)
+        self._push("loss", -(delta if delta < 0 else 0.0))
+        rs = _divide(sums["gain", self.rsi_period].mean(), sums["loss", self.rsi_period].mean())
+        row[f"rsi_{self.rsi_period}"] = 100 - _divide(100, 1 + rs)
+
+        # 布林带
+        period = self.bollinger_params["period"]
+        middle_band = sums["close", period].mean()
+        std_dev = self._variances["close", period].std()
+        row["bb_upper"] = middle_band + (std_dev * self.bollinger_params["num_std"])
+        row["bb_middle"] = middle_band
+        row["bb_lower"] = middle_band - (std_dev * self.bollinger_params["num_std"])
+
+        # 移动平均线
+        for period in self.ma_periods:
+            row[f"ma_{period}"] = sums["close", period].mean()
+        for period in self.ema_periods:
+            row[f"ema_{period}"] = self._ema[period]
+
+        # 随机指标
+        k_period = self.stochastic_params["k_period"]
+        low_min = self._minima[k_period].value()
+        high_max = self._maxima[k_period].value()
+        percent_k = 100 * _divide(close - low_min, high_max - low_min)
+        self._push("percent_k", percent_k)
+        row["stoch_k"] = percent_k
+        row["stoch_d"] = sums["percent_k", self.stochastic_params["d_period"]].mean()
+
+        # ATR，首根K线取 high - low
+        if has_previous:
+            tr = max(abs(high - low), abs(high - prev_close), abs(low - prev_close))
+        else:
+            tr = abs(high - low)
+        self._push("tr", tr)
+        row[f"atr_{self.atr_period}"] = sums["tr", self.atr_period].mean()
+
+        # CCI，平均绝对偏差与 kernels.rolling_mad 对单个窗口的计算相同
+        period = self.cci_period
+        if len(series["tp"]) < period:
+            row[f"cci_{period}"] = NAN
+        else:
+            window = np.array(_tail(series["tp"], period), dtype=np.float64)
+            mad = np.mean(np.abs(window - np.mean(window)))
+            row[f"cci_{period}"] = _divide(tp - sums["tp", period].mean(), 0.015 * float(mad))
+
+        # 威廉姆斯%R
+        highest_high = self._maxima[self.williams_period].value()
+        lowest_low = self._minima[self.williams_period].value()
+        row[f"williams_r_{self.williams_period}"] = _divide(highest_high - close, highest_high - lowest_low) * -100
+
+        # 动量
+        closes = series["close"]
+        period = self.momentum_period
+        row[f"momentum_{period}"] = close - closes[-period - 1] if len(closes) > period else NAN
+
+        # 顺势指标
+        params = self.ichimoku_params
+        tenkan_sen = (self._maxima[params["tenkan_sen_period"]].value()
+                      + self._minima[params["tenkan_sen_period"]].value()) / 2
+        kijun_sen = (self._maxima[params["kijun_sen_period"]].value()
+                     + self._minima[params["kijun_sen_period"]].value()) / 2
+        self._push("cloud_a", (tenkan_sen + kijun_sen) / 2)
+        self._push("cloud_b", (self._maxima[params["senkou_span_b_period"]].value()
+                               + self._minima[params["senkou_span_b_period"]].value()) / 2)
+        shift = params["kijun_sen_period"]
+        row["tenkan_sen"] = tenkan_sen
+        row["kijun_sen"] = kijun_sen
+        row["senkou_span_a"] = series["cloud_a"][-shift - 1] if len(series["cloud_a"]) > shift else NAN
+        row["senkou_span_b"] = series["cloud_b"][-shift - 1] if len(series["cloud_b"]) > shift else NAN
+        # 滞后跨度使用未来价格，最新K线总是为空
+        row["chikou_span"] = NAN
+
+        # 抛物线SAR
+        row["sar"] = self._update_sar(high, low, close, prev_high, prev_low)
+
+        # VWAP
+        self._cumulative_tp_volume += tp * volume
+        self._cumulative_volume += volume
+        row["vwap"] = _divide(self._cumulative_tp_volume, self._cumulative_volume)
+
+        # MFI
+        raw_money_flow = tp * volume
+        self._push("positive_flow", raw_money_flow if tp > prev_tp else 0.0)
+        self._push("negative_flow", raw_money_flow if tp < prev_tp else 0.0)
+        money_ratio = _divide(sums["positive_flow", self.mfi_period].sum(),
+                              sums["negative_flow", self.mfi_period].sum())
+        row[f"mfi_{self.mfi_period}"] = 100 - _divide(100, 1 + money_ratio)
+
+        # OBV
+        if close > prev_close:
+            self._obv += volume
+        elif close < prev_close:
+            self._obv -= volume
+        row["obv"] = self._obv
+
+        # ADL / CMF，high == low 时 CLV 取 0
+        clv = _divide((close - low) - (high - close), high - low)
+        if clv != clv:
+            clv = 0.0
+        money_flow_volume = clv * volume
+        self._push("money_flow_volume", money_flow_volume)
+        self._adl += money_flow_volume
+        row["adl"] = self._adl
+        row[f"cmf_{self.cmf_period}"] = _divide(sums["money_flow_volume", self.cmf_period].sum(),
+                                                sums["volume", self.cmf_period].sum())
+
+        # 标准差
+        row[f"std_{self.std_period}"] = self._variances["close", self.std_period].std()
+
+        # ADX
+        period = self.adx_period
+        up_move = high - prev_high
+        down_move = prev_low - low
+        self._push("plus_dm", up_move if up_move > down_move and up_move > 0 else 0.0)
+        self._push("minus_dm", down_move if down_move > up_move and down_move > 0 else 0.0)
+        atr = sums["tr", period].mean()
+        di_plus = _divide(sums["plus_dm", period].mean(), atr) * 100
+        di_minus = _divide(sums["minus_dm", period].mean(), atr) * 100
+        self._push("dx", _divide(abs(di_plus - di_minus), di_plus + di_minus) * 100)
+        row["di_plus"] = di_plus
+        row["di_minus"] = di_minus
+        row[f"adx_{period}"] = sums["dx", period].mean()
+
+        # 波动率
+        self._push("returns", _divide(close, prev_close) - 1 if has_previous else NAN)
+        row[f"volatility_{self.volatility_period}"] = self._variances["returns", self.volatility_period].std()
+
+        self._latest = self._format_row(candle, high, low, close, volume, row)
+        return self._latest
+
+    def _update_sar(self, high: float, low: float, close: float, prev_high: float, prev_low: float) -> float:
+        """按 kernels.parabolic_sar 的规则推进一步"""
+        acceleration = self.sar_params["acceleration"]
+        maximum = self.sar_params["maximum"]
+        if self.count == 1:
+            return NAN
+
+        highs = self._series["high"]
+        lows = self._series["low"]
+        if self.count == 2:
+            # 第二根K线确定初始趋势
+            self._sar_bull = close >= self._series["close"][-2]
+            self._sar_af = acceleration
+            if self._sar_bull:
+                self._sar_ep = prev_high
+                self._sar = prev_low
+            else:
+                self._sar_ep = prev_low
+                self._sar = prev_high
+
+        prev = self._sar
+        ep = self._sar_ep
+        af = self._sar_af
+        psar = prev + af * (ep - prev)
+
+        if self._sar_bull:
+            if prev_low < psar:
+                psar = prev_low
+            if self.count > 2 and lows[-3] < psar:
+                psar = lows[-3]
+            if low < psar:
+                self._sar_bull = False
+                psar = ep
+                af = acceleration
+                ep = low
+            elif high > ep:
+                ep = high
+                af = min(af + acceleration, maximum)
+        else:
+            if prev_high > psar:
+                psar = prev_high
+            if self.count > 2 and highs[-3] > psar:
+                psar = highs[-3]
+            if high > psar:
+                self._sar_bull = True
+                psar = ep
+                af = acceleration
+                ep = high
+            elif low < ep:
+                ep = low
+                af = min(af + acceleration, maximum)
+
+        self._sar = psar
+        self._sar_ep = ep
+        self._sar_af = af
+        return psar
+
+    @staticmethod
+    def _format_row(candle: Dict[str, Any], high: float, low: float, close: float, volume: float,
+                    indicators: Dict[str, float]) -> Dict[str, Any]:
+        """生成与 calculate_all 一致的输出行：价格字段为字符串，NaN 转为 None"""
+        row = dict(candle)
+        row["high"] = str(high)
+        row["low"] = str(low)
+        row["close"] = str(close)
+        row["volume"] = str(volume)
+        for key, value in indicators.items():
+            row[key] = None if value != value else value
+        return row
@@ -1,7 +1,13 @@
 # exchanges/binance/indicators.py
-import pandas as pd
+from typing import List, Dict, Any, Optional, Union
+
 import numpy as np
-from typing import List, Dict, Any, Optional
+
+from .backends import DEFAULT_BACKEND, get_backend
+from .cache import LRUCache
+from .engine import IndicatorEngine
+from .klines import KlineColumns
+from .planner import IndicatorPlanner
 
 class TechnicalIndicators:
     """技术指标计算器"""
@@ -24,7 +30,7 @@ class TechnicalIndicators:
             "parameters": {
                 "period": {"default": 14, "type": "int", "description": "计算周期"}
             },
-            "outputs": ["rsi"]
+            "outputs": ["rsi_{period}"]
         },
         "bollinger_bands": {
             "name": "Bollinger Bands",
@@ -41,7 +47,7 @@ class TechnicalIndicators:
             "parameters": {
                 "period": {"default": 30, "type": "int", "description": "计算周期"}
             },
-            "outputs": ["ma_30"]
+            "outputs": ["ma_{period}"]
         },
         "ema": {
             "name": "Exponential Moving Average",
@@ -49,7 +55,7 @@ class TechnicalIndicators:
             "parameters": {
                 "period": {"default": 12, "type": "int", "description": "计算周期"}
             },
-            "outputs": ["ema_12"]
+            "outputs": ["ema_{period}"]
         },
         "stochastic": {
             "name": "Stochastic Oscillator",
@@ -58,7 +64,8 @@ class TechnicalIndicators:
                 "k_period": {"default": 14, "type": "int", "description": "K值周期"},
                 "d_period": {"default": 3, "type": "int", "description": "D值周期"}
             },
-            "outputs": ["stoch_k", "stoch_d"]
+            "outputs": ["stoch_k", "stoch_d"],
+            "requires": ["rolling_high:k_period", "rolling_low:k_period"]
         },
         "atr": {
             "name": "Average True Range",
@@ -66,7 +73,8 @@ class TechnicalIndicators:
             "parameters": {
                 "period": {"default": 14, "type": "int", "description": "计算周期"}
             },
-            "outputs": ["atr"]
+            "outputs": ["atr_{period}"],
+            "requires": ["true_range"]
         },
         "cci": {
             "name": "Commodity Channel Index",
@@ -74,7 +82,8 @@ class TechnicalIndicators:
             "parameters": {
                 "period": {"default": 20, "type": "int", "description": "计算周期"}
             },
-            "outputs": ["cci"]
+            "outputs": ["cci_{period}"],
+            "requires": ["typical_price"]
         },
         "williams_r": {
             "name": "Williams %R",
@@ -82,7 +91,8 @@ class TechnicalIndicators:
             "parameters": {
                 "period": {"default": 14, "type": "int", "description": "计算周期"}
             },
-            "outputs": ["williams_r"]
+            "outputs": ["williams_r_{period}"],
+            "requires": ["rolling_high:period", "rolling_low:period"]
         },
         "momentum": {
             "name": "Momentum",
@@ -90,7 +100,7 @@ class TechnicalIndicators:
             "parameters": {
                 "period": {"default": 10, "type": "int", "description": "计算周期"}
             },
-            "outputs": ["momentum"]
+            "outputs": ["momentum_{period}"]
         },
         "ichimoku": {
             "name": "Ichimoku Cloud",
@@ -100,7 +110,8 @@ class TechnicalIndicators:
                 "kijun_sen_period": {"default": 26, "type": "int", "description": "基准线周期"},
                 "senkou_span_b_period": {"default": 52, "type": "int", "description": "先行跨度B周期"}
             },
-            "outputs": ["tenkan_sen", "kijun_sen", "senkou_span_a", "senkou_span_b", "chikou_span"]
+            "outputs": ["tenkan_sen", "kijun_sen", "senkou_span_a", "senkou_span_b", "chikou_span"],
+            "requires": ["rolling_high:tenkan_sen_period", "rolling_low:tenkan_sen_period", "rolling_high:kijun_sen_period", "rolling_low:kijun_sen_period", "rolling_high:senkou_span_b_period", "rolling_low:senkou_span_b_period"]
         },
         "parabolic_sar": {
             "name": "Parabolic SAR",
@@ -115,7 +126,8 @@ class TechnicalIndicators:
             "name": "Volume Weighted Average Price",
             "description": "成交量加权平均价",
             "parameters": {},
-            "outputs": ["vwap"]
+            "outputs": ["vwap"],
+            "requires": ["typical_price"]
         },
         "mfi": {
             "name": "Money Flow Index",
@@ -123,7 +135,8 @@ class TechnicalIndicators:
             "parameters": {
                 "period": {"default": 14, "type": "int", "description": "计算周期"}
             },
-            "outputs": ["mfi"]
+            "outputs": ["mfi_{period}"],
+            "requires": ["money_flow"]
         },
         "obv": {
             "name": "On-Balance Volume",
@@ -135,7 +148,8 @@ class TechnicalIndicators:
             "name": "Accumulation/Distribution Line",
             "description": "累积/派发线",
             "parameters": {},
-            "outputs": ["adl"]
+            "outputs": ["adl"],
+            "requires": ["money_flow_volume"]
         },
         "cmf": {
             "name": "Chaikin Money Flow",
@@ -143,7 +157,8 @@ class TechnicalIndicators:
             "parameters": {
                 "period": {"default": 20, "type": "int", "description": "计算周期"}
             },
-            "outputs": ["cmf"]
+            "outputs": ["cmf_{period}"],
+            "requires": ["money_flow_volume"]
         },
         "standard_deviation": {
             "name": "Standard Deviation",
@@ -151,7 +166,7 @@ class TechnicalIndicators:
             "parameters": {
                 "period": {"default": 20, "type": "int", "description": "计算周期"}
             },
-            "outputs": ["std"]
+            "outputs": ["std_{period}"]
         },
         "adx": {
             "name": "Average Directional Index",
@@ -159,10 +174,64 @@ class TechnicalIndicators:
             "parameters": {
                 "period": {"default": 14, "type": "int", "description": "计算周期"}
             },
-            "outputs": ["adx", "di_plus", "di_minus"]
+            "outputs": ["adx_{period}", "di_plus", "di_minus"],
+            "requires": ["true_range", "directional_movement"]
+        },
+        "volatility": {
+            "name": "Volatility",
+            "description": "波动率(收益率标准差)",
+            "parameters": {
+                "period": {"default": 20, "type": "int", "description": "计算周期"}
+            },
+            "outputs": ["volatility_{period}"]
         }
     }
 
+    # calculate_all 默认计算的指标及参数（顺序即输出字段顺序）
+    DEFAULT_INDICATORS = [
+        ("macd", {}),
+        ("rsi", {"period": 14}),
+        ("bollinger_bands", {}),
+        ("ma", {"period": 30}),
+        ("ma", {"period": 10}),
+        ("ema", {"period": 12}),
+        ("ema", {"period": 26}),
+        ("stochastic", {}),
+        ("atr", {"period": 14}),
+        ("cci", {"period": 20}),
+        ("williams_r", {"period": 14}),
+        ("momentum", {"period": 10}),
+        ("ichimoku", {}),
+        ("parabolic_sar", {}),
+        ("vwap", {}),
+        ("mfi", {"period": 14}),
+        ("obv", {}),
+        ("adl", {}),
+        ("cmf", {"period": 20}),
+        ("standard_deviation", {"period": 20}),
+        ("adx", {"period": 14}),
+        ("volatility", {"period": 20}),
+    ]
+
+    # 基于 SUPPORTED_INDICATORS 元数据的依赖计划器
+    planner = IndicatorPlanner(SUPPORTED_INDICATORS)
+
+    # 指标结果缓存: (K线窗口标识, 指标请求) -> 指标列
+    memo = LRUCache(maxsize=512, ttl=3600)
+
+    # 指标计算后端（引擎类），启动时由环境变量 INDICATOR_BACKEND 选择
+    engine_class = get_backend(DEFAULT_BACKEND)
+
+    @staticmethod
+    def use_backend(name: str) -> None:
+        """
+        切换指标计算后端
+
+        Args:
+            name: 后端名称 pandas / talib
+        """
+        TechnicalIndicators.engine_class = get_backend(name)
+
     @staticmethod
     def get_supported_indicators() -> Dict[str, Any]:
         """
@@ -175,9 +244,9 @@ class TechnicalIndicators:
 
     @staticmethod
     def calculate_macd(klines: List[Dict[str, Any]],
-                      fast_period: int = 12,
-                      slow_period: int = 26,
-                      signal_period: int = 9) -> List[Dict[str, Any]]:
+                       fast_period: int = 12,
+                       slow_period: int = 26,
+                       signal_period: int = 9) -> List[Dict[str, Any]]:
         """
         计算MACD指标
 
@@ -190,28 +259,7 @@ class TechnicalIndicators:
         Returns:
             包含MACD指标的K线数据
         """
-        df = pd.DataFrame(klines)
-        df['close'] = df['close'].astype(float)
-
-        # 计算快速和慢速EMA
-        ema_fast = df['close'].ewm(span=fast_period, adjust=False).mean()
-        ema_slow = df['close'].ewm(span=slow_period, adjust=False).mean()
-
-        # 计算MACD线
-        macd_line = ema_fast - ema_slow
-
-        # 计算信号线
-        signal_line = macd_line.ewm(span=signal_period, adjust=False).mean()
-
-        # 计算柱状图
-        histogram = macd_line - signal_line
-
-        # 添加到原始数据
-        df['macd'] = macd_line
-        df['macd_signal'] = signal_line
-        df['macd_histogram'] = histogram
-
-        return df.to_dict('records')
+        return TechnicalIndicators.engine_class(klines).macd(fast_period, slow_period, signal_period).to_records()
 
     @staticmethod
     def calculate_rsi(klines: List[Dict[str, Any]], period: int = 14) -> List[Dict[str, Any]]:
@@ -225,31 +273,12 @@ class TechnicalIndicators:
         Returns:
             包含RSI指标的K线数据
         """
-        df = pd.DataFrame(klines)
-        df['close'] = df['close'].astype(float)
-
-        # 计算价格变化
-        delta = df['close'].diff()
-
-        # 分离上涨和下跌
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-
-        # 计算RS
-        rs = gain / loss
-
-        # 计算RSI
-        rsi = 100 - (100 / (1 + rs))
-
-        # 修改字段名为包含周期的形式
-        df[f'rsi_{period}'] = rsi
-
-        return df.to_dict('records')
+        return TechnicalIndicators.engine_class(klines).rsi(period).to_records()
 
     @staticmethod
     def calculate_bollinger_bands(klines: List[Dict[str, Any]],
-                                 period: int = 20,
-                                 num_std: int = 2) -> List[Dict[str, Any]]:
+                                  period: int = 20,
+                                  num_std: int = 2) -> List[Dict[str, Any]]:
         """
         计算布林带指标
 
@@ -261,24 +290,7 @@ class TechnicalIndicators:
         Returns:
             包含布林带指标的K线数据
         """
-        df = pd.DataFrame(klines)
-        df['close'] = df['close'].astype(float)
-
-        # 计算中轨（移动平均线）
-        middle_band = df['close'].rolling(window=period).mean()
-
-        # 计算标准差
-        std_dev = df['close'].rolling(window=period).std()
-
-        # 计算上下轨
-        upper_band = middle_band + (std_dev * num_std)
-        lower_band = middle_band - (std_dev * num_std)
-
-        df['bb_upper'] = upper_band
-        df['bb_middle'] = middle_band
-        df['bb_lower'] = lower_band
-
-        return df.to_dict('records')
+        return TechnicalIndicators.engine_class(klines).bollinger_bands(period, num_std).to_records()
 
     @staticmethod
     def calculate_ma(klines: List[Dict[str, Any]], period: int = 30) -> List[Dict[str, Any]]:
@@ -292,15 +304,7 @@ class TechnicalIndicators:
         Returns:
             包含移动平均线的K线数据
         """
-        df = pd.DataFrame(klines)
-        df['close'] = df['close'].astype(float)
-
-        # 计算移动平均线
-        ma = df['close'].rolling(window=period).mean()
-
-        df[f'ma_{period}'] = ma
-
-        return df.to_dict('records')
+        return TechnicalIndicators.engine_class(klines).ma(period).to_records()
 
     @staticmethod
     def calculate_ema(klines: List[Dict[str, Any]], period: int = 12) -> List[Dict[str, Any]]:
@@ -314,20 +318,12 @@ class TechnicalIndicators:
         Returns:
             包含指数移动平均线的K线数据
         """
-        df = pd.DataFrame(klines)
-        df['close'] = df['close'].astype(float)
-
-        # 计算EMA
-        ema = df['close'].ewm(span=period, adjust=False).mean()
-
-        df[f'ema_{period}'] = ema
-
-        return df.to_dict('records')
+        return TechnicalIndicators.engine_class(klines).ema(period).to_records()
 
     @staticmethod
     def calculate_stochastic(klines: List[Dict[str, Any]],
-                           k_period: int = 14,
-                           d_period: int = 3) -> List[Dict[str, Any]]:
+                             k_period: int = 14,
+                             d_period: int = 3) -> List[Dict[str, Any]]:
         """
         计算随机指标(KDJ)
 
@@ -339,23 +335,7 @@ class TechnicalIndicators:
         Returns:
             包含随机指标的K线数据
         """
-        df = pd.DataFrame(klines)
-        df['high'] = df['high'].astype(float)
-        df['low'] = df['low'].astype(float)
-        df['close'] = df['close'].astype(float)
-
-        # 计算%K
-        low_min = df['low'].rolling(window=k_period).min()
-        high_max = df['high'].rolling(window=k_period).max()
-        percent_k = 100 * ((df['close'] - low_min) / (high_max - low_min))
-
-        # 计算%D
-        percent_d = percent_k.rolling(window=d_period).mean()
-
-        df['stoch_k'] = percent_k
-        df['stoch_d'] = percent_d
-
-        return df.to_dict('records')
+        return TechnicalIndicators.engine_class(klines).stochastic(k_period, d_period).to_records()
 
     @staticmethod
     def calculate_atr(klines: List[Dict[str, Any]], period: int = 14) -> List[Dict[str, Any]]:
@@ -369,24 +349,7 @@ class TechnicalIndicators:
         Returns:
             包含ATR指标的K线数据
         """
-        df = pd.DataFrame(klines)
-        df['high'] = df['high'].astype(float)
-        df['low'] = df['low'].astype(float)
-        df['close'] = df['close'].astype(float)
-
-        # 计算真实波幅(TR)
-        df['tr0'] = abs(df['high'] - df['low'])
-        df['tr1'] = abs(df['high'] - df['close'].shift(1))
-        df['tr2'] = abs(df['low'] - df['close'].shift(1))
-        df['tr'] = df[['tr0', 'tr1', 'tr2']].max(axis=1)
-
-        # 计算ATR
-        df[f'atr_{period}'] = df['tr'].rolling(window=period).mean()
-
-        # 清理临时列
-        df.drop(['tr0', 'tr1', 'tr2', 'tr'], axis=1, inplace=True)
-
-        return df.to_dict('records')
+        return TechnicalIndicators.engine_class(klines).atr(period).to_records()
 
     @staticmethod
     def calculate_cci(klines: List[Dict[str, Any]], period: int = 20) -> List[Dict[str, Any]]:
@@ -400,30 +363,7 @@ class TechnicalIndicators:
         Returns:
             包含CCI指标的K线数据
         """
-        df = pd.DataFrame(klines)
-        df['high'] = df['high'].astype(float)
-        df['low'] = df['low'].astype(float)
-        df['close'] = df['close'].astype(float)
-
-        # 计算典型价格
-        df['tp'] = (df['high'] + df['low'] + df['close']) / 3
-
-        # 计算简单移动平均
-        df['sma_tp'] = df['tp'].rolling(window=period).mean()
-
-        # 计算平均绝对偏差 (使用手动计算替代 mad())
-        def mean_abs_deviation(x):
-            return np.mean(np.abs(x - np.mean(x)))
-
-        df['mad'] = df['tp'].rolling(window=period).apply(mean_abs_deviation, raw=True)
-
-        # 计算CCI
-        df[f'cci_{period}'] = (df['tp'] - df['sma_tp']) / (0.015 * df['mad'])
-
-        # 清理临时列
-        df.drop(['tp', 'sma_tp', 'mad'], axis=1, inplace=True)
-
-        return df.to_dict('records')
+        return TechnicalIndicators.engine_class(klines).cci(period).to_records()
 
     @staticmethod
     def calculate_williams_r(klines: List[Dict[str, Any]], period: int = 14) -> List[Dict[str, Any]]:
@@ -437,19 +377,7 @@ class TechnicalIndicators:
         Returns:
             包含威廉姆斯%R指标的K线数据
         """
-        df = pd.DataFrame(klines)
-        df['high'] = df['high'].astype(float)
-        df['low'] = df['low'].astype(float)
-        df['close'] = df['close'].astype(float)
-
-        # 计算周期内最高价和最低价
-        highest_high = df['high'].rolling(window=period).max()
-        lowest_low = df['low'].rolling(window=period).min()
-
-        # 计算威廉姆斯%R
-        df[f'williams_r_{period}'] = (highest_high - df['close']) / (highest_high - lowest_low) * -100
-
-        return df.to_dict('records')
+        return TechnicalIndicators.engine_class(klines).williams_r(period).to_records()
 
     @staticmethod
     def calculate_momentum(klines: List[Dict[str, Any]], period: int = 10) -> List[Dict[str, Any]]:
@@ -463,19 +391,13 @@ class TechnicalIndicators:
         Returns:
             包含动量指标的K线数据
         """
-        df = pd.DataFrame(klines)
-        df['close'] = df['close'].astype(float)
-
-        # 计算动量
-        df[f'momentum_{period}'] = df['close'] - df['close'].shift(period)
-
-        return df.to_dict('records')
+        return TechnicalIndicators.engine_class(klines).momentum(period).to_records()
 
     @staticmethod
     def calculate_ichimoku(klines: List[Dict[str, Any]],
-                          tenkan_sen_period: int = 9,
-                          kijun_sen_period: int = 26,
-                          senkou_span_b_period: int = 52) -> List[Dict[str, Any]]:
+                           tenkan_sen_period: int = 9,
+                           kijun_sen_period: int = 26,
+                           senkou_span_b_period: int = 52) -> List[Dict[str, Any]]:
         """
         计算顺势指标(Ichimoku Cloud)
 
@@ -488,107 +410,24 @@ class TechnicalIndicators:
         Returns:
             包含顺势指标的K线数据
         """
-        df = pd.DataFrame(klines)
-        df['high'] = df['high'].astype(float)
-        df['low'] = df['low'].astype(float)
-
-        # 计算转换线 (Tenkan-sen)
-        period9_high = df['high'].rolling(window=tenkan_sen_period).max()
-        period9_low = df['low'].rolling(window=tenkan_sen_period).min()
-        df['tenkan_sen'] = (period9_high + period9_low) / 2
-
-        # 计算基准线 (Kijun-sen)
-        period26_high = df['high'].rolling(window=kijun_sen_period).max()
-        period26_low = df['low'].rolling(window=kijun_sen_period).min()
-        df['kijun_sen'] = (period26_high + period26_low) / 2
-
-        # 计算先行跨度A (Senkou Span A)
-        df['senkou_span_a'] = ((df['tenkan_sen'] + df['kijun_sen']) / 2).shift(kijun_sen_period)
-
-        # 计算先行跨度B (Senkou Span B)
-        period52_high = df['high'].rolling(window=senkou_span_b_period).max()
-        period52_low = df['low'].rolling(window=senkou_span_b_period).min()
-        df['senkou_span_b'] = ((period52_high + period52_low) / 2).shift(kijun_sen_period)
-
-        # 计算滞后跨度 (Chikou Span)
-        df['chikou_span'] = df['close'].shift(-kijun_sen_period)
-
-        return df.to_dict('records')
+        return TechnicalIndicators.engine_class(klines).ichimoku(tenkan_sen_period, kijun_sen_period, senkou_span_b_period).to_records()
 
     @staticmethod
     def calculate_parabolic_sar(klines: List[Dict[str, Any]],
                                 acceleration: float = 0.02,
                                 maximum: float = 0.2) -> List[Dict[str, Any]]:
         """
-           计算抛物线转向指标(Parabolic SAR)
-
-           Args:
-               klines: K线数据列表
-               acceleration: 步长
-               maximum: 最大步长
-
-           Returns:
-               包含抛物线转向指标的K线数据
-           """
-        df = pd.DataFrame(klines)
-        df['high'] = df['high'].astype(float)
-        df['low'] = df['low'].astype(float)
-        df['close'] = df['close'].astype(float)
-
-        sar = [0.0] * len(df)
-
-        # 1. 判断初始趋势
-        bull = df['close'].iloc[1] >= df['close'].iloc[0]
-
-        af = acceleration
-        if bull:
-            ep = df['high'].iloc[0]  # 多头趋势极值 = 最高价
-            sar[0] = df['low'].iloc[0]  # SAR 在下方
-        else:
-            ep = df['low'].iloc[0]  # 空头趋势极值 = 最低价
-            sar[0] = df['high'].iloc[0]  # SAR 在上方
-
-        for i in range(1, len(df)):
-            # 2. 先计算候选SAR
-            psar = sar[i - 1] + af * (ep - sar[i - 1])
-
-            # 3. 按方向做约束
-            if bull:
-                # 通常用前1~2根的low做约束，这里简化为1根或2根都可以
-                psar = min(psar, df['low'].iloc[i - 1])
-                if i > 1:
-                    psar = min(psar, df['low'].iloc[i - 2])
-                # 4. 判断是否反转
-                if df['low'].iloc[i] < psar:
-                    # 反转为空头
-                    bull = False
-                    sar[i] = ep  # 反转当根SAR = 上一趋势极值
-                    af = acceleration
-                    ep = df['low'].iloc[i]  # 新空头趋势的初始极值
-                else:
-                    sar[i] = psar
-                    # 更新EP/AF
-                    if df['high'].iloc[i] > ep:
-                        ep = df['high'].iloc[i]
-                        af = min(af + acceleration, maximum)
-            else:
-                psar = max(psar, df['high'].iloc[i - 1])
-                if i > 1:
-                    psar = max(psar, df['high'].iloc[i - 2])
-                if df['high'].iloc[i] > psar:
-                    # 反转为多头
-                    bull = True
-                    sar[i] = ep
-                    af = acceleration
-                    ep = df['high'].iloc[i]
-                else:
-                    sar[i] = psar
-                    if df['low'].iloc[i] < ep:
-                        ep = df['low'].iloc[i]
-                        af = min(af + acceleration, maximum)
-
-        df['sar'] = sar
-        return df.to_dict('records')
+        计算抛物线转向指标(Parabolic SAR)
+
+        Args:
+            klines: K线数据列表
+            acceleration: 步长
+            maximum: 最大步长
+
+        Returns:
+            包含抛物线转向指标的K线数据
+        """
+        return TechnicalIndicators.engine_class(klines).parabolic_sar(acceleration, maximum).to_records()
 
     @staticmethod
     def calculate_vwap(klines: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -601,29 +440,7 @@ class TechnicalIndicators:
         Returns:
             包含VWAP指标的K线数据
         """
-        df = pd.DataFrame(klines)
-        df['high'] = df['high'].astype(float)
-        df['low'] = df['low'].astype(float)
-        df['close'] = df['close'].astype(float)
-        df['volume'] = df['volume'].astype(float)
-
-        # 计算典型价格
-        df['tp'] = (df['high'] + df['low'] + df['close']) / 3
-
-        # 计算TP*Volume
-        df['tp_volume'] = df['tp'] * df['volume']
-
-        # 计算累积值
-        df['cumulative_tp_volume'] = df['tp_volume'].cumsum()
-        df['cumulative_volume'] = df['volume'].cumsum()
-
-        # 计算VWAP
-        df['vwap'] = df['cumulative_tp_volume'] / df['cumulative_volume']
-
-        # 清理临时列
-        df.drop(['tp', 'tp_volume', 'cumulative_tp_volume', 'cumulative_volume'], axis=1, inplace=True)
-
-        return df.to_dict('records')
+        return TechnicalIndicators.engine_class(klines).vwap().to_records()
 
     @staticmethod
     def calculate_mfi(klines: List[Dict[str, Any]], period: int = 14) -> List[Dict[str, Any]]:
@@ -637,64 +454,20 @@ class TechnicalIndicators:
         Returns:
             包含MFI指标的K线数据
         """
-        df = pd.DataFrame(klines)
-        df['high'] = df['high'].astype(float)
-        df['low'] = df['low'].astype(float)
-        df['close'] = df['close'].astype(float)
-        df['volume'] = df['volume'].astype(float)
-
-        # 计算典型价格
-        df['tp'] = (df['high'] + df['low'] + df['close']) / 3
-
-        # 计算资金流量
-        df['raw_money_flow'] = df['tp'] * df['volume']
-
-        # 确定资金流向
-        df['positive_flow'] = 0.0
-        df['negative_flow'] = 0.0
-
-        for i in range(1, len(df)):
-            if df['tp'].iloc[i] > df['tp'].iloc[i-1]:
-                df.loc[df.index[i], 'positive_flow'] = df['raw_money_flow'].iloc[i]
-            elif df['tp'].iloc[i] < df['tp'].iloc[i-1]:
-                df.loc[df.index[i], 'negative_flow'] = df['raw_money_flow'].iloc[i]
-
-        # 计算周期内的正负资金流量总和
-        df['positive_money_flow'] = df['positive_flow'].rolling(window=period).sum()
-        df['negative_money_flow'] = df['negative_flow'].rolling(window=period).sum()
-
-        # 计算资金比率
-        df['money_ratio'] = df['positive_money_flow'] / df['negative_money_flow']
-
-        # 计算MFI
-        df[f'mfi_{period}'] = 100 - (100 / (1 + df['money_ratio']))
-
-        # 清理临时列
-        df.drop(['tp', 'raw_money_flow', 'positive_flow', 'negative_flow',
-                 'positive_money_flow', 'negative_money_flow', 'money_ratio'],
-                axis=1, inplace=True)
-
-        return df.to_dict('records')
+        return TechnicalIndicators.engine_class(klines).mfi(period).to_records()
 
     @staticmethod
     def calculate_obv(klines: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        df = pd.DataFrame(klines)
-        df['close'] = df['close'].astype(float)
-        df['volume'] = df['volume'].astype(float)
-
-        # 初始化 OBV（标准：第一根为0）
-        obv = [0.0]
-
-        for i in range(1, len(df)):
-            if df['close'].iloc[i] > df['close'].iloc[i - 1]:
-                obv.append(obv[-1] + df['volume'].iloc[i])
-            elif df['close'].iloc[i] < df['close'].iloc[i - 1]:
-                obv.append(obv[-1] - df['volume'].iloc[i])
-            else:
-                obv.append(obv[-1])
+        """
+        计算能量潮指标(OBV)
 
-        df['obv'] = obv
-        return df.to_dict('records')
+        Args:
+            klines: K线数据列表
+
+        Returns:
+            包含OBV指标的K线数据
+        """
+        return TechnicalIndicators.engine_class(klines).obv().to_records()
 
     @staticmethod
     def calculate_adl(klines: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -707,26 +480,7 @@ class TechnicalIndicators:
         Returns:
             包含ADL指标的K线数据
         """
-        df = pd.DataFrame(klines)
-        df['high'] = df['high'].astype(float)
-        df['low'] = df['low'].astype(float)
-        df['close'] = df['close'].astype(float)
-        df['volume'] = df['volume'].astype(float)
-
-        # 计算CLV(收盘价位置值)
-        df['clv'] = ((df['close'] - df['low']) - (df['high'] - df['close'])) / (df['high'] - df['low'])
-        df['clv'].fillna(0, inplace=True)  # 处理除零情况
-
-        # 计算资金流量
-        df['money_flow_volume'] = df['clv'] * df['volume']
-
-        # 计算累积/派发线
-        df['adl'] = df['money_flow_volume'].cumsum()
-
-        # 清理临时列
-        df.drop(['clv', 'money_flow_volume'], axis=1, inplace=True)
-
-        return df.to_dict('records')
+        return TechnicalIndicators.engine_class(klines).adl().to_records()
 
     @staticmethod
     def calculate_cmf(klines: List[Dict[str, Any]], period: int = 20) -> List[Dict[str, Any]]:
@@ -740,31 +494,7 @@ class TechnicalIndicators:
         Returns:
             包含CMF指标的K线数据
         """
-        df = pd.DataFrame(klines)
-        df['high'] = df['high'].astype(float)
-        df['low'] = df['low'].astype(float)
-        df['close'] = df['close'].astype(float)
-        df['volume'] = df['volume'].astype(float)
-
-        # 计算CLV(收盘价位置值)
-        df['clv'] = ((df['close'] - df['low']) - (df['high'] - df['close'])) / (df['high'] - df['low'])
-        df['clv'].fillna(0, inplace=True)  # 处理除零情况
-
-        # 计算资金流量
-        df['money_flow_volume'] = df['clv'] * df['volume']
-
-        # 计算周期内资金流量和成交量的移动平均
-        df['money_flow_volume_sum'] = df['money_flow_volume'].rolling(window=period).sum()
-        df['volume_sum'] = df['volume'].rolling(window=period).sum()
-
-        # 计算CMF
-        df[f'cmf_{period}'] = df['money_flow_volume_sum'] / df['volume_sum']
-
-        # 清理临时列
-        df.drop(['clv', 'money_flow_volume', 'money_flow_volume_sum', 'volume_sum'],
-                axis=1, inplace=True)
-
-        return df.to_dict('records')
+        return TechnicalIndicators.engine_class(klines).cmf(period).to_records()
 
     @staticmethod
     def calculate_standard_deviation(klines: List[Dict[str, Any]], period: int = 20) -> List[Dict[str, Any]]:
@@ -778,13 +508,8 @@ class TechnicalIndicators:
         Returns:
             包含标准差指标的K线数据
         """
-        df = pd.DataFrame(klines)
-        df['close'] = df['close'].astype(float)
+        return TechnicalIndicators.engine_class(klines).standard_deviation(period).to_records()
 
-        # 计算标准差
-        df[f'std_{period}'] = df['close'].rolling(window=period).std()
-
-        return df.to_dict('records')
     @staticmethod
     def calculate_adx(klines: List[Dict[str, Any]], period: int = 14) -> List[Dict[str, Any]]:
         """
@@ -797,129 +522,123 @@ class TechnicalIndicators:
         Returns:
             包含ADX指标的K线数据
         """
-        df = pd.DataFrame(klines)
-        df['high'] = df['high'].astype(float)
-        df['low'] = df['low'].astype(float)
-        df['close'] = df['close'].astype(float)
-
-        # 计算真实波幅(TR)
-        df['tr'] = 0.0
-        df['tr'].iloc[0] = df['high'].iloc[0] - df['low'].iloc[0]
+        return TechnicalIndicators.engine_class(klines).adx(period).to_records()
 
-        for i in range(1, len(df)):
-            df.iloc[i, df.columns.get_loc('tr')] = max(
-                df['high'].iloc[i] - df['low'].iloc[i],
-                abs(df['high'].iloc[i] - df['close'].iloc[i-1]),
-                abs(df['low'].iloc[i] - df['close'].iloc[i-1])
-            )
-
-        # 计算+DM和-DM
-        df['plus_dm'] = 0.0
-        df['minus_dm'] = 0.0
-
-        for i in range(1, len(df)):
-            up_move = df['high'].iloc[i] - df['high'].iloc[i-1]
-            down_move = df['low'].iloc[i-1] - df['low'].iloc[i]
-
-            if up_move > down_move and up_move > 0:
-                df.iloc[i, df.columns.get_loc('plus_dm')] = up_move
-
-            if down_move > up_move and down_move > 0:
-                df.iloc[i, df.columns.get_loc('minus_dm')] = down_move
+    @staticmethod
+    def calculate_volatility(klines: List[Dict[str, Any]], period: int = 20) -> List[Dict[str, Any]]:
+        """
+        计算波动率指标
 
-        # 计算+DI和-DI
-        df['atr_period'] = df['tr'].rolling(window=period).mean()
-        df['plus_di_period'] = df['plus_dm'].rolling(window=period).mean()
-        df['minus_di_period'] = df['minus_dm'].rolling(window=period).mean()
+        Args:
+            klines: K线数据列表
+            period: 波动率周期
 
-        df['di_plus'] = (df['plus_di_period'] / df['atr_period']) * 100
-        df['di_minus'] = (df['minus_di_period'] / df['atr_period']) * 100
+        Returns:
+            包含波动率指标的K线数据
+        """
+        return TechnicalIndicators.engine_class(klines).volatility(period).to_records()
 
-        # 计算DX
-        dx = abs(df['di_plus'] - df['di_minus']) / (df['di_plus'] + df['di_minus']) * 100
+    @staticmethod
+    def calculate(klines: List[Dict[str, Any]],
+                  indicators: Optional[List[Any]] = None,
+                  memoize: bool = False) -> List[Dict[str, Any]]:
+        """
+        按需计算指定的技术指标
 
-        # 计算ADX
-        df[f'adx_{period}'] = dx.rolling(window=period).mean()
+        由计划器根据指标依赖的中间量（真实波幅、典型价格、窗口高低点等）生成执行计划，
+        共享的中间量只计算一次，未请求的指标不计算。
 
-        # 清理临时列
-        df.drop(['tr', 'plus_dm', 'minus_dm', 'atr_period', 'plus_di_period',
-                 'minus_di_period'], axis=1, inplace=True)
+        Args:
+            klines: K线数据列表
+            indicators: 指标列表，元素可以是名称、(名称, 参数字典) 或 IndicatorRequest，
+                为 None 时计算全部默认指标
+            memoize: 是否按 (交易对, 周期, K线窗口, 指标, 参数) 缓存并复用指标结果
 
-        return df.to_dict('records')
+        Returns:
+            包含所请求技术指标的K线数据（价格字段为字符串，NaN 转为 None）
+        """
+        if indicators is None:
+            indicators = TechnicalIndicators.DEFAULT_INDICATORS
+        memo = TechnicalIndicators.memo if memoize else None
+        return TechnicalIndicators.engine_class(klines).compute(indicators, memo).to_records(normalize=True)
 
     @staticmethod
-    def calculate_volatility(klines: List[Dict[str, Any]], period: int = 20) -> List[Dict[str, Any]]:
+    def calculate_block(high: np.ndarray,
+                        low: np.ndarray,
+                        close: np.ndarray,
+                        volume: np.ndarray,
+                        indicators: Optional[List[Any]] = None) -> Dict[str, np.ndarray]:
         """
-        计算波动率指标
+        对多个品种对齐的 OHLCV 二维数组一次性计算技术指标
 
         Args:
-            klines: K线数据列表
-            period: 波动率周期
+            high: 最高价，形状为 (时间, 品种)
+            low: 最低价
+            close: 收盘价
+            volume: 成交量
+            indicators: 指标列表，为 None 时计算全部默认指标
 
         Returns:
-            包含波动率指标的K线数据
+            指标列名 -> (时间, 品种) 的结果数组
         """
-        df = pd.DataFrame(klines)
-        df['close'] = df['close'].astype(float)
+        if indicators is None:
+            indicators = TechnicalIndicators.DEFAULT_INDICATORS
+        return TechnicalIndicators.engine_class.from_arrays(high, low, close, volume).compute(indicators).columns
 
-        # 计算收益率
-        df['returns'] = df['close'].pct_change()
+    @staticmethod
+    def calculate_batch(klines_by_symbol: Dict[str, Union[List[Dict[str, Any]], KlineColumns]],
+                        indicators: Optional[List[Any]] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        批量计算多个交易对的技术指标
+
+        K线时间完全相同（相同的开盘时间序列）的交易对拼成 (时间, 品种) 的二维数组，
+        在一次向量化计算中得到所有品种的指标；上市时间不同等原因未对齐的交易对各自成组。
+        每个交易对的结果与单独调用 calculate 一致。
 
-        # 计算波动率(收益率的标准差)
-        df[f'volatility_{period}'] = df['returns'].rolling(window=period).std()
+        Args:
+            klines_by_symbol: 交易对 -> K线数据列表或列式K线（直接使用价格列，生成结果行时才转换为旧格式）
+            indicators: 指标列表，为 None 时计算全部默认指标
 
-        # 删除临时列
-        df.drop(['returns'], axis=1, inplace=True)
+        Returns:
+            交易对 -> 包含技术指标的K线数据（顺序与输入一致）
+        """
+        if indicators is None:
+            indicators = TechnicalIndicators.DEFAULT_INDICATORS
+        plan = TechnicalIndicators.planner.plan(indicators)
 
-        return df.to_dict('records')
+        # 按开盘时间序列分组
+        groups: Dict[tuple, List[str]] = {}
+        for symbol, klines in klines_by_symbol.items():
+            if isinstance(klines, KlineColumns):
+                key = tuple(klines["open_time"].tolist())
+            else:
+                key = tuple(int(kline["open_time"]) for kline in klines)
+            groups.setdefault(key, []).append(symbol)
+
+        results: Dict[str, List[Dict[str, Any]]] = {}
+        for symbols in groups.values():
+            block = [klines_by_symbol[symbol] for symbol in symbols]
+            arrays = [np.array([klines[field] if isinstance(klines, KlineColumns) else
+                                [kline[field] for kline in klines] for klines in block], dtype=np.float64).T
+                      for field in IndicatorEngine.PRICE_FIELDS]
+            engine = plan.execute(TechnicalIndicators.engine_class.from_arrays(*arrays))
+            for index, (symbol, klines) in enumerate(zip(symbols, block)):
+                if isinstance(klines, KlineColumns):
+                    klines = klines.to_klines()
+                results[symbol] = engine.select(index, klines).to_records(normalize=True)
+        return {symbol: results[symbol] for symbol in klines_by_symbol}
 
     @staticmethod
     def calculate_all(klines: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         计算所有常用技术指标
 
+        K线只解析一次，所有指标在共享的列上计算，最后统一生成结果行。
+
         Args:
             klines: K线数据列表
 
         Returns:
-            包含所有技术指标的K线数据
-        """
-        # 依次计算各种指标，传入默认周期参数
-        result = TechnicalIndicators.calculate_macd(klines)
-        result = TechnicalIndicators.calculate_rsi(result, 14)
-        result = TechnicalIndicators.calculate_bollinger_bands(result)
-        result = TechnicalIndicators.calculate_ma(result, 30)
-        result = TechnicalIndicators.calculate_ma(result, 10)
-        result = TechnicalIndicators.calculate_ema(result, 12)
-        result = TechnicalIndicators.calculate_ema(result, 26)
-
-        result = TechnicalIndicators.calculate_stochastic(result)
-        result = TechnicalIndicators.calculate_atr(result, 14)
-        result = TechnicalIndicators.calculate_cci(result, 20)
-        result = TechnicalIndicators.calculate_williams_r(result, 14)
-        result = TechnicalIndicators.calculate_momentum(result, 10)
-        result = TechnicalIndicators.calculate_ichimoku(result)
-        result = TechnicalIndicators.calculate_parabolic_sar(result)
-        result = TechnicalIndicators.calculate_vwap(result)
-        result = TechnicalIndicators.calculate_mfi(result, 14)
-        result = TechnicalIndicators.calculate_obv(result)
-        result = TechnicalIndicators.calculate_adl(result)
-        result = TechnicalIndicators.calculate_cmf(result, 20)
-        result = TechnicalIndicators.calculate_standard_deviation(result, 20)
-        result = TechnicalIndicators.calculate_adx(result, 14)
-        result = TechnicalIndicators.calculate_volatility(result)
-
-
-        # 确保所有原始字符串字段仍为字符串类型
-        for item in result:
-            item['open'] = str(item['open'])
-            item['high'] = str(item['high'])
-            item['low'] = str(item['low'])
-            item['close'] = str(item['close'])
-            item['volume'] = str(item['volume'])
-            # 处理技术指标中的 NaN 值
-            for key in item:
-                if isinstance(item[key], (float, np.floating)) and np.isnan(item[key]):
-                    item[key] = None
-
-        return result
+            包含所有技术指标的K线数据（价格字段为字符串，NaN 转为 None）
+        """
+        return TechnicalIndicators.calculate(klines)
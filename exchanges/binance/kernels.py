@@ -0,0 +1,279 @@
+# exchanges/binance/kernels.py
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Callable, Dict, Tuple
+
+# 滑动窗口归约内核注册表: 名称 -> func(values, window)，结果与输入等长，窗口未满的位置为 NaN
+WINDOW_KERNELS: Dict[str, Callable[[np.ndarray, int], np.ndarray]] = {}
+
+# 滑动窗口视图分块处理的最大元素数，避免长序列一次性展开占用过多内存
+WINDOW_CHUNK_ELEMENTS = 1 << 20
+
+
+def register_window_kernel(name: str):
+    """
+    注册滑动窗口归约内核的装饰器
+
+    Args:
+        name: 内核名称，例如 "mean"、"mad"
+    """
+    def decorator(func: Callable[[np.ndarray, int], np.ndarray]):
+        WINDOW_KERNELS[name] = func
+        return func
+    return decorator
+
+
+def rolling_window(name: str, values: np.ndarray, window: int) -> np.ndarray:
+    """
+    按名称调用已注册的滑动窗口归约内核（沿第0轴，即时间轴）
+
+    Args:
+        name: 内核名称
+        values: 一维序列，或 (时间, 品种) 的二维数组
+        window: 窗口长度
+
+    Returns:
+        与输入形状相同的结果
+    """
+    kernel = WINDOW_KERNELS.get(name)
+    if kernel is None:
+        raise ValueError(f"Unsupported window kernel: {name}")
+    return kernel(values, window)
+
+
+def _rolling(values: np.ndarray, window: int):
+    frame = pd.Series(values, copy=False) if values.ndim == 1 else pd.DataFrame(values, copy=False)
+    return frame.rolling(window=window)
+
+
+@register_window_kernel("mean")
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """滚动均值"""
+    return _rolling(values, window).mean().to_numpy()
+
+
+@register_window_kernel("sum")
+def rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """滚动求和"""
+    return _rolling(values, window).sum().to_numpy()
+
+
+@register_window_kernel("std")
+def rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    """滚动样本标准差"""
+    return _rolling(values, window).std().to_numpy()
+
+
+@register_window_kernel("max")
+def rolling_max(values: np.ndarray, window: int) -> np.ndarray:
+    """滚动最大值"""
+    return _rolling(values, window).max().to_numpy()
+
+
+@register_window_kernel("min")
+def rolling_min(values: np.ndarray, window: int) -> np.ndarray:
+    """滚动最小值"""
+    return _rolling(values, window).min().to_numpy()
+
+
+@register_window_kernel("mad")
+def rolling_mad(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    滚动平均绝对偏差 mean(|x - mean(x)|)
+
+    使用滑动窗口视图一次计算一批窗口，替代 rolling.apply 的逐行 Python 回调。
+    每个窗口先复制为连续内存，使求和顺序与对单个窗口调用 np.mean 完全相同，
+    因此结果与原实现逐位一致。
+
+    Args:
+        values: 一维序列，或 (时间, 品种) 的二维数组
+        window: 窗口长度
+
+    Returns:
+        与输入形状相同的结果，前 window-1 个位置为 NaN
+    """
+    values = np.asarray(values, dtype=np.float64)
+    result = np.full(values.shape, np.nan)
+    count = values.shape[0] - window + 1
+    if window < 1 or count <= 0:
+        return result
+
+    # windows 形状为 (窗口数, [品种,] 窗口长度)
+    windows = sliding_window_view(values, window, axis=0)
+    row_elements = window * (values[0].size if values.ndim > 1 else 1)
+    chunk = max(1, WINDOW_CHUNK_ELEMENTS // row_elements)
+    for start in range(0, count, chunk):
+        block = np.ascontiguousarray(windows[start:start + chunk])
+        mean = np.mean(block, axis=-1, keepdims=True)
+        result[window - 1 + start:window - 1 + start + len(block)] = np.mean(np.abs(block - mean), axis=-1)
+    return result
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """
+    计算真实波幅(TR)
+
+    Args:
+        high: 最高价
+        low: 最低价
+        close: 收盘价
+
+    Returns:
+        真实波幅，首根K线没有前收盘价，取 high - low
+    """
+    prev_close = np.empty_like(close)
+    prev_close[:1] = np.nan
+    prev_close[1:] = close[:-1]
+
+    return np.fmax(np.fmax(np.abs(high - low), np.abs(high - prev_close)),
+                   np.abs(low - prev_close))
+
+
+def directional_movement(high: np.ndarray, low: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    计算方向运动 +DM / -DM
+
+    Args:
+        high: 最高价
+        low: 最低价
+
+    Returns:
+        (+DM, -DM)，首根K线为0
+    """
+    up_move = high[1:] - high[:-1]
+    down_move = low[:-1] - low[1:]
+
+    plus_dm = np.zeros_like(high)
+    minus_dm = np.zeros_like(low)
+    plus_dm[1:] = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
+    minus_dm[1:] = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)
+    return plus_dm, minus_dm
+
+
+def money_flow(typical_price: np.ndarray, volume: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    按典型价格涨跌拆分正负资金流量
+
+    Args:
+        typical_price: 典型价格
+        volume: 成交量
+
+    Returns:
+        (正资金流量, 负资金流量)，典型价格不变时两者都为0
+    """
+    raw_money_flow = typical_price * volume
+    rising = typical_price[1:] > typical_price[:-1]
+    falling = typical_price[1:] < typical_price[:-1]
+
+    positive_flow = np.zeros_like(raw_money_flow)
+    negative_flow = np.zeros_like(raw_money_flow)
+    positive_flow[1:] = np.where(rising, raw_money_flow[1:], 0.0)
+    negative_flow[1:] = np.where(falling, raw_money_flow[1:], 0.0)
+    return positive_flow, negative_flow
+
+
+def obv(close: np.ndarray, volume: np.ndarray) -> np.ndarray:
+    """
+    计算能量潮指标(OBV)
+
+    Args:
+        close: 收盘价
+        volume: 成交量
+
+    Returns:
+        OBV，第一根为0
+    """
+    signed_volume = np.zeros_like(volume)
+    signed_volume[1:] = np.sign(close[1:] - close[:-1]) * volume[1:]
+    return np.cumsum(signed_volume, axis=0)
+
+
+def parabolic_sar(high: np.ndarray,
+                  low: np.ndarray,
+                  close: np.ndarray,
+                  acceleration: float = 0.02,
+                  maximum: float = 0.2,
+                  return_state: bool = False):
+    """
+    计算抛物线转向指标(Parabolic SAR)
+
+    SAR 依赖上一根的状态，无法向量化，这里用纯浮点状态循环实现，
+    不做任何 pandas 标量索引。
+
+    Args:
+        high: 最高价，一维序列或 (时间, 品种) 的二维数组（二维时逐列计算）
+        low: 最低价
+        close: 收盘价
+        acceleration: 步长
+        maximum: 最大步长
+        return_state: 是否同时返回最后一根之后的状态 (sar, 是否多头, 步长, 极值点)，
+            用于接续增量计算
+
+    Returns:
+        SAR 数组，不足两根K线时全部为 NaN；return_state 为 True 时返回 (SAR 数组, 状态)，
+        不足两根K线时状态为 None
+    """
+    if np.ndim(close) == 2 and not return_state:
+        # (时间, 品种) 二维输入逐列计算，状态循环按时间展开对少量品种没有收益
+        return np.column_stack([parabolic_sar(high[:, j], low[:, j], close[:, j], acceleration, maximum)
+                                for j in range(close.shape[1])]).reshape(close.shape)
+
+    n = len(close)
+    if n < 2:
+        sar = np.full(n, np.nan)
+        return (sar, None) if return_state else sar
+
+    high = high.tolist()
+    low = low.tolist()
+    sar = [0.0] * n
+
+    # 判断初始趋势
+    bull = close[1] >= close[0]
+    af = acceleration
+    if bull:
+        ep = high[0]
+        prev = low[0]
+    else:
+        ep = low[0]
+        prev = high[0]
+    sar[0] = prev
+
+    for i in range(1, n):
+        psar = prev + af * (ep - prev)
+        if bull:
+            if low[i - 1] < psar:
+                psar = low[i - 1]
+            if i > 1 and low[i - 2] < psar:
+                psar = low[i - 2]
+            if low[i] < psar:
+                # 反转为空头，当根SAR为上一趋势极值
+                bull = False
+                psar = ep
+                af = acceleration
+                ep = low[i]
+            elif high[i] > ep:
+                ep = high[i]
+                af = min(af + acceleration, maximum)
+        else:
+            if high[i - 1] > psar:
+                psar = high[i - 1]
+            if i > 1 and high[i - 2] > psar:
+                psar = high[i - 2]
+            if high[i] > psar:
+                # 反转为多头
+                bull = True
+                psar = ep
+                af = acceleration
+                ep = high[i]
+            elif low[i] < ep:
+                ep = low[i]
+                af = min(af + acceleration, maximum)
+        sar[i] = psar
+        prev = psar
+
+    sar = np.array(sar, dtype=np.float64)
+    if return_state:
+        return sar, (prev, bull, af, ep)
+    return sar
+
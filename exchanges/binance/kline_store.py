@@ -0,0 +1,317 @@
+# exchanges/binance/kline_store.py
+import json
+import os
+import threading
+from typing import List, Dict, Any, Optional, Tuple, Union
+
+import numpy as np
+
+from .futures import _FuturesClientBase
+from .klines import COLUMNS, KlineColumns, RawRows
+
+# 本地K线存储目录（如 data/klines），为空（默认）时不启用
+STORE_DIR = os.getenv("KLINE_STORE_DIR", "")
+
+# 存储的列：K线数值列，以及每根K线的原始 JSON 文本在 rows.bin 中的结束位置
+STORE_COLUMNS = {**COLUMNS, "raw_end": np.int64}
+
+
+class KlineStore:
+    """
+    本地持久化K线存储（按 交易对/周期 分目录，列式、只追加、可内存映射）
+
+    每个 (交易对, 周期) 由若干固定容量的段组成，每段每列一个 .npy 文件，通过 np.memmap 读写。
+    每根K线的原始 JSON 文本以逗号分隔依次写入段内的 rows.bin，转换为旧格式时与接口返回的字符串完全相同。
+    manifest.json 记录每段的容量、行数、首末 open_time 和 rows.bin 的有效长度；数据写入并刷盘后才更新 manifest，
+    写入中断时超出行数的部分会被忽略。段内与段间 open_time 严格递增，范围读取用二分查找定位。
+    没有 raw_size 的段（旧版本写入，或追加过没有原始K线的数据）只有数值列。
+    """
+
+    SEGMENT_ROWS = 65536
+
+    def __init__(self,
+                 root: str,
+                 interval_ms: Optional[Dict[str, int]] = None,
+                 segment_rows: int = SEGMENT_ROWS):
+        """
+        Args:
+            root: 存储根目录
+            interval_ms: K线周期 -> 毫秒数，只支持其中的周期
+            segment_rows: 新建段的容量(行)
+        """
+        self.root = root
+        self.interval_ms = interval_ms or _FuturesClientBase.INTERVAL_MS
+        self.segment_rows = segment_rows
+        self._manifests: Dict[Tuple[str, str], List[Dict[str, int]]] = {}
+        self._maps: Dict[str, np.ndarray] = {}
+        self._lock = threading.RLock()
+
+    # ---------- 文件布局 ----------
+
+    def _dir(self, symbol: str, interval: str) -> str:
+        if interval not in self.interval_ms:
+            raise ValueError(f"Unsupported interval for kline store: {interval}")
+        return os.path.join(self.root, symbol, interval)
+
+    def _manifest(self, symbol: str, interval: str) -> List[Dict[str, int]]:
+        key = (symbol, interval)
+        if key not in self._manifests:
+            path = os.path.join(self._dir(symbol, interval), "manifest.json")
+            segments = []
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    segments = json.load(f)["segments"]
+            self._manifests[key] = segments
+        return self._manifests[key]
+
+    def _save_manifest(self, symbol: str, interval: str, segments: List[Dict[str, int]]) -> None:
+        directory = self._dir(symbol, interval)
+        path = os.path.join(directory, "manifest.json")
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"columns": list(COLUMNS), "segments": segments}, f)
+        os.replace(path + ".tmp", path)
+        self._manifests[(symbol, interval)] = segments
+
+    def _column(self, symbol: str, interval: str, segment: Dict[str, int], name: str) -> np.ndarray:
+        """段内某一列的内存映射（按需打开并复用）"""
+        path = os.path.join(self._dir(symbol, interval), str(segment["id"]), f"{name}.npy")
+        array = self._maps.get(path)
+        if array is None:
+            if os.path.exists(path):
+                array = np.load(path, mmap_mode="r+")
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                array = np.lib.format.open_memmap(path, mode="w+", dtype=STORE_COLUMNS[name],
+                                                  shape=(segment["capacity"],))
+            self._maps[path] = array
+        return array
+
+    def _rows_path(self, symbol: str, interval: str, segment: Dict[str, int]) -> str:
+        return os.path.join(self._dir(symbol, interval), str(segment["id"]), "rows.bin")
+
+    # ---------- 写入 ----------
+
+    def append(self, symbol: str, interval: str, klines: Union[List[Dict[str, Any]], KlineColumns]) -> int:
+        """
+        追加K线（只追加比已存储的最后一根更新的K线，调用方应只传入已收盘的K线）
+
+        Args:
+            symbol: 交易对
+            interval: K线周期
+            klines: _format_klines 格式的K线数据，或列式K线
+
+        Returns:
+            实际追加的行数
+        """
+        if not isinstance(klines, KlineColumns):
+            klines = KlineColumns.from_klines(klines, symbol, interval)
+        with self._lock:
+            segments = [dict(segment) for segment in self._manifest(symbol, interval)]
+            last = segments[-1]["last"] if segments else None
+            open_time = klines["open_time"]
+            # 按 open_time 排序去重（同一根K线只保留一次），只保留比已存储更新的K线
+            _, index = np.unique(open_time, return_index=True)
+            if last is not None:
+                index = index[open_time[index] > last]
+            if len(index) == 0:
+                return 0
+
+            values = {name: klines[name][index] for name in COLUMNS}
+            texts = klines.row_texts(index)
+            rows = len(index)
+            written = 0
+            while written < rows:
+                if not segments or segments[-1]["count"] == segments[-1]["capacity"]:
+                    segments.append({"id": segments[-1]["id"] + 1 if segments else 0, "capacity": self.segment_rows,
+                                     "count": 0, "first": int(values["open_time"][written]), "last": 0,
+                                     "raw_size": 0})
+                segment = segments[-1]
+                size = min(segment["capacity"] - segment["count"], rows - written)
+                for name in COLUMNS:
+                    column = self._column(symbol, interval, segment, name)
+                    column[segment["count"]:segment["count"] + size] = values[name][written:written + size]
+                    column.flush()
+                if "raw_size" in segment:
+                    if texts is None:
+                        # 没有原始K线的数据写入后，该段不再能还原旧格式
+                        del segment["raw_size"]
+                    else:
+                        self._append_rows(symbol, interval, segment, texts[written:written + size])
+                segment["count"] += size
+                written += size
+                segment["last"] = int(values["open_time"][written - 1])
+
+            self._save_manifest(symbol, interval, segments)
+            return written
+
+    def _append_rows(self, symbol: str, interval: str, segment: Dict[str, int], texts: List[bytes]) -> None:
+        """在段的 rows.bin 有效内容之后写入原始K线文本，并记录每根的结束位置"""
+        size = segment["raw_size"]
+        data = (b"," if size else b"") + b",".join(texts)
+        path = self._rows_path(symbol, interval, segment)
+        with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+            f.seek(size)
+            f.write(data)
+            f.truncate()
+            f.flush()
+            os.fsync(f.fileno())
+        # 每根K线文本之后跟一个逗号（最后一根除外）
+        lengths = np.array([len(text) + 1 for text in texts], dtype=np.int64)
+        column = self._column(symbol, interval, segment, "raw_end")
+        column[segment["count"]:segment["count"] + len(texts)] = size + (1 if size else 0) + np.cumsum(lengths) - 1
+        column.flush()
+        segment["raw_size"] = size + len(data)
+
+    # ---------- 读取 ----------
+
+    def count(self, symbol: str, interval: str) -> int:
+        """已存储的K线根数"""
+        with self._lock:
+            return sum(segment["count"] for segment in self._manifest(symbol, interval))
+
+    def last_open_time(self, symbol: str, interval: str) -> Optional[int]:
+        """已存储的最后一根K线的 open_time"""
+        with self._lock:
+            segments = self._manifest(symbol, interval)
+            return segments[-1]["last"] if segments else None
+
+    def last_close_time(self, symbol: str, interval: str) -> Optional[int]:
+        """已存储的最后一根K线的 close_time"""
+        with self._lock:
+            segments = self._manifest(symbol, interval)
+            if not segments:
+                return None
+            segment = segments[-1]
+            return int(self._column(symbol, interval, segment, "close_time")[segment["count"] - 1])
+
+    def read(self,
+             symbol: str,
+             interval: str,
+             start_time: Optional[int] = None,
+             end_time: Optional[int] = None,
+             limit: Optional[int] = None,
+             rows: bool = True) -> KlineColumns:
+        """
+        按 open_time 范围读取K线（与 REST 接口语义一致：指定开始时间时取最早的 limit 根，否则取最近的 limit 根）
+
+        Args:
+            symbol: 交易对
+            interval: K线周期
+            start_time: 开始时间戳 (毫秒)，包含
+            end_time: 结束时间戳 (毫秒)，包含
+            limit: 最多返回的根数
+            rows: 是否读取原始K线文本（转换为旧格式时需要）
+
+        Returns:
+            列式K线视图，范围内有不保存原始K线的段时 rows 为 None
+        """
+        with self._lock:
+            parts = []
+            for segment in self._manifest(symbol, interval):
+                if (start_time is not None and segment["last"] < start_time) or \
+                        (end_time is not None and segment["first"] > end_time):
+                    continue
+                open_time = self._column(symbol, interval, segment, "open_time")[:segment["count"]]
+                lo = 0 if start_time is None else int(np.searchsorted(open_time, start_time, side="left"))
+                hi = segment["count"] if end_time is None else int(np.searchsorted(open_time, end_time, side="right"))
+                if lo < hi:
+                    parts.append((segment, lo, hi))
+
+            if limit is not None:
+                parts = self._limit(parts, limit, from_start=start_time is not None)
+
+            columns = {}
+            for name in COLUMNS:
+                views = [self._column(symbol, interval, segment, name)[lo:hi] for segment, lo, hi in parts]
+                if len(views) == 1:
+                    column = views[0].view(np.ndarray)
+                    column.flags.writeable = False
+                else:
+                    column = np.concatenate(views) if views else np.empty(0, dtype=COLUMNS[name])
+                columns[name] = column
+            return KlineColumns(symbol, interval, columns, self._read_rows(symbol, interval, parts) if rows else None)
+
+    def _read_rows(self,
+                   symbol: str,
+                   interval: str,
+                   parts: List[Tuple[Dict[str, int], int, int]]) -> Optional[RawRows]:
+        """读取各段 [lo, hi) 行的原始K线文本，任意一段没有时返回 None"""
+        pieces = []
+        for segment, lo, hi in parts:
+            if "raw_size" not in segment:
+                return None
+            raw_end = self._column(symbol, interval, segment, "raw_end")
+            ends = np.array(raw_end[lo:hi])
+            start = int(raw_end[lo - 1]) + 1 if lo else 0
+            with open(self._rows_path(symbol, interval, segment), "rb") as f:
+                f.seek(start)
+                body = f.read(int(ends[-1]) - start)
+            starts = np.concatenate([[start], ends[:-1] + 1])
+            pieces.append(RawRows(body, np.column_stack([starts, ends]) - start))
+        if not pieces:
+            return RawRows(b"", np.empty((0, 2), dtype=np.int64))
+        return RawRows.concat(pieces)
+
+    @staticmethod
+    def _limit(parts: List[Tuple[Dict[str, int], int, int]], limit: int, from_start: bool):
+        """从开头或末尾截取 limit 行"""
+        result = []
+        remaining = limit
+        for segment, lo, hi in (parts if from_start else reversed(parts)):
+            if remaining <= 0:
+                break
+            size = min(hi - lo, remaining)
+            result.append((segment, lo, lo + size) if from_start else (segment, hi - size, hi))
+            remaining -= size
+        return result if from_start else result[::-1]
+
+    def gaps(self,
+             symbol: str,
+             interval: str,
+             start_time: Optional[int] = None,
+             end_time: Optional[int] = None) -> List[Tuple[int, int]]:
+        """
+        检测缺失的K线
+
+        Args:
+            symbol: 交易对
+            interval: K线周期
+            start_time: 检查范围的开始时间 (毫秒)，早于已存储的第一根K线时开头也算缺失
+            end_time: 检查范围的结束时间 (毫秒)，晚于已存储的最后一根K线时末尾也算缺失
+
+        Returns:
+            缺失区间列表 [(第一根缺失K线的 open_time, 最后一根缺失K线的 open_time)]
+        """
+        step = self.interval_ms[interval]
+        open_time = self.read(symbol, interval, start_time, end_time, rows=False)["open_time"]
+        if len(open_time) == 0:
+            return [(start_time, end_time)] if start_time is not None and end_time is not None else []
+
+        gaps = []
+        if start_time is not None and open_time[0] - step >= start_time:
+            gaps.append((int(open_time[0] - (open_time[0] - start_time) // step * step), int(open_time[0] - step)))
+        for i in np.flatnonzero(np.diff(open_time) != step).tolist():
+            gaps.append((int(open_time[i] + step), int(open_time[i + 1] - step)))
+        if end_time is not None and open_time[-1] + step <= end_time:
+            gaps.append((int(open_time[-1] + step), int(open_time[-1] + (end_time - open_time[-1]) // step * step)))
+        return gaps
+
+    def stats(self) -> Dict[str, Any]:
+        """获取每个 (交易对, 周期) 的存储行数和时间范围"""
+        with self._lock:
+            result = {}
+            if not os.path.isdir(self.root):
+                return result
+            for symbol in sorted(os.listdir(self.root)):
+                for interval in sorted(os.listdir(os.path.join(self.root, symbol))):
+                    if interval not in self.interval_ms:
+                        continue
+                    segments = self._manifest(symbol, interval)
+                    if segments:
+                        result[f"{symbol}@{interval}"] = {
+                            "rows": self.count(symbol, interval),
+                            "segments": len(segments),
+                            "first_open_time": segments[0]["first"],
+                            "last_open_time": segments[-1]["last"]
+                        }
+            return result
@@ -0,0 +1,297 @@
+# exchanges/binance/klines.py
+import json
+from typing import List, Dict, Any, Optional, Tuple, Union
+
+import numpy as np
+
+# 列名 -> 类型（与 _format_klines 的字段对应，ignore 字段只保留在原始K线中）
+COLUMNS = {
+    "open_time": np.int64,
+    "open": np.float64,
+    "high": np.float64,
+    "low": np.float64,
+    "close": np.float64,
+    "volume": np.float64,
+    "close_time": np.int64,
+    "quote_asset_volume": np.float64,
+    "number_of_trades": np.int64,
+    "taker_buy_base_asset_volume": np.float64,
+    "taker_buy_quote_asset_volume": np.float64,
+}
+
+# 币安K线接口每根K线数组的长度（前11项依次对应 COLUMNS，最后一项为 ignore）
+RAW_FIELDS = 12
+
+
+def format_rows(rows: List[List], symbol: str, interval: str) -> List[Dict[str, Any]]:
+    """
+    把币安接口返回的原始K线数组转换为旧的字符串字典格式（即 _format_klines 的格式）
+
+    Args:
+        rows: 原始K线数据
+        symbol: 交易对
+        interval: K线周期
+
+    Returns:
+        K线数据列表
+    """
+    names = list(COLUMNS)
+    return [{"symbol": symbol, "interval": interval, **dict(zip(names, map(str, row))), "ignore": row[11]}
+            for row in rows]
+
+
+class RawRows:
+    """
+    一段K线的原始 JSON 文本（接口响应或本地存储中的字节，按行切片时不复制）
+
+    第 i 根K线数组的文本为 body[bounds[i, 0]:bounds[i, 1]]。相邻K线之间只有逗号（和空白），
+    任意连续几根K线的文本加上方括号就是合法的 JSON 数组，需要旧格式时再解析，字符串与接口返回的完全相同。
+    """
+
+    def __init__(self, body: bytes, bounds: np.ndarray):
+        self.body = body
+        self.bounds = bounds
+
+    @classmethod
+    def from_texts(cls, texts: List[bytes]) -> "RawRows":
+        """由每根K线数组的文本构造（以逗号拼接）"""
+        lengths = np.array([len(text) for text in texts], dtype=np.int64)
+        starts = np.cumsum(lengths + 1) - lengths - 1
+        return cls(b",".join(texts), np.column_stack([starts, starts + lengths]))
+
+    @classmethod
+    def concat(cls, parts: List["RawRows"]) -> "RawRows":
+        """按顺序拼接多段"""
+        parts = [part for part in parts if len(part)]
+        if len(parts) == 1:
+            return parts[0]
+        bodies, bounds, offset = [], [], 0
+        for part in parts:
+            body = part.text()
+            bodies.append(body)
+            bounds.append(part.bounds - part.bounds[0, 0] + offset)
+            offset += len(body) + 1
+        return cls(b",".join(bodies), np.concatenate(bounds) if bounds else np.empty((0, 2), dtype=np.int64))
+
+    def __len__(self) -> int:
+        return len(self.bounds)
+
+    def __getitem__(self, index: slice) -> "RawRows":
+        return RawRows(self.body, self.bounds[index])
+
+    def text(self) -> bytes:
+        """从第一根到最后一根K线的连续文本"""
+        if not len(self.bounds):
+            return b""
+        return self.body[self.bounds[0, 0]:self.bounds[-1, 1]]
+
+    def texts(self, index: np.ndarray) -> List[bytes]:
+        """指定各行的K线数组文本"""
+        return [self.body[start:end] for start, end in self.bounds[index].tolist()]
+
+    def decode(self) -> List[List]:
+        """解析为原始K线数组"""
+        return json.loads(b"[" + self.text() + b"]")
+
+
+class KlineColumns:
+    """
+    一段K线的列式表示（每个字段一个 int64/float64 数组）
+
+    由响应字节直接解析得到，或是本地存储的内存映射切片（单段内不复制）。
+    指标引擎直接在价格列上计算；只有接口需要旧的字符串字典格式时才调用 to_klines 转换。
+    按列编码的接口响应中 columns 还可以包含指标列。
+
+    rows 保留K线的原始形式：解析响应时为响应字节（RawRows），由旧格式K线构造时为原来的字典列表，
+    to_klines 由它还原出与接口返回完全相同的字符串（如 "50000.10"），而不是由浮点数重新格式化。
+    """
+
+    def __init__(self,
+                 symbol: str,
+                 interval: str,
+                 columns: Dict[str, np.ndarray],
+                 rows: Optional[Union[RawRows, List[Dict[str, Any]]]] = None):
+        self.symbol = symbol
+        self.interval = interval
+        self.columns = columns
+        self.rows = rows
+
+    @classmethod
+    def from_rows(cls, rows: List[List], symbol: str, interval: str) -> "KlineColumns":
+        """
+        由币安接口返回的原始K线数组构造
+
+        Args:
+            rows: 原始K线数据（每根K线为 [open_time, open, high, ...] 数组）
+            symbol: 交易对
+            interval: K线周期
+
+        Returns:
+            列式K线
+        """
+        values = np.array([row[:len(COLUMNS)] for row in rows], dtype=object).reshape(len(rows), len(COLUMNS))
+        return cls(symbol, interval,
+                   {name: values[:, i].astype(dtype) for i, (name, dtype) in enumerate(COLUMNS.items())},
+                   format_rows(rows, symbol, interval))
+
+    @classmethod
+    def from_klines(cls,
+                    klines: List[Dict[str, Any]],
+                    symbol: Optional[str] = None,
+                    interval: Optional[str] = None) -> "KlineColumns":
+        """
+        由 _format_klines 格式的K线构造
+
+        Args:
+            klines: K线数据列表
+            symbol: 交易对，为 None 时取K线中的值
+            interval: K线周期，为 None 时取K线中的值
+
+        Returns:
+            列式K线
+        """
+        first = klines[0] if klines else {}
+        columns = {}
+        for name, dtype in COLUMNS.items():
+            convert = int if dtype is np.int64 else float
+            columns[name] = np.array([convert(kline[name]) for kline in klines], dtype=dtype)
+        return cls(symbol or first.get("symbol"), interval or first.get("interval"), columns, list(klines))
+
+    def __len__(self) -> int:
+        return len(self.columns["open_time"])
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    @property
+    def nbytes(self) -> int:
+        """各列数组占用的字节数"""
+        return sum(column.nbytes for column in self.columns.values())
+
+    def is_contiguous(self, interval_ms: int) -> bool:
+        """相邻K线是否都相差一个周期"""
+        open_time = self.columns["open_time"]
+        return len(open_time) == 0 or int(open_time[-1] - open_time[0]) == (len(open_time) - 1) * interval_ms
+
+    def slice(self, start: Optional[int] = None, stop: Optional[int] = None) -> "KlineColumns":
+        """按行切片（各列和原始K线都不复制）"""
+        rows = None if self.rows is None else self.rows[start:stop]
+        return KlineColumns(self.symbol, self.interval,
+                            {name: column[start:stop] for name, column in self.columns.items()}, rows)
+
+    @classmethod
+    def concat(cls, parts: List["KlineColumns"]) -> "KlineColumns":
+        """
+        按顺序拼接多段K线（各段的列相同）
+
+        原始K线都是响应字节时拼接字节，否则转换为旧格式后拼接，任意一段没有原始K线时结果也没有。
+        """
+        first = parts[0]
+        columns = {name: np.concatenate([part.columns[name] for part in parts]) for name in first.columns}
+        rows = None
+        if all(part.rows is not None for part in parts):
+            if all(isinstance(part.rows, RawRows) for part in parts):
+                rows = RawRows.concat([part.rows for part in parts])
+            else:
+                rows = [kline for part in parts for kline in part.to_klines()]
+        return cls(first.symbol, first.interval, columns, rows)
+
+    def row_texts(self, index: np.ndarray) -> Optional[List[bytes]]:
+        """
+        指定各行原始K线数组的 JSON 文本（写入本地存储使用）
+
+        Returns:
+            每行的文本，没有原始K线时返回 None
+        """
+        if self.rows is None:
+            return None
+        if isinstance(self.rows, RawRows):
+            return self.rows.texts(index)
+        return [json.dumps([self.rows[i][name] for name in list(COLUMNS) + ["ignore"]],
+                           separators=(",", ":")).encode() for i in index.tolist()]
+
+    def to_klines(self) -> List[Dict[str, Any]]:
+        """
+        转换为 _format_klines 格式的K线（只在接口边界使用）
+
+        由原始K线还原，所有字段（包括 ignore）与接口返回的完全相同，不由浮点数重新格式化。
+
+        Returns:
+            K线数据列表
+
+        Raises:
+            ValueError: 没有保留原始K线（如只有数值列的存储数据）
+        """
+        if self.rows is None:
+            raise ValueError("Original klines are not available for legacy conversion")
+        if isinstance(self.rows, RawRows):
+            return format_rows(self.rows.decode(), self.symbol, self.interval)
+        return list(self.rows)
+
+    def window_key(self) -> Optional[Tuple]:
+        """
+        K线窗口标识（交易对、周期、首根开盘时间、根数、末根收盘时间和价格成交量），用于指标结果缓存
+
+        Returns:
+            可哈希的窗口标识，没有K线时返回 None
+        """
+        if len(self) == 0:
+            return None
+        return (self.symbol, self.interval, int(self.columns["open_time"][0]), len(self),
+                int(self.columns["close_time"][-1])) + tuple(float(self.columns[name][-1])
+                                                             for name in ("high", "low", "close", "volume"))
+
+    def engine(self, engine_class=None, klines: Optional[List[Dict[str, Any]]] = None):
+        """
+        直接在价格列上构造指标引擎（不复制），指标结果缓存以 window_key 为窗口标识
+
+        Args:
+            engine_class: 引擎类，默认为当前指标后端
+            klines: 生成结果行所需的旧格式K线（to_klines），只计算指标列时可省略
+
+        Returns:
+            引擎实例
+        """
+        if engine_class is None:
+            from .indicators import TechnicalIndicators
+            engine_class = TechnicalIndicators.engine_class
+        return engine_class.from_arrays(self.columns["high"], self.columns["low"], self.columns["close"],
+                                        self.columns["volume"], klines=klines, window=self.window_key())
+
+
+def parse_klines(body: Union[bytes, str], symbol: str, interval: str) -> KlineColumns:
+    """
+    把K线接口的响应内容直接解析为列式K线，不经过每个字段的 Python 字符串和字典
+
+    币安返回的是只含数字和数字字符串的二维数组，去掉引号和括号后就是逗号分隔的数字序列，
+    由 NumPy 一次解析为 float64 矩阵（时间戳小于 2^53，转换为 int64 时没有精度损失）。
+    内容不符合该格式时回退为 JSON 解析。
+
+    Args:
+        body: 响应内容
+        symbol: 交易对
+        interval: K线周期
+
+    Returns:
+        列式K线
+    """
+    if isinstance(body, str):
+        body = body.encode()
+    rows = body.count(b"[") - 1
+    try:
+        values = np.fromstring(body.translate(None, b'"[] \n'), sep=",")
+    except ValueError:
+        values = None
+    if rows < 0 or values is None or values.size != rows * RAW_FIELDS:
+        data = json.loads(body)
+        if not isinstance(data, list):
+            raise ValueError(f"Unexpected klines response: {body[:200]!r}")
+        return KlineColumns.from_rows(data, symbol, interval)
+
+    values = values.reshape(rows, RAW_FIELDS)
+    # 内容只有数字、引号、逗号和括号，除最外层外每对方括号就是一根K线
+    array = np.frombuffer(body, dtype=np.uint8)
+    bounds = np.column_stack([np.flatnonzero(array == ord("["))[1:], np.flatnonzero(array == ord("]"))[:-1] + 1])
+    return KlineColumns(symbol, interval, {name: np.ascontiguousarray(values[:, i], dtype=dtype)
+                                           for i, (name, dtype) in enumerate(COLUMNS.items())},
+                        RawRows(body, bounds))
@@ -0,0 +1,212 @@
+# exchanges/binance/planner.py
+from typing import List, Dict, Any, Optional, Tuple, NamedTuple, Union
+
+# 指标之间共享的中间量及其依赖（名称与 IndicatorEngine 上的 _<name> 方法对应）
+INTERMEDIATES = {
+    "typical_price": {"description": "典型价格 (high + low + close) / 3", "requires": []},
+    "true_range": {"description": "真实波幅", "requires": []},
+    "directional_movement": {"description": "方向运动 +DM / -DM", "requires": []},
+    "money_flow": {"description": "按典型价格涨跌拆分的正负资金流量", "requires": ["typical_price"]},
+    "money_flow_volume": {"description": "CLV * 成交量", "requires": []},
+    "rolling_high": {"description": "窗口内最高价", "requires": []},
+    "rolling_low": {"description": "窗口内最低价", "requires": []},
+}
+
+# 参数类型转换
+PARAMETER_TYPES = {"int": int, "float": float}
+
+
+class IndicatorRequest(NamedTuple):
+    """单个指标请求：名称及完整参数（已补齐默认值，可哈希）"""
+    name: str
+    params: Tuple[Tuple[str, Any], ...]
+
+    @property
+    def kwargs(self) -> Dict[str, Any]:
+        return dict(self.params)
+
+
+IndicatorSpec = Union[str, IndicatorRequest, Tuple[str, Dict[str, Any]]]
+
+
+class IndicatorPlan:
+    """指标执行计划：按拓扑顺序排列的中间量，以及按请求顺序排列的指标"""
+
+    def __init__(self, intermediates: List[Tuple], indicators: List[IndicatorRequest]):
+        self.intermediates = intermediates
+        self.indicators = indicators
+
+    def execute(self, engine, memo=None):
+        """
+        在引擎上执行计划
+
+        Args:
+            engine: IndicatorEngine 实例
+            memo: 可选的结果缓存（LRUCache），以 (K线窗口标识, 指标请求) 为键保存指标列，
+                命中时直接复用，未命中的指标才会计算（中间量按需计算）
+
+        Returns:
+            执行后的引擎（指标结果在 engine.columns 中）
+        """
+        if memo is None:
+            for key in self.intermediates:
+                engine.intermediate(*key)
+            for request in self.indicators:
+                getattr(engine, request.name)(**request.kwargs)
+            return engine
+
+        window = engine.window_key()
+        for request in self.indicators:
+            key = (window, request)
+            columns = memo.get(key)
+            if columns is None:
+                columns = engine.run(request)
+                memo.set(key, columns)
+            engine.columns.update(columns)
+        return engine
+
+
+class IndicatorPlanner:
+    """
+    依赖感知的指标计划器
+
+    根据 SUPPORTED_INDICATORS 中声明的参数和 requires（依赖的中间量），
+    为请求的指标集合构建中间量依赖图，保证每个中间量只计算一次，
+    未请求的指标不会被计算。
+
+    requires 中的 "rolling_high:k_period" 表示以参数 k_period 的值作为中间量的窗口参数。
+    """
+
+    def __init__(self, supported: Dict[str, Any]):
+        self.supported = supported
+
+    def resolve(self, name: str, params: Optional[Dict[str, Any]] = None) -> IndicatorRequest:
+        """
+        校验指标名称和参数，并补齐默认参数
+
+        Args:
+            name: 指标名称
+            params: 指标参数，未提供的使用默认值
+
+        Returns:
+            指标请求
+        """
+        spec = self.supported.get(name)
+        if spec is None:
+            raise ValueError(f"Unsupported indicator: {name}. Available indicators: {list(self.supported)}")
+
+        params = params or {}
+        declared = spec["parameters"]
+        unknown = [key for key in params if key not in declared]
+        if unknown:
+            raise ValueError(f"Unsupported parameters for {name}: {unknown}")
+
+        resolved = []
+        for key, meta in declared.items():
+            value = params.get(key, meta["default"])
+            try:
+                value = PARAMETER_TYPES[meta["type"]](value)
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid value for {name}.{key}: {value}")
+            if meta["type"] == "int" and value < 1:
+                raise ValueError(f"Invalid value for {name}.{key}: {value}")
+            resolved.append((key, value))
+        return IndicatorRequest(name, tuple(resolved))
+
+    def plan(self, indicators: List[IndicatorSpec]) -> IndicatorPlan:
+        """
+        为指标集合生成执行计划
+
+        Args:
+            indicators: 指标列表，元素可以是名称、(名称, 参数字典) 或 IndicatorRequest
+
+        Returns:
+            执行计划
+        """
+        requests: List[IndicatorRequest] = []
+        for item in indicators:
+            if isinstance(item, IndicatorRequest):
+                request = item
+            elif isinstance(item, str):
+                request = self.resolve(item)
+            else:
+                request = self.resolve(*item)
+            if request not in requests:
+                requests.append(request)
+        self._check_outputs(requests)
+
+        order: List[Tuple] = []
+        for request in requests:
+            params = request.kwargs
+            for requirement in self.supported[request.name].get("requires", []):
+                name, *arg_names = requirement.split(":")
+                self._visit((name,) + tuple(params[arg] for arg in arg_names), order, set())
+        return IndicatorPlan(order, requests)
+
+    def outputs(self, request: IndicatorRequest) -> List[str]:
+        """
+        获取指标请求的输出字段名（outputs 中的 {参数名} 按请求参数填充）
+
+        Args:
+            request: 指标请求
+
+        Returns:
+            输出字段名列表
+        """
+        return [template.format(**request.kwargs) for template in self.supported[request.name]["outputs"]]
+
+    def _check_outputs(self, requests: List[IndicatorRequest]) -> None:
+        """同一计划中不同请求的输出字段不能重名，否则后计算的会覆盖先计算的"""
+        owners: Dict[str, IndicatorRequest] = {}
+        for request in requests:
+            for name in self.outputs(request):
+                if name in owners:
+                    raise ValueError(f"Conflicting indicator outputs: {name} is produced by both "
+                                     f"{self.format(owners[name])} and {self.format(request)}")
+                owners[name] = request
+
+    def _visit(self, key: Tuple, order: List[Tuple], visiting: set) -> None:
+        """深度优先遍历，依赖先于使用者加入执行顺序"""
+        if key in order:
+            return
+        if key in visiting:
+            raise ValueError(f"Circular intermediate dependency: {key[0]}")
+        if key[0] not in INTERMEDIATES:
+            raise ValueError(f"Unknown intermediate: {key[0]}")
+
+        visiting.add(key)
+        for dependency in INTERMEDIATES[key[0]]["requires"]:
+            self._visit((dependency,), order, visiting)
+        visiting.discard(key)
+        order.append(key)
+
+    def parse(self, selection: Optional[str]) -> Optional[List[IndicatorRequest]]:
+        """
+        解析逗号分隔的指标列表，每项可以用冒号按参数声明顺序附带参数
+
+        例如 "rsi:9,ema:20,ema:50,bollinger_bands:20:2"，省略或留空的参数使用默认值，
+        如 "stochastic::5" 只指定 d_period。
+
+        Args:
+            selection: 指标列表字符串
+
+        Returns:
+            指标请求列表，为空时返回 None（表示计算全部默认指标）
+        """
+        if selection is None or not selection.strip():
+            return None
+
+        requests = []
+        for item in selection.split(","):
+            if not item.strip():
+                continue
+            name, *values = [part.strip() for part in item.split(":")]
+            declared = list(self.supported.get(name, {}).get("parameters", {}))
+            if len(values) > len(declared) and name in self.supported:
+                raise ValueError(f"Too many parameters for {name}: expected at most {len(declared)} ({', '.join(declared)})")
+            requests.append(self.resolve(name, {key: value for key, value in zip(declared, values) if value}))
+        return requests
+
+    def format(self, request: IndicatorRequest) -> str:
+        """将指标请求格式化为 parse 接受的 "名称:参数1:参数2" 形式"""
+        return ":".join([request.name] + [str(value) for _, value in request.params])
@@ -0,0 +1,233 @@
+# exchanges/binance/push.py
+import asyncio
+import logging
+import os
+from typing import List, Dict, Any, Optional, Set, Tuple
+
+from .indicators import TechnicalIndicators
+
+logger = logging.getLogger(__name__)
+
+# 没有K线推送（未启用或断线）时重新计算的间隔(秒)
+PUSH_POLL_INTERVAL = float(os.getenv("KLINE_PUSH_POLL_INTERVAL", "5"))
+# 每个订阅连接最多积压的消息数，超出时丢弃最旧的消息
+PUSH_QUEUE_SIZE = int(os.getenv("KLINE_PUSH_QUEUE_SIZE", "100"))
+
+
+class PushTopic:
+    """一个 (交易对, 周期, 指标) 订阅，所有订阅者共用同一次计算"""
+
+    def __init__(self, symbol, interval: str, indicators: Optional[str], selection: Optional[List[Any]]):
+        """
+        Args:
+            symbol: 交易对（Symbol / FuturesSymbol）
+            interval: K线周期
+            indicators: 规范化的指标字符串（推送消息中返回给订阅者）
+            selection: 解析后的指标列表，为 None 时计算全部默认指标
+        """
+        self.symbol = symbol
+        self.interval = interval
+        self.indicators = indicators
+        self.selection = selection
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.updated = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        # 最近一次推送的最后一根K线，以及新订阅者收到的快照
+        self.last_row: Optional[Dict[str, Any]] = None
+        self.snapshot: Optional[Dict[str, Any]] = None
+        self.computations = 0
+        self.pushes = 0
+        self.errors = 0
+
+
+class KlinePushHub:
+    """
+    K线和技术指标的实时推送中心
+
+    客户端按 (交易对, 周期, 指标) 订阅，指标按规范化后的集合区分（顺序、空格和默认参数的写法不影响），
+    每个订阅由一个后台任务计算：收到该交易对和周期的K线推送时
+    （没有推送时每 poll_interval 秒）取最近的K线计算指标，只把最后一根K线的结果推给所有订阅者，
+    开始新K线时连同刚收盘的那一根一起推送。计算期间收到的多次推送合并为一次计算，结果没有变化时不推送。
+    """
+
+    def __init__(self,
+                 client,
+                 kline_stream=None,
+                 poll_interval: float = PUSH_POLL_INTERVAL,
+                 queue_size: int = PUSH_QUEUE_SIZE):
+        """
+        Args:
+            client: AsyncBinanceFuturesClient
+            kline_stream: K线推送服务，为 None 时按 poll_interval 定时计算
+            poll_interval: 两次推送之间最长的计算间隔(秒)
+            queue_size: 每个订阅连接最多积压的消息数
+        """
+        self.client = client
+        self.kline_stream = kline_stream
+        self.poll_interval = poll_interval
+        self.queue_size = queue_size
+        self.topics: Dict[Tuple[str, str, Optional[str]], PushTopic] = {}
+        self.dropped = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def queue(self) -> asyncio.Queue:
+        """为一个订阅连接创建消息队列"""
+        return asyncio.Queue(maxsize=self.queue_size)
+
+    @staticmethod
+    def topic_key(symbol, interval: str, selection: Optional[List[Any]] = None) -> Tuple[str, str, Optional[str]]:
+        """
+        订阅键：(交易对, 周期, 规范化的指标字符串)
+
+        指标去重并排序后格式化为 "名称:参数1:参数2"（补齐默认参数），
+        如 "ema:20,rsi:9" 与 "rsi:9, ema:20" 得到同一个键；selection 为 None 时指标为 None（全部默认指标）。
+        """
+        indicators = None
+        if selection is not None:
+            indicators = ",".join(sorted({TechnicalIndicators.planner.format(request) for request in selection}))
+        return symbol.value, interval, indicators
+
+    def subscribe(self,
+                  queue: asyncio.Queue,
+                  symbol,
+                  interval: str,
+                  selection: Optional[List[Any]] = None) -> Tuple[str, str, Optional[str]]:
+        """
+        订阅 (交易对, 周期, 指标)，已有结果时立即把最新快照放入队列（须在事件循环中调用）
+
+        Args:
+            queue: 订阅连接的消息队列
+            symbol: 交易对
+            interval: K线周期
+            selection: 解析后的指标列表，为 None 时计算全部默认指标
+
+        Returns:
+            订阅键（见 topic_key）
+        """
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+            if self.kline_stream is not None:
+                self.kline_stream.add_listener(self._on_kline)
+
+        key = self.topic_key(symbol, interval, selection)
+        topic = self.topics.get(key)
+        if topic is None:
+            topic = self.topics[key] = PushTopic(symbol, interval, key[2], selection)
+            topic.task = asyncio.ensure_future(self._run(topic))
+        topic.subscribers.add(queue)
+        if topic.snapshot is not None:
+            self.put(queue, topic.snapshot)
+        return key
+
+    def unsubscribe(self, queue: asyncio.Queue, key: Tuple[str, str, Optional[str]]) -> None:
+        """取消订阅，没有订阅者的订阅停止计算"""
+        topic = self.topics.get(key)
+        if topic is None:
+            return
+        topic.subscribers.discard(queue)
+        if not topic.subscribers:
+            topic.task.cancel()
+            del self.topics[key]
+
+    def unsubscribe_all(self, queue: asyncio.Queue) -> None:
+        """连接断开时取消它的所有订阅"""
+        for key in [key for key, topic in self.topics.items() if queue in topic.subscribers]:
+            self.unsubscribe(queue, key)
+
+    async def close(self) -> None:
+        """停止所有订阅的计算"""
+        if self.kline_stream is not None:
+            self.kline_stream.remove_listener(self._on_kline)
+        tasks = [topic.task for topic in self.topics.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.topics.clear()
+
+    def _on_kline(self, kline: Dict[str, Any]) -> None:
+        # 在推送线程中调用，转到事件循环中唤醒对应的订阅
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._notify, kline["symbol"], kline["interval"])
+
+    def _notify(self, symbol: str, interval: str) -> None:
+        for topic in self.topics.values():
+            if topic.symbol.value == symbol and topic.interval == interval:
+                topic.updated.set()
+
+    def put(self, queue: asyncio.Queue, message: Dict[str, Any]) -> None:
+        """把消息放入连接的队列，消费过慢积压过多时丢弃最旧的消息"""
+        if queue.full():
+            queue.get_nowait()
+            self.dropped += 1
+        queue.put_nowait(message)
+
+    def _publish(self, topic: PushTopic, message: Dict[str, Any]) -> None:
+        for queue in list(topic.subscribers):
+            self.put(queue, message)
+
+    async def _run(self, topic: PushTopic) -> None:
+        if self.kline_stream is not None:
+            try:
+                # 按需订阅：每次计算都会读取推送存储，订阅期间不会因空闲被淘汰
+                self.kline_stream.subscribe(topic.symbol.value, topic.interval, pinned=False)
+            except ValueError:
+                # 推送不支持的周期按 poll_interval 定时计算
+                pass
+
+        while True:
+            topic.updated.clear()
+            try:
+                await self._compute(topic)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                topic.errors += 1
+                logger.warning(f"Failed to compute pushed klines for {topic.symbol.value}@{topic.interval}: {str(e)}")
+                self._publish(topic, {"type": "error", "symbol": topic.symbol.value, "interval": topic.interval,
+                                      "indicators": topic.indicators, "detail": str(e)})
+            try:
+                await asyncio.wait_for(topic.updated.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _compute(self, topic: PushTopic) -> None:
+        """计算最近两根K线的指标，推送变化的部分"""
+        klines, warmup_count = await self.client.get_indicator_window(
+            topic.symbol, topic.interval, 2, indicators=topic.selection, warmup=True)
+        rows = await self.client.run_indicator_rows(klines, topic.selection, warmup_count)
+        topic.computations += 1
+        if not rows:
+            return
+
+        last = topic.last_row
+        if last is None:
+            rows = rows[-1:]
+        else:
+            # 开始新K线时带上刚收盘的那一根（收盘前最后的更新可能被合并掉了）
+            rows = [row for row in rows if int(row["open_time"]) >= int(last["open_time"])]
+            if rows == [last]:
+                return
+
+        message = {"type": "klines", "symbol": topic.symbol.value, "interval": topic.interval,
+                   "indicators": topic.indicators, "klines": rows}
+        topic.last_row = rows[-1]
+        topic.snapshot = dict(message, klines=rows[-1:])
+        topic.pushes += 1
+        self._publish(topic, message)
+
+    def stats(self) -> Dict[str, Any]:
+        """获取推送统计信息"""
+        return {
+            "topics": {
+                f"{symbol}@{interval}" + (f"[{indicators}]" if indicators else ""): {
+                    "subscribers": len(topic.subscribers),
+                    "computations": topic.computations,
+                    "pushes": topic.pushes,
+                    "errors": topic.errors
+                }
+                for (symbol, interval, indicators), topic in self.topics.items()
+            },
+            "subscribers": sum(len(topic.subscribers) for topic in self.topics.values()),
+            "dropped": self.dropped
+        }
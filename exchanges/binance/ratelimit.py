@@ -0,0 +1,310 @@
+# exchanges/binance/ratelimit.py
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Any, Callable, Dict, Mapping, Optional
+
+
+class Priority(IntEnum):
+    """请求优先级，数值越小越先获得权重"""
+    LIVE = 0        # 实盘交易（AI 交易员、定时交易任务）
+    NORMAL = 1      # 页面和接口查询
+    BACKFILL = 2    # 历史数据回补
+
+
+# 当前请求的优先级（随 asyncio 任务上下文传递，调用方用 request_priority 设置）
+current_priority: ContextVar[int] = ContextVar("request_priority", default=Priority.NORMAL)
+
+
+@contextmanager
+def request_priority(priority: int):
+    """在该上下文中发出的币安请求使用指定优先级排队"""
+    token = current_priority.set(priority)
+    try:
+        yield
+    finally:
+        current_priority.reset(token)
+
+
+def kline_weight(limit: int) -> int:
+    """K线类接口单次请求的权重（按 limit 分档）"""
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+
+def depth_weight(limit: int) -> int:
+    """深度接口单次请求的权重（按 limit 分档）"""
+    if limit <= 50:
+        return 2
+    if limit <= 100:
+        return 5
+    if limit <= 500:
+        return 10
+    return 20
+
+
+# 接口路径 -> 权重（固定值，或 (按 limit 计算的函数, 默认 limit)，或 (带 symbol 时的权重, 不带时的权重)）
+ENDPOINT_WEIGHTS = {
+    "/fapi/v1/ping": 1,
+    "/fapi/v1/time": 1,
+    "/fapi/v1/exchangeInfo": 1,
+    "/fapi/v1/klines": (kline_weight, 500),
+    "/fapi/v1/continuousKlines": (kline_weight, 500),
+    "/fapi/v1/indexPriceKlines": (kline_weight, 500),
+    "/fapi/v1/markPriceKlines": (kline_weight, 500),
+    "/fapi/v1/depth": (depth_weight, 500),
+    "/fapi/v1/ticker/price": {"symbol": 1, None: 2},
+    "/fapi/v1/ticker/bookTicker": {"symbol": 2, None: 5},
+    "/fapi/v1/ticker/24hr": {"symbol": 1, None: 40},
+}
+
+
+def request_weight(path: str, params: Optional[Mapping[str, Any]] = None) -> int:
+    """
+    计算一次请求的权重
+
+    Args:
+        path: 接口路径，如 /fapi/v1/klines
+        params: 请求参数
+
+    Returns:
+        权重，未知接口按1计算
+    """
+    params = params or {}
+    weight = ENDPOINT_WEIGHTS.get(path, 1)
+    if isinstance(weight, tuple):
+        func, default_limit = weight
+        return func(int(params.get("limit", default_limit)))
+    if isinstance(weight, dict):
+        return weight["symbol"] if params.get("symbol") else weight[None]
+    return weight
+
+
+class WeightBudget:
+    """
+    请求权重预算（令牌桶，按优先级排队）
+
+    币安按每分钟累计的请求权重限流（合约默认 2400/分钟）。桶容量为一个周期的权重上限，
+    令牌按 容量/周期 的速率持续补充；权重不足时请求按 (优先级, 到达顺序) 排队等待，而不是让请求被交易所拒绝。
+    响应头 X-MBX-USED-WEIGHT-1M 报告的已用权重（包括同一 IP 下其他进程的请求）会同步回桶中，
+    收到 429/418 时按 Retry-After 暂停所有请求。
+
+    异步请求通过 acquire 排队，同步客户端通过 acquire_sync 阻塞等待，两者共用同一个桶。
+    排队请求可以来自不同的事件循环（应用、调度器、测试各自的循环），每个请求只在其所属的循环中被唤醒，
+    已关闭的循环中的请求直接丢弃。
+    """
+
+    def __init__(self, capacity: int = 2400, period: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            capacity: 每个周期的权重上限
+            period: 周期(秒)
+            clock: 返回单调时间(秒)的函数
+        """
+        self.capacity = capacity
+        self.period = period
+        self.rate = capacity / period
+        self.clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._banned_until = 0.0
+        self._lock = threading.Lock()
+        self._queue = []
+        self._sequence = itertools.count()
+        # 有排队请求的事件循环 -> 该循环中下一次分配权重的定时器
+        self._timers: Dict[asyncio.AbstractEventLoop, asyncio.TimerHandle] = {}
+        self.spent = 0
+        self.waits = 0
+        self.used_weight = 0
+        self.bans = 0
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _delay(self, weight: int) -> float:
+        """拿到 weight 的权重还需等待的秒数（调用前须持锁并已补充令牌）"""
+        delay = max(self._banned_until - self.clock(), 0.0)
+        if delay > 0:
+            return delay
+        return max((weight - self._tokens) / self.rate, 0.0)
+
+    def _take(self, weight: int) -> None:
+        self._tokens -= weight
+        self.spent += weight
+
+    def _check(self, weight: int) -> None:
+        if weight > self.capacity:
+            raise ValueError(f"Request weight {weight} exceeds budget capacity {self.capacity}")
+
+    async def acquire(self, weight: int, priority: Optional[int] = None) -> None:
+        """
+        占用 weight 的权重，预算不足时按优先级排队等待
+
+        Args:
+            weight: 请求的权重
+            priority: 优先级，为 None 时使用当前上下文的优先级
+        """
+        self._check(weight)
+        priority = current_priority.get() if priority is None else priority
+        with self._lock:
+            self._refill()
+            if not self._queue and self._delay(weight) == 0:
+                self._take(weight)
+                return
+            self.waits += 1
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._queue, (priority, next(self._sequence), weight, future))
+        self._schedule(0)
+        await future
+
+    def _schedule(self, delay: float) -> None:
+        """在每个有排队请求的事件循环中 delay 秒后重新分配权重（可在任意线程中调用）"""
+        with self._lock:
+            loops = {future.get_loop() for _, _, _, future in self._queue}
+        for loop in loops:
+            if loop.is_closed():
+                continue
+            try:
+                loop.call_soon_threadsafe(self._set_timer, loop, delay)
+            except RuntimeError:
+                # 检查之后循环被关闭
+                continue
+
+    def _set_timer(self, loop: asyncio.AbstractEventLoop, delay: float) -> None:
+        """在 loop 中（重新）设置分配权重的定时器"""
+        timer = self._timers.pop(loop, None)
+        if timer is not None:
+            timer.cancel()
+        for closed in [other for other in self._timers if other.is_closed()]:
+            del self._timers[closed]
+        self._timers[loop] = loop.call_later(delay, self._dispatch)
+
+    def _dispatch(self) -> None:
+        """按优先级把权重分配给排队的请求，不够时等到下一次补充"""
+        self._timers.pop(asyncio.get_running_loop(), None)
+        ready = []
+        delay = None
+        with self._lock:
+            self._refill()
+            while self._queue:
+                priority, sequence, weight, future = self._queue[0]
+                if future.done() or future.get_loop().is_closed():
+                    # 等待中被取消的请求，或所属事件循环已关闭的请求
+                    heapq.heappop(self._queue)
+                    continue
+                delay = self._delay(weight)
+                if delay > 0:
+                    break
+                heapq.heappop(self._queue)
+                self._take(weight)
+                ready.append(future)
+                delay = None
+        for future in ready:
+            self._wake(future)
+        if delay is not None:
+            self._schedule(delay)
+
+    @staticmethod
+    def _wake(future: asyncio.Future) -> None:
+        """在请求所属的事件循环中唤醒等待的请求"""
+        loop = future.get_loop()
+        if loop is asyncio.get_running_loop():
+            if not future.done():
+                future.set_result(None)
+            return
+        try:
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+        except RuntimeError:
+            # 所属事件循环已关闭
+            pass
+
+    def acquire_sync(self, weight: int) -> None:
+        """同步占用 weight 的权重（阻塞等待，供同步客户端使用）"""
+        self._check(weight)
+        while True:
+            with self._lock:
+                self._refill()
+                delay = self._delay(weight)
+                if delay == 0 and not self._queue:
+                    self._take(weight)
+                    return
+            time.sleep(max(delay, 0.01))
+
+    def update(self, used_weight: int) -> None:
+        """
+        按交易所报告的本周期已用权重校正可用令牌（只会减少）
+
+        Args:
+            used_weight: 响应头 X-MBX-USED-WEIGHT-1M 的值
+        """
+        with self._lock:
+            self._refill()
+            self.used_weight = used_weight
+            self._tokens = min(self._tokens, float(self.capacity - used_weight))
+
+    def ban(self, seconds: float) -> None:
+        """
+        收到 429/418 后暂停所有请求
+
+        Args:
+            seconds: 暂停时间(秒)，来自 Retry-After
+        """
+        with self._lock:
+            self.bans += 1
+            self._banned_until = max(self._banned_until, self.clock() + seconds)
+            self._tokens = min(self._tokens, 0.0)
+        if self._queue:
+            self._schedule(seconds)
+
+    def update_from_headers(self, status: int, headers: Mapping[str, str]) -> Optional[float]:
+        """
+        根据响应状态和响应头更新预算
+
+        Args:
+            status: HTTP 状态码
+            headers: 响应头（不区分大小写的映射）
+
+        Returns:
+            被限流(429/418)时需要等待的秒数，否则为 None
+        """
+        used_weight = headers.get("X-MBX-USED-WEIGHT-1M")
+        if used_weight is not None:
+            self.update(int(used_weight))
+        if status in (418, 429):
+            retry_after = float(headers.get("Retry-After") or self.period)
+            self.ban(retry_after)
+            return retry_after
+        return None
+
+    @property
+    def available(self) -> float:
+        """当前可用的权重"""
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def stats(self) -> Dict[str, Any]:
+        """获取预算统计信息"""
+        return {
+            "capacity": self.capacity,
+            "period": self.period,
+            "available": round(self.available, 2),
+            "spent": self.spent,
+            "waits": self.waits,
+            "queued": len(self._queue),
+            "used_weight": self.used_weight,
+            "bans": self.bans,
+            "banned_for": round(max(self._banned_until - self.clock(), 0.0), 2)
+        }
@@ -0,0 +1,65 @@
+# exchanges/binance/singleflight.py
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    合并相同的并发请求（single-flight）
+
+    同一个 key 的请求在进行中时，后到的调用方不再发起新请求，而是等待同一个上游任务的结果，
+    任务完成（成功或失败）后 key 即被移除，之后的调用重新发起请求。
+    上游任务与调用方相互独立：某个调用方被取消不会取消其他调用方共享的任务。
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, asyncio.Task] = {}
+        self._callers: Dict[Hashable, int] = {}
+        self.calls = 0
+        self.flights = 0
+        self.shared = 0
+        self.max_callers = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        执行 func，或等待正在进行的相同 key 的请求
+
+        Args:
+            key: 请求的唯一标识
+            func: 发起上游请求的协程函数
+
+        Returns:
+            上游请求的结果（所有调用方共享同一个对象）
+        """
+        self.calls += 1
+        task = self._flights.get(key)
+        if task is None:
+            self.flights += 1
+            task = asyncio.ensure_future(func())
+            self._flights[key] = task
+            self._callers[key] = 0
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.shared += 1
+        self._callers[key] += 1
+        self.max_callers = max(self.max_callers, self._callers[key])
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        self._flights.pop(key, None)
+        self._callers.pop(key, None)
+        # 调用方都已取消时由这里取走异常，避免 "exception was never retrieved" 警告
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        """获取合并统计信息（calls 为调用方总数，flights 为实际发出的上游请求数）"""
+        return {
+            "calls": self.calls,
+            "flights": self.flights,
+            "shared": self.shared,
+            "in_flight": len(self._flights),
+            "callers": sum(self._callers.values()),
+            "max_callers": self.max_callers,
+            "share_rate": round(self.shared / self.calls, 4) if self.calls else 0.0
+        }
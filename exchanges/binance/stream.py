@@ -0,0 +1,346 @@
+# exchanges/binance/stream.py
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Callable, Optional, Set, Tuple
+
+import websocket
+
+from .candle_store import CandleStore
+from .futures import _FuturesClientBase
+from .klines import KlineColumns
+
+logger = logging.getLogger(__name__)
+
+# 是否启用K线推送（默认不启用，不连接币安 WebSocket），以及启动时预先订阅的 交易对@周期 列表（逗号分隔，如 BTCUSDT@1h,ETHUSDT@15m）
+STREAM_ENABLED = os.getenv("KLINE_STREAM_ENABLED", "false").lower() in ("1", "true", "yes")
+STREAM_SUBSCRIPTIONS = os.getenv("KLINE_STREAMS", "")
+# 最多同时订阅的流数量（币安限制单个连接的流数量），达到上限时淘汰最久未读取的按需订阅
+STREAM_MAX_SUBSCRIPTIONS = int(os.getenv("KLINE_STREAM_MAX_SUBSCRIPTIONS", "200"))
+# 按需订阅超过该秒数未被读取时取消订阅
+STREAM_IDLE_TIMEOUT = float(os.getenv("KLINE_STREAM_IDLE_TIMEOUT", "3600"))
+
+
+class KlineStreamService:
+    """
+    币安合约K线推送接入服务
+
+    在后台线程中连接合约组合流，订阅 <symbol>@kline_<interval>，把推送的K线写入 CandleStore。
+    断线后按指数退避重连，断线期间缓冲区不可读，读取方回退到 REST。
+    读取未命中时自动建立的按需订阅超过 idle_timeout 秒未被读取，或订阅数达到 max_subscriptions 时
+    按最久未读取的顺序取消订阅并释放缓冲区；显式订阅（启动配置）常驻。
+    """
+
+    STREAM_URL = "wss://fstream.binance.com/stream"
+
+    def __init__(self,
+                 store: Optional[CandleStore] = None,
+                 url: Optional[str] = None,
+                 auto_subscribe: bool = True,
+                 reconnect_delay: float = 1.0,
+                 max_reconnect_delay: float = 30.0,
+                 max_subscriptions: int = STREAM_MAX_SUBSCRIPTIONS,
+                 idle_timeout: float = STREAM_IDLE_TIMEOUT):
+        """
+        Args:
+            store: K线存储，为 None 时新建
+            url: 组合流地址，默认为币安合约地址
+            auto_subscribe: 读取未订阅的 (交易对, 周期) 时是否自动订阅
+            reconnect_delay: 首次重连等待(秒)
+            max_reconnect_delay: 重连等待上限(秒)
+            max_subscriptions: 最多同时订阅的流数量
+            idle_timeout: 按需订阅未被读取的最长时间(秒)
+        """
+        self.store = store or CandleStore(_FuturesClientBase.INTERVAL_MS)
+        self.url = url or self.STREAM_URL
+        self.auto_subscribe = auto_subscribe
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.max_subscriptions = max_subscriptions
+        self.idle_timeout = idle_timeout
+        self.subscriptions: Set[Tuple[str, str]] = set()
+        # 按需订阅 -> 最近读取时间（按最久未读取在前的顺序）
+        self.on_demand: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self.evicted = 0
+        self.connected = False
+        self.messages = 0
+        self.reconnects = 0
+        self._ws: Optional[websocket.WebSocketApp] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._request_id = 0
+        # 每收到一根推送的K线调用（在推送线程中执行，不能阻塞）
+        self.listeners: List[Callable[[Dict[str, Any]], None]] = []
+
+    @staticmethod
+    def stream_name(symbol: str, interval: str) -> str:
+        """组合流中的流名称"""
+        return f"{symbol.lower()}@kline_{interval}"
+
+    @staticmethod
+    def parse_kline(payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        把 kline 推送事件转换为与 REST 接口相同格式的K线
+
+        Args:
+            payload: 推送事件的 data 部分
+
+        Returns:
+            格式化后的K线数据
+        """
+        kline = payload["k"]
+        return {
+            "symbol": payload["s"],
+            "interval": kline["i"],
+            "open_time": str(kline["t"]),
+            "open": str(kline["o"]),
+            "high": str(kline["h"]),
+            "low": str(kline["l"]),
+            "close": str(kline["c"]),
+            "volume": str(kline["v"]),
+            "close_time": str(kline["T"]),
+            "quote_asset_volume": str(kline["q"]),
+            "number_of_trades": str(kline["n"]),
+            "taker_buy_base_asset_volume": str(kline["V"]),
+            "taker_buy_quote_asset_volume": str(kline["Q"]),
+            "ignore": kline["B"]
+        }
+
+    def subscribe(self, symbol: str, interval: str, pinned: bool = True) -> bool:
+        """
+        订阅 (交易对, 周期) 的K线推送
+
+        Args:
+            symbol: 交易对
+            interval: K线周期
+            pinned: 是否常驻；为 False 时为按需订阅，空闲或订阅数达到上限时被淘汰
+
+        Returns:
+            是否已订阅（订阅数已达上限且没有可淘汰的按需订阅时，按需订阅返回 False）
+        """
+        if interval not in self.store.interval_ms:
+            raise ValueError(f"Unsupported stream interval: {interval}")
+        key = (symbol, interval)
+        evicted = self._evict_idle()
+        added = False
+        with self._lock:
+            if key in self.subscriptions:
+                if pinned:
+                    self.on_demand.pop(key, None)
+                elif key in self.on_demand:
+                    self.on_demand[key] = self.store.clock()
+                    self.on_demand.move_to_end(key)
+            else:
+                # 达到上限时淘汰最久未读取的按需订阅，常驻订阅不受上限限制
+                while len(self.subscriptions) >= self.max_subscriptions and self.on_demand:
+                    oldest = next(iter(self.on_demand))
+                    self._discard(oldest)
+                    evicted.append(oldest)
+                added = pinned or len(self.subscriptions) < self.max_subscriptions
+                if added:
+                    self.subscriptions.add(key)
+                    if not pinned:
+                        self.on_demand[key] = self.store.clock()
+            subscribed = key in self.subscriptions
+        self._release(evicted)
+        if added:
+            if self.connected:
+                self._send("SUBSCRIBE", [self.stream_name(symbol, interval)])
+            self._wakeup.set()
+        return subscribed
+
+    def unsubscribe(self, symbol: str, interval: str) -> None:
+        """取消订阅并释放缓冲区"""
+        with self._lock:
+            if (symbol, interval) not in self.subscriptions:
+                return
+            self._discard((symbol, interval))
+        self.store.remove(symbol, interval)
+        if self.connected:
+            self._send("UNSUBSCRIBE", [self.stream_name(symbol, interval)])
+
+    def _discard(self, key: Tuple[str, str]) -> None:
+        # 须持有 self._lock
+        self.subscriptions.discard(key)
+        self.on_demand.pop(key, None)
+
+    def _evict_idle(self) -> List[Tuple[str, str]]:
+        """从订阅集合中移除空闲的按需订阅，返回被移除的订阅（由 _release 取消推送并释放缓冲区）"""
+        deadline = self.store.clock() - self.idle_timeout
+        evicted = []
+        with self._lock:
+            while self.on_demand:
+                key, used = next(iter(self.on_demand.items()))
+                if used > deadline:
+                    break
+                self._discard(key)
+                evicted.append(key)
+        return evicted
+
+    def _release(self, evicted: List[Tuple[str, str]]) -> None:
+        """取消被淘汰订阅的推送并释放缓冲区"""
+        if not evicted:
+            return
+        self.evicted += len(evicted)
+        for symbol, interval in evicted:
+            self.store.remove(symbol, interval)
+        logger.info(f"Kline stream evicted idle subscriptions: {', '.join(f'{s}@{i}' for s, i in evicted)}")
+        if self.connected:
+            self._send("UNSUBSCRIBE", [self.stream_name(symbol, interval) for symbol, interval in evicted])
+
+    def read(self, symbol: str, interval: str, limit: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        从内存存储读取最近 limit 根K线，未命中时按需订阅
+
+        Returns:
+            K线数据列表，未命中时返回 None（由调用方走 REST）
+        """
+        klines = self.store.read(symbol, interval, limit)
+        key = (symbol, interval)
+        with self._lock:
+            if key in self.on_demand:
+                self.on_demand[key] = self.store.clock()
+                self.on_demand.move_to_end(key)
+        if klines is None and self.auto_subscribe and interval in self.store.interval_ms:
+            self.subscribe(symbol, interval, pinned=False)
+        else:
+            self._release(self._evict_idle())
+        return klines
+
+    def fill(self, symbol: str, interval: str, klines: KlineColumns) -> None:
+        """用 REST 取回的列式K线补齐缓冲区缺失的历史"""
+        self.store.fill(symbol, interval, klines)
+
+    def add_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """注册K线推送回调（写入存储之后、在推送线程中调用）"""
+        if listener not in self.listeners:
+            self.listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """移除K线推送回调"""
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def start(self) -> None:
+        """启动后台推送线程"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="kline-stream", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """停止推送线程并关闭连接"""
+        self._stopped.set()
+        self._wakeup.set()
+        ws = self._ws
+        if ws is not None:
+            # 直接关闭底层连接，唤醒阻塞在 select 上的推送线程
+            ws.keep_running = False
+            if ws.sock is not None:
+                ws.sock.abort()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        delay = self.reconnect_delay
+        while not self._stopped.is_set():
+            # 没有订阅时不建立连接
+            if not self.subscriptions:
+                self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+
+            self._ws = websocket.WebSocketApp(
+                self.url,
+                on_open=self._on_open,
+                on_message=self._on_message,
+                on_error=self._on_error,
+                on_close=self._on_close
+            )
+            received = self.messages
+            self._ws.run_forever(ping_interval=60, ping_timeout=20)
+            self.connected = False
+            self.store.set_live(False)
+            if self._stopped.is_set():
+                break
+
+            # 连上并收到过推送后重置退避时间
+            delay = self.reconnect_delay if self.messages > received else min(delay * 2, self.max_reconnect_delay)
+            self.reconnects += 1
+            logger.warning(f"Kline stream disconnected, reconnecting in {delay:.1f}s")
+            self._stopped.wait(delay)
+
+    def _send(self, method: str, streams: List[str]) -> None:
+        with self._lock:
+            self._request_id += 1
+            request_id = self._request_id
+        try:
+            self._ws.send(json.dumps({"method": method, "params": streams, "id": request_id}))
+        except Exception as e:
+            logger.warning(f"Kline stream {method} failed: {str(e)}")
+
+    def _on_open(self, ws) -> None:
+        if self._stopped.is_set():
+            ws.close()
+            return
+        self.connected = True
+        with self._lock:
+            streams = [self.stream_name(symbol, interval) for symbol, interval in sorted(self.subscriptions)]
+        if streams:
+            self._send("SUBSCRIBE", streams)
+
+    def _on_message(self, ws, message: str) -> None:
+        data = json.loads(message)
+        payload = data.get("data", data)
+        if isinstance(payload, dict) and payload.get("e") == "kline":
+            self.messages += 1
+            kline = self.parse_kline(payload)
+            if (kline["symbol"], kline["interval"]) not in self.subscriptions:
+                # 取消订阅前已发出的推送，不再为其建立缓冲区
+                return
+            self.store.update(kline)
+            for listener in list(self.listeners):
+                try:
+                    listener(kline)
+                except Exception as e:
+                    logger.warning(f"Kline stream listener failed: {str(e)}")
+
+    def _on_error(self, ws, error) -> None:
+        logger.warning(f"Kline stream error: {str(error)}")
+
+    def _on_close(self, ws, close_status_code, close_msg) -> None:
+        self.connected = False
+        self.store.set_live(False)
+
+    def stats(self) -> Dict[str, Any]:
+        """获取推送服务统计信息"""
+        return {
+            "connected": self.connected,
+            "subscriptions": sorted(f"{symbol}@{interval}" for symbol, interval in self.subscriptions),
+            "on_demand": len(self.on_demand),
+            "max_subscriptions": self.max_subscriptions,
+            "evicted": self.evicted,
+            "messages": self.messages,
+            "reconnects": self.reconnects,
+            "store": self.store.stats()
+        }
+
+
+def subscriptions_from_env(value: str = STREAM_SUBSCRIPTIONS) -> List[Tuple[str, str]]:
+    """解析 KLINE_STREAMS 配置，如 BTCUSDT@1h,ETHUSDT@15m"""
+    subscriptions = []
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        symbol, _, interval = item.partition("@")
+        if not interval:
+            raise ValueError(f"Invalid kline stream: {item}, expected SYMBOL@interval")
+        subscriptions.append((symbol.upper(), interval))
+    return subscriptions
@@ -0,0 +1,253 @@
+# exchanges/binance/symbols.py
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import List, Dict, Any, Optional
+
+from .futures import FuturesSymbol
+
+logger = logging.getLogger(__name__)
+
+# 离线的交易对元数据文件（/fapi/v1/exchangeInfo 的响应 JSON），指定时从文件加载且不再刷新，用于测试和无网络环境
+SYMBOLS_FIXTURE = os.getenv("SYMBOLS_FIXTURE", "")
+# 从交易所刷新交易对列表的间隔(秒)
+SYMBOLS_REFRESH_INTERVAL = float(os.getenv("SYMBOLS_REFRESH_INTERVAL", "3600"))
+
+
+class Symbol(str):
+    """经注册表校验的交易对名称（str 子类，与 FuturesSymbol 一样提供 .value，可直接传给客户端）"""
+
+    __slots__ = ()
+
+    @property
+    def value(self) -> str:
+        return str.__str__(self)
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source, handler):
+        """作为 pydantic 字段类型时按字符串校验和序列化（是否可交易由字段上的 symbol_registry.validate 校验）"""
+        from pydantic_core import core_schema
+
+        return core_schema.no_info_after_validator_function(
+            cls, core_schema.str_schema(), serialization=core_schema.plain_serializer_function_ser_schema(str)
+        )
+
+
+class SymbolInfo:
+    """单个合约交易对的元数据"""
+
+    __slots__ = ("symbol", "status", "base_asset", "quote_asset", "contract_type", "price_precision",
+                 "quantity_precision", "tick_size", "step_size", "min_qty", "min_notional")
+
+    def __init__(self,
+                 symbol: str,
+                 status: str = "TRADING",
+                 base_asset: Optional[str] = None,
+                 quote_asset: Optional[str] = None,
+                 contract_type: Optional[str] = None,
+                 price_precision: Optional[int] = None,
+                 quantity_precision: Optional[int] = None,
+                 tick_size: Optional[float] = None,
+                 step_size: Optional[float] = None,
+                 min_qty: Optional[float] = None,
+                 min_notional: Optional[float] = None):
+        self.symbol = symbol
+        self.status = status
+        self.base_asset = base_asset
+        self.quote_asset = quote_asset
+        self.contract_type = contract_type
+        self.price_precision = price_precision
+        self.quantity_precision = quantity_precision
+        self.tick_size = tick_size
+        self.step_size = step_size
+        self.min_qty = min_qty
+        self.min_notional = min_notional
+
+    @classmethod
+    def from_exchange_info(cls, item: Dict[str, Any]) -> "SymbolInfo":
+        """
+        解析 exchangeInfo 中 symbols 的一项
+
+        Args:
+            item: 交易对信息（含 filters 列表）
+
+        Returns:
+            交易对元数据
+        """
+        filters = {f["filterType"]: f for f in item.get("filters", [])}
+        price_filter = filters.get("PRICE_FILTER", {})
+        lot_size = filters.get("LOT_SIZE", {})
+        min_notional = filters.get("MIN_NOTIONAL", {})
+
+        def number(value: Optional[str]) -> Optional[float]:
+            return float(value) if value is not None else None
+
+        return cls(
+            symbol=item["symbol"],
+            status=item.get("status", "TRADING"),
+            base_asset=item.get("baseAsset"),
+            quote_asset=item.get("quoteAsset"),
+            contract_type=item.get("contractType"),
+            price_precision=item.get("pricePrecision"),
+            quantity_precision=item.get("quantityPrecision"),
+            tick_size=number(price_filter.get("tickSize")),
+            step_size=number(lot_size.get("stepSize")),
+            min_qty=number(lot_size.get("minQty")),
+            min_notional=number(min_notional.get("notional"))
+        )
+
+    @property
+    def trading(self) -> bool:
+        """是否可交易"""
+        return self.status == "TRADING"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class SymbolRegistry:
+    """
+    合约交易对注册表
+
+    交易对列表和元数据（状态、最小价格/数量变动单位等）来自 /fapi/v1/exchangeInfo，在后台定期刷新；
+    刷新时整体替换查找表，校验只是一次字典查找。首次加载完成前使用内置的 FuturesSymbol 列表，
+    刷新失败时保留上一次的结果。
+    """
+
+    def __init__(self, refresh_interval: float = SYMBOLS_REFRESH_INTERVAL, clock=time.time):
+        """
+        Args:
+            refresh_interval: 后台刷新间隔(秒)
+            clock: 返回当前时间(秒)的函数
+        """
+        self.refresh_interval = refresh_interval
+        self.clock = clock
+        self._symbols: Dict[str, SymbolInfo] = {symbol.value: SymbolInfo(symbol.value) for symbol in FuturesSymbol}
+        self.source = "builtin"
+        self.loaded_at: Optional[float] = None
+        self.refreshes = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def load(self, exchange_info: Dict[str, Any], source: str = "exchangeInfo") -> int:
+        """
+        用 exchangeInfo 响应替换交易对表
+
+        Args:
+            exchange_info: /fapi/v1/exchangeInfo 的响应
+            source: 数据来源（用于统计）
+
+        Returns:
+            交易对数量
+        """
+        symbols = {}
+        for item in exchange_info.get("symbols", []):
+            info = SymbolInfo.from_exchange_info(item)
+            symbols[info.symbol] = info
+        if not symbols:
+            raise ValueError("exchangeInfo contains no symbols")
+        self._symbols = symbols
+        self.source = source
+        self.loaded_at = self.clock()
+        return len(symbols)
+
+    def load_file(self, path: str) -> int:
+        """从离线文件加载交易对表"""
+        with open(path, "r", encoding="utf-8") as f:
+            return self.load(json.load(f), source=f"file:{path}")
+
+    def get(self, symbol: str) -> Optional[SymbolInfo]:
+        """交易对元数据，不存在时返回 None"""
+        return self._symbols.get(symbol)
+
+    def __contains__(self, symbol: str) -> bool:
+        info = self._symbols.get(symbol)
+        return info is not None and info.trading
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+    def validate(self, symbol: str) -> Symbol:
+        """
+        校验交易对是否存在且可交易
+
+        Args:
+            symbol: 交易对名称（不区分大小写）
+
+        Returns:
+            交易对
+
+        Raises:
+            ValueError: 交易对不存在或不可交易
+        """
+        name = symbol.value if isinstance(symbol, FuturesSymbol) else str(symbol).upper()
+        info = self._symbols.get(name)
+        if info is None:
+            raise ValueError(f"Unsupported symbol: {name}")
+        if not info.trading:
+            raise ValueError(f"Symbol {name} is not trading (status: {info.status})")
+        return Symbol(name)
+
+    def symbols(self) -> List[str]:
+        """可交易的交易对列表"""
+        return sorted(name for name, info in self._symbols.items() if info.trading)
+
+    async def refresh(self, client) -> int:
+        """
+        从交易所刷新交易对表
+
+        Args:
+            client: AsyncBinanceFuturesClient
+
+        Returns:
+            交易对数量
+        """
+        count = self.load(await client.get_exchange_info())
+        self.refreshes += 1
+        return count
+
+    def start(self, client) -> None:
+        """在后台定期刷新（须在事件循环中调用）"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run(client))
+
+    async def stop(self) -> None:
+        """停止后台刷新"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self, client) -> None:
+        while True:
+            delay = self.refresh_interval
+            try:
+                await self.refresh(client)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+                # 失败后较快重试
+                delay = min(self.refresh_interval, 60)
+                logger.warning(f"Failed to refresh futures symbols: {str(e)}")
+            await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        """获取注册表统计信息"""
+        return {
+            "source": self.source,
+            "symbols": len(self._symbols),
+            "trading": sum(1 for info in self._symbols.values() if info.trading),
+            "loaded_at": self.loaded_at,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "last_error": self.last_error
+        }
+
+
+# 进程内共享的交易对注册表
+symbol_registry = SymbolRegistry()
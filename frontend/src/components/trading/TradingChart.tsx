@@ -23,6 +23,8 @@ interface TradingChartProps {
 export function TradingChart({ data, colors = {} }: TradingChartProps) {
     const chartContainerRef = useRef<HTMLDivElement>(null);
     const chartRef = useRef<IChartApi | null>(null);
+    const seriesRef = useRef<any>(null);
+    const candleCount = useRef(0);
 
     useEffect(() => {
         if (!chartContainerRef.current) return;
@@ -46,7 +48,7 @@ export function TradingChart({ data, colors = {} }: TradingChartProps) {
 
         chartRef.current = chart;
 
-        const candlestickSeries = (chart as any).addCandlestickSeries({
+        seriesRef.current = (chart as any).addCandlestickSeries({
             upColor: "#26a69a",
             downColor: "#ef5350",
             borderVisible: false,
@@ -54,20 +56,30 @@ export function TradingChart({ data, colors = {} }: TradingChartProps) {
             wickDownColor: "#ef5350",
         });
 
-        const formattedData = data.map(d => ({
-            ...d,
-            time: Number(d.time) / 1000 as any // Convert ms to seconds
-        }));
-
-        candlestickSeries.setData(formattedData);
-        chart.timeScale().fitContent();
-
         window.addEventListener("resize", handleResize);
 
         return () => {
             window.removeEventListener("resize", handleResize);
             chart.remove();
+            chartRef.current = null;
+            seriesRef.current = null;
         };
+    }, [colors]);
+
+    // Live updates only replace the data, the chart itself is created once
+    useEffect(() => {
+        if (!seriesRef.current) return;
+
+        const formattedData = data.map(d => ({
+            ...d,
+            time: Number(d.time) / 1000 as any // Convert ms to seconds
+        }));
+
+        seriesRef.current.setData(formattedData);
+        if (candleCount.current === 0 || Math.abs(data.length - candleCount.current) > 2) {
+            chartRef.current?.timeScale().fitContent();
+        }
+        candleCount.current = data.length;
     }, [data, colors]);
 
     return <div ref={chartContainerRef} className="w-full h-[500px]" />;
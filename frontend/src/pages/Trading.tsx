@@ -10,32 +10,106 @@ interface Kline {
     high: string;
     low: string;
     close: string;
+    rsi_14?: number | null;
+    ema_20?: number | null;
 }
 
+interface Candle {
+    time: string;
+    open: number;
+    high: number;
+    low: number;
+    close: number;
+}
+
+const LIMIT = 100;
+const LIVE_INDICATORS = "rsi:14,ema:20";
+const RECONNECT_DELAY = 3000;
+
+const toCandle = (k: Kline): Candle => ({
+    time: k.open_time,
+    open: parseFloat(k.open),
+    high: parseFloat(k.high),
+    low: parseFloat(k.low),
+    close: parseFloat(k.close),
+});
+
+// Replace the candle with the same open time, or append a newer one
+const mergeCandles = (candles: Candle[], updates: Candle[]): Candle[] => {
+    const next = [...candles];
+    for (const candle of updates) {
+        const index = next.findIndex((c) => c.time === candle.time);
+        if (index >= 0) {
+            next[index] = candle;
+        } else if (next.length === 0 || Number(candle.time) > Number(next[next.length - 1].time)) {
+            next.push(candle);
+        }
+    }
+    return next.slice(-LIMIT);
+};
+
+const liveUrl = () => {
+    const protocol = window.location.protocol === "https:" ? "wss" : "ws";
+    return `${protocol}://${window.location.host}/api/exchange/binance/futures/ws`;
+};
+
 export default function Trading() {
     const [symbol, setSymbol] = useState("BTCUSDT");
     const [interval, setInterval] = useState("1h");
-    const [data, setData] = useState<any[]>([]);
+    const [data, setData] = useState<Candle[]>([]);
+    const [latest, setLatest] = useState<Kline | null>(null);
+    const [live, setLive] = useState(false);
     const [loading, setLoading] = useState(false);
 
     useEffect(() => {
         fetchData();
     }, [symbol, interval]);
 
+    // Only the last candle (and its indicators) is pushed after the initial load
+    useEffect(() => {
+        let socket: WebSocket | null = null;
+        let reconnectTimer: ReturnType<typeof setTimeout> | undefined;
+        let closed = false;
+
+        const connect = () => {
+            socket = new WebSocket(liveUrl());
+            socket.onopen = () => {
+                setLive(true);
+                socket?.send(JSON.stringify({ action: "subscribe", symbol, interval, indicators: LIVE_INDICATORS }));
+            };
+            socket.onmessage = (event) => {
+                const message = JSON.parse(event.data);
+                if (message.type === "klines" && message.klines.length > 0) {
+                    setData((candles) => mergeCandles(candles, message.klines.map(toCandle)));
+                    setLatest(message.klines[message.klines.length - 1]);
+                } else if (message.type === "error") {
+                    console.error("Live klines error:", message.detail);
+                }
+            };
+            socket.onclose = () => {
+                setLive(false);
+                if (!closed) {
+                    reconnectTimer = setTimeout(connect, RECONNECT_DELAY);
+                }
+            };
+        };
+
+        connect();
+        return () => {
+            closed = true;
+            clearTimeout(reconnectTimer);
+            socket?.close();
+        };
+    }, [symbol, interval]);
+
     const fetchData = async () => {
         setLoading(true);
+        setLatest(null);
         try {
             const response = await api.get("/exchange/binance/futures/klines", {
-                params: { symbol, interval, limit: 100 },
+                params: { symbol, interval, limit: LIMIT },
             });
-            const klines = response.data.klines.map((k: Kline) => ({
-                time: k.open_time,
-                open: parseFloat(k.open),
-                high: parseFloat(k.high),
-                low: parseFloat(k.low),
-                close: parseFloat(k.close),
-            }));
-            setData(klines);
+            setData(response.data.klines.map(toCandle));
         } catch (error) {
             console.error("Failed to fetch klines:", error);
         } finally {
@@ -43,10 +117,18 @@ export default function Trading() {
         }
     };
 
+    const formatValue = (value?: number | null) => (value == null ? "-" : value.toFixed(2));
+
     return (
         <div className="space-y-6">
             <div className="flex items-center justify-between">
-                <h2 className="text-3xl font-bold tracking-tight">Trading</h2>
+                <div className="space-y-1">
+                    <h2 className="text-3xl font-bold tracking-tight">Trading</h2>
+                    <p className="text-sm text-muted-foreground">
+                        {live ? "Live" : "Offline"}
+                        {latest && ` · ${parseFloat(latest.close)} · RSI(14) ${formatValue(latest.rsi_14)} · EMA(20) ${formatValue(latest.ema_20)}`}
+                    </p>
+                </div>
                 <div className="flex gap-4">
                     <div className="w-[180px]">
                         <Select value={symbol} onChange={(e) => setSymbol(e.target.value)}>
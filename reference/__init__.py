@@ -0,0 +1,2 @@
+# reference/__init__.py
+# 测试和基准测试共用的参考数据与参考实现：模拟K线生成、重构前的指标实现
@@ -0,0 +1,40 @@
+# reference/klines.py
+import numpy as np
+
+
+def make_klines(count: int, seed: int = 7, symbol: str = "BTCUSDT", interval: str = "1h"):
+    """生成与 BinanceFuturesClient._format_klines 格式一致的模拟K线"""
+    rng = np.random.default_rng(seed)
+    close = 30000 + np.cumsum(rng.normal(0, 60, count))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    high = np.maximum(open_, close) + rng.uniform(0, 40, count)
+    low = np.minimum(open_, close) - rng.uniform(0, 40, count)
+    volume = rng.uniform(10, 500, count)
+
+    # 人为制造平盘和 high == low 的K线，覆盖边界分支
+    for i in range(5, count, 37):
+        close[i] = close[i - 1]
+    for i in range(11, count, 53):
+        high[i] = low[i] = open_[i] = close[i]
+
+    start = 1_700_000_000_000
+    step = 3_600_000
+    klines = []
+    for i in range(count):
+        klines.append({
+            "symbol": symbol,
+            "interval": interval,
+            "open_time": str(start + i * step),
+            "open": f"{open_[i]:.2f}",
+            "high": f"{high[i]:.2f}",
+            "low": f"{low[i]:.2f}",
+            "close": f"{close[i]:.2f}",
+            "volume": f"{volume[i]:.3f}",
+            "close_time": str(start + (i + 1) * step - 1),
+            "quote_asset_volume": f"{volume[i] * close[i]:.4f}",
+            "number_of_trades": str(int(volume[i] * 3)),
+            "taker_buy_base_asset_volume": f"{volume[i] / 2:.3f}",
+            "taker_buy_quote_asset_volume": f"{volume[i] * close[i] / 2:.4f}",
+            "ignore": "0"
+        })
+    return klines
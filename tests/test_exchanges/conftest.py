@@ -0,0 +1,8 @@
+import pytest
+
+from reference.klines import make_klines
+
+
+@pytest.fixture
+def klines():
+    return make_klines(600)
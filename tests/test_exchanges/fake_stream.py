@@ -0,0 +1,128 @@
+import asyncio
+import json
+import threading
+import time
+from typing import Any, Dict, List
+
+from aiohttp import web, WSMsgType
+
+
+class FakeKlineStream:
+    """
+    本地模拟的币安合约组合流 WebSocket 服务（在独立线程的事件循环中运行）
+
+    支持 SUBSCRIBE / UNSUBSCRIBE 请求，push() 向订阅了对应流的连接推送 kline 事件，
+    drop() 断开所有连接以模拟断线。
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.connections: Dict[web.WebSocketResponse, set] = {}
+        self.requests: List[Dict[str, Any]] = []
+        self.accepted = 0
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self._runner = None
+        self.url = None
+
+    def start(self) -> "FakeKlineStream":
+        self._thread.start()
+        self._call(self._start())
+        return self
+
+    def stop(self) -> None:
+        self._call(self._stop())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(5)
+
+    def push(self, kline: Dict[str, Any], final: bool = False) -> None:
+        """推送一根K线（格式与 _format_klines 相同）"""
+        self._call(self._push(kline, final))
+
+    def drop(self) -> None:
+        """断开所有连接"""
+        self._call(self._drop())
+
+    def subscribed(self) -> set:
+        """所有连接当前订阅的流"""
+        return set().union(*self.connections.values()) if self.connections else set()
+
+    def _call(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(5)
+
+    async def _start(self):
+        app = web.Application()
+        app.router.add_get("/stream", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"ws://127.0.0.1:{port}/stream"
+
+    async def _stop(self):
+        await self._drop()
+        await self._runner.cleanup()
+
+    async def _handle(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connections[ws] = set()
+        self.accepted += 1
+        try:
+            async for message in ws:
+                if message.type != WSMsgType.TEXT:
+                    continue
+                data = json.loads(message.data)
+                self.requests.append(data)
+                if data["method"] == "SUBSCRIBE":
+                    self.connections[ws].update(data["params"])
+                elif data["method"] == "UNSUBSCRIBE":
+                    self.connections[ws].difference_update(data["params"])
+                await ws.send_json({"result": None, "id": data["id"]})
+        finally:
+            self.connections.pop(ws, None)
+        return ws
+
+    async def _push(self, kline: Dict[str, Any], final: bool):
+        stream = f"{kline['symbol'].lower()}@kline_{kline['interval']}"
+        event = {
+            "stream": stream,
+            "data": {
+                "e": "kline",
+                "E": int(time.time() * 1000),
+                "s": kline["symbol"],
+                "k": {
+                    "t": int(kline["open_time"]),
+                    "T": int(kline["close_time"]),
+                    "s": kline["symbol"],
+                    "i": kline["interval"],
+                    "o": kline["open"],
+                    "c": kline["close"],
+                    "h": kline["high"],
+                    "l": kline["low"],
+                    "v": kline["volume"],
+                    "n": int(kline["number_of_trades"]),
+                    "x": final,
+                    "q": kline["quote_asset_volume"],
+                    "V": kline["taker_buy_base_asset_volume"],
+                    "Q": kline["taker_buy_quote_asset_volume"],
+                    "B": kline["ignore"]
+                }
+            }
+        }
+        for ws, streams in list(self.connections.items()):
+            if stream in streams:
+                await ws.send_json(event)
+
+    async def _drop(self):
+        for ws in list(self.connections):
+            await ws.close()
+
+
+def wait_until(predicate, timeout: float = 5.0) -> None:
+    """等待后台线程中的状态满足条件"""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met before timeout")
+        time.sleep(0.01)
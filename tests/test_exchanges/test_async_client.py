@@ -0,0 +1,545 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from exchanges.binance.async_futures import AsyncBinanceFuturesClient
+from exchanges.binance.futures import FuturesSymbol
+from exchanges.binance.indicators import TechnicalIndicators
+from exchanges.binance.kline_store import KlineStore
+from exchanges.binance.ratelimit import Priority, WeightBudget, request_priority
+from exchanges.binance.stream import KlineStreamService
+from exchanges.binance.symbols import SymbolRegistry
+from tests.test_exchanges.conftest import make_klines
+from tests.test_exchanges.fake_stream import FakeKlineStream, wait_until
+
+EXCHANGE_INFO = os.path.join(os.path.dirname(__file__), "fixtures", "exchange_info.json")
+SERIES = {symbol: make_klines(600, seed=seed, symbol=symbol)
+          for seed, symbol in enumerate(["BTCUSDT", "ETHUSDT"], start=7)}
+
+
+def raw_kline(kline):
+    """转换为币安接口返回的原始K线数组"""
+    return [int(kline["open_time"]), kline["open"], kline["high"], kline["low"], kline["close"], kline["volume"],
+            int(kline["close_time"]), kline["quote_asset_volume"], int(kline["number_of_trades"]),
+            kline["taker_buy_base_asset_volume"], kline["taker_buy_quote_asset_volume"], kline["ignore"]]
+
+
+@pytest_asyncio.fixture
+async def server():
+    """本地模拟的 /fapi/v1/klines 接口，记录每次请求的参数和客户端连接"""
+    calls = []
+    peers = set()
+    state = {"in_flight": 0, "max_in_flight": 0, "limited": 0, "retry_after": "0", "used_weight": None}
+
+    async def klines(request):
+        query = request.query
+        peers.add(request.transport.get_extra_info("peername"))
+        calls.append(dict(query))
+        state["in_flight"] += 1
+        state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        await asyncio.sleep(0.01)
+        state["in_flight"] -= 1
+        headers = {} if state["used_weight"] is None else {"X-MBX-USED-WEIGHT-1M": str(state["used_weight"])}
+        if state["limited"]:
+            # 模拟被限流：返回 429 和 Retry-After
+            state["limited"] -= 1
+            return web.json_response({"code": -1003, "msg": "Too many requests."}, status=429,
+                                     headers={**headers, "Retry-After": state["retry_after"]})
+        if query["symbol"] not in SERIES:
+            return web.json_response({"code": -1121, "msg": "Invalid symbol."}, status=400)
+
+        start_time = int(query["startTime"]) if "startTime" in query else None
+        end_time = int(query["endTime"]) if "endTime" in query else None
+        limit = int(query["limit"])
+        rows = [kline for kline in SERIES[query["symbol"]]
+                if (start_time is None or int(kline["open_time"]) >= start_time)
+                and (end_time is None or int(kline["open_time"]) <= end_time)]
+        rows = rows[:limit] if start_time is not None else rows[-limit:]
+        return web.json_response([raw_kline(kline) for kline in rows], headers=headers)
+
+    async def exchange_info(request):
+        calls.append({"path": request.path})
+        if state.get("exchange_info_error"):
+            return web.json_response({"code": -1001, "msg": "Internal error."}, status=500)
+        return web.FileResponse(EXCHANGE_INFO)
+
+    app = web.Application()
+    app.router.add_get("/fapi/v1/klines", klines)
+    app.router.add_get("/fapi/v1/exchangeInfo", exchange_info)
+    test_server = TestServer(app)
+    await test_server.start_server()
+    test_server.calls = calls
+    test_server.peers = peers
+    test_server.state = state
+    yield test_server
+    await test_server.close()
+
+
+@pytest_asyncio.fixture
+async def client(server, monkeypatch):
+    monkeypatch.setattr(AsyncBinanceFuturesClient, "BASE_URL", str(server.make_url("")).rstrip("/"))
+    monkeypatch.setattr(AsyncBinanceFuturesClient, "frame_cache", type(AsyncBinanceFuturesClient.frame_cache)())
+    async with AsyncBinanceFuturesClient(weight_budget=WeightBudget()) as client:
+        yield client
+
+
+@pytest.mark.asyncio
+async def test_get_klines_format(client):
+    """测试异步客户端返回的K线格式与同步客户端一致"""
+    rows = await client.get_klines(FuturesSymbol.BTCUSDT, "1h", limit=50)
+    assert rows == SERIES["BTCUSDT"][-50:]
+
+
+@pytest.mark.asyncio
+async def test_session_is_reused(client, server):
+    """测试多次请求复用同一个会话和 keep-alive 连接"""
+    session = client.session
+    for _ in range(5):
+        await client.get_klines(FuturesSymbol.BTCUSDT, limit=10)
+
+    assert client.session is session
+    assert len(server.calls) == 5
+    assert len(server.peers) == 1
+
+
+@pytest.mark.asyncio
+async def test_close_and_reopen(client):
+    """测试关闭后再次请求会重新创建会话"""
+    session = client.session
+    await client.close()
+    assert session.closed
+
+    rows = await client.get_klines(FuturesSymbol.BTCUSDT, limit=3)
+    assert len(rows) == 3
+    assert client.session is not session
+
+
+@pytest.mark.asyncio
+async def test_api_error(client):
+    """测试非200响应按同步客户端的格式抛出异常"""
+    with pytest.raises(Exception, match="Binance API Error: 400"):
+        await client.get_klines(FuturesSymbol.MATICUSDT, limit=10)
+    with pytest.raises(ValueError, match="Unsupported interval"):
+        await client.get_klines(FuturesSymbol.BTCUSDT, interval="7h")
+
+
+@pytest.mark.asyncio
+async def test_network_error():
+    """测试连接失败时抛出网络错误"""
+    async with AsyncBinanceFuturesClient(timeout=5) as client:
+        client.BASE_URL = "http://127.0.0.1:9"
+        with pytest.raises(Exception, match="Network Error"):
+            await client.get_klines(FuturesSymbol.BTCUSDT, limit=10)
+
+
+@pytest.mark.asyncio
+async def test_klines_with_indicators(client, server):
+    """测试带预热的指标K线与全量计算的末尾一致"""
+    rows = await client.get_klines_with_indicators(FuturesSymbol.BTCUSDT, limit=120)
+
+    assert [int(call["limit"]) for call in server.calls] == [197]
+    assert rows == TechnicalIndicators.calculate_all(SERIES["BTCUSDT"][-197:])[-120:]
+
+
+@pytest.mark.asyncio
+async def test_iter_klines_with_indicators(client, server):
+    """测试流式生成的指标结果行与完整结果一致"""
+    expected = await client.get_klines_with_indicators(FuturesSymbol.BTCUSDT, limit=120)
+    rows = await client.iter_klines_with_indicators(FuturesSymbol.BTCUSDT, limit=120)
+    assert list(rows) == expected
+
+    selection = ["rsi", ("ema", {"period": 20})]
+    expected = await client.get_klines_with_indicators(FuturesSymbol.BTCUSDT, limit=120, indicators=selection)
+    rows = await client.iter_klines_with_indicators(FuturesSymbol.BTCUSDT, limit=120, indicators=selection)
+    assert not isinstance(rows, list)
+    assert list(rows) == expected
+
+
+@pytest.mark.asyncio
+async def test_get_indicator_columns(client, server):
+    """测试列式指标结果与逐行结果一致，数值保持为数字"""
+    selection = ["rsi", ("ema", {"period": 20})]
+    rows = await client.get_klines_with_indicators(FuturesSymbol.BTCUSDT, limit=120, indicators=selection)
+    columns = await client.get_indicator_columns(FuturesSymbol.BTCUSDT, limit=120, indicators=selection)
+
+    assert len(columns) == 120
+    assert columns.symbol == "BTCUSDT"
+    assert columns["open_time"].tolist() == [int(row["open_time"]) for row in rows]
+    assert columns["close"].tolist() == [float(row["close"]) for row in rows]
+    assert columns["rsi_14"].tolist() == [row["rsi_14"] for row in rows]
+    assert columns["ema_20"].tolist() == [row["ema_20"] for row in rows]
+
+
+@pytest.mark.asyncio
+async def test_batch_fetches_concurrently(client, server):
+    """测试批量接口为每个交易对取数，结果与逐个计算一致"""
+    indicators = TechnicalIndicators.planner.parse("rsi:9,ema:20")
+    results = await client.get_klines_with_indicators_batch(
+        [FuturesSymbol.BTCUSDT, FuturesSymbol.ETHUSDT], limit=100, indicators=indicators)
+
+    count = 100 + TechnicalIndicators.engine_class.lookback(indicators)
+    assert list(results) == ["BTCUSDT", "ETHUSDT"]
+    assert len(server.calls) == 2
+    for symbol, rows in results.items():
+        assert rows == TechnicalIndicators.calculate(SERIES[symbol][-count:], indicators)[-100:]
+
+
+@pytest.fixture
+def paged(monkeypatch):
+    """把单页上限改为100根，用600根的模拟序列覆盖分页"""
+    monkeypatch.setattr(AsyncBinanceFuturesClient, "MAX_LIMIT", 100)
+
+
+@pytest.mark.asyncio
+async def test_klines_range_pages(client, server, paged):
+    """测试按页拆分并发获取，拼接结果与完整序列一致"""
+    series = SERIES["BTCUSDT"]
+    rows = await client.get_klines_range(FuturesSymbol.BTCUSDT, "1h", int(series[0]["open_time"]),
+                                         int(series[-1]["open_time"]), concurrency=3)
+
+    assert rows == series
+    assert len(server.calls) == 6
+    assert server.state["max_in_flight"] == 3
+
+
+@pytest.mark.asyncio
+async def test_klines_range_unaligned(client, server, paged):
+    """测试起止时间不在K线边界上时只取范围内的K线，最后一页按剩余根数请求"""
+    series = SERIES["BTCUSDT"]
+    start_time = int(series[10]["open_time"]) - 5
+    end_time = int(series[260]["open_time"]) + 5
+    rows = await client.get_klines_range(FuturesSymbol.BTCUSDT, "1h", start_time, end_time)
+
+    assert rows == series[10:261]
+    assert sorted(int(call["limit"]) for call in server.calls) == [51, 100, 100]
+
+
+@pytest.mark.asyncio
+async def test_klines_range_streams_unique_pages(client, paged, monkeypatch):
+    """测试逐页产出，页之间重叠的K线只产出一次"""
+    series = SERIES["BTCUSDT"]
+    # 让每页多返回前一页的最后一根K线
+    fetch = AsyncBinanceFuturesClient.get_klines
+
+    async def overlapping(self, symbol, interval="1h", limit=500, start_time=None, end_time=None):
+        return await fetch(self, symbol, interval, limit + 1, start_time - 3_600_000, end_time)
+
+    monkeypatch.setattr(AsyncBinanceFuturesClient, "get_klines", overlapping)
+    pages = [page async for page in client.iter_klines_range(
+        FuturesSymbol.BTCUSDT, "1h", int(series[100]["open_time"]), int(series[399]["open_time"]))]
+
+    assert len(pages) == 3
+    assert sorted((row for page in pages for row in page), key=lambda row: int(row["open_time"])) == series[99:400]
+
+
+@pytest.mark.asyncio
+async def test_klines_range_monthly(client, server, paged):
+    """测试月线等不定长周期按页顺序翻页"""
+    series = SERIES["BTCUSDT"]
+    rows = await client.get_klines_range(FuturesSymbol.BTCUSDT, "1M", int(series[50]["open_time"]),
+                                         int(series[-1]["open_time"]))
+
+    assert [row["open_time"] for row in rows] == [row["open_time"] for row in series[50:]]
+    assert len(server.calls) == 6
+
+
+@pytest.mark.asyncio
+async def test_klines_range_rejects_reversed(client):
+    with pytest.raises(ValueError):
+        await client.get_klines_range(FuturesSymbol.BTCUSDT, "1h", 2_000, 1_000)
+
+
+@pytest.mark.asyncio
+async def test_weight_budget_waits():
+    """测试权重预算耗尽后按补充速率等待"""
+    budget = WeightBudget(capacity=10, period=0.2)
+    started = time.monotonic()
+    for _ in range(3):
+        await budget.acquire(10)
+
+    assert time.monotonic() - started >= 0.35
+    assert budget.stats()["spent"] == 30
+    assert budget.waits == 2
+    with pytest.raises(ValueError):
+        await budget.acquire(11)
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_request_is_retried(client, server):
+    """测试 429 时按 Retry-After 暂停后重试，响应头的已用权重同步到预算"""
+    server.state.update(limited=1, retry_after="0.2", used_weight=2000)
+    started = time.monotonic()
+    rows = await client.get_klines(FuturesSymbol.BTCUSDT, "1h", limit=50)
+
+    assert rows == SERIES["BTCUSDT"][-50:]
+    assert time.monotonic() - started >= 0.15
+    assert len(server.calls) == 2
+    stats = client.weight_budget.stats()
+    assert stats["bans"] == 1
+    assert stats["used_weight"] == 2000
+    assert stats["available"] <= 401
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_gives_up(client, server):
+    """测试重试次数用完，或 LIVE 请求遇到过长的 Retry-After 时不再重试"""
+    server.state.update(limited=10, retry_after="0.01")
+    with pytest.raises(Exception, match="Binance API Error: 429"):
+        await client.get_klines(FuturesSymbol.BTCUSDT, limit=10)
+    assert len(server.calls) == client.MAX_RETRIES + 1
+
+    server.calls.clear()
+    server.state.update(limited=1, retry_after=str(client.MAX_RETRY_WAIT + 1))
+    with request_priority(Priority.LIVE):
+        with pytest.raises(Exception, match="Binance API Error: 429"):
+            await client.get_klines(FuturesSymbol.BTCUSDT, limit=10)
+    assert len(server.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_long_ban_waited_out_by_backfill(client, server, monkeypatch):
+    """测试 Retry-After 超过 MAX_RETRY_WAIT 时，非 LIVE 请求等到封禁结束后重试"""
+    monkeypatch.setattr(client, "MAX_RETRY_WAIT", 0.01)
+    server.state.update(limited=1, retry_after="0.1")
+    started = time.monotonic()
+    with request_priority(Priority.BACKFILL):
+        rows = await client.get_klines(FuturesSymbol.BTCUSDT, limit=10)
+    assert len(rows) == 10
+    assert len(server.calls) == 2
+    assert time.monotonic() - started >= 0.1
+
+
+@pytest.mark.asyncio
+async def test_identical_requests_are_coalesced(client, server):
+    """测试相同参数的并发请求共享一个上游请求，不同参数各自请求"""
+    requests = [client.get_klines(FuturesSymbol.BTCUSDT, "1h", limit=50) for _ in range(5)]
+    requests.append(client.get_klines(FuturesSymbol.ETHUSDT, "1h", limit=50))
+    results = await asyncio.gather(*requests)
+
+    assert len(server.calls) == 2
+    assert all(rows == SERIES["BTCUSDT"][-50:] for rows in results[:5])
+    assert results[5] == SERIES["ETHUSDT"][-50:]
+    # 每个调用方拿到各自的列表
+    assert results[0] is not results[1]
+    stats = client.single_flight.stats()
+    assert (stats["calls"], stats["flights"], stats["shared"], stats["max_callers"]) == (6, 2, 4, 5)
+    assert stats["in_flight"] == 0
+
+    # 完成后不再合并，之后的请求重新获取
+    await client.get_klines(FuturesSymbol.BTCUSDT, "1h", limit=50)
+    assert len(server.calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_coalesced_request_survives_cancelled_caller(client, server):
+    """测试发起请求的调用方被取消后，共享该请求的其他调用方仍能拿到结果"""
+    first = asyncio.ensure_future(client.get_klines(FuturesSymbol.BTCUSDT, "1h", limit=20))
+    second = asyncio.ensure_future(client.get_klines(FuturesSymbol.BTCUSDT, "1h", limit=20))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == SERIES["BTCUSDT"][-20:]
+    assert len(server.calls) == 1
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+
+@pytest.mark.asyncio
+async def test_coalesced_errors_reach_every_caller(client, server):
+    results = await asyncio.gather(*[client.get_klines(FuturesSymbol.MATICUSDT, limit=10) for _ in range(3)],
+                                   return_exceptions=True)
+    assert all("Binance API Error: 400" in str(result) for result in results)
+    assert len(server.calls) == 1
+
+
+def test_kline_weight():
+    assert [AsyncBinanceFuturesClient.kline_weight(limit) for limit in (1, 99, 100, 499, 500, 1000, 1001, 1500)] == \
+        [1, 1, 2, 2, 5, 5, 10, 10]
+
+
+@pytest.mark.asyncio
+async def test_latest_klines_read_from_stream(client, server):
+    """测试最近K线优先读推送维护的内存K线，REST 只补齐缓冲区缺失的历史"""
+    fake_stream = FakeKlineStream().start()
+    service = KlineStreamService(url=fake_stream.url)
+    service.start()
+    client.kline_stream = service
+    try:
+        series = SERIES["BTCUSDT"]
+        # 首次读取未命中：走 REST 并按需订阅
+        assert await client.get_klines(FuturesSymbol.BTCUSDT, "1h", limit=50) == series[-50:]
+        wait_until(lambda: fake_stream.subscribed())
+
+        # 推送正在形成的最后一根K线后，REST 补齐其之前的历史
+        forming = dict(series[-1], close="12345.67")
+        fake_stream.push(forming)
+        wait_until(lambda: service.messages == 1)
+        assert await client.get_klines(FuturesSymbol.BTCUSDT, "1h", limit=50) == series[-50:]
+        assert len(server.calls) == 2
+
+        # 之后从内存读取，包含推送的最新价格
+        rows = await client.get_klines(FuturesSymbol.BTCUSDT, "1h", limit=50)
+        assert rows == series[-50:-1] + [forming]
+        assert len(server.calls) == 2
+
+        # 内存中的K线不够时再用 REST 补齐
+        await client.get_klines(FuturesSymbol.BTCUSDT, "1h", limit=300)
+        rows = await client.get_klines(FuturesSymbol.BTCUSDT, "1h", limit=300)
+        assert rows == series[-300:-1] + [forming]
+        assert len(server.calls) == 3
+        assert service.store.stats()["hits"] == 2
+
+        # 指定时间范围的请求仍走 REST
+        await client.get_klines(FuturesSymbol.BTCUSDT, "1h", limit=10, start_time=int(series[0]["open_time"]))
+        assert len(server.calls) == 4
+    finally:
+        service.stop()
+        fake_stream.stop()
+
+
+@pytest.mark.asyncio
+async def test_sync_and_read_from_kline_store(client, server, paged, tmp_path):
+    """测试增量同步只取存储末尾之后的K线，覆盖完整的范围请求直接读本地存储"""
+    client.kline_store = KlineStore(str(tmp_path))
+    series = SERIES["BTCUSDT"]
+    start_time = int(series[0]["open_time"])
+
+    with pytest.raises(ValueError):
+        await client.sync_klines(FuturesSymbol.BTCUSDT, "1h")
+    assert await client.sync_klines(FuturesSymbol.BTCUSDT, "1h", start_time,
+                                    end_time=int(series[349]["open_time"])) == 350
+    assert len(server.calls) == 4
+
+    # 第二次同步从已存储的最后一根K线之后开始
+    server.calls.clear()
+    assert await client.sync_klines(FuturesSymbol.BTCUSDT, "1h", end_time=int(series[-1]["open_time"])) == 250
+    assert min(int(call["startTime"]) for call in server.calls) == int(series[349]["close_time"]) + 1
+    assert client.kline_store.gaps("BTCUSDT", "1h") == []
+
+    # 范围请求由本地存储完整覆盖时不再请求接口
+    server.calls.clear()
+    rows = await client.get_klines(FuturesSymbol.BTCUSDT, "1h", limit=100, start_time=int(series[120]["open_time"]))
+    # 与接口返回的字符串完全相同（如 "28525.50" 不会变成 "28525.5"）
+    assert rows == series[120:220]
+    rows = await client.get_klines(FuturesSymbol.BTCUSDT, "1h", limit=50, end_time=int(series[300]["open_time"]))
+    assert [row["open_time"] for row in rows] == [row["open_time"] for row in series[251:301]]
+    assert server.calls == []
+
+    # 超出存储范围的请求走 REST
+    await client.get_klines(FuturesSymbol.BTCUSDT, "1h", limit=100, start_time=int(series[550]["open_time"]))
+    await client.get_klines(FuturesSymbol.BTCUSDT, "1h", limit=50, end_time=int(series[20]["open_time"]))
+    assert len(server.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_store_extended_off_the_event_loop(client, server, tmp_path):
+    """测试 REST 取回的已收盘K线在线程池中写入本地存储，close 前等待写入完成"""
+    series = SERIES["BTCUSDT"]
+    client.kline_store = KlineStore(str(tmp_path))
+    client.kline_store.append("BTCUSDT", "1h", series[:200])
+    append = client.kline_store.append
+    threads = []
+
+    def recording_append(*args):
+        threads.append(threading.current_thread())
+        return append(*args)
+
+    client.kline_store.append = recording_append
+    await client.get_klines(FuturesSymbol.BTCUSDT, "1h", limit=100, start_time=int(series[150]["open_time"]))
+    await client.flush_store()
+
+    assert threads and threading.main_thread() not in threads
+    assert client.kline_store.count("BTCUSDT", "1h") == 250
+
+
+@pytest.mark.asyncio
+async def test_get_kline_columns(client, server, tmp_path):
+    """测试列式K线：REST 响应直接解析为数值列，存储命中时返回内存映射的列，与同一请求共享上游响应"""
+    series = SERIES["BTCUSDT"]
+    columns, rows = await asyncio.gather(client.get_kline_columns(FuturesSymbol.BTCUSDT, "1h", limit=50),
+                                         client.get_klines(FuturesSymbol.BTCUSDT, "1h", limit=50))
+    assert len(server.calls) == 1
+    assert rows == series[-50:]
+    assert columns["open_time"].tolist() == [int(row["open_time"]) for row in series[-50:]]
+    assert columns["close"].tolist() == [float(row["close"]) for row in series[-50:]]
+
+    client.kline_store = KlineStore(str(tmp_path))
+    client.kline_store.append("BTCUSDT", "1h", series[:200])
+    columns = await client.get_kline_columns(FuturesSymbol.BTCUSDT, "1h", limit=100,
+                                             start_time=int(series[50]["open_time"]))
+    assert len(server.calls) == 1
+    assert not columns["close"].flags.writeable
+    assert columns["open_time"].tolist() == [int(row["open_time"]) for row in series[50:150]]
+
+
+def live_series(count, seed=7):
+    """最后一根K线正在形成的模拟K线（按当前时间平移）"""
+    klines = make_klines(count, seed=seed)
+    hour = 3_600_000
+    shift = int(time.time() * 1000) // hour * hour - int(klines[-1]["open_time"])
+    return [dict(kline, open_time=str(int(kline["open_time"]) + shift),
+                 close_time=str(int(kline["close_time"]) + shift)) for kline in klines]
+
+
+@pytest.mark.asyncio
+async def test_delta_fetch_splices_window(client, server, monkeypatch):
+    """测试最近K线窗口只增量获取最后一根之后的K线并拼接，缺失K线或窗口不足时完整获取"""
+    series = live_series(600)
+    monkeypatch.setitem(SERIES, "BTCUSDT", series[:598])
+    assert await client.get_klines(FuturesSymbol.BTCUSDT, "1h", limit=300) == series[298:598]
+    assert "startTime" not in server.calls[-1]
+
+    # 新增两根K线，正在形成的K线价格变化
+    forming = dict(series[-1], close="1.23")
+    monkeypatch.setitem(SERIES, "BTCUSDT", series[:599] + [forming])
+    rows = await client.get_klines(FuturesSymbol.BTCUSDT, "1h", limit=300)
+    assert rows == series[300:599] + [forming]
+    assert server.calls[-1]["startTime"] == series[597]["open_time"]
+    assert int(server.calls[-1]["limit"]) < 10
+
+    # 小于窗口的请求同样增量获取
+    assert await client.get_klines(FuturesSymbol.BTCUSDT, "1h", limit=100) == series[500:599] + [forming]
+    assert server.calls[-1]["startTime"] == series[599]["open_time"]
+
+    # 窗口最后一根K线在接口中缺失时完整获取
+    monkeypatch.setitem(SERIES, "BTCUSDT", series[:599])
+    assert await client.get_klines(FuturesSymbol.BTCUSDT, "1h", limit=300) == series[299:599]
+    assert "startTime" not in server.calls[-1]
+
+    # 超过窗口的请求完整获取
+    await client.get_klines(FuturesSymbol.BTCUSDT, "1h", limit=400)
+    assert "startTime" not in server.calls[-1]
+    stats = client.window_cache.stats()
+    assert (stats["full"], stats["delta"], stats["gaps"]) == (3, 2, 1)
+
+
+@pytest.mark.asyncio
+async def test_symbol_registry_refresh(client, server):
+    """测试从 exchangeInfo 刷新交易对，后台刷新失败时保留上一次的结果"""
+    registry = SymbolRegistry(refresh_interval=0.05)
+    assert await registry.refresh(client) == 11
+    assert "1000PEPEUSDT" in registry and "MATICUSDT" not in registry
+
+    # 注册表返回的交易对可直接传给客户端
+    rows = await client.get_klines(registry.validate("ethusdt"), "1h", limit=5)
+    assert rows == SERIES["ETHUSDT"][-5:]
+
+    server.state["exchange_info_error"] = True
+    registry.start(client)
+    await wait_for(lambda: registry.failures >= 1)
+    await registry.stop()
+    assert registry.stats()["last_error"].startswith("Error fetching exchange info: Binance API Error: 500")
+    assert len(registry) == 11 and registry.refreshes == 1
+
+
+async def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        await asyncio.sleep(0.01)
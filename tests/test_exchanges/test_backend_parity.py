@@ -0,0 +1,126 @@
+"""
+pandas 与 TA-Lib 指标后端的一致性测试
+
+定义相同的指标要求数值一致；定义不同的指标（见 backends.DEFINITION_DIFFERENCES）
+按各自的定义单独校验，用来记录两者差在哪里。
+"""
+import numpy as np
+import pytest
+
+talib = pytest.importorskip("talib")
+
+from exchanges.binance.backends import DEFINITION_DIFFERENCES, TalibIndicatorEngine, get_backend
+from exchanges.binance.engine import IndicatorEngine
+from exchanges.binance.indicators import TechnicalIndicators
+from tests.test_exchanges.conftest import make_klines
+
+# 预热期之后比较
+WARMUP = 300
+
+
+@pytest.fixture(scope="module")
+def engines():
+    klines = make_klines(1200)
+    return IndicatorEngine(klines).compute_all(), TalibIndicatorEngine(klines).compute_all()
+
+
+def wilder(values: np.ndarray, period: int, start: int) -> np.ndarray:
+    """Wilder 平滑: 首值为 values[start:start + period] 的均值，之后 prev + (x - prev) / period"""
+    result = np.full(len(values), np.nan)
+    result[start + period - 1] = values[start:start + period].mean()
+    for i in range(start + period, len(values)):
+        result[i] = result[i - 1] + (values[i] - result[i - 1]) / period
+    return result
+
+
+@pytest.mark.parametrize("columns, warmup", [
+    (["ma_30", "ma_10", "bb_middle", "cci_20", "williams_r_14", "momentum_10", "mfi_14", "adl",
+      "stoch_k", "stoch_d"], WARMUP),
+    # EMA 初值不同带来的偏差按 (1 - alpha)^n 衰减，慢线需要更长的预热期
+    (["ema_12", "ema_26", "macd", "macd_signal", "macd_histogram"], 2 * WARMUP),
+])
+def test_same_definitions_match(engines, columns, warmup):
+    """测试定义相同的指标（EMA 类在预热期之后）数值一致"""
+    pandas_engine, talib_engine = engines
+    for name in columns:
+        np.testing.assert_allclose(talib_engine.columns[name][warmup:], pandas_engine.columns[name][warmup:],
+                                   rtol=1e-9, atol=1e-8, err_msg=name)
+
+
+def test_unsupported_indicators_fall_back_to_pandas(engines):
+    """测试 TA-Lib 没有的指标沿用 pandas 实现，结果逐位一致"""
+    pandas_engine, talib_engine = engines
+    for name in ("tenkan_sen", "kijun_sen", "senkou_span_a", "senkou_span_b", "chikou_span",
+                 "vwap", "cmf_20", "volatility_20"):
+        np.testing.assert_array_equal(talib_engine.columns[name], pandas_engine.columns[name], err_msg=name)
+
+
+def test_rsi_wilder_vs_sma(engines):
+    """RSI: TA-Lib 为 Wilder 平滑，pandas 实现为简单移动平均"""
+    pandas_engine, talib_engine = engines
+    delta = np.diff(pandas_engine.close, prepend=np.nan)
+    gain = wilder(np.where(delta > 0, delta, 0.0), 14, 1)
+    loss = wilder(np.where(delta < 0, -delta, 0.0), 14, 1)
+
+    np.testing.assert_allclose(talib_engine.columns["rsi_14"][WARMUP:],
+                               (100 - 100 / (1 + gain / loss))[WARMUP:], rtol=1e-9)
+    assert not np.allclose(talib_engine.columns["rsi_14"][WARMUP:], pandas_engine.columns["rsi_14"][WARMUP:])
+    assert "rsi" in DEFINITION_DIFFERENCES
+
+
+def test_atr_and_adx_wilder_vs_sma(engines):
+    """ATR / ADX: TA-Lib 为 Wilder 平滑，且首根K线不计入真实波幅"""
+    pandas_engine, talib_engine = engines
+    true_range = pandas_engine.intermediate("true_range")
+
+    np.testing.assert_allclose(talib_engine.columns["atr_14"], wilder(true_range, 14, 1), rtol=1e-9, equal_nan=True)
+    assert not np.allclose(talib_engine.columns["atr_14"][WARMUP:], pandas_engine.columns["atr_14"][WARMUP:])
+    for name in ("adx_14", "di_plus", "di_minus"):
+        assert not np.allclose(talib_engine.columns[name][WARMUP:], pandas_engine.columns[name][WARMUP:])
+    assert {"atr", "adx"} <= set(DEFINITION_DIFFERENCES)
+
+
+def test_standard_deviation_population_vs_sample(engines):
+    """标准差 / 布林带: TA-Lib 为总体标准差，pandas 实现为样本标准差"""
+    pandas_engine, talib_engine = engines
+    ratio = np.sqrt(19 / 20)
+
+    np.testing.assert_allclose(talib_engine.columns["std_20"][WARMUP:],
+                               pandas_engine.columns["std_20"][WARMUP:] * ratio, rtol=1e-6)
+    width = talib_engine.columns["bb_upper"] - talib_engine.columns["bb_middle"]
+    np.testing.assert_allclose(width[WARMUP:], 2 * pandas_engine.columns["std_20"][WARMUP:] * ratio, rtol=1e-6)
+
+
+def test_obv_initial_value(engines):
+    """OBV: TA-Lib 以首根成交量为初值，两者相差一个常数"""
+    pandas_engine, talib_engine = engines
+    np.testing.assert_allclose(talib_engine.columns["obv"] - pandas_engine.columns["obv"],
+                               pandas_engine.volume[0], rtol=1e-9)
+
+
+def test_parabolic_sar_mostly_agrees(engines):
+    """SAR: 初始化和少数反转点不同，其余K线一致"""
+    pandas_engine, talib_engine = engines
+    talib_sar = talib_engine.columns["sar"]
+    pandas_sar = pandas_engine.columns["sar"]
+
+    assert np.isnan(talib_sar[0])
+    assert np.isclose(talib_sar[1:], pandas_sar[1:], rtol=1e-12).mean() > 0.98
+
+
+def test_batch_and_records_use_selected_backend(monkeypatch):
+    """测试切换后端后，单品种、批量计算和缓存都使用所选后端"""
+    monkeypatch.setattr(TechnicalIndicators, "engine_class", get_backend("talib"))
+    klines = make_klines(200)
+    records = TechnicalIndicators.calculate(klines, ["rsi"], memoize=True)
+    batch = TechnicalIndicators.calculate_batch({"A": klines, "B": make_klines(200, seed=3)}, ["rsi"])
+
+    expected = talib.RSI(IndicatorEngine(klines).close, 14)
+    assert records[-1]["rsi_14"] == pytest.approx(expected[-1], rel=1e-12)
+    assert batch["A"] == records
+
+
+def test_unknown_backend():
+    """测试未知后端报错"""
+    with pytest.raises(ValueError):
+        get_backend("numba")
@@ -0,0 +1,44 @@
+import numpy as np
+
+from exchanges.binance import kernels
+from exchanges.binance.engine import IndicatorEngine
+from exchanges.binance.indicators import TechnicalIndicators
+from tests.test_exchanges.conftest import make_klines
+
+
+def test_batch_matches_single_symbol():
+    """测试批量计算每个交易对的结果与单独计算逐位一致，未对齐的交易对单独成组"""
+    klines_by_symbol = {
+        "BTCUSDT": make_klines(400, seed=1),
+        "ETHUSDT": make_klines(400, seed=2, symbol="ETHUSDT"),
+        "SOLUSDT": make_klines(250, seed=3, symbol="SOLUSDT"),
+    }
+    results = TechnicalIndicators.calculate_batch(klines_by_symbol)
+
+    assert list(results) == list(klines_by_symbol)
+    for symbol, klines in klines_by_symbol.items():
+        assert results[symbol] == TechnicalIndicators.calculate_all(klines)
+
+
+def test_batch_with_selection():
+    """测试批量计算支持指定指标和参数"""
+    klines_by_symbol = {"BTCUSDT": make_klines(200, seed=1), "ETHUSDT": make_klines(200, seed=2)}
+    selection = TechnicalIndicators.planner.parse("rsi:9,parabolic_sar,cci")
+    results = TechnicalIndicators.calculate_batch(klines_by_symbol, selection)
+
+    for symbol, klines in klines_by_symbol.items():
+        assert results[symbol] == TechnicalIndicators.calculate(klines, selection)
+
+
+def test_calculate_block_shapes():
+    """测试二维数组输入按列计算"""
+    engines = [IndicatorEngine(make_klines(120, seed=seed)) for seed in (4, 5, 6)]
+    arrays = [np.column_stack([getattr(engine, field) for engine in engines])
+              for field in IndicatorEngine.PRICE_FIELDS]
+    columns = TechnicalIndicators.calculate_block(*arrays, indicators=["adx", "parabolic_sar"])
+
+    assert set(columns) == {"di_plus", "di_minus", "adx_14", "sar"}
+    for index, engine in enumerate(engines):
+        np.testing.assert_array_equal(columns["sar"][:, index],
+                                      kernels.parabolic_sar(engine.high, engine.low, engine.close))
+        np.testing.assert_array_equal(columns["adx_14"][:, index], engine.adx(14).columns["adx_14"])
@@ -0,0 +1,68 @@
+import pytest
+
+from app.core.caching import KlineValidator, kline_validator
+from exchanges.binance.klines import KlineColumns
+from tests.test_exchanges.conftest import make_klines
+
+KEY = ("klines", "BTCUSDT", "1h", 100, None, None, "json")
+
+
+@pytest.fixture
+def klines():
+    return make_klines(100)
+
+
+def clock_at(ms):
+    return lambda: ms / 1000
+
+
+def test_etag_tracks_window_version(klines):
+    """测试 ETag 随请求参数和最后一根K线变化，窗口不变时保持不变"""
+    now = clock_at(int(klines[-1]["open_time"]) + 1000)
+    etag = KlineValidator(KEY, klines, clock=now).etag
+
+    assert KlineValidator(KEY, [dict(kline) for kline in klines], clock=now).etag == etag
+    assert KlineValidator(KEY[:-1] + ("ndjson",), klines, clock=now).etag != etag
+
+    updated = klines[:-1] + [dict(klines[-1], close=str(float(klines[-1]["close"]) + 1))]
+    assert KlineValidator(KEY, updated, clock=now).etag != etag
+
+
+def test_etag_same_for_columns_and_dicts(klines):
+    """测试同一窗口的列式K线与字典K线得到相同的 ETag"""
+    now = clock_at(int(klines[-1]["open_time"]))
+    assert KlineValidator(KEY, KlineColumns.from_klines(klines), clock=now).etag == \
+        KlineValidator(KEY, klines, clock=now).etag
+
+
+def test_max_age_aligned_to_candle_close(klines):
+    """测试未收盘窗口的 max-age 对齐到最后一根K线收盘，已收盘窗口使用上限"""
+    close_time = int(klines[-1]["close_time"])
+
+    forming = KlineValidator(KEY, klines, clock=clock_at(close_time + 1 - 90_500), max_age=3600)
+    assert forming.max_age == 91
+    assert forming.headers["Cache-Control"] == "public, max-age=91"
+
+    closed = KlineValidator(KEY, klines, clock=clock_at(close_time + 5000), max_age=3600)
+    assert closed.max_age == 3600
+    assert closed.last_modified == close_time / 1000
+
+
+def test_if_none_match(klines):
+    validator = KlineValidator(KEY, klines)
+
+    assert validator.matches(validator.etag)
+    assert validator.matches(f'"other", W/{validator.etag}')
+    assert validator.matches("*")
+    assert not validator.matches('"other"')
+    assert not validator.matches(None)
+
+    response = validator.not_modified()
+    assert response.status_code == 304
+    assert response.headers["etag"] == validator.etag
+
+
+def test_no_validator_for_event_stream_or_empty_window(klines):
+    assert kline_validator(KEY, klines, "sse") is None
+    assert kline_validator(KEY, [], "json") is None
+    assert kline_validator(KEY, klines, "ndjson") is not None
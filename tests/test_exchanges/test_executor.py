@@ -0,0 +1,138 @@
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from exchanges.binance.executor import IndicatorExecutor, IndicatorQueueFull, IndicatorTimeout
+from exchanges.binance.futures import _FuturesClientBase
+from exchanges.binance.indicators import TechnicalIndicators
+from exchanges.binance.klines import KlineColumns
+from tests.test_exchanges.conftest import make_klines
+
+
+@pytest.mark.asyncio
+async def test_run_does_not_block_event_loop():
+    """测试计算在线程池中执行时事件循环仍可处理其他任务"""
+    executor = IndicatorExecutor("thread", workers=1)
+    ticks = []
+
+    async def ticker():
+        while True:
+            ticks.append(time.time())
+            await asyncio.sleep(0.01)
+
+    task = asyncio.ensure_future(ticker())
+    result = await executor.run(lambda: time.sleep(0.2) or 42)
+    task.cancel()
+    executor.close()
+
+    assert result == 42
+    assert len(ticks) >= 5
+    stats = executor.stats()
+    assert stats["completed"] == 1 and stats["pending"] == 0
+    assert stats["compute"]["max_ms"] >= 190
+
+
+@pytest.mark.asyncio
+async def test_queue_full_rejects():
+    """测试排队和执行中的任务达到上限时直接拒绝"""
+    executor = IndicatorExecutor("thread", workers=1, max_pending=1)
+    release = threading.Event()
+
+    first = asyncio.ensure_future(executor.run(release.wait))
+    await asyncio.sleep(0.05)
+    with pytest.raises(IndicatorQueueFull):
+        await executor.run(lambda: 1)
+
+    release.set()
+    assert await first is True
+    assert await executor.run(lambda: 1) == 1
+    executor.close()
+    assert executor.stats()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_timeout_withdraws_queued_task():
+    """测试超时时尚未开始的任务从队列中撤销，执行中的任务完成后才释放名额"""
+    executor = IndicatorExecutor("thread", workers=1, max_pending=4, timeout=0.1)
+    release = threading.Event()
+    started = []
+
+    with pytest.raises(IndicatorTimeout):
+        await executor.run(release.wait)
+    with pytest.raises(IndicatorTimeout):
+        await executor.run(started.append, 1)
+
+    # 第一个任务仍在执行，第二个任务已撤销
+    assert executor.pending == 1
+    release.set()
+    for _ in range(100):
+        if executor.pending == 0:
+            break
+        await asyncio.sleep(0.01)
+    executor.close()
+
+    assert executor.pending == 0
+    assert started == []
+    assert executor.stats()["timeouts"] == 2
+
+
+@pytest.mark.asyncio
+async def test_cancel_withdraws_queued_task():
+    """测试调用方被取消时尚未开始的任务不再执行"""
+    executor = IndicatorExecutor("thread", workers=1)
+    release = threading.Event()
+    started = []
+
+    first = asyncio.ensure_future(executor.run(release.wait))
+    second = asyncio.ensure_future(executor.run(started.append, 1))
+    await asyncio.sleep(0.05)
+    second.cancel()
+    await asyncio.gather(second, return_exceptions=True)
+    release.set()
+    await first
+    executor.close()
+
+    assert started == []
+    assert executor.stats()["cancelled"] == 1
+
+
+@pytest.mark.asyncio
+async def test_queue_wait_measured_separately():
+    """测试排队等待时间与计算时间分开统计"""
+    executor = IndicatorExecutor("thread", workers=1)
+    await asyncio.gather(*(executor.run(time.sleep, 0.05) for _ in range(3)))
+    stats = executor.stats()
+    executor.close()
+
+    assert stats["compute"]["count"] == 3
+    assert stats["compute"]["avg_ms"] >= 45
+    # 后两个任务依次等待前面的任务
+    assert stats["queue_wait"]["max_ms"] >= 90
+
+
+@pytest.mark.asyncio
+async def test_process_pool_matches_thread():
+    """测试大窗口在进程池中计算的列式结果与线程池一致"""
+    klines = KlineColumns.from_klines(make_klines(400), "BTCUSDT", "1h")
+    selection = TechnicalIndicators.planner.parse("rsi:9,ema:20,macd")
+    executor = IndicatorExecutor("process", workers=1, process_min_rows=300, timeout=60)
+    assert executor.use_process(len(klines)) and not executor.use_process(100)
+
+    try:
+        expected = await executor.run(_FuturesClientBase.indicator_columns, klines, selection, 50)
+        columns = await executor.run(_FuturesClientBase.indicator_columns, klines, selection, 50, process=True)
+    finally:
+        executor.close()
+
+    assert len(columns) == len(expected) == 350
+    for name, column in expected.columns.items():
+        np.testing.assert_array_equal(columns[name], column)
+
+
+def test_unsupported_kind():
+    """测试不支持的执行器类型"""
+    with pytest.raises(ValueError):
+        IndicatorExecutor("gpu")
@@ -0,0 +1,79 @@
+import json
+import math
+
+import numpy as np
+import pytest
+
+from app.core import formats
+from app.core.formats import encode_columns, negotiate_format
+from exchanges.binance.klines import KlineColumns
+from tests.test_exchanges.conftest import make_klines
+
+
+@pytest.fixture
+def columns():
+    frame = KlineColumns.from_klines(make_klines(50))
+    frame.columns["rsi_14"] = np.r_[np.full(14, np.nan), np.linspace(30, 70, 36)]
+    return frame
+
+
+@pytest.mark.parametrize("format, accept, expected", [
+    (None, None, "json"),
+    (None, "text/html,application/xhtml+xml,*/*;q=0.8", "json"),
+    (None, "text/event-stream", "sse"),
+    (None, "application/x-ndjson;q=0.5, application/vnd.kline.columns+json", "columns"),
+    (None, "application/vnd.kline.columns+json;q=0, application/x-ndjson", "ndjson"),
+    ("columns", "application/x-ndjson", "columns"),
+])
+def test_negotiate_format(format, accept, expected):
+    """测试 format 参数优先，其次按 Accept 头的 q 值协商，默认为 json"""
+    assert negotiate_format(format, accept) == expected
+
+
+def test_negotiate_format_rejects_unknown_and_unavailable(monkeypatch):
+    """测试不支持的格式报错；依赖未安装时 format 参数报错，Accept 协商时跳过"""
+    with pytest.raises(ValueError, match="Unsupported format"):
+        negotiate_format("xml", None)
+
+    monkeypatch.setattr(formats, "msgpack", None)
+    with pytest.raises(ValueError, match="requires msgpack"):
+        negotiate_format("msgpack", None)
+    assert negotiate_format(None, "application/msgpack, application/x-ndjson;q=0.9") == "ndjson"
+
+
+def test_encode_columns_json(columns):
+    """测试列式 JSON：每个字段一个数组，数值保持为数字，NaN 转为 null"""
+    payload = json.loads(encode_columns(columns, "columns"))
+
+    assert payload["count"] == 50
+    assert payload["columns"]["open_time"] == columns["open_time"].tolist()
+    assert payload["columns"]["close"] == columns["close"].tolist()
+    assert payload["columns"]["rsi_14"][:14] == [None] * 14
+    assert payload["columns"]["rsi_14"][-1] == 70.0
+
+
+def test_encode_columns_msgpack(columns):
+    msgpack = pytest.importorskip("msgpack")
+    payload = msgpack.unpackb(encode_columns(columns, "msgpack"))
+
+    assert payload["symbol"] == columns.symbol
+    assert payload["columns"]["close"] == columns["close"].tolist()
+    assert payload["columns"]["rsi_14"][0] is None
+
+
+def test_encode_columns_arrow(columns):
+    pa = pytest.importorskip("pyarrow")
+    table = pa.ipc.open_stream(encode_columns(columns, "arrow")).read_all()
+
+    assert table.schema.metadata[b"symbol"] == columns.symbol.encode()
+    assert table.column("open_time").type == pa.int64()
+    assert table.column("rsi_14").null_count == 14
+    assert math.isclose(table.column("close")[-1].as_py(), columns["close"][-1])
+
+
+def test_fast_json_response_encodes_engine_output():
+    """测试直接编码的 JSON 响应：NaN 编码为 null，NumPy 数组直接编码"""
+    response = formats.FastJSONResponse({"close": "1.5", "rsi_14": float("nan"), "ema": np.array([1.0, np.nan])})
+
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == {"close": "1.5", "rsi_14": None, "ema": [1.0, None]}
@@ -0,0 +1,96 @@
+import pytest
+
+from exchanges.binance.cache import LRUCache
+from exchanges.binance.frame_cache import IndicatorFrameCache
+from exchanges.binance.indicators import TechnicalIndicators
+from exchanges.binance.klines import KlineColumns
+from tests.test_exchanges.conftest import make_klines
+from tests.test_exchanges.test_incremental import assert_row_matches
+
+
+def forming_clock(klines):
+    """让最后一根K线处于未收盘状态的时钟"""
+    return lambda: int(klines[-1]["open_time"]) + 1
+
+
+def columns(klines):
+    return KlineColumns.from_klines(klines, "BTCUSDT", "1h")
+
+
+def test_lru_cache_eviction_and_ttl(monkeypatch):
+    """测试容量淘汰、过期和命中统计"""
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.stats() == {"size": 2, "maxsize": 2, "ttl": None, "hits": 1,
+                             "misses": 1, "evictions": 1, "hit_rate": 0.5}
+
+    now = [100.0]
+    monkeypatch.setattr("exchanges.binance.cache.time.monotonic", lambda: now[0])
+    expiring = LRUCache(ttl=10)
+    expiring.set("a", 1)
+    now[0] += 11
+    assert expiring.get("a") is None
+
+
+def test_closed_window_hit_returns_same_rows():
+    """测试全部已收盘的窗口命中后直接复用结果"""
+    klines = make_klines(300)
+    cache = IndicatorFrameCache(clock=lambda: 2_000_000_000_000)
+
+    cold = cache.calculate(columns(klines))
+    hot = cache.calculate(columns(klines))
+    assert cold == TechnicalIndicators.calculate_all(klines)
+    assert hot == cold
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_forming_candle_recomputed_on_hit():
+    """测试命中时只重算未收盘K线，结果与全量计算一致"""
+    klines = make_klines(300)
+    cache = IndicatorFrameCache(clock=forming_clock(klines))
+    assert cache.calculate(columns(klines)) == TechnicalIndicators.calculate_all(klines)
+
+    for delta in (15.5, -40.25):
+        forming = [dict(kline) for kline in klines]
+        forming[-1]["close"] = f"{float(klines[-1]['close']) + delta:.2f}"
+        forming[-1]["high"] = f"{max(float(klines[-1]['high']), float(forming[-1]['close'])):.2f}"
+        forming[-1]["low"] = f"{min(float(klines[-1]['low']), float(forming[-1]['close'])):.2f}"
+
+        hot = cache.calculate(columns(forming))
+        expected = TechnicalIndicators.calculate_all(forming)
+        assert hot[:-1] == expected[:-1]
+        assert_row_matches(hot[-1], expected[-1])
+    assert cache.stats()["hits"] == 2
+
+    # 缓存的已收盘部分不受正在形成的K线影响，可直接用于不含该K线的同一窗口
+    assert cache.calculate(columns(klines[:-1])) == TechnicalIndicators.calculate_all(klines[:-1])
+    assert cache.stats()["hits"] == 3
+
+
+def test_chikou_shift_follows_default_ichimoku():
+    """测试缓存替换的滞后跨度行与默认指标中 ichimoku 的 kijun_sen_period 一致"""
+    overrides = dict(TechnicalIndicators.DEFAULT_INDICATORS)["ichimoku"]
+    shift = TechnicalIndicators.planner.resolve("ichimoku", overrides).kwargs["kijun_sen_period"]
+    assert IndicatorFrameCache.CHIKOU_SHIFT == shift
+
+    klines = make_klines(300)
+    cache = IndicatorFrameCache(clock=forming_clock(klines))
+    cache.calculate(columns(klines))
+    hot = cache.calculate(columns(klines))
+    assert hot[-1 - shift]["chikou_span"] == float(klines[-1]["close"])
+    assert hot[-2 - shift]["chikou_span"] == float(klines[-2]["close"])
+
+
+def test_new_candle_is_a_miss():
+    """测试新K线收盘后窗口变化，缓存未命中并按容量淘汰"""
+    klines = make_klines(400)
+    cache = IndicatorFrameCache(maxsize=2, clock=lambda: 2_000_000_000_000)
+    for end in (300, 301, 302):
+        window = klines[end - 250:end]
+        assert cache.calculate(columns(window)) == TechnicalIndicators.calculate_all(window)
+    assert cache.stats()["misses"] == 3
+    assert cache.stats()["evictions"] == 1
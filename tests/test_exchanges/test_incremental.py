@@ -0,0 +1,155 @@
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from exchanges.binance import kernels
+from exchanges.binance.engine import IndicatorEngine
+from exchanges.binance.incremental import (PANDAS_EXACT, SUPPORTED_PANDAS, IncrementalIndicators, RollingExtreme,
+                                           RollingSum, RollingVariance)
+from exchanges.binance.indicators import TechnicalIndicators
+from tests.test_exchanges.conftest import make_klines
+
+
+def assert_row_matches(row, expected):
+    """所有字段与 calculate_all 逐位一致"""
+    assert list(row) == list(expected)
+    for key, value in expected.items():
+        assert row[key] == value, key
+
+
+def rolling_series(values, window):
+    """逐个推入序列，返回每个位置的滚动均值、和与标准差"""
+    sums, variances = RollingSum(window), RollingVariance(window)
+    history = deque(maxlen=window)
+    means, totals, stds = [], [], []
+    for value in values:
+        sums.push(history, value)
+        variances.push(history, value)
+        history.append(value)
+        means.append(sums.mean())
+        totals.append(sums.sum())
+        stds.append(variances.std())
+    return np.array(means), np.array(totals), np.array(stds)
+
+
+@pytest.mark.parametrize("window", [3, 14, 20])
+def test_rolling_state_matches_kernels(window):
+    """测试在线滚动状态与 pandas 窗口内核逐位一致（含NaN、连续相同值、负数和数量级突变）"""
+    rng = np.random.default_rng(window)
+    values = 50000 * np.exp(np.cumsum(rng.normal(0, 0.002, 600)))
+    values[:5] = np.nan
+    values[100:140] = 5.0
+    values[200:260] = np.where(rng.random(60) < 0.5, 0.0, -rng.exponential(1e6, 60))
+    values[300] = 1e10
+    values[400:420] = np.nan
+
+    means, totals, stds = rolling_series(values.tolist(), window)
+    np.testing.assert_array_equal(means, kernels.rolling_window("mean", values, window))
+    np.testing.assert_array_equal(totals, kernels.rolling_window("sum", values, window))
+    np.testing.assert_array_equal(stds, kernels.rolling_window("std", values, window))
+
+
+@pytest.mark.parametrize("window", [1, 9, 26])
+def test_rolling_extreme_matches_kernels(window):
+    """测试单调队列的滚动最值与 pandas 窗口内核一致（含NaN和相同值），撤销最后一次推入后状态不变"""
+    rng = np.random.default_rng(window)
+    values = np.round(100 + np.cumsum(rng.normal(0, 1, 400)), 1)
+    values[50:80] = 7.0
+    values[150:153] = np.nan
+    values[200:260] = np.arange(60, 0, -1)
+
+    for maximum, kernel in ((True, "max"), (False, "min")):
+        extreme = RollingExtreme(window, maximum)
+        results = []
+        for value in values.tolist():
+            state = extreme.save()
+            candidates = list(extreme.candidates)
+            extreme.push(None, 1e9 if maximum else -1e9)
+            extreme.restore(state)
+            assert list(extreme.candidates) == candidates
+            extreme.push(None, value)
+            results.append(extreme.value())
+            assert len(extreme.candidates) <= window
+        np.testing.assert_array_equal(results, kernels.rolling_window(kernel, values, window))
+
+
+def test_pandas_version_supported():
+    """测试安装的 pandas 在增量计算逐位一致的版本范围内（requirements.txt 的范围）"""
+    assert PANDAS_EXACT, f"pandas {pd.__version__} is outside {SUPPORTED_PANDAS}"
+
+
+def test_rolling_extend_matches_push():
+    """测试初始化时整段推入与逐个推入的状态相同"""
+    values = [1.0, -1.0, 0.0, 1.0, 3.0, 2.0, -2.0, 1e10, 1.0, 2.0, 0.0, -2.0, 1.0, 3.0, 0.0, 1.0]
+    for cls in (RollingSum, RollingVariance):
+        pushed, extended = cls(6), cls(6)
+        history = deque(maxlen=6)
+        for value in values:
+            pushed.push(history, value)
+            history.append(value)
+        extended.extend(values)
+        assert pushed.save() == extended.save()
+
+def test_update_matches_calculate_all_for_every_prefix():
+    """测试逐根更新的结果与对同一段历史调用 calculate_all 的最后一行一致"""
+    klines = make_klines(160)
+    indicators = IncrementalIndicators()
+    for i, kline in enumerate(klines):
+        row = indicators.update(kline)
+        if i in (0, 1, 2, 13, 19, 51, 78, 120, 159):
+            assert_row_matches(row, TechnicalIndicators.calculate_all(klines[:i + 1])[-1])
+
+
+def test_from_klines_matches_full_history():
+    """测试用历史初始化后，后续每根K线都与全量计算一致（滞后跨度除外）"""
+    klines = make_klines(400)
+    expected = TechnicalIndicators.calculate_all(klines)
+    indicators = IncrementalIndicators.from_klines(klines[:300])
+
+    for kline, full_row in zip(klines[300:], expected[300:]):
+        row = indicators.update(kline)
+        full_row = dict(full_row, chikou_span=None)
+        assert_row_matches(row, full_row)
+
+
+def test_replace_last_recomputes_forming_candle():
+    """测试未收盘K线多次替换后与直接追加最终K线的结果一致"""
+    klines = make_klines(200)
+    final = klines[-1]
+    forming = dict(final, close=str(float(final["close"]) + 55), high=str(float(final["high"]) + 80))
+
+    indicators = IncrementalIndicators.from_klines(klines[:-1])
+    indicators.update(forming)
+    indicators.replace_last(dict(forming, close=final["low"]))
+    row = indicators.replace_last(final)
+
+    assert indicators.count == 200
+    assert row == IncrementalIndicators.from_klines(klines).latest()
+
+
+def test_copy_is_independent():
+    """测试复制的状态互不影响"""
+    klines = make_klines(120)
+    indicators = IncrementalIndicators.from_klines(klines[:100])
+    clone = indicators.copy()
+    for kline in klines[100:]:
+        clone.update(kline)
+
+    assert indicators.count == 100
+    assert clone.count == 120
+    assert not math.isclose(indicators.latest()["obv"], clone.latest()["obv"])
+
+
+def test_from_engine_matches_from_klines():
+    """测试从引擎结果初始化的状态与逐根回放完全一致"""
+    klines = make_klines(400)
+    engine = IndicatorEngine(klines).compute_all()
+    seeded = IncrementalIndicators.from_engine(engine, 300)
+    replayed = IncrementalIndicators.from_klines(klines[:300])
+
+    assert seeded.latest() == replayed.latest()
+    for kline in klines[300:]:
+        assert seeded.update(kline) == replayed.update(kline)
@@ -0,0 +1,73 @@
+import math
+
+import pytest
+
+from exchanges.binance.engine import IndicatorEngine
+from exchanges.binance.indicators import TechnicalIndicators
+from reference.legacy_indicators import TechnicalIndicators as LegacyIndicators
+
+
+def assert_records_equal(actual, expected):
+    assert len(actual) == len(expected)
+    for row, legacy_row in zip(actual, expected):
+        assert list(row) == list(legacy_row)
+        for key, value in legacy_row.items():
+            if isinstance(value, float) and math.isnan(value):
+                assert math.isnan(row[key]), key
+            else:
+                assert row[key] == value, key
+
+
+def test_calculate_all_matches_legacy(klines):
+    """测试列式引擎与原逐指标实现的结果完全一致"""
+    assert_records_equal(TechnicalIndicators.calculate_all(klines),
+                         LegacyIndicators.calculate_all(klines))
+
+
+@pytest.mark.parametrize("name, args", [
+    ("calculate_macd", (8, 21, 5)),
+    ("calculate_rsi", (9,)),
+    ("calculate_bollinger_bands", (20, 2)),
+    ("calculate_atr", (14,)),
+    ("calculate_cci", (20,)),
+    ("calculate_parabolic_sar", (0.02, 0.2)),
+    ("calculate_mfi", (14,)),
+    ("calculate_obv", ()),
+    ("calculate_adx", (14,)),
+])
+def test_wrappers_match_legacy_indicator_columns(klines, name, args):
+    """测试单指标包装函数输出的指标列与原实现一致"""
+    actual = getattr(TechnicalIndicators, name)(klines, *args)
+    expected = getattr(LegacyIndicators, name)(klines, *args)
+
+    new_keys = [key for key in expected[0] if key not in klines[0]]
+    assert new_keys
+    for row, legacy_row in zip(actual, expected):
+        for key in new_keys:
+            value = legacy_row[key]
+            if isinstance(value, float) and math.isnan(value):
+                assert math.isnan(row[key]), key
+            else:
+                assert row[key] == value, key
+
+
+def test_engine_materializes_columns_once(klines):
+    """测试引擎按计算顺序保存指标列，输出行保留原始字段"""
+    engine = IndicatorEngine(klines).compute_all()
+    records = engine.to_records(normalize=True)
+
+    assert list(engine.columns)[:3] == ["macd", "macd_signal", "macd_histogram"]
+    assert records[0]["open"] == klines[0]["open"]
+    assert records[0]["close"] == str(float(klines[0]["close"]))
+    assert records[0]["rsi_14"] is None
+    assert isinstance(records[-1]["rsi_14"], float)
+
+
+def test_iter_records_matches_to_records(klines):
+    """测试按块逐行生成的结果行与一次生成的结果行一致"""
+    engine = IndicatorEngine(klines).compute(["rsi", ("ema", {"period": 20}), "bollinger_bands"])
+
+    expected = engine.to_records(normalize=True)
+    assert list(engine.iter_records(normalize=True, chunk_size=7)) == expected
+    assert list(engine.iter_records(normalize=True, start=50, chunk_size=16)) == expected[50:]
+    assert list(engine.iter_records(start=len(klines))) == []
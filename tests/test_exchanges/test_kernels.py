@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from exchanges.binance import kernels
+from tests.test_exchanges.conftest import make_klines
+from reference.legacy_indicators import TechnicalIndicators as LegacyIndicators
+
+
+def columns(klines):
+    df = pd.DataFrame(klines)
+    return tuple(df[field].astype(float).to_numpy() for field in ("high", "low", "close", "volume"))
+
+
+def legacy_column(rows, key):
+    return np.array([row[key] for row in rows], dtype=np.float64)
+
+
+def test_obv_matches_legacy_loop():
+    """测试向量化OBV与原循环实现一致"""
+    klines = make_klines(2000, seed=3)
+    high, low, close, volume = columns(klines)
+
+    expected = legacy_column(LegacyIndicators.calculate_obv(klines), "obv")
+    np.testing.assert_array_equal(kernels.obv(close, volume), expected)
+
+
+def test_money_flow_matches_legacy_mfi():
+    """测试向量化资金流量拆分后MFI与原循环实现一致"""
+    klines = make_klines(2000, seed=4)
+    high, low, close, volume = columns(klines)
+
+    positive_flow, negative_flow = kernels.money_flow((high + low + close) / 3, volume)
+    ratio = (pd.Series(positive_flow).rolling(14).sum()
+             / pd.Series(negative_flow).rolling(14).sum())
+    actual = (100 - (100 / (1 + ratio))).to_numpy()
+
+    expected = legacy_column(LegacyIndicators.calculate_mfi(klines, 14), "mfi_14")
+    np.testing.assert_array_equal(actual, expected)
+
+
+def test_directional_movement_and_true_range():
+    """测试 +DM/-DM 与 TR 的边界取值"""
+    high = np.array([10.0, 12.0, 11.0, 11.0])
+    low = np.array([9.0, 10.0, 8.0, 8.0])
+    close = np.array([9.5, 11.0, 9.0, 10.0])
+
+    plus_dm, minus_dm = kernels.directional_movement(high, low)
+    np.testing.assert_array_equal(plus_dm, [0.0, 2.0, 0.0, 0.0])
+    np.testing.assert_array_equal(minus_dm, [0.0, 0.0, 2.0, 0.0])
+    np.testing.assert_array_equal(kernels.true_range(high, low, close), [1.0, 2.5, 3.0, 3.0])
+
+
+def test_parabolic_sar_matches_legacy_loop():
+    """测试数组状态循环的SAR与原实现一致"""
+    for seed in (1, 2, 5):
+        klines = make_klines(1500, seed=seed)
+        high, low, close, volume = columns(klines)
+
+        expected = legacy_column(LegacyIndicators.calculate_parabolic_sar(klines), "sar")
+        np.testing.assert_array_equal(kernels.parabolic_sar(high, low, close), expected)
+
+
+def test_parabolic_sar_short_input():
+    """测试不足两根K线时SAR为NaN"""
+    assert np.isnan(kernels.parabolic_sar(np.array([1.0]), np.array([0.5]), np.array([0.8]))).all()
+    assert kernels.parabolic_sar(np.array([]), np.array([]), np.array([])).size == 0
+
+
+def legacy_mad(values, window):
+    return pd.Series(values).rolling(window=window).apply(
+        lambda x: np.mean(np.abs(x - np.mean(x))), raw=True).to_numpy()
+
+
+def test_rolling_mad_matches_rolling_apply(monkeypatch):
+    """测试滑动窗口MAD与 rolling.apply 逐位一致（含NaN与分块边界）"""
+    values = 30000 + np.cumsum(np.random.default_rng(11).normal(0, 50, 5000))
+    values[100] = np.nan
+
+    expected = legacy_mad(values, 20)
+    np.testing.assert_array_equal(kernels.rolling_mad(values, 20), expected)
+
+    monkeypatch.setattr(kernels, "WINDOW_CHUNK_ELEMENTS", 20 * 7)
+    np.testing.assert_array_equal(kernels.rolling_mad(values, 20), expected)
+
+
+def test_rolling_mad_two_dimensional_and_short_input():
+    """测试二维输入按列计算，以及序列短于窗口时全部为NaN"""
+    block = np.random.default_rng(12).normal(100, 5, (300, 3))
+    actual = kernels.rolling_mad(block, 14)
+    for column in range(3):
+        np.testing.assert_array_equal(actual[:, column], legacy_mad(block[:, column], 14))
+
+    assert np.isnan(kernels.rolling_mad(np.arange(5.0), 20)).all()
+
+
+def test_window_kernel_registry():
+    """测试窗口内核注册与按名称调用"""
+    @kernels.register_window_kernel("range")
+    def rolling_range(values, window):
+        return kernels.rolling_max(values, window) - kernels.rolling_min(values, window)
+
+    try:
+        values = np.array([1.0, 4.0, 2.0, 8.0])
+        np.testing.assert_array_equal(kernels.rolling_window("range", values, 2), [np.nan, 3.0, 2.0, 6.0])
+        np.testing.assert_array_equal(kernels.rolling_window("mean", values, 2), [np.nan, 2.5, 3.0, 5.0])
+        with pytest.raises(ValueError):
+            kernels.rolling_window("unknown", values, 2)
+    finally:
+        kernels.WINDOW_KERNELS.pop("range")
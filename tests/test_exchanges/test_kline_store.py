@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+
+from exchanges.binance.engine import IndicatorEngine
+from exchanges.binance.kline_store import KlineStore
+from exchanges.binance.klines import KlineColumns
+from tests.test_exchanges.conftest import make_klines
+
+SERIES = make_klines(600)
+HOUR = 3_600_000
+
+
+def open_times(columns):
+    return columns["open_time"].tolist()
+
+
+def expected(klines):
+    return [int(kline["open_time"]) for kline in klines]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return KlineStore(str(tmp_path), segment_rows=100)
+
+
+def test_append_and_read_across_segments(store):
+    """测试跨段追加和按 open_time 范围读取（与 REST 的 limit 语义一致）"""
+    assert store.append("BTCUSDT", "1h", SERIES[:250]) == 250
+    assert store.append("BTCUSDT", "1h", SERIES[250:]) == 350
+    assert store.count("BTCUSDT", "1h") == 600
+    assert store.stats()["BTCUSDT@1h"]["segments"] == 6
+
+    assert open_times(store.read("BTCUSDT", "1h")) == expected(SERIES)
+    start, end = int(SERIES[95]["open_time"]), int(SERIES[310]["open_time"])
+    assert open_times(store.read("BTCUSDT", "1h", start, end)) == expected(SERIES[95:311])
+    assert open_times(store.read("BTCUSDT", "1h", start - 5, end + 5)) == expected(SERIES[95:311])
+    assert open_times(store.read("BTCUSDT", "1h", start, limit=10)) == expected(SERIES[95:105])
+    assert open_times(store.read("BTCUSDT", "1h", end_time=end, limit=150)) == expected(SERIES[161:311])
+    assert open_times(store.read("BTCUSDT", "1h", limit=3)) == expected(SERIES[-3:])
+    assert len(store.read("ETHUSDT", "1h")) == 0
+
+
+def test_round_trip_values(store):
+    """测试各列按类型存储，转换回K线时与写入的原始K线完全相同（包括小数末尾的 0 和 ignore）"""
+    series = [dict(kline, close=f"{float(kline['close']):.1f}0", ignore="123") for kline in SERIES[:150]]
+    store.append("BTCUSDT", "1h", series[:50])
+    store.append("BTCUSDT", "1h", series[50:150])
+    assert store.read("BTCUSDT", "1h").to_klines() == series
+    assert store.read("BTCUSDT", "1h", int(series[95]["open_time"]), limit=10).to_klines() == series[95:105]
+    assert KlineStore(store.root, segment_rows=100).read("BTCUSDT", "1h", limit=60).to_klines() == series[90:]
+
+
+def test_rows_unavailable_without_original_klines(store):
+    """测试只有数值列的数据写入后，该段不再能转换为旧格式，其他段不受影响"""
+    store.append("BTCUSDT", "1h", SERIES[:120])
+    numeric = KlineColumns.from_klines(SERIES[120:130])
+    numeric.rows = None
+    store.append("BTCUSDT", "1h", numeric)
+
+    assert store.read("BTCUSDT", "1h", limit=30).rows is None
+    assert store.read("BTCUSDT", "1h", end_time=int(SERIES[99]["open_time"])).to_klines() == SERIES[:100]
+    with pytest.raises(ValueError):
+        store.read("BTCUSDT", "1h").to_klines()
+
+
+def test_reads_are_zero_copy(store):
+    """测试单段内的读取是内存映射的只读视图，指标引擎直接在其上计算"""
+    store.append("BTCUSDT", "1h", SERIES[:100])
+    columns = store.read("BTCUSDT", "1h", limit=80)
+    segment = store._manifest("BTCUSDT", "1h")[0]
+    mapped = store._column("BTCUSDT", "1h", segment, "close")
+
+    assert np.shares_memory(columns["close"], mapped)
+    assert not columns["close"].flags.writeable
+
+    engine = columns.engine(IndicatorEngine).compute_all()
+    assert np.shares_memory(engine.close, mapped)
+    reference = IndicatorEngine(SERIES[20:100]).compute_all()
+    for name, values in reference.columns.items():
+        np.testing.assert_allclose(engine.columns[name], values, equal_nan=True, err_msg=name)
+
+
+def test_append_only_and_persistent(store, tmp_path):
+    """测试只追加比已存储更新的K线，重新打开后数据仍在"""
+    store.append("BTCUSDT", "1h", SERIES[100:200])
+    assert store.append("BTCUSDT", "1h", SERIES[50:150]) == 0
+    assert store.append("BTCUSDT", "1h", SERIES[190:210] + SERIES[205:215]) == 15
+    assert store.last_open_time("BTCUSDT", "1h") == int(SERIES[214]["open_time"])
+    assert store.last_close_time("BTCUSDT", "1h") == int(SERIES[214]["close_time"])
+
+    reopened = KlineStore(str(tmp_path), segment_rows=50)
+    assert open_times(reopened.read("BTCUSDT", "1h")) == expected(SERIES[100:215])
+    reopened.append("BTCUSDT", "1h", SERIES[215:300])
+    assert open_times(reopened.read("BTCUSDT", "1h")) == expected(SERIES[100:300])
+
+
+def test_gaps(store):
+    """测试检测中间缺失的K线以及检查范围首尾未覆盖的部分"""
+    store.append("BTCUSDT", "1h", SERIES[10:20] + SERIES[25:30] + SERIES[31:40])
+    first, last = int(SERIES[0]["open_time"]), int(SERIES[49]["open_time"])
+
+    assert store.gaps("BTCUSDT", "1h") == [
+        (int(SERIES[20]["open_time"]), int(SERIES[24]["open_time"])),
+        (int(SERIES[30]["open_time"]), int(SERIES[30]["open_time"])),
+    ]
+    assert store.gaps("BTCUSDT", "1h", first + 1, last)[0] == (int(SERIES[1]["open_time"]),
+                                                                int(SERIES[9]["open_time"]))
+    assert store.gaps("BTCUSDT", "1h", first, last)[-1] == (int(SERIES[40]["open_time"]), last)
+    assert store.gaps("ETHUSDT", "1h", first, last) == [(first, last)]
+    with pytest.raises(ValueError):
+        store.append("BTCUSDT", "1M", SERIES[:1])
@@ -0,0 +1,89 @@
+import json
+
+import numpy as np
+import pytest
+
+from exchanges.binance.futures import BinanceFuturesClient, FuturesSymbol
+from exchanges.binance.klines import COLUMNS, KlineColumns, format_rows, parse_klines
+from tests.test_exchanges.conftest import make_klines
+
+SERIES = make_klines(300)
+
+
+def raw_rows(klines):
+    """转换为币安接口返回的原始K线数组"""
+    return [[int(k["open_time"]), k["open"], k["high"], k["low"], k["close"], k["volume"], int(k["close_time"]),
+             k["quote_asset_volume"], int(k["number_of_trades"]), k["taker_buy_base_asset_volume"],
+             k["taker_buy_quote_asset_volume"], k["ignore"]] for k in klines]
+
+
+def assert_columns_equal(columns, klines):
+    assert len(columns) == len(klines)
+    for name, dtype in COLUMNS.items():
+        assert columns[name].dtype == dtype
+        convert = int if dtype is np.int64 else float
+        assert columns[name].tolist() == [convert(kline[name]) for kline in klines], name
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+def test_parse_klines_from_bytes(indent):
+    """测试响应字节直接解析为数值列，结果与逐字段解析一致"""
+    body = json.dumps(raw_rows(SERIES), indent=indent).encode()
+    columns = parse_klines(body, "BTCUSDT", "1h")
+
+    assert_columns_equal(columns, SERIES)
+    assert (columns.symbol, columns.interval) == ("BTCUSDT", "1h")
+    assert all(column.flags.c_contiguous for column in columns.columns.values())
+    assert columns.nbytes == len(SERIES) * 8 * len(COLUMNS)
+
+
+def test_parse_klines_fallback_and_empty():
+    """测试不符合纯数字数组格式的内容回退为 JSON 解析"""
+    rows = raw_rows(SERIES[:3])
+    rows[1][11] = "x"
+    assert_columns_equal(parse_klines(json.dumps(rows), "BTCUSDT", "1h"), SERIES[:3])
+    assert len(parse_klines(b"[]", "BTCUSDT", "1h")) == 0
+    with pytest.raises(ValueError):
+        parse_klines(b'{"code": -1121}', "BTCUSDT", "1h")
+
+
+def test_legacy_round_trip():
+    """测试旧的字符串字典格式由原始K线还原，与 _format_klines 的结果完全相同"""
+    series = [dict(kline, close=f"{float(kline['close']):.1f}0", ignore="17928899.62484339") for kline in SERIES]
+    columns = KlineColumns.from_klines(series)
+    assert_columns_equal(columns, series)
+    assert (columns.symbol, columns.interval) == ("BTCUSDT", "1h")
+    assert columns.to_klines() == series
+
+    legacy = BinanceFuturesClient()._format_klines(raw_rows(series), FuturesSymbol.BTCUSDT, "1h")
+    assert legacy == series
+    for body in (json.dumps(raw_rows(series)), json.dumps(raw_rows(series), indent=2)):
+        assert parse_klines(body, "BTCUSDT", "1h").to_klines() == legacy
+    assert KlineColumns.from_rows(raw_rows(series), "BTCUSDT", "1h").to_klines() == legacy
+
+    numeric = KlineColumns(columns.symbol, columns.interval, columns.columns)
+    with pytest.raises(ValueError):
+        numeric.to_klines()
+
+
+def test_slice_and_concat_keep_original_klines():
+    """测试按行切片和拼接后仍能还原原始K线，响应字节之间拼接时不解析"""
+    body = json.dumps(raw_rows(SERIES), indent=1).encode()
+    columns = parse_klines(body, "BTCUSDT", "1h")
+    tail = columns.slice(250)
+    assert tail.rows.body is body
+    assert tail.to_klines() == SERIES[250:]
+    assert columns.slice(10, 12).to_klines() == SERIES[10:12]
+    assert columns.slice(5, 5).to_klines() == []
+
+    joined = KlineColumns.concat([columns.slice(0, 100), parse_klines(json.dumps(raw_rows(SERIES[100:])), "BTCUSDT",
+                                                                      "1h")])
+    assert_columns_equal(joined, SERIES)
+    assert joined.to_klines() == SERIES
+    assert joined.slice(95, 105).to_klines() == SERIES[95:105]
+
+    mixed = KlineColumns.concat([columns.slice(0, 100), KlineColumns.from_klines(SERIES[100:])])
+    assert mixed.to_klines() == SERIES
+    for part in (joined, mixed):
+        texts = part.row_texts(np.array([99, 100]))
+        assert format_rows([json.loads(text) for text in texts], "BTCUSDT", "1h") == SERIES[99:101]
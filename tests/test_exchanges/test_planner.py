@@ -0,0 +1,137 @@
+import pytest
+
+from exchanges.binance.cache import LRUCache
+from exchanges.binance.engine import IndicatorEngine
+from exchanges.binance.indicators import TechnicalIndicators
+from exchanges.binance.planner import IndicatorRequest
+
+planner = TechnicalIndicators.planner
+
+
+def test_shared_intermediates_are_planned_once():
+    """测试 ATR/ADX 共享真实波幅，随机指标/威廉/一目均衡共享窗口高低点"""
+    plan = planner.plan(["atr", "adx", "stochastic", "williams_r", "ichimoku"])
+
+    assert plan.intermediates.count(("true_range",)) == 1
+    assert plan.intermediates.count(("rolling_high", 14)) == 1
+    assert plan.intermediates.count(("rolling_low", 14)) == 1
+    assert {("rolling_high", 9), ("rolling_high", 26), ("rolling_high", 52)} <= set(plan.intermediates)
+    assert [request.name for request in plan.indicators] == ["atr", "adx", "stochastic", "williams_r", "ichimoku"]
+
+
+def test_dependencies_come_before_dependents():
+    """测试中间量按依赖顺序排列"""
+    plan = planner.plan(["mfi", "vwap", "cci"])
+    assert plan.intermediates == [("typical_price",), ("money_flow",)]
+
+
+def test_resolve_fills_defaults_and_validates():
+    """测试参数补齐默认值、类型转换和非法输入"""
+    assert planner.resolve("bollinger_bands", {"period": "10"}) == IndicatorRequest(
+        "bollinger_bands", (("period", 10), ("num_std", 2)))
+
+    with pytest.raises(ValueError):
+        planner.resolve("unknown")
+    with pytest.raises(ValueError):
+        planner.resolve("rsi", {"window": 3})
+    with pytest.raises(ValueError):
+        planner.resolve("rsi", {"period": 0})
+
+
+def test_intermediate_computed_once(klines, monkeypatch):
+    """测试同一中间量在一次计算中只执行一次"""
+    calls = []
+    original = IndicatorEngine._true_range
+
+    def counting(engine):
+        calls.append(1)
+        return original(engine)
+
+    monkeypatch.setattr(IndicatorEngine, "_true_range", counting)
+    IndicatorEngine(klines).compute(["atr", "adx"])
+    assert len(calls) == 1
+
+
+def test_calculate_selected_indicators_only(klines):
+    """测试只计算请求的指标，且结果与全量计算一致"""
+    full = TechnicalIndicators.calculate_all(klines)
+    selected = TechnicalIndicators.calculate(klines, ["rsi", "adx"])
+
+    indicator_keys = [key for key in selected[0] if key not in klines[0]]
+    assert indicator_keys == ["rsi_14", "di_plus", "di_minus", "adx_14"]
+    for row, full_row in zip(selected, full):
+        for key in indicator_keys:
+            assert row[key] == full_row[key]
+
+
+def test_parse_selection():
+    """测试逗号分隔的指标列表解析，冒号后按参数声明顺序指定参数"""
+    assert planner.parse(None) is None
+    assert planner.parse(" ") is None
+    assert [request.name for request in planner.parse("macd, rsi,,atr")] == ["macd", "rsi", "atr"]
+
+    requests = planner.parse("rsi:9,ema:20,ema:50,bollinger_bands:20:2,stochastic::5")
+    assert requests[0] == IndicatorRequest("rsi", (("period", 9),))
+    assert [request.kwargs["period"] for request in requests[1:3]] == [20, 50]
+    assert requests[3].kwargs == {"period": 20, "num_std": 2}
+    assert requests[4].kwargs == {"k_period": 14, "d_period": 5}
+    assert [planner.format(request) for request in requests[:4]] == [
+        "rsi:9", "ema:20", "ema:50", "bollinger_bands:20:2"]
+
+    with pytest.raises(ValueError):
+        planner.parse("rsi:9:3")
+    with pytest.raises(ValueError):
+        planner.parse("ema:fast")
+
+
+def test_outputs_match_engine_columns(klines):
+    """测试元数据中的输出字段模板与引擎实际生成的列一致"""
+    for name in TechnicalIndicators.SUPPORTED_INDICATORS:
+        request = planner.resolve(name)
+        assert set(IndicatorEngine(klines).run(request)) == set(planner.outputs(request))
+    assert planner.outputs(planner.resolve("rsi", {"period": 9})) == ["rsi_9"]
+
+
+def test_conflicting_outputs_rejected():
+    """测试参数不同但输出字段重名的请求被拒绝"""
+    with pytest.raises(ValueError):
+        planner.plan(planner.parse("bollinger_bands:20:2,bollinger_bands:10:2"))
+    planner.plan(planner.parse("ema:20,ema:50"))
+
+
+def test_parameterized_calculation(klines):
+    """测试带参数的指标计算结果与单独计算一致"""
+    records = TechnicalIndicators.calculate(klines, planner.parse("rsi:9,ema:20,ema:50"))
+    rsi = TechnicalIndicators.calculate_rsi(klines, 9)
+    ema = TechnicalIndicators.calculate_ema(klines, 50)
+
+    assert [key for key in records[0] if key not in klines[0]] == ["rsi_9", "ema_20", "ema_50"]
+    assert records[-1]["rsi_9"] == rsi[-1]["rsi_9"]
+    assert records[-1]["ema_50"] == ema[-1]["ema_50"]
+
+
+def test_memoized_results(klines, monkeypatch):
+    """测试同一窗口的指标结果被缓存复用，窗口或末根K线变化时重新计算"""
+    monkeypatch.setattr(TechnicalIndicators, "memo", LRUCache(maxsize=64))
+    calls = []
+    original = IndicatorEngine.rsi
+
+    def counting(engine, period=14):
+        calls.append(period)
+        return original(engine, period)
+
+    monkeypatch.setattr(IndicatorEngine, "rsi", counting)
+    selection = planner.parse("rsi:9,ema:20")
+
+    first = TechnicalIndicators.calculate(klines, selection, memoize=True)
+    second = TechnicalIndicators.calculate(klines, selection, memoize=True)
+    assert calls == [9]
+    assert first == second
+    assert TechnicalIndicators.memo.stats()["hits"] == 2
+
+    # 末根K线仍在变化（未收盘）时不能复用旧结果
+    forming = [dict(kline) for kline in klines]
+    forming[-1]["close"] = str(float(forming[-1]["close"]) + 1)
+    updated = TechnicalIndicators.calculate(forming, selection, memoize=True)
+    assert calls == [9, 9]
+    assert updated[-1]["rsi_9"] == TechnicalIndicators.calculate(forming, selection)[-1]["rsi_9"]
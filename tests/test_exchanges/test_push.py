@@ -0,0 +1,171 @@
+import asyncio
+import threading
+
+import pytest
+
+from exchanges.binance.futures import _FuturesClientBase
+from exchanges.binance.indicators import TechnicalIndicators
+from exchanges.binance.push import KlinePushHub
+from exchanges.binance.symbols import Symbol
+from tests.test_exchanges.conftest import make_klines
+
+BTCUSDT = Symbol("BTCUSDT")
+SELECTION = TechnicalIndicators.planner.parse("rsi:9")
+
+
+class FakeClient:
+    """只提供推送中心需要的取数和计算接口，返回 klines 属性中的K线"""
+
+    INTERVAL_MS = _FuturesClientBase.INTERVAL_MS
+
+    def __init__(self, klines):
+        self.klines = klines
+        self.calls = 0
+
+    async def get_indicator_window(self, symbol, interval, limit, start_time=None, end_time=None,
+                                   indicators=None, warmup=True):
+        self.calls += 1
+        return list(self.klines), len(self.klines) - limit
+
+    async def run_indicator_rows(self, klines, indicators, start=0):
+        return TechnicalIndicators.calculate(klines, indicators)[start:]
+
+
+class FakeStream:
+    def __init__(self):
+        self.listeners = []
+        self.subscriptions = set()
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self.listeners.remove(listener)
+
+    def subscribe(self, symbol, interval, pinned=True):
+        self.subscriptions.add((symbol, interval))
+
+    def push(self, kline):
+        """在另一个线程中回调，与真实推送线程相同"""
+        thread = threading.Thread(target=lambda: [listener(kline) for listener in self.listeners])
+        thread.start()
+        thread.join()
+
+
+async def receive(queue, timeout=2.0):
+    return await asyncio.wait_for(queue.get(), timeout)
+
+
+@pytest.fixture
+def klines():
+    return make_klines(60)
+
+
+@pytest.mark.asyncio
+async def test_subscribers_share_one_computation(klines):
+    """测试同一订阅的多个连接共用一次计算，只推送最后一根K线"""
+    client = FakeClient(klines)
+    hub = KlinePushHub(client, poll_interval=60)
+    first, second = hub.queue(), hub.queue()
+    try:
+        hub.subscribe(first, BTCUSDT, "1h", SELECTION)
+        hub.subscribe(second, BTCUSDT, "1h", SELECTION)
+        message = await receive(first)
+        assert await receive(second) == message
+
+        expected = TechnicalIndicators.calculate(klines, SELECTION)[-1]
+        assert message["type"] == "klines"
+        assert message["klines"] == [expected]
+        assert client.calls == 1
+
+        # 后来的订阅者立即收到最新快照，不再计算
+        third = hub.queue()
+        hub.subscribe(third, BTCUSDT, "1h", SELECTION)
+        assert (await receive(third))["klines"] == [expected]
+        assert client.calls == 1
+        assert hub.stats()["topics"]["BTCUSDT@1h[rsi:9]"]["subscribers"] == 3
+    finally:
+        await hub.close()
+
+
+@pytest.mark.asyncio
+async def test_equivalent_indicator_strings_share_topic(klines):
+    """测试指标顺序、空格和默认参数写法不同的订阅共用同一个计算"""
+    client = FakeClient(klines)
+    hub = KlinePushHub(client, poll_interval=60)
+    first, second, third = hub.queue(), hub.queue(), hub.queue()
+    try:
+        keys = {hub.subscribe(first, BTCUSDT, "1h", TechnicalIndicators.planner.parse("rsi:9,ema:20")),
+                hub.subscribe(second, BTCUSDT, "1h", TechnicalIndicators.planner.parse(" ema:20 , rsi:9")),
+                hub.subscribe(third, BTCUSDT, "1h", TechnicalIndicators.planner.parse("ema:20,rsi:9,rsi:9"))}
+        assert keys == {("BTCUSDT", "1h", "ema:20,rsi:9")}
+        assert hub.topic_key(BTCUSDT, "1h", TechnicalIndicators.planner.parse("rsi")) == \
+            hub.topic_key(BTCUSDT, "1h", TechnicalIndicators.planner.parse("rsi:14"))
+        message = await receive(first)
+        assert message["indicators"] == "ema:20,rsi:9"
+        assert await receive(second) == message
+        assert client.calls == 1
+        assert list(hub.stats()["topics"]) == ["BTCUSDT@1h[ema:20,rsi:9]"]
+    finally:
+        await hub.close()
+
+
+@pytest.mark.asyncio
+async def test_stream_updates_push_changed_candles(klines):
+    """测试K线推送触发重新计算：最后一根变化时推送，开始新K线时连同刚收盘的一根推送"""
+    stream = FakeStream()
+    client = FakeClient(klines[:-1])
+    hub = KlinePushHub(client, stream, poll_interval=60)
+    queue = hub.queue()
+    try:
+        hub.subscribe(queue, BTCUSDT, "1h", SELECTION)
+        await receive(queue)
+        assert stream.subscriptions == {("BTCUSDT", "1h")}
+
+        # 最后一根K线没有变化时不推送
+        stream.push(klines[-2])
+        await asyncio.sleep(0.05)
+        assert queue.empty()
+
+        forming = dict(klines[-2], close=str(float(klines[-2]["close"]) + 10))
+        client.klines = klines[:-2] + [forming]
+        stream.push(forming)
+        rows = (await receive(queue))["klines"]
+        assert [row["close"] for row in rows] == [str(float(forming["close"]))]
+
+        client.klines = klines
+        stream.push(klines[-1])
+        rows = (await receive(queue))["klines"]
+        assert [row["open_time"] for row in rows] == [klines[-2]["open_time"], klines[-1]["open_time"]]
+        assert rows[0]["close"] == str(float(klines[-2]["close"]))
+    finally:
+        await hub.close()
+    assert stream.listeners == []
+
+
+@pytest.mark.asyncio
+async def test_unsubscribe_stops_computation(klines):
+    client = FakeClient(klines)
+    hub = KlinePushHub(client, poll_interval=0.01)
+    queue = hub.queue()
+    key = hub.subscribe(queue, BTCUSDT, "1h")
+    await receive(queue)
+
+    task = hub.topics[key].task
+    hub.unsubscribe_all(queue)
+    await asyncio.gather(task, return_exceptions=True)
+    assert task.cancelled()
+    assert hub.stats()["topics"] == {}
+    calls = client.calls
+    await asyncio.sleep(0.05)
+    assert client.calls == calls
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_drops_oldest(klines):
+    hub = KlinePushHub(FakeClient(klines), queue_size=2)
+    queue = hub.queue()
+    for i in range(3):
+        hub.put(queue, {"seq": i})
+    assert [queue.get_nowait()["seq"] for _ in range(2)] == [1, 2]
+    assert hub.stats()["dropped"] == 1
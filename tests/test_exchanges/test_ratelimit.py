@@ -0,0 +1,134 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from exchanges.binance.ratelimit import Priority, WeightBudget, request_priority, request_weight
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_request_weight():
+    """测试按接口和 limit 分档计算权重"""
+    assert request_weight("/fapi/v1/klines", {"limit": 99}) == 1
+    assert request_weight("/fapi/v1/klines", {"limit": 1500}) == 10
+    assert request_weight("/fapi/v1/klines", {}) == 5
+    assert request_weight("/fapi/v1/depth", {"limit": 1000}) == 20
+    assert request_weight("/fapi/v1/ticker/24hr", {"symbol": "BTCUSDT"}) == 1
+    assert request_weight("/fapi/v1/ticker/24hr") == 40
+    assert request_weight("/fapi/v1/unknown") == 1
+
+
+@pytest.mark.asyncio
+async def test_queue_by_priority():
+    """测试权重不足时实时请求先于普通查询和历史回补获得权重"""
+    budget = WeightBudget(capacity=10, period=0.1)
+    await budget.acquire(10)
+    order = []
+
+    async def request(name, priority):
+        with request_priority(priority):
+            await budget.acquire(10)
+        order.append(name)
+
+    tasks = [asyncio.create_task(request("backfill-1", Priority.BACKFILL)),
+             asyncio.create_task(request("backfill-2", Priority.BACKFILL)),
+             asyncio.create_task(request("normal", Priority.NORMAL)),
+             asyncio.create_task(request("live", Priority.LIVE))]
+    await asyncio.gather(*tasks)
+
+    assert order == ["live", "normal", "backfill-1", "backfill-2"]
+    assert budget.stats()["queued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_releases_turn():
+    """测试排队中被取消的请求不占用权重"""
+    budget = WeightBudget(capacity=10, period=0.1)
+    await budget.acquire(10)
+    cancelled = asyncio.create_task(budget.acquire(10, Priority.LIVE))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    await budget.acquire(10, Priority.BACKFILL)
+
+    assert budget.spent == 20
+    assert budget.stats()["queued"] == 0
+
+
+def test_headers_update_budget():
+    """测试响应头的已用权重只会减少可用权重，429 时按 Retry-After 暂停"""
+    clock = FakeClock()
+    budget = WeightBudget(capacity=100, period=10, clock=clock)
+    assert budget.update_from_headers(200, {"X-MBX-USED-WEIGHT-1M": "90"}) is None
+    assert budget.available == 10
+    budget.update(5)
+    assert budget.available == 10
+
+    assert budget.update_from_headers(429, {"Retry-After": "5"}) == 5.0
+    stats = budget.stats()
+    assert stats["bans"] == 1
+    assert stats["banned_for"] == 5
+    assert stats["available"] == 0
+
+    clock.now = 5
+    assert budget.stats()["banned_for"] == 0
+    assert budget.available == 50
+
+
+def test_acquire_sync_waits():
+    """测试同步客户端在预算耗尽后阻塞等待补充"""
+    budget = WeightBudget(capacity=10, period=0.2)
+    started = time.monotonic()
+    budget.acquire_sync(10)
+    budget.acquire_sync(10)
+
+    assert time.monotonic() - started >= 0.15
+    assert budget.spent == 20
+
+
+def test_waiters_on_separate_loops():
+    """测试不同事件循环中排队的请求各自在所属循环中被唤醒"""
+    budget = WeightBudget(capacity=10, period=0.1)
+    budget.acquire_sync(10)
+    finished = []
+
+    def run(name):
+        async def request():
+            await budget.acquire(10)
+            finished.append(name)
+
+        asyncio.run(asyncio.wait_for(request(), 2))
+
+    threads = [threading.Thread(target=run, args=(name,)) for name in ("app", "scheduler")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(finished) == ["app", "scheduler"]
+    assert budget.spent == 30
+
+
+def test_ban_after_loop_closed():
+    """测试排队请求所属的事件循环关闭后，其他线程的限流和请求不受影响"""
+    budget = WeightBudget(capacity=10, period=1)
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(budget.acquire(10))
+    loop.create_task(budget.acquire(10))
+    loop.run_until_complete(asyncio.sleep(0.01))
+    loop.close()
+
+    budget.ban(0.01)
+
+    async def request():
+        await budget.acquire(1)
+
+    asyncio.run(asyncio.wait_for(request(), 2))
+    assert budget.spent == 11
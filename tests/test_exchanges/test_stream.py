@@ -0,0 +1,234 @@
+import pytest
+
+from exchanges.binance.candle_store import CandleBuffer, CandleStore, KlineWindowCache
+from exchanges.binance.futures import BinanceFuturesClient
+from exchanges.binance.klines import KlineColumns
+from exchanges.binance.stream import KlineStreamService, subscriptions_from_env
+from tests.test_exchanges.conftest import make_klines
+from tests.test_exchanges.fake_stream import FakeKlineStream, wait_until
+
+SERIES = make_klines(300)
+HOUR = 3_600_000
+
+
+def open_times(klines):
+    return [int(kline["open_time"]) for kline in klines]
+
+
+def columns(klines):
+    return KlineColumns.from_klines(klines, "BTCUSDT", "1h")
+
+
+def test_buffer_update_and_gap():
+    """测试同一根K线覆盖、下一根追加、不连续时清空重来"""
+    buffer = CandleBuffer(HOUR, maxlen=5)
+    for kline in SERIES[:7]:
+        buffer.update(kline)
+    assert open_times(buffer.candles) == open_times(SERIES[2:7])
+
+    updated = dict(SERIES[6], close="1")
+    buffer.update(updated)
+    assert buffer.candles[-1] is updated and len(buffer.candles) == 5
+
+    # 迟到的旧K线只覆盖已有的同一根
+    late = dict(SERIES[4], close="2")
+    buffer.update(late)
+    buffer.update(SERIES[0])
+    assert buffer.candles[2] is late
+    assert open_times(buffer.candles) == open_times(SERIES[2:7])
+
+    buffer.update(SERIES[9])
+    assert open_times(buffer.candles) == open_times(SERIES[9:10])
+
+
+def test_buffer_fill_prepends_contiguous_history():
+    """测试 REST 数据只补齐与缓冲区开头连续的历史，重叠部分保留推送的数据"""
+    buffer = CandleBuffer(HOUR, maxlen=100)
+    pushed = dict(SERIES[50], close="1")
+    buffer.update(pushed)
+
+    buffer.fill(columns(SERIES[10:40]))
+    assert len(buffer.candles) == 1
+
+    buffer.fill(columns(SERIES[0:51]))
+    assert open_times(buffer.candles) == open_times(SERIES[0:51])
+    assert buffer.candles[-1] is pushed
+
+    buffer.fill(columns(SERIES[:200]))
+    assert len(buffer.candles) == 51
+
+    small = CandleBuffer(HOUR, maxlen=10)
+    small.fill(columns(SERIES[:30]))
+    assert open_times(small.candles) == open_times(SERIES[20:30])
+    assert small.latest(11) is None
+    assert small.latest(3) == SERIES[27:30]
+
+
+def test_store_reads_only_live_fresh_buffers():
+    """测试断线或长时间没有推送时不读取内存K线"""
+    now = [0.0]
+    store = CandleStore(BinanceFuturesClient.INTERVAL_MS, max_age=10, clock=lambda: now[0])
+    assert store.read("BTCUSDT", "1h", 1) is None
+
+    for kline in SERIES[:20]:
+        store.update(kline)
+    assert store.read("BTCUSDT", "1h", 20) == SERIES[:20]
+    assert store.read("BTCUSDT", "1h", 21) is None
+
+    now[0] = 11
+    assert store.read("BTCUSDT", "1h", 5) is None
+    store.update(SERIES[19])
+    assert store.read("BTCUSDT", "1h", 5) == SERIES[15:20]
+
+    store.set_live(False)
+    assert store.read("BTCUSDT", "1h", 5) is None
+    assert store.stats()["hits"] == 2
+    assert store.stats()["misses"] == 4
+
+
+def test_window_cache_counts_broken_delta_as_gap():
+    """测试增量K线之间不连续（缓冲区被清空）时按缺失统计，不计入增量获取和返回的根数"""
+    cache = KlineWindowCache({"1h": HOUR}, maxlen=100)
+    cache.replace("BTCUSDT", "1h", columns(SERIES[:50]))
+    assert cache.splice("BTCUSDT", "1h", columns(SERIES[49:51]), limit=50).to_klines() == SERIES[1:51]
+
+    # 增量结果从窗口最后一根开始，但中间缺了K线
+    assert cache.splice("BTCUSDT", "1h", columns([SERIES[50], SERIES[53]]), limit=50) is None
+    stats = cache.stats()
+    assert (stats["full"], stats["delta"], stats["gaps"]) == (1, 1, 1)
+    assert (stats["rows_fetched"], stats["rows_served"]) == (54, 100)
+
+
+def test_window_cache_evicts_least_recently_used():
+    """测试窗口数达到上限时淘汰最久未使用的窗口"""
+    cache = KlineWindowCache({"1h": HOUR}, maxlen=100, max_windows=2)
+    for symbol in ("BTCUSDT", "ETHUSDT"):
+        cache.replace(symbol, "1h", columns(SERIES[:50]))
+    assert cache.since("BTCUSDT", "1h", 50) is not None
+    cache.replace("SOLUSDT", "1h", columns(SERIES[:50]))
+
+    assert cache.since("ETHUSDT", "1h", 50) is None
+    assert cache.since("BTCUSDT", "1h", 50) == int(SERIES[49]["open_time"])
+    stats = cache.stats()
+    assert (stats["windows"], stats["max_windows"], stats["evictions"]) == (2, 2, 1)
+
+
+def test_subscriptions_from_env():
+    assert subscriptions_from_env("btcusdt@1h, ETHUSDT@15m,") == [("BTCUSDT", "1h"), ("ETHUSDT", "15m")]
+    with pytest.raises(ValueError):
+        subscriptions_from_env("BTCUSDT")
+
+
+@pytest.fixture
+def fake_stream():
+    server = FakeKlineStream().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def service(fake_stream):
+    service = KlineStreamService(url=fake_stream.url, reconnect_delay=0.05)
+    service.start()
+    yield service
+    service.stop()
+
+
+def test_stream_ingests_klines(fake_stream, service):
+    """测试订阅后推送的K线按 REST 格式写入存储"""
+    service.subscribe("BTCUSDT", "1h")
+    wait_until(lambda: "btcusdt@kline_1h" in fake_stream.subscribed())
+
+    for kline in SERIES[:10]:
+        fake_stream.push(kline, final=True)
+    wait_until(lambda: service.messages == 10)
+
+    assert service.read("BTCUSDT", "1h", 10) == SERIES[:10]
+    assert service.stats()["subscriptions"] == ["BTCUSDT@1h"]
+
+
+def test_stream_subscribes_on_demand(fake_stream, service):
+    """测试读取未订阅的 (交易对, 周期) 时自动订阅，取消订阅后不再推送"""
+    assert service.read("ETHUSDT", "15m", 5) is None
+    wait_until(lambda: "ethusdt@kline_15m" in fake_stream.subscribed())
+
+    service.unsubscribe("ETHUSDT", "15m")
+    wait_until(lambda: not fake_stream.subscribed())
+    with pytest.raises(ValueError):
+        service.subscribe("BTCUSDT", "1M")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_on_demand_subscriptions_evicted_lru_and_idle():
+    """测试按需订阅达到上限时淘汰最久未读取的，空闲超时后取消订阅并释放缓冲区，常驻订阅不淘汰"""
+    clock = FakeClock()
+    service = KlineStreamService(CandleStore(BinanceFuturesClient.INTERVAL_MS, clock=clock),
+                                 max_subscriptions=3, idle_timeout=60)
+    service.subscribe("BTCUSDT", "1h")
+    for symbol in ("ETHUSDT", "BNBUSDT"):
+        clock.now += 1
+        assert service.read(symbol, "1h", 5) is None
+    service.store.update(dict(SERIES[0], symbol="ETHUSDT"))
+
+    # 读取 ETHUSDT 后 BNBUSDT 成为最久未读取的按需订阅
+    clock.now += 1
+    service.read("ETHUSDT", "1h", 5)
+    service.read("SOLUSDT", "1h", 5)
+    assert service.subscriptions == {("BTCUSDT", "1h"), ("ETHUSDT", "1h"), ("SOLUSDT", "1h")}
+    assert service.evicted == 1
+
+    # 空闲超时：两个按需订阅都被淘汰，缓冲区一并释放
+    clock.now += 61
+    service.read("BTCUSDT", "1h", 5)
+    assert service.subscriptions == {("BTCUSDT", "1h")}
+    assert ("ETHUSDT", "1h") not in service.store.buffers
+    assert service.stats()["evicted"] == 3
+
+    # 全部是常驻订阅时不再建立按需订阅
+    service.subscribe("ETHUSDT", "1h")
+    service.subscribe("BNBUSDT", "1h")
+    assert service.subscribe("SOLUSDT", "1h", pinned=False) is False
+    assert len(service.subscriptions) == 3
+
+
+def test_evicted_stream_unsubscribed_upstream(fake_stream):
+    """测试淘汰的按需订阅向推送服务取消订阅，之后迟到的推送不再建立缓冲区"""
+    service = KlineStreamService(url=fake_stream.url, reconnect_delay=0.05, max_subscriptions=1)
+    service.start()
+    try:
+        service.read("BTCUSDT", "1h", 5)
+        wait_until(lambda: fake_stream.subscribed() == {"btcusdt@kline_1h"})
+        service.read("ETHUSDT", "1h", 5)
+        wait_until(lambda: fake_stream.subscribed() == {"ethusdt@kline_1h"})
+        assert service.subscriptions == {("ETHUSDT", "1h")}
+
+        fake_stream.push(dict(SERIES[0], symbol="ETHUSDT"))
+        wait_until(lambda: service.messages == 1)
+        assert list(service.store.buffers) == [("ETHUSDT", "1h")]
+    finally:
+        service.stop()
+
+
+def test_stream_reconnects(fake_stream, service):
+    """测试断线期间不可读，重连后重新订阅并继续写入"""
+    service.subscribe("BTCUSDT", "1h")
+    wait_until(lambda: fake_stream.subscribed())
+    for kline in SERIES[:5]:
+        fake_stream.push(kline)
+    wait_until(lambda: service.messages == 5)
+
+    fake_stream.drop()
+    wait_until(lambda: service.store.read("BTCUSDT", "1h", 5) is None)
+    wait_until(lambda: fake_stream.accepted == 2 and fake_stream.subscribed())
+
+    fake_stream.push(SERIES[5])
+    wait_until(lambda: service.messages == 6)
+    assert service.read("BTCUSDT", "1h", 6) == SERIES[:6]
+    assert service.reconnects == 1
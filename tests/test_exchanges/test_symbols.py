@@ -0,0 +1,70 @@
+import os
+from typing import Annotated
+
+import pytest
+from pydantic import AfterValidator, BaseModel, ValidationError
+
+from exchanges.binance.futures import FuturesSymbol
+from exchanges.binance.symbols import Symbol, SymbolRegistry
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "exchange_info.json")
+
+
+@pytest.fixture
+def registry():
+    registry = SymbolRegistry()
+    registry.load_file(FIXTURE)
+    return registry
+
+
+def test_builtin_symbols_before_first_load():
+    """测试首次加载前使用内置的交易对列表"""
+    registry = SymbolRegistry()
+    assert all(symbol.value in registry for symbol in FuturesSymbol)
+    assert registry.stats()["source"] == "builtin"
+
+
+def test_load_from_fixture(registry):
+    """测试从离线 exchangeInfo 加载交易对和元数据"""
+    assert len(registry) == 11
+    assert "1000PEPEUSDT" in registry
+    assert "MATICUSDT" not in registry
+    assert "FOOUSDT" not in registry
+    assert "1000PEPEUSDT" in registry.symbols() and "MATICUSDT" not in registry.symbols()
+
+    info = registry.get("BTCUSDT")
+    assert (info.tick_size, info.step_size, info.min_qty, info.min_notional) == (0.1, 0.001, 0.001, 100.0)
+    assert (info.base_asset, info.quote_asset, info.contract_type) == ("BTC", "USDT", "PERPETUAL")
+    assert info.to_dict()["price_precision"] == 2
+    assert registry.stats()["source"].startswith("file:")
+
+
+def test_validate(registry):
+    """测试校验返回可直接传给客户端的交易对，不存在或不可交易时抛出 ValueError"""
+    symbol = registry.validate("ethusdt")
+    assert isinstance(symbol, Symbol)
+    assert symbol == "ETHUSDT" and symbol.value == "ETHUSDT"
+    assert registry.validate(FuturesSymbol.BTCUSDT).value == "BTCUSDT"
+
+    with pytest.raises(ValueError, match="Unsupported symbol: FOOUSDT"):
+        registry.validate("FOOUSDT")
+    with pytest.raises(ValueError, match="not trading"):
+        registry.validate("MATICUSDT")
+    with pytest.raises(ValueError):
+        registry.load({"symbols": []})
+    assert len(registry) == 11
+
+
+def test_symbol_as_model_field(registry):
+    """测试 Symbol 作为请求体字段类型时的校验、序列化和 JSON Schema"""
+    class Request(BaseModel):
+        symbol: Annotated[Symbol, AfterValidator(registry.validate)]
+
+    request = Request(symbol="btcusdt")
+    assert isinstance(request.symbol, Symbol) and request.symbol.value == "BTCUSDT"
+    assert request.model_dump() == {"symbol": "BTCUSDT"}
+    assert type(request.model_dump()["symbol"]) is str
+    assert Request.model_json_schema()["properties"]["symbol"]["type"] == "string"
+
+    with pytest.raises(ValidationError, match="Unsupported symbol: FOOUSDT"):
+        Request(symbol="FOOUSDT")
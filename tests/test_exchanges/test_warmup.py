@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from exchanges.binance.backends import BACKENDS
+from exchanges.binance.futures import BinanceFuturesClient, FuturesSymbol
+from exchanges.binance.indicators import TechnicalIndicators
+from exchanges.binance.klines import KlineColumns
+from tests.test_exchanges.conftest import make_klines
+
+planner = TechnicalIndicators.planner
+SERIES = make_klines(3000)
+
+
+@pytest.mark.parametrize("backend", list(BACKENDS))
+@pytest.mark.parametrize("params", [{}, {"period": 5}, {"k_period": 9, "d_period": 5}, {"kijun_sen_period": 30}])
+def test_lookback_covers_leading_nan(backend, params):
+    """测试每个指标在预热K线之后不再有 NaN（滞后跨度除外）"""
+    engine_class = BACKENDS[backend]
+    for name, spec in TechnicalIndicators.SUPPORTED_INDICATORS.items():
+        request = planner.resolve(name, {key: value for key, value in params.items() if key in spec["parameters"]})
+        lookback = engine_class.indicator_lookback(request)
+        columns = engine_class(SERIES[:400]).run(request)
+        for column, values in columns.items():
+            if column != "chikou_span":
+                assert not np.isnan(values[lookback:]).any(), (backend, planner.format(request), column)
+
+
+def test_lookback_of_selection():
+    """测试一组指标的预热期取最大值"""
+    assert TechnicalIndicators.engine_class.lookback(planner.parse("rsi:9,ema:50")) == 9
+    assert TechnicalIndicators.engine_class.lookback(TechnicalIndicators.DEFAULT_INDICATORS) == 77
+    assert TechnicalIndicators.engine_class.lookback([]) == 0
+
+
+@pytest.fixture
+def fetches(monkeypatch):
+    """用本地K线序列模拟 get_kline_columns，记录每次请求的参数"""
+    calls = []
+
+    def fake_get_kline_columns(self, symbol, interval="1h", limit=500, start_time=None, end_time=None):
+        calls.append((limit, start_time, end_time))
+        rows = [kline for kline in SERIES
+                if (start_time is None or int(kline["open_time"]) >= start_time)
+                and (end_time is None or int(kline["open_time"]) <= end_time)]
+        rows = rows[:limit] if start_time is not None else rows[-limit:]
+        return KlineColumns.from_klines(rows, symbol.value, interval)
+
+    monkeypatch.setattr(BinanceFuturesClient, "get_kline_columns", fake_get_kline_columns)
+    monkeypatch.setattr(BinanceFuturesClient, "frame_cache", type(BinanceFuturesClient.frame_cache)())
+    return calls
+
+
+def test_window_is_fully_populated(fetches):
+    """测试多取预热K线后，返回的窗口与全量计算的末尾一致且没有空值"""
+    client = BinanceFuturesClient()
+    rows = client.get_klines_with_indicators(FuturesSymbol.BTCUSDT, limit=120)
+
+    assert fetches == [(197, None, None)]
+    assert rows == TechnicalIndicators.calculate_all(SERIES[-197:])[-120:]
+    for row in rows[:-26]:
+        assert all(value is not None for value in row.values())
+
+    selected = client.get_klines_with_indicators(FuturesSymbol.BTCUSDT, limit=50,
+                                                 indicators=planner.parse("rsi:9,ema:20"))
+    assert fetches[-1] == (59, None, None)
+    assert len(selected) == 50 and selected[0]["rsi_9"] is not None
+
+
+def test_history_fetched_separately(fetches):
+    """测试指定开始时间或超过单次上限时，单独请求窗口之前的历史K线"""
+    client = BinanceFuturesClient()
+    start_time = int(SERIES[1000]["open_time"])
+    rows = client.get_klines_with_indicators(FuturesSymbol.BTCUSDT, limit=100, start_time=start_time)
+
+    assert fetches == [(100, start_time, None), (77, None, start_time - 1)]
+    assert rows[0]["open_time"] == SERIES[1000]["open_time"]
+    assert rows == TechnicalIndicators.calculate_all(SERIES[923:1100])[77:]
+
+    client.get_klines_with_indicators(FuturesSymbol.BTCUSDT, limit=1500)
+    assert fetches[2][0] == 1500 and fetches[3][0] == 77
+
+
+def test_warmup_disabled(fetches):
+    """测试关闭预热时保持原有行为"""
+    rows = BinanceFuturesClient().get_klines_with_indicators(FuturesSymbol.BTCUSDT, limit=100, warmup=False)
+    assert fetches == [(100, None, None)]
+    assert rows[0]["ma_30"] is None